@@ -0,0 +1,3 @@
+"""Benchmarks for the server and the client library. Run them from the root
+of this project, e.g. `python -m benchmarks.client_session`.
+"""
@@ -0,0 +1,72 @@
+"""Compares the per-poll latency of GET /status calls made through a fresh
+connection each time (module-level `requests.get`, the client library's old
+behaviour) against a pooled, keep-alive TranslateVideoClient.
+
+Usage: python -m benchmarks.client_session [--polls 2000]
+"""
+
+from typing import Callable
+
+import argparse
+import statistics
+import time
+
+import requests
+
+from client_library.translate_video.translate_video import TranslateVideoClient
+
+from .server_process import running_server
+
+_JOB_ID = "BENCHMARK_JOB"
+
+
+def _measure(poll: Callable[[], requests.Response], polls: int) -> list[float]:
+    """Returns the latency (in milliseconds) of each poll"""
+    latencies = []
+    for _ in range(polls):
+        started_at = time.perf_counter()
+        response = poll()
+        latencies.append((time.perf_counter() - started_at) * 1000)
+        assert response.status_code == 200
+
+    return latencies
+
+
+def _summarize(name: str, latencies: list[float]) -> None:
+    """Prints the latency percentiles"""
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<28} mean {statistics.fmean(latencies):6.3f} ms   "
+        f"p50 {quantiles[49]:6.3f} ms   p99 {quantiles[98]:6.3f} ms"
+    )
+
+
+def main() -> None:
+    """Runs the benchmark against a locally spawned server"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--polls", type=int, default=2000)
+    args = parser.parse_args()
+
+    with running_server() as base_url:
+        url = f"{base_url}/status/{_JOB_ID}"
+        requests.post(f"{base_url}/submit/{_JOB_ID}", params={"delay_seconds": 3600})
+
+        with TranslateVideoClient(base_url=base_url) as client:
+            # Warming both paths up before measuring
+            _measure(lambda: requests.get(url, timeout=10), 50)
+            _measure(lambda: client.get(f"/status/{_JOB_ID}", timeout=10), 50)
+
+            _summarize(
+                "requests.get (new conn)",
+                _measure(lambda: requests.get(url, timeout=10), args.polls),
+            )
+            _summarize(
+                "TranslateVideoClient (pool)",
+                _measure(
+                    lambda: client.get(f"/status/{_JOB_ID}", timeout=10), args.polls
+                ),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Measures the throughput of the segmented downloads of a job's output against
+a locally spawned server, for several numbers of segments in flight, along with
+the server's peak memory (which stays flat whatever the size of the output, as
+it's sent a block at a time, or by the ASGI server itself when it can).
+
+Usage: python -m benchmarks.downloads [--size-mib 512] [--segment-mib 8] [--concurrency 1,4]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.server_process import running_server_process
+from benchmarks.uploads import _peak_rss_bytes
+from client_library.translate_video.translate_video import (
+    TranslateVideo,
+    TranslateVideoClient,
+)
+
+
+def main() -> None:
+    """Downloads the same output once per number of segments in flight"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mib", type=int, default=512)
+    parser.add_argument("--segment-mib", type=int, default=8)
+    parser.add_argument("--concurrency", default="1,4")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            "RESULT_DIRECTORY": os.path.join(directory, "results"),
+            "RESULT_STANDIN_SIZE": str(args.size_mib * 2**20),
+            "JOB_ERROR_RATE": "0",
+            "SUBMIT_RATE_PER_CLIENT": "0",
+        }
+        extra_args = ("--sqlite-path", os.path.join(directory, "jobs.sqlite3"))
+        with running_server_process(extra_args=extra_args, env=env) as (base_url, process):
+            with TranslateVideoClient(base_url, request_timeout_seconds=60) as client:
+                job = TranslateVideo("JOB_DOWNLOAD", delay_seconds=0, client=client)
+                job.submit()
+                # The first download also writes the output on the server
+                job.download(os.path.join(directory, "warm-up.mp4"))
+
+                print(f"Downloading {args.size_mib} MiB in {args.segment_mib} MiB segments")
+                for concurrency in (int(c) for c in args.concurrency.split(",")):
+                    output_path = os.path.join(directory, f"output-{concurrency}.mp4")
+                    started_at = time.perf_counter()
+                    job.download(
+                        output_path,
+                        concurrency=concurrency,
+                        segment_size=args.segment_mib * 2**20,
+                    )
+                    seconds = time.perf_counter() - started_at
+                    os.remove(output_path)
+
+                    print(
+                        f"  {concurrency} in flight: {args.size_mib / seconds:8.1f} MiB/s, "
+                        f"server peak RSS {_peak_rss_bytes(process.pid) / 2**20:.1f} MiB"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Compares the memory the process-local job stores take per resident job.
+
+The jobs are a mix of pending and finished (completed or error) ones, as on a
+busy server. Memory is measured with tracemalloc, so it covers everything the
+store allocates: the records, the job_id index and the expiry index.
+
+Usage: python -m benchmarks.job_memory [--jobs 1000000]
+"""
+
+from datetime import datetime, timedelta
+from typing import Callable
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from server.models import Job
+from server.stores import CompactJobStore, InMemoryJobStore, JobStore
+
+
+def _fill(store: JobStore, jobs: int) -> None:
+    """Submits the jobs, and finishes two thirds of them"""
+    started_at = datetime.now()
+    for i in range(jobs):
+        store.put(
+            f"JOB_{i:07}",
+            Job(
+                delay=random.randint(1, 60),
+                random_num=random.random(),
+                started_at=started_at + timedelta(microseconds=i),
+                status="pending",
+            ),
+        )
+
+    for i in range(0, jobs - 1, 3):
+        store.update_status(f"JOB_{i:07}", "completed", datetime.now())
+        store.update_status(f"JOB_{i + 1:07}", "error", datetime.now())
+
+
+def _measure(create_store: Callable[[], JobStore], jobs: int) -> tuple[float, float]:
+    """Returns the bytes allocated per job and the time (in seconds) it took to fill the store"""
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+
+    started_at = time.perf_counter()
+    store = create_store()
+    _fill(store, jobs)
+    elapsed = time.perf_counter() - started_at
+
+    gc.collect()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    store.close()
+    return (allocated - baseline) / jobs, elapsed
+
+
+def main() -> None:
+    """Runs the benchmark against every process-local backend"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    stores = {"memory": InMemoryJobStore, "compact": CompactJobStore}
+    for name, create_store in stores.items():
+        bytes_per_job, elapsed = _measure(create_store, args.jobs)
+        print(
+            f"{name:<8} {bytes_per_job:8.1f} bytes/job "
+            f"{bytes_per_job * args.jobs / 2**20:9.1f} MiB for {args.jobs:,} jobs "
+            f"(filled in {elapsed:.1f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Compares the per-operation latency and the throughput of the job store backends.
+
+The "redis" backend runs against the given --redis-url, or else against the
+in-process stand-in used by the tests (which measures the protocol and the
+round trips rather than a real Redis server).
+
+Usage: python -m benchmarks.job_stores [--jobs 10000] [--redis-url redis://...]
+"""
+
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Callable
+
+import argparse
+import os
+import tempfile
+import time
+
+from server.models import Job
+from server.stores import (
+    CompactJobStore,
+    InMemoryJobStore,
+    JobStore,
+    RedisJobStore,
+    SQLiteJobStore,
+)
+from server.tests.resp_server import running_resp_server
+
+_BATCH_SIZE = 500
+
+
+def _time_per_op(operation: Callable[[], None], ops: int) -> float:
+    """Runs the operation and returns the time (in seconds) it took per op"""
+    started_at = time.perf_counter()
+    operation()
+    return (time.perf_counter() - started_at) / ops
+
+
+def _benchmark(name: str, store: JobStore, jobs: int) -> None:
+    """Prints the time per op of every store operation"""
+    job_ids = [f"JOB_{i:07}" for i in range(jobs)]
+    job = Job(delay=20, random_num=0.5, started_at=datetime.now(), status="pending")
+    batches = [job_ids[i : i + _BATCH_SIZE] for i in range(0, jobs, _BATCH_SIZE)]
+
+    results = {
+        "put": _time_per_op(lambda: [store.put(i, job) for i in job_ids], jobs),
+        "get": _time_per_op(lambda: [store.get(i) for i in job_ids], jobs),
+        "update_status": _time_per_op(
+            lambda: [store.update_status(i, "completed", datetime.now()) for i in job_ids], jobs
+        ),
+        "put_many": _time_per_op(
+            lambda: [store.put_many(dict.fromkeys(b, job)) for b in batches], jobs
+        ),
+        "get_many": _time_per_op(lambda: [store.get_many(b) for b in batches], jobs),
+        "delete": _time_per_op(lambda: [store.delete(i) for i in job_ids], jobs),
+    }
+
+    print(f"\n{name}")
+    for operation, seconds in results.items():
+        print(
+            f"  {operation:<14} {seconds * 1e6:9.2f} us/op {1 / seconds:12,.0f} ops/s"
+        )
+
+
+def main() -> None:
+    """Runs the benchmark against every backend"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=10_000)
+    parser.add_argument("--redis-url")
+    args = parser.parse_args()
+
+    with ExitStack() as stack:
+        directory = stack.enter_context(tempfile.TemporaryDirectory())
+        redis_url = args.redis_url or stack.enter_context(running_resp_server())
+
+        stores = {
+            "memory": InMemoryJobStore(),
+            "compact": CompactJobStore(),
+            "sqlite (WAL)": SQLiteJobStore(os.path.join(directory, "jobs.sqlite3")),
+            "redis": RedisJobStore(redis_url),
+        }
+        for name, store in stores.items():
+            _benchmark(name, store, args.jobs)
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
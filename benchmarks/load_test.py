@@ -0,0 +1,405 @@
+"""Load test of the server and of the client library's polling loop.
+
+A scenario submits `jobs` jobs (with delays drawn from `delays`) through
+`submitters` concurrent submitters, while `pollers` concurrent pollers wait for
+each of them to finish through AsyncTranslateVideo.get_status(). Every request
+is timed, per endpoint, at the transport level.
+
+The server either runs in-process, driven through httpx.ASGITransport (which
+leaves the network and uvicorn out of the picture), or in a locally spawned
+uvicorn process (`python -m server`), whose CPU time and memory are reported.
+Each error rate of the sweep (JOB_ERROR_RATE) gets a run of its own.
+
+The results are printed, and written as JSON (see --output) so that runs can
+be compared across commits (see --baseline). Delays and job order are drawn
+from a seeded random generator, so a scenario is the same from run to run.
+
+Usage: python -m benchmarks.load_test [--scenario mixed] [--target asgi|uvicorn]
+       [--error-rates 0,0.2,0.5] [--output results.json] [--baseline previous.json]
+"""
+
+from collections import Counter, defaultdict
+from contextlib import ExitStack, redirect_stdout
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timezone
+from typing import Optional
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+from client_library.translate_video import errors
+from client_library.translate_video.async_translate_video import (
+    AsyncTranslateVideo,
+    AsyncTranslateVideoClient,
+)
+from server import config, handlers
+
+from .server_process import running_server_process
+
+_ASGI_BASE_URL = "http://testserver"
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Shape of the load put on the server"""
+
+    jobs: int
+    submitters: int
+    pollers: int
+    delays: tuple[int, ...]  # Seconds, drawn at random for every job
+    long_poll_seconds: int = 0
+    polling_interval_seconds: int = 1
+    timeout_seconds: int = 120
+    seed: int = 0
+
+
+SCENARIOS = {
+    "smoke": Scenario(jobs=20, submitters=2, pollers=5, delays=(0, 1)),
+    "mixed": Scenario(jobs=500, submitters=20, pollers=100, delays=(0, 1, 2, 5)),
+    "long-poll": Scenario(
+        jobs=500, submitters=20, pollers=100, delays=(1, 2, 5), long_poll_seconds=30
+    ),
+}
+
+
+def _percentile(sorted_values: list[float], percentile: float) -> Optional[float]:
+    """Returns the nearest-rank percentile of the sorted values"""
+    if not sorted_values:
+        return None
+
+    rank = math.ceil(percentile / 100 * len(sorted_values))
+    return sorted_values[max(0, rank - 1)]
+
+
+def _summarize_latencies(latencies: list[float], seconds: float) -> dict:
+    """Returns the request rate and the latency percentiles (in milliseconds)"""
+    latencies = sorted(latency * 1000 for latency in latencies)
+    return {
+        "requests": len(latencies),
+        "requests_per_second": round(len(latencies) / seconds, 1),
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "p99_ms": _percentile(latencies, 99),
+        "max_ms": latencies[-1] if latencies else None,
+    }
+
+
+class _RecordingTransport(httpx.AsyncBaseTransport):
+    """Times every request sent through the wrapped transport, per endpoint
+    (e.g. "GET /status"), until the response's headers are received
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        self._transport = transport
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.status_codes: dict[str, Counter] = defaultdict(Counter)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        endpoint = f"{request.method} /{request.url.path.split('/')[1]}"
+        started_at = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TransportError:
+            self.status_codes[endpoint]["transport_error"] += 1
+            raise
+
+        self.latencies[endpoint].append(time.perf_counter() - started_at)
+        self.status_codes[endpoint][str(response.status_code)] += 1
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _process_tree(pid: int) -> list[int]:
+    """Returns the process and its descendants (e.g. the uvicorn workers)"""
+    children_by_parent = defaultdict(list)
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="utf-8") as stat:
+                parent = int(stat.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children_by_parent[parent].append(int(entry))
+
+    pids = [pid]
+    for current in pids:
+        pids.extend(children_by_parent[current])
+    return pids
+
+
+def _resource_usage(pid: int) -> dict:
+    """Returns the CPU time (user + system, in seconds) and the resident memory
+    (in bytes) of the process and its descendants, as per /proc (Linux only)
+    """
+    clock_ticks = os.sysconf("SC_CLK_TCK")
+    cpu_seconds = 0.0
+    rss_bytes = 0
+    for process_id in _process_tree(pid):
+        try:
+            with open(f"/proc/{process_id}/stat", encoding="utf-8") as stat:
+                fields = stat.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{process_id}/status", encoding="utf-8") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        rss_bytes += int(line.split()[1]) * 1024
+        except OSError:  # The process exited in the meantime
+            continue
+        cpu_seconds += (int(fields[11]) + int(fields[12])) / clock_ticks
+
+    return {"cpu_seconds": cpu_seconds, "rss_bytes": rss_bytes}
+
+
+async def _drive(
+    scenario: Scenario, base_url: str, transport: httpx.AsyncBaseTransport
+) -> dict:
+    """Puts the scenario's load on the server. Returns the measurements"""
+    rng = random.Random(scenario.seed)
+    run_id = f"{time.time_ns():x}"
+    pending_submissions: asyncio.Queue = asyncio.Queue()
+    for i in range(scenario.jobs):
+        pending_submissions.put_nowait((f"LOAD_{run_id}_{i}", rng.choice(scenario.delays)))
+    submitted_jobs: asyncio.Queue = asyncio.Queue()
+
+    recorder = _RecordingTransport(transport)
+    results: Counter = Counter()
+    turnaround_overheads = []
+
+    async with AsyncTranslateVideoClient(
+        base_url,
+        max_concurrency=scenario.submitters + scenario.pollers,
+        max_keepalive_connections=scenario.submitters + scenario.pollers,
+        transport=recorder,
+    ) as client:
+
+        async def submit() -> None:
+            while not pending_submissions.empty():
+                job_id, delay = pending_submissions.get_nowait()
+                job = AsyncTranslateVideo(
+                    job_id,
+                    delay_seconds=delay,
+                    polling_interval_seconds=scenario.polling_interval_seconds,
+                    timeout_seconds=scenario.timeout_seconds,
+                    long_poll_seconds=scenario.long_poll_seconds,
+                    client=client,
+                )
+                await job.submit()
+                await submitted_jobs.put((job, time.perf_counter()))
+
+        async def poll() -> None:
+            while (item := await submitted_jobs.get()) is not None:
+                job, submitted_at = item
+                try:
+                    status = await job.get_status()
+                except errors.GetJobInfoError:
+                    results["failed"] += 1
+                    continue
+
+                results[status["result"]] += 1
+                if status["result"] == "completed":
+                    turnaround = time.perf_counter() - submitted_at
+                    turnaround_overheads.append(turnaround - job.delay_seconds)
+
+        started_at = time.perf_counter()
+        pollers = [asyncio.create_task(poll()) for _ in range(scenario.pollers)]
+        await asyncio.gather(*(submit() for _ in range(scenario.submitters)))
+        for _ in pollers:
+            submitted_jobs.put_nowait(None)
+        await asyncio.gather(*pollers)
+        seconds = time.perf_counter() - started_at
+
+    all_latencies = [latency for values in recorder.latencies.values() for latency in values]
+    turnaround_overheads.sort()
+    return {
+        "duration_seconds": round(seconds, 3),
+        "overall": _summarize_latencies(all_latencies, seconds),
+        "endpoints": {
+            endpoint: {
+                **_summarize_latencies(latencies, seconds),
+                "status_codes": dict(recorder.status_codes[endpoint]),
+            }
+            for endpoint, latencies in sorted(recorder.latencies.items())
+        },
+        "jobs": {
+            "completed": results["completed"],
+            "error": results["error"],
+            "pending": results["pending"],  # i.e. timed out
+            "failed": results["failed"],
+            "error_share": round(results["error"] / max(1, scenario.jobs), 3),
+        },
+        # Time between a job being due and a poller seeing it completed (which
+        # includes waiting for a poller to be free when they're all busy)
+        "completion_lag": {
+            "p50_ms": _ms(_percentile(turnaround_overheads, 50)),
+            "p95_ms": _ms(_percentile(turnaround_overheads, 95)),
+            "p99_ms": _ms(_percentile(turnaround_overheads, 99)),
+        },
+    }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    """Converts seconds into (rounded) milliseconds"""
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+async def _run_in_process(scenario: Scenario, error_rate: float) -> dict:
+    """Runs the scenario against the app, in this process (with its background tasks)"""
+    config.JOB_ERROR_RATE = error_rate
+    transport = httpx.ASGITransport(app=handlers.app)
+    cpu_started_at = time.process_time()
+    async with handlers.lifespan(handlers.app):
+        measurements = await _drive(scenario, _ASGI_BASE_URL, transport)
+
+    measurements["process"] = {
+        # The client runs in the same process, so this covers both
+        "cpu_seconds": round(time.process_time() - cpu_started_at, 3),
+        "rss_bytes": _resource_usage(os.getpid())["rss_bytes"],
+    }
+    return measurements
+
+
+def _run_against_uvicorn(scenario: Scenario, error_rate: float, workers: int) -> dict:
+    """Runs the scenario against a freshly spawned server"""
+    with running_server_process(
+        extra_args=("--workers", str(workers)),
+        env={"JOB_ERROR_RATE": str(error_rate)},
+    ) as (base_url, process):
+        usage_before = _resource_usage(process.pid)
+        measurements = asyncio.run(
+            _drive(scenario, base_url, httpx.AsyncHTTPTransport())
+        )
+        usage_after = _resource_usage(process.pid)
+
+    cpu_seconds = usage_after["cpu_seconds"] - usage_before["cpu_seconds"]
+    measurements["server"] = {
+        "cpu_seconds": round(cpu_seconds, 3),
+        "cpu_percent": round(100 * cpu_seconds / measurements["duration_seconds"], 1),
+        "rss_bytes": usage_after["rss_bytes"],
+    }
+    return measurements
+
+
+def _git_commit() -> Optional[str]:
+    """Returns the commit the benchmark runs at, if it runs in a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_run(run: dict, baseline_run: Optional[dict]) -> None:
+    """Prints the run's main figures, along with their change since the baseline"""
+
+    def change(path: tuple[str, ...], value: Optional[float]) -> str:
+        previous = baseline_run
+        for key in path:
+            previous = (previous or {}).get(key)
+        if not previous or value is None:
+            return ""
+        return f" ({(value - previous) / previous:+.0%})"
+
+    print(f"\nerror rate {run['error_rate']:.2f} - {run['duration_seconds']}s")
+    for endpoint, stats in {"overall": run["overall"], **run["endpoints"]}.items():
+        path = ("overall",) if endpoint == "overall" else ("endpoints", endpoint)
+        print(
+            f"  {endpoint:<14} {stats['requests']:7} requests "
+            f"{stats['requests_per_second']:9.1f}/s"
+            f"{change((*path, 'requests_per_second'), stats['requests_per_second'])}  "
+            f"p50 {stats['p50_ms']:8.2f} ms  p95 {stats['p95_ms']:8.2f} ms  "
+            f"p99 {stats['p99_ms']:8.2f} ms{change((*path, 'p99_ms'), stats['p99_ms'])}"
+        )
+    print(f"  jobs           {run['jobs']}")
+    print(f"  completion lag {run['completion_lag']}")
+    for key in ("server", "process"):
+        if key in run:
+            print(
+                f"  {key:<14} {run[key]['cpu_seconds']}s CPU "
+                f"{run[key]['rss_bytes'] / 2**20:.1f} MiB RSS"
+            )
+
+
+def main() -> None:
+    """Runs the scenario for every error rate of the sweep"""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scenario", choices=SCENARIOS, default="mixed")
+    parser.add_argument("--target", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn target only")
+    parser.add_argument("--jobs", type=int)
+    parser.add_argument("--submitters", type=int)
+    parser.add_argument("--pollers", type=int)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument(
+        "--error-rates",
+        default=str(config.JOB_ERROR_RATE),
+        help="Comma-separated JOB_ERROR_RATE values to sweep, e.g. 0,0.2,0.5",
+    )
+    parser.add_argument("--output", help="JSON file to write the results to")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare with")
+    args = parser.parse_args()
+
+    overrides = {
+        name: getattr(args, name)
+        for name in ("jobs", "submitters", "pollers", "seed")
+        if getattr(args, name) is not None
+    }
+    scenario = replace(SCENARIOS[args.scenario], **overrides)
+
+    baseline_runs = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline_runs = {
+                run["error_rate"]: run for run in json.load(baseline_file)["runs"]
+            }
+
+    report = {
+        "scenario": {"name": args.scenario, **asdict(scenario)},
+        "target": args.target,
+        "workers": args.workers if args.target == "uvicorn" else None,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "runs": [],
+    }
+    print(f"Scenario {args.scenario} {scenario} against {args.target}")
+    for error_rate in (float(rate) for rate in args.error_rates.split(",")):
+        # The client library prints every poll, which would drown the results
+        with ExitStack() as stack:
+            stack.enter_context(redirect_stdout(io.StringIO()))
+            if args.target == "asgi":
+                measurements = asyncio.run(_run_in_process(scenario, error_rate))
+            else:
+                measurements = _run_against_uvicorn(scenario, error_rate, args.workers)
+
+        run = {"error_rate": error_rate, **measurements}
+        report["runs"].append(run)
+        _print_run(run, baseline_runs.get(error_rate))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"\nWrote the results to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
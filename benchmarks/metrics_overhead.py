@@ -0,0 +1,84 @@
+"""Measures the overhead of the metrics (the timing middleware and the database
+counters) on the hot path: GET /status of a finished job.
+
+The requests are sent in-process through httpx's ASGI transport, so that the
+time measured is the server's own. Since the metrics are switched on or off
+when the server is imported, each configuration runs in its own interpreter
+(METRICS_ENABLED=0, then METRICS_ENABLED=1), alternately for a few rounds.
+
+Usage: python -m benchmarks.metrics_overhead [--requests 20000] [--rounds 3]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+async def _time_per_request(requests: int) -> float:
+    """Returns the time (in seconds) GET /status of a finished job takes"""
+    # Imported here, as importing the server reads METRICS_ENABLED
+    # pylint: disable=import-outside-toplevel
+    import httpx
+
+    from server import handlers
+
+    transport = httpx.ASGITransport(app=handlers.app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://benchmark"
+    ) as client:
+        await client.post("/submit/JOB_0", params={"delay_seconds": 0})
+        for _ in range(100):  # warming up
+            await client.get("/status/JOB_0")
+
+        started_at = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get("/status/JOB_0")
+            assert response.status_code == 200
+        return (time.perf_counter() - started_at) / requests
+
+
+def _run_round(metrics_enabled: bool, requests: int) -> float:
+    """Measures the time per request in a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.metrics_overhead", "--measure",
+         "--requests", str(requests)],
+        env={**os.environ, "METRICS_ENABLED": "1" if metrics_enabled else "0"},
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return float(output)
+
+
+def main() -> None:
+    """Compares the time per request with the metrics off and on"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(asyncio.run(_time_per_request(args.requests)))
+        return
+
+    seconds: dict[bool, list[float]] = {False: [], True: []}
+    for _ in range(args.rounds):
+        for metrics_enabled in seconds:
+            seconds[metrics_enabled].append(_run_round(metrics_enabled, args.requests))
+
+    disabled = statistics.median(seconds[False])
+    enabled = statistics.median(seconds[True])
+    print(f"GET /status of a finished job, median of {args.rounds} rounds")
+    print(f"  {'metrics disabled':<20} {disabled * 1e6:7.1f} us")
+    print(f"  {'metrics enabled':<20} {enabled * 1e6:7.1f} us")
+    print(f"  {'overhead':<20} {(enabled - disabled) * 1e6:7.1f} us "
+          f"({(enabled / disabled - 1) * 100:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
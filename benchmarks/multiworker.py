@@ -0,0 +1,94 @@
+"""Load test showing how the throughput of the GET /status API scales with
+the number of server worker processes (sharing their jobs through SQLite).
+
+For each worker count, the server is started with `python -m server --workers N`,
+some jobs are submitted and then hammered by client processes, each polling their
+status over a keep-alive connection for a fixed duration.
+
+Usage: python -m benchmarks.multiworker [--max-workers 4] [--clients 8] [--seconds 5]
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+import requests
+
+from .server_process import running_server
+
+_JOBS = 100
+
+
+def _poll_until(base_url: str, stop_at: float, counts) -> None:
+    """Polls the status of the jobs until stop_at, counting the successful polls"""
+    session = requests.Session()
+    polls = 0
+    while time.time() < stop_at:
+        response = session.get(f"{base_url}/status/JOB_{polls % _JOBS}", timeout=10)
+        assert response.status_code == 200
+        polls += 1
+
+    counts.put(polls)
+
+
+def _measure(workers: int, clients: int, seconds: float) -> float:
+    """Returns the requests per second served by the given number of workers"""
+    with tempfile.TemporaryDirectory() as directory:
+        extra_args = (
+            "--workers",
+            str(workers),
+            "--job-store",
+            "sqlite",
+            "--sqlite-path",
+            os.path.join(directory, "jobs.sqlite3"),
+        )
+        with running_server(extra_args=extra_args) as base_url:
+            jobs = [{"job_id": f"JOB_{i}", "delay_seconds": 3600} for i in range(_JOBS)]
+            requests.post(f"{base_url}/submit:batch", json={"jobs": jobs}, timeout=10)
+
+            counts: multiprocessing.Queue = multiprocessing.Queue()
+            stop_at = time.time() + seconds
+            processes = [
+                multiprocessing.Process(
+                    target=_poll_until, args=(base_url, stop_at, counts)
+                )
+                for _ in range(clients)
+            ]
+            for process in processes:
+                process.start()
+
+            total_polls = sum(counts.get() for _ in processes)
+            for process in processes:
+                process.join()
+
+    return total_polls / seconds
+
+
+def main() -> None:
+    """Runs the load test for 1, 2, 4, ... up to --max-workers workers"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--clients", type=int, default=2 * (os.cpu_count() or 1))
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= args.max_workers:
+        worker_counts.append(worker_counts[-1] * 2)
+    if worker_counts[-1] != args.max_workers:
+        worker_counts.append(args.max_workers)
+
+    baseline = None
+    for workers in worker_counts:
+        requests_per_second = _measure(workers, args.clients, args.seconds)
+        baseline = baseline or requests_per_second
+        print(
+            f"{workers:>3} worker(s): {requests_per_second:10,.0f} requests/s "
+            f"({requests_per_second / baseline:4.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Spawns the FastAPI server in a separate uvicorn process for the benchmarks"""
+
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import requests
+
+
+def get_free_port() -> int:
+    """Returns a TCP port nobody is listening on"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def running_server(
+    port: Optional[int] = None,
+    extra_args: tuple[str, ...] = (),
+    env: Optional[dict[str, str]] = None,
+    startup_timeout_seconds: float = 15,
+) -> Iterator[str]:
+    """Runs the server (through `python -m server`, with the extra
+    arguments, e.g. "--workers") for the duration of the block.
+
+    Yields: The base URL of the server.
+    """
+    with running_server_process(
+        port, extra_args, env, startup_timeout_seconds
+    ) as (base_url, _):
+        yield base_url
+
+
+@contextmanager
+def running_server_process(
+    port: Optional[int] = None,
+    extra_args: tuple[str, ...] = (),
+    env: Optional[dict[str, str]] = None,
+    startup_timeout_seconds: float = 15,
+) -> Iterator[tuple[str, subprocess.Popen]]:
+    """Same as running_server(), also yielding the server's process"""
+    port = port or get_free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(  # pylint: disable=consider-using-with
+        [
+            sys.executable,
+            "-m",
+            "server",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+            *extra_args,
+        ],
+        env={**os.environ, **(env or {})},
+    )
+    try:
+        deadline = time.time() + startup_timeout_seconds
+        while True:
+            try:
+                requests.get(base_url + "/docs", timeout=1)
+                break
+            except requests.ConnectionError:
+                if time.time() > deadline or process.poll() is not None:
+                    raise RuntimeError(f"The server on port {port} failed to start")
+                time.sleep(0.1)
+
+        yield base_url, process
+    finally:
+        process.terminate()
+        process.wait()
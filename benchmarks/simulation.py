@@ -0,0 +1,210 @@
+"""Replays hours of traffic in seconds: thousands of jobs are submitted and
+polled (with the asyncio client library) until they finish, against the app and
+its background tasks, all in this process, on an event loop that runs on a
+virtual clock. Every wait (the jobs' delays, the polling intervals, the
+long-polls) is skipped through rather than waited through.
+
+Runs are reproducible: the jobs, their submission times and their outcomes are
+drawn from --seed, so the same seed gives the same result for every job, down to
+its number of polls (see the digest).
+
+Usage: python -m benchmarks.simulation [--jobs 2000] [--hours 4] [--seed 42]
+    [--max-delay-seconds 1800] [--polling-interval-seconds 5] [--long-poll-seconds 30]
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator
+
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+
+import httpx
+
+from client_library.translate_video.async_translate_video import (
+    AsyncTranslateVideo,
+    AsyncTranslateVideoClient,
+)
+from client_library.translate_video.resilience import RetryPolicy
+from server import admission, clock, database, handlers, scheduler, stores, sweeper
+
+# Base URL of the app, as seen by the client through the ASGI transport
+_BASE_URL = "http://simulation"
+
+
+@dataclass
+class SimulationResult:
+    """DTO holding the outcome of a simulation.
+
+    Attributes:
+        results: dict[str, int] -> Number of jobs, by their final status.
+        polls: int -> Number of GET /status calls made.
+        virtual_seconds: float -> Time simulated.
+        wall_seconds: float -> Time the simulation took.
+        digest: str -> Hash of every job's status, number of polls and
+        turnaround, equal for the runs of the same parameters.
+    """
+
+    results: dict[str, int]
+    polls: int
+    virtual_seconds: float
+    wall_seconds: float
+    digest: str
+
+
+@contextmanager
+def _simulated_server(virtual_clock: clock.VirtualClock, seed: int) -> Iterator[None]:
+    """Puts the server on the virtual clock, with an empty job store and its own
+    background tasks, and seeds the jobs' random numbers, for the duration of the block
+    """
+    saved = (
+        clock.CLOCK,
+        database.JOB_STORE,
+        database.RANDOM,
+        admission.ADMISSION_CONTROLLER,
+        scheduler.JOB_SCHEDULER,
+        sweeper.JOB_SWEEPER,
+    )
+    clock.CLOCK = virtual_clock
+    database.JOB_STORE = stores.InMemoryJobStore({})
+    database.RANDOM = random.Random(seed)
+    admission.ADMISSION_CONTROLLER = admission.AdmissionController()
+    scheduler.JOB_SCHEDULER = scheduler.JobScheduler()
+    sweeper.JOB_SWEEPER = sweeper.JobSweeper()
+    try:
+        yield
+    finally:
+        (
+            clock.CLOCK,
+            database.JOB_STORE,
+            database.RANDOM,
+            admission.ADMISSION_CONTROLLER,
+            scheduler.JOB_SCHEDULER,
+            sweeper.JOB_SWEEPER,
+        ) = saved
+
+
+async def _run_jobs(
+    virtual_clock: clock.VirtualClock,
+    jobs: int,
+    hours: float,
+    seed: int,
+    max_delay_seconds: int,
+    polling_interval_seconds: int,
+    long_poll_seconds: int,
+) -> list[tuple[str, str, int, float]]:
+    """Submits the jobs at random over the first half of the simulated time, and
+    polls each of them until it finishes (or the simulated time is over).
+    Returns every job's (job_id, status, polls, turnaround seconds).
+    """
+    # pylint: disable=too-many-arguments
+    rng = random.Random(seed)
+    schedule = [
+        (f"JOB_{i:06}", rng.uniform(0, hours * 3600 / 2), rng.randint(0, max_delay_seconds))
+        for i in range(jobs)
+    ]
+
+    async def run_job(
+        client: AsyncTranslateVideoClient, job_id: str, submit_at: float, delay: int
+    ) -> tuple[str, str, int, float]:
+        await asyncio.sleep(submit_at)
+        job = AsyncTranslateVideo(
+            job_id,
+            delay_seconds=delay,
+            polling_interval_seconds=polling_interval_seconds,
+            long_poll_seconds=long_poll_seconds,
+            timeout_seconds=int(hours * 3600 - submit_at),
+            client=client,
+        )
+        submitted_at = virtual_clock.monotonic()
+        await job.submit()
+        status = await job.get_status()
+        turnaround_seconds = round(virtual_clock.monotonic() - submitted_at, 6)
+        return job_id, status["result"], job.polling_strategy.polls, turnaround_seconds
+
+    async with handlers.lifespan(handlers.app):
+        async with AsyncTranslateVideoClient(
+            base_url=_BASE_URL,
+            transport=httpx.ASGITransport(app=handlers.app),
+            max_concurrency=jobs,
+            retry_policy=RetryPolicy(rng=random.Random(seed)),
+            clock=virtual_clock,
+        ) as client:
+            return await asyncio.gather(
+                *(run_job(client, *scheduled_job) for scheduled_job in schedule)
+            )
+
+
+def simulate(
+    jobs: int = 2000,
+    hours: float = 4,
+    seed: int = 42,
+    max_delay_seconds: int = 1800,
+    polling_interval_seconds: int = 5,
+    long_poll_seconds: int = 30,
+) -> SimulationResult:
+    """Runs a simulation (see the module's docstring)"""
+    # pylint: disable=too-many-arguments
+    virtual_clock = clock.VirtualClock(start=datetime(2000, 1, 1))
+    loop = virtual_clock.new_event_loop()
+    started_at = time.perf_counter()
+    try:
+        with _simulated_server(virtual_clock, seed):
+            outcomes = loop.run_until_complete(
+                _run_jobs(
+                    virtual_clock,
+                    jobs,
+                    hours,
+                    seed,
+                    max_delay_seconds,
+                    polling_interval_seconds,
+                    long_poll_seconds,
+                )
+            )
+    finally:
+        loop.close()
+
+    return SimulationResult(
+        results=dict(Counter(status for _, status, _, _ in outcomes)),
+        polls=sum(polls for _, _, polls, _ in outcomes),
+        virtual_seconds=virtual_clock.monotonic(),
+        wall_seconds=time.perf_counter() - started_at,
+        digest=hashlib.sha256(repr(sorted(outcomes)).encode()).hexdigest()[:16],
+    )
+
+
+def main() -> None:
+    """Runs a simulation and prints its outcome"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--hours", type=float, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-delay-seconds", type=int, default=1800)
+    parser.add_argument("--polling-interval-seconds", type=int, default=5)
+    parser.add_argument("--long-poll-seconds", type=int, default=30)
+    args = parser.parse_args()
+
+    result = simulate(
+        jobs=args.jobs,
+        hours=args.hours,
+        seed=args.seed,
+        max_delay_seconds=args.max_delay_seconds,
+        polling_interval_seconds=args.polling_interval_seconds,
+        long_poll_seconds=args.long_poll_seconds,
+    )
+    print(
+        f"Simulated {result.virtual_seconds / 3600:.2f} hours of {args.jobs} jobs "
+        f"in {result.wall_seconds:.2f} seconds ({result.virtual_seconds / result.wall_seconds:,.0f}x)"
+    )
+    print(f"  results: {result.results}")
+    print(f"  polls:   {result.polls}")
+    print(f"  digest:  {result.digest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Measures the gain of serving the /status API's terminal responses precomputed,
+and of answering conditional requests with 304s.
+
+1. In-process: the time it takes to build the response of a "completed" job,
+   the former way (a GetStatusResponse run through jsonable_encoder into a
+   JSONResponse) against the precomputed way.
+2. End-to-end: the requests per second a locally spawned server answers for
+   "completed" jobs, to plain GET requests (200s) and to conditional ones
+   carrying the job's ETag (304s), from client processes over keep-alive
+   connections.
+
+Usage: python -m benchmarks.status_responses [--clients 4] [--seconds 5]
+"""
+
+from datetime import datetime
+from typing import Callable, Optional
+
+import argparse
+import multiprocessing
+import time
+
+import requests
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from server import handlers
+from server.models import Job
+
+from .server_process import running_server
+
+_JOBS = 100
+_RENDERS = 100_000
+
+
+def _time_per_call(build: Callable[[], object]) -> float:
+    """Returns the time (in seconds) a call to build() takes"""
+    started_at = time.perf_counter()
+    for _ in range(_RENDERS):
+        build()
+    return (time.perf_counter() - started_at) / _RENDERS
+
+
+def _benchmark_rendering() -> None:
+    """Prints the time it takes to build the response of a completed job"""
+    job = Job(delay=0, random_num=1.0, started_at=datetime.now(), status="completed")
+    results = {
+        "jsonable_encoder + JSONResponse": _time_per_call(
+            lambda: JSONResponse(
+                content=jsonable_encoder(handlers.GetStatusResponse(result="completed"))
+            )
+        ),
+        "precomputed": _time_per_call(
+            lambda: handlers._build_status_response("completed", "job", job)
+        ),
+        "precomputed (304)": _time_per_call(
+            lambda: handlers._build_status_response("completed", "job", job, '"completed"')
+        ),
+    }
+
+    print("Building the response of a completed job")
+    for name, seconds in results.items():
+        print(f"  {name:<32} {seconds * 1e6:7.2f} us")
+
+
+def _poll_until(base_url: str, stop_at: float, etag: Optional[str], counts) -> None:
+    """Polls the status of the jobs until stop_at, counting the polls"""
+    session = requests.Session()
+    headers = {"If-None-Match": etag} if etag else None
+    expected_status_code = 304 if etag else 200
+    polls = 0
+    while time.time() < stop_at:
+        response = session.get(
+            f"{base_url}/status/JOB_{polls % _JOBS}", headers=headers, timeout=10
+        )
+        assert response.status_code == expected_status_code
+        polls += 1
+
+    counts.put(polls)
+
+
+def _measure_throughput(
+    base_url: str, clients: int, seconds: float, etag: Optional[str]
+) -> float:
+    """Returns the requests per second served to the client processes"""
+    counts: multiprocessing.Queue = multiprocessing.Queue()
+    stop_at = time.time() + seconds
+    processes = [
+        multiprocessing.Process(
+            target=_poll_until, args=(base_url, stop_at, etag, counts)
+        )
+        for _ in range(clients)
+    ]
+    for process in processes:
+        process.start()
+
+    total_polls = sum(counts.get() for _ in processes)
+    for process in processes:
+        process.join()
+
+    return total_polls / seconds
+
+
+def main() -> None:
+    """Runs both benchmarks"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    _benchmark_rendering()
+
+    with running_server() as base_url:
+        # Jobs bound to fail are "error" rather than "completed"
+        jobs = [{"job_id": f"JOB_{i}", "delay_seconds": 0} for i in range(_JOBS)]
+        requests.post(f"{base_url}/submit:batch", json={"jobs": jobs}, timeout=10)
+        statuses = requests.post(
+            f"{base_url}/status:batch",
+            json={"job_ids": [job["job_id"] for job in jobs]},
+            timeout=10,
+        ).json()["results"]
+        assert all(status["result"] != "pending" for status in statuses)
+
+        print(f"\nGET /status of finished jobs, {args.clients} client processes")
+        for name, etag in [("200 (full body)", None), ("304 (If-None-Match)", "*")]:
+            requests_per_second = _measure_throughput(
+                base_url, args.clients, args.seconds, etag
+            )
+            print(f"  {name:<32} {requests_per_second:9,.0f} requests/s")
+
+
+if __name__ == "__main__":
+    main()
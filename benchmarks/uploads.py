@@ -0,0 +1,71 @@
+"""Measures the throughput of the chunked uploads against a locally spawned
+server, for several numbers of chunks in flight, along with the server's peak
+memory (which stays flat whatever the size of the file, as chunks are written
+to disk as they're received).
+
+Usage: python -m benchmarks.uploads [--size-mib 512] [--chunk-mib 8] [--concurrency 1,4]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.server_process import running_server_process
+from client_library.translate_video.translate_video import (
+    TranslateVideo,
+    TranslateVideoClient,
+)
+
+
+def _peak_rss_bytes(pid: int) -> int:
+    """Returns the peak resident memory of the process (Linux only, else 0)"""
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def main() -> None:
+    """Uploads the same file once per number of chunks in flight"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mib", type=int, default=512)
+    parser.add_argument("--chunk-mib", type=int, default=8)
+    parser.add_argument("--concurrency", default="1,4")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        video_path = os.path.join(directory, "video.mp4")
+        with open(video_path, "wb") as video:
+            for _ in range(args.size_mib):
+                video.write(os.urandom(2**20))
+
+        env = {
+            "UPLOAD_DIRECTORY": os.path.join(directory, "uploads"),
+            "SUBMIT_RATE_PER_CLIENT": "0",
+        }
+        extra_args = ("--sqlite-path", os.path.join(directory, "jobs.sqlite3"))
+        with running_server_process(extra_args=extra_args, env=env) as (base_url, process):
+            print(f"Uploading {args.size_mib} MiB in {args.chunk_mib} MiB chunks")
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                with TranslateVideoClient(base_url, request_timeout_seconds=60) as client:
+                    job = TranslateVideo(f"JOB_{concurrency}", client=client)
+                    started_at = time.perf_counter()
+                    with open(video_path, "rb") as video:
+                        job.upload(
+                            video, chunk_size=args.chunk_mib * 2**20, concurrency=concurrency
+                        )
+                    seconds = time.perf_counter() - started_at
+
+                print(
+                    f"  {concurrency} in flight: {args.size_mib / seconds:8.1f} MiB/s, "
+                    f"server peak RSS {_peak_rss_bytes(process.pid) / 2**20:.1f} MiB"
+                )
+
+
+if __name__ == "__main__":
+    main()
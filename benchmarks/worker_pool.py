@@ -0,0 +1,60 @@
+"""Measures how the throughput of the worker pool scales with the number of
+workers: every job keeps a worker busy for --work-ms, so N workers can't process
+more than N / work-seconds jobs per second. The gap to that bound is the pool's
+own overhead (taking the job, checking it against the store, moving it on).
+
+Usage: python -m benchmarks.worker_pool [--jobs 2000] [--work-ms 10] [--workers 1,4,16,64]
+"""
+
+import argparse
+import asyncio
+import time
+
+from server import database
+from server.models import Job
+from server.pool import WorkerPool
+
+
+async def _process_jobs(workers: int, jobs: int, work_seconds: float) -> float:
+    """Processes the jobs on a pool of `workers` workers. Returns the seconds it took"""
+
+    async def work(job_id: str, job: Job) -> None:  # pylint: disable=unused-argument
+        await asyncio.sleep(work_seconds)
+
+    worker_pool = WorkerPool(workers=workers, work=work)
+    for i in range(jobs):
+        job_id = f"JOB_{i:07}"
+        job = database.fake_submit_job(job_id, 0)
+        worker_pool.submit(job_id, job, priority=i % 3)
+
+    started_at = time.perf_counter()
+    task = asyncio.create_task(worker_pool.run())
+    while worker_pool.queued_jobs or worker_pool.busy_workers:
+        await asyncio.sleep(0.01)
+    elapsed_seconds = time.perf_counter() - started_at
+
+    task.cancel()
+    return elapsed_seconds
+
+
+def main() -> None:
+    """Runs the benchmark for every number of workers"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--work-ms", type=float, default=10)
+    parser.add_argument("--workers", default="1,4,16,64")
+    args = parser.parse_args()
+
+    work_seconds = args.work_ms / 1000
+    print(f"{args.jobs} jobs of {args.work_ms:g} ms each")
+    print(f"  {'workers':>7} {'jobs/s':>10} {'bound':>10} {'efficiency':>10}")
+    for workers in (int(w) for w in args.workers.split(",")):
+        jobs = max(args.jobs, workers)
+        elapsed_seconds = asyncio.run(_process_jobs(workers, jobs, work_seconds))
+        throughput = jobs / elapsed_seconds
+        bound = workers / work_seconds
+        print(f"  {workers:>7} {throughput:>10,.0f} {bound:>10,.0f} {throughput / bound:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
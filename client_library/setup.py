@@ -14,6 +14,9 @@ setup(
     version="0.1.0",
     description="Python library for submitting video translation jobs and fetching their status",
     author="Aditya N Rao",
-    requires=["colorama", "requests"],
+    requires=["colorama", "httpx", "requests"],
     long_description=read("README.md"),
+    entry_points={
+        "console_scripts": ["translate-video-run=translate_video.runner:main"],
+    },
 )
@@ -0,0 +1,91 @@
+"""Local stand-in for the server, injecting faults into its responses"""
+
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List, Optional, Union
+
+import json
+import threading
+
+# A fault is a status code to fail with, or "drop" to close the connection
+# without responding. None stands for a successful response.
+Fault = Optional[Union[int, str]]
+
+
+class FaultServer(ThreadingHTTPServer):
+    """Answers GET /status/{job_id} with {"result": "completed"} and
+    POST /submit/{job_id} with a 201, once the scripted faults (one per request,
+    in order) have been served.
+
+    Attributes:
+        base_url: str -> URL of the server.
+        requests: List[str] -> "<method> <path>" of every received request, in order.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, faults: List[Fault]) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        host, port = self.server_address[:2]
+        self.base_url = f"http://{host}:{port}"
+        self.requests: List[str] = []
+        self._faults = list(faults)
+        self._lock = threading.Lock()
+
+    def next_fault(self, method: str, path: str) -> Fault:
+        """Records the request and returns the fault to inject, if any"""
+        with self._lock:
+            self.requests.append(f"{method} {path}")
+            return self._faults.pop(0) if self._faults else None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves the requests of a single connection"""
+
+    server: FaultServer
+    protocol_version = "HTTP/1.1"  # Keeps the connections alive
+
+    def _respond(self, status_code: int, body: dict) -> None:
+        content = json.dumps(body).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _serve(self, method: str, success_status_code: int, success_body: dict) -> None:
+        path = self.path.split("?")[0]
+        fault = self.server.next_fault(method, path)
+        if fault == "drop":
+            self.close_connection = True
+            return
+        if fault is not None:
+            self._respond(fault, {"detail": f"Injected HTTP {fault}"})
+            return
+
+        self._respond(success_status_code, success_body)
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Answers the GET /status API"""
+        self._serve("GET", 200, {"result": "completed"})
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """Answers the POST /submit API"""
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self._serve("POST", 201, {"detail": "Submitted"})
+
+    def log_message(self, format: str, *args) -> None:  # pylint: disable=redefined-builtin
+        """Keeps the test output quiet"""
+
+
+@contextmanager
+def running_fault_server(faults: List[Fault] = ()) -> Iterator[FaultServer]:
+    """Runs the server for the duration of the block"""
+    server = FaultServer(list(faults))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,109 @@
+"""The server, run on a thread of the test process or in processes of its own"""
+
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+import uvicorn
+from server import results, uploads
+from server.handlers import app
+
+
+def _get_free_port() -> int:
+    """Returns a TCP port nobody is listening on"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def running_server(directory: str, result_standin_size: int = 2**20) -> Iterator[str]:
+    """Runs the server on a thread for the duration of the block, spooling the
+    uploads to "<directory>/uploads" and writing the jobs' outputs (of the given
+    size) to "<directory>/results". Yields its base URL.
+    """
+    port = _get_free_port()
+    upload_store, result_store = uploads.UPLOAD_STORE, results.RESULT_STORE
+    uploads.UPLOAD_STORE = uploads.UploadStore(os.path.join(directory, "uploads"))
+    results.RESULT_STORE = results.ResultStore(
+        os.path.join(directory, "results"), standin_size=result_standin_size
+    )
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    try:
+        while not server.started:
+            time.sleep(0.01)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+        uploads.UPLOAD_STORE, results.RESULT_STORE = upload_store, result_store
+
+
+class ServerProcess:
+    """A server (`python -m server`, with its own in-memory job store) running
+    in a process of its own, that can be stopped and started again on its port
+    """
+
+    def __init__(self) -> None:
+        self.port = _get_free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.process = None
+
+    def start(self) -> None:
+        """Spawns the server, without waiting for it to be up"""
+        self.process = subprocess.Popen(  # pylint: disable=consider-using-with
+            [
+                sys.executable,
+                "-m",
+                "server",
+                "--host",
+                "127.0.0.1",
+                "--port",
+                str(self.port),
+                "--log-level",
+                "warning",
+            ]
+        )
+
+    def wait_until_up(self, timeout_seconds: float = 20) -> None:
+        """Waits for the server to answer its health checks"""
+        deadline = time.time() + timeout_seconds
+        while True:
+            try:
+                requests.get(self.base_url + "/healthz", timeout=1)
+                return
+            except requests.ConnectionError:
+                assert time.time() < deadline and self.process.poll() is None
+                time.sleep(0.1)
+
+    def stop(self) -> None:
+        """Stops the server"""
+        self.process.terminate()
+        self.process.wait()
+
+
+@contextmanager
+def running_server_processes(count: int) -> Iterator[List[ServerProcess]]:
+    """Runs `count` servers, each in a process of its own, for the duration of the block"""
+    servers = [ServerProcess() for _ in range(count)]
+    try:
+        for server in servers:
+            server.start()
+        for server in servers:
+            server.wait_until_up()
+        yield servers
+    finally:
+        for server in servers:
+            if server.process.poll() is None:
+                server.stop()
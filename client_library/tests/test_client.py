@@ -1,7 +1,24 @@
 """Testing the client library"""
 
+import asyncio
+
+import httpx
 import pytest
-from client_library.translate_video.translate_video import TranslateVideo
+import requests
+from client_library.translate_video import errors, observers
+from client_library.translate_video.clock import VirtualClock
+from client_library.translate_video.async_translate_video import (
+    AsyncTranslateVideo,
+    AsyncTranslateVideoClient,
+)
+from client_library.translate_video.resilience import RetryPolicy
+from client_library.translate_video.streaming import JobStatusEvent, stream_statuses
+from client_library.translate_video.translate_video import (
+    TranslateVideo,
+    TranslateVideoClient,
+)
+
+BASE_URL = "http://testserver"
 
 
 @pytest.fixture
@@ -11,9 +28,10 @@ def mock_status_api_response(mocker):
     def _mock_status_api_response(status_code, job_status):
         mock_response = mocker.Mock()
         mock_response.status_code = status_code
+        mock_response.headers = {}
         if job_status:
             mock_response.json.return_value = {"result": job_status}
-        return mocker.patch("requests.get", return_value=mock_response)
+        return mocker.patch("requests.Session.get", return_value=mock_response)
 
     return _mock_status_api_response
 
@@ -25,7 +43,7 @@ def mock_submit_api_response(mocker):
     def _mock_submit_api_response(status_code):
         mock_response = mocker.Mock()
         mock_response.status_code = status_code
-        return mocker.patch("requests.post", return_value=mock_response)
+        return mocker.patch("requests.Session.post", return_value=mock_response)
 
     return _mock_submit_api_response
 
@@ -56,6 +74,109 @@ def test_get_status_pending_job(
     assert status["result"] == "pending"
 
 
+def test_get_status_honours_retry_after(mocker) -> None:
+    """The server's Retry-After hint decides when to poll again"""
+    pending_response = mocker.Mock(status_code=200, headers={"Retry-After": "7"})
+    pending_response.json.return_value = {"result": "pending", "remaining_seconds": 6.5}
+    completed_response = mocker.Mock(status_code=200, headers={})
+    completed_response.json.return_value = {"result": "completed"}
+    mocker.patch(
+        "requests.Session.get", side_effect=[pending_response, completed_response]
+    )
+    mocked_sleep = mocker.patch("time.sleep")
+
+    status = TranslateVideo("JOB_000", polling_interval_seconds=1).get_status()
+
+    assert status == {"result": "completed"}
+    mocked_sleep.assert_called_once_with(7)
+
+
+def test_get_status_on_virtual_clock(mocker) -> None:
+    """A client on a virtual clock waits in between polls by moving the clock forward"""
+    pending_response = mocker.Mock(status_code=200, headers={"Retry-After": "600"})
+    pending_response.json.return_value = {"result": "pending", "remaining_seconds": 3600}
+    completed_response = mocker.Mock(status_code=200, headers={})
+    completed_response.json.return_value = {"result": "completed"}
+    mocker.patch(
+        "requests.Session.get", side_effect=[pending_response] * 6 + [completed_response]
+    )
+    mocked_sleep = mocker.patch("time.sleep")
+    clock = VirtualClock()
+
+    job = TranslateVideo(
+        "JOB_000", timeout_seconds=7200, client=TranslateVideoClient(clock=clock)
+    )
+    assert job.get_status() == {"result": "completed"}
+
+    assert clock.monotonic() == 3600
+    mocked_sleep.assert_not_called()
+
+
+def test_get_status_non_existent_job(mock_status_api_response) -> None:
+    """Fetching the status of a job that hasn't been submitted"""
+    job = TranslateVideo("JOB_000")
+    mock_status_api_response(404, None)
+
+    with pytest.raises(errors.GetJobInfoError):
+        job.get_status()
+
+
+def test_get_status_long_polls(mock_status_api_response) -> None:
+    """The GET /status API is long-polled, with a matching request timeout"""
+    job = TranslateVideo("JOB_000", long_poll_seconds=5)
+    mocked_get = mock_status_api_response(200, "completed")
+    job.get_status()
+
+    assert mocked_get.call_args.kwargs["params"] == {"wait": 5}
+    assert mocked_get.call_args.kwargs["timeout"] == 15
+
+
+def test_client_base_url_and_pool(mock_status_api_response) -> None:
+    """Jobs sharing a client go through its pooled session and base URL"""
+    client = TranslateVideoClient(base_url=BASE_URL + "/", pool_maxsize=32)
+    mocked_get = mock_status_api_response(200, "completed")
+
+    for job_id in ("JOB_000", "JOB_001"):
+        TranslateVideo(job_id, client=client).get_status()
+
+    assert mocked_get.call_args.kwargs["url"] == BASE_URL + "/status/JOB_001"
+    assert client.session.get_adapter(BASE_URL)._pool_maxsize == 32
+    assert TranslateVideo("JOB_002").client is TranslateVideo("JOB_003").client
+
+
+def _build_response(status_code: int, content: bytes, headers: dict) -> requests.Response:
+    """Builds a `requests` response, as received from the server"""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers.update(headers)
+    return response
+
+
+def test_client_conditional_requests(mocker) -> None:
+    """GET requests send the latest ETag of the path, and 304s are turned into 200s"""
+    get = mocker.patch(
+        "requests.Session.get",
+        side_effect=[
+            _build_response(
+                200,
+                b'{"result":"completed"}',
+                {"ETag": '"completed"', "Content-Type": "application/json"},
+            ),
+            _build_response(304, b"", {"ETag": '"completed"'}),
+        ],
+    )
+    client = TranslateVideoClient(base_url=BASE_URL)
+
+    assert client.get("/status/JOB_000").json() == {"result": "completed"}
+    assert "headers" not in get.call_args.kwargs
+
+    response = client.get("/status/JOB_000")
+    assert get.call_args.kwargs["headers"] == {"If-None-Match": '"completed"'}
+    assert response.status_code == 200
+    assert response.json() == {"result": "completed"}
+
+
 def test_object_instantiation(mock_submit_api_response) -> None:
     """Tests the object instantiation"""
     mock_submit_api_response(201)
@@ -67,13 +188,304 @@ def test_object_instantiation(mock_submit_api_response) -> None:
     assert job.delay_seconds == 20
     assert job.polling_interval_seconds == 5
     assert job.timeout_seconds == 3600
+    assert job.long_poll_seconds == 30
 
     # Testing instantiation with user defined values
     job = TranslateVideo(
-        "JOB_001", delay_seconds=5, polling_interval_seconds=1, timeout_seconds=3
+        "JOB_001",
+        delay_seconds=5,
+        polling_interval_seconds=1,
+        timeout_seconds=3,
+        long_poll_seconds=0,
     )
 
     assert job.job_id == "JOB_001"
     assert job.delay_seconds == 5
     assert job.polling_interval_seconds == 1
     assert job.timeout_seconds == 3
+    assert job.long_poll_seconds == 0
+
+
+def test_submit_many_chunks_jobs(mocker) -> None:
+    """Submitting many jobs through as few /submit:batch calls as possible"""
+    jobs = [TranslateVideo(f"JOB_{i:03}", delay_seconds=i) for i in range(5)]
+
+    def _post(url, json, timeout):
+        mock_response = mocker.Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "results": [
+                {"job_id": job["job_id"], "status_code": 201, "detail": ""}
+                for job in json["jobs"]
+            ]
+        }
+        return mock_response
+
+    mocked_post = mocker.patch("requests.Session.post", side_effect=_post)
+    submitted = TranslateVideo.submit_many(jobs, chunk_size=2)
+
+    assert mocked_post.call_count == 3
+    assert mocked_post.call_args_list[0].kwargs["json"]["jobs"][1] == {
+        "job_id": "JOB_001",
+        "delay_seconds": 1,
+    }
+    assert submitted == {job.job_id: True for job in jobs}
+
+
+def test_get_statuses(mocker) -> None:
+    """Fetching the status of many jobs through the /status:batch API"""
+    mock_response = mocker.Mock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {
+        "results": [
+            {"job_id": "JOB_000", "status_code": 200, "result": "completed"},
+            {"job_id": "JOB_001", "status_code": 404, "result": None, "detail": ""},
+        ]
+    }
+    mocked_post = mocker.patch("requests.Session.post", return_value=mock_response)
+
+    statuses = TranslateVideo.get_statuses(["JOB_000", "JOB_001"])
+
+    assert mocked_post.call_args.kwargs["json"] == {"job_ids": ["JOB_000", "JOB_001"]}
+    assert statuses == {"JOB_000": "completed", "JOB_001": None}
+
+
+async def _collect_stream_events(handler, job_ids) -> list:
+    """Collects every event yielded by stream_statuses() against a mocked server"""
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(base_url=BASE_URL, transport=transport) as client:
+        return [event async for event in stream_statuses(job_ids, client=client)]
+
+
+def test_stream_statuses() -> None:
+    """Parsing the status transitions pushed over the GET /status:stream API"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.params.get_list("job_id") == ["JOB_000", "unknown"]
+        body = (
+            'event: status\ndata: {"job_id": "JOB_000", "result": "pending"}\n\n'
+            'event: error\ndata: {"job_id": "unknown", "detail": "Not found"}\n\n'
+            ": keep-alive\n\n"
+            'event: status\ndata: {"job_id": "JOB_000", "result": "completed"}\n\n'
+        )
+        return httpx.Response(200, text=body)
+
+    events = asyncio.run(_collect_stream_events(handler, ["JOB_000", "unknown"]))
+    assert events == [
+        JobStatusEvent(job_id="JOB_000", result="pending"),
+        JobStatusEvent(job_id="unknown", result=None, detail="Not found"),
+        JobStatusEvent(job_id="JOB_000", result="completed"),
+    ]
+
+
+def test_stream_statuses_server_error() -> None:
+    """Streaming the statuses when the server fails to respond"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503, json={"detail": "Service unavailable"})
+
+    with pytest.raises(errors.GetJobInfoError):
+        asyncio.run(_collect_stream_events(handler, ["JOB_000"]))
+
+
+async def _submit_and_get_status_async(handler, job: AsyncTranslateVideo) -> dict:
+    """Submits the job and gets its status through a mocked, pooled async client"""
+    transport = httpx.MockTransport(handler)
+    async with AsyncTranslateVideoClient(transport=transport) as client:
+        job.client = client
+        await job.submit()
+        return await job.get_status()
+
+
+def test_async_get_status_completed_job() -> None:
+    """Submitting a job and polling its status until it completes, asynchronously"""
+    statuses = iter(["pending", "completed"])
+    requests_sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_sent.append(request)
+        if request.method == "POST":
+            return httpx.Response(201, text="Successfully submitted the job: JOB_000")
+        return httpx.Response(200, json={"result": next(statuses)})
+
+    job = AsyncTranslateVideo("JOB_000", polling_interval_seconds=0, long_poll_seconds=5)
+    status = asyncio.run(_submit_and_get_status_async(handler, job))
+
+    assert status == {"result": "completed"}
+    assert requests_sent[0].url.path == "/submit/JOB_000"
+    assert requests_sent[0].url.params["delay_seconds"] == "20"
+    assert requests_sent[1].url.path == "/status/JOB_000"
+    assert requests_sent[1].url.params["wait"] == "5"
+    assert len(requests_sent) == 3
+
+
+def test_async_job_reuses_its_own_client(mocker) -> None:
+    """A job given no client creates one on first use, and keeps using its pool"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            return httpx.Response(201, text="Successfully submitted the job: JOB_000")
+        return httpx.Response(200, json={"result": "completed"})
+
+    created_clients = []
+
+    def create_client() -> AsyncTranslateVideoClient:
+        created_clients.append(
+            AsyncTranslateVideoClient(transport=httpx.MockTransport(handler))
+        )
+        return created_clients[-1]
+
+    mocker.patch(
+        "client_library.translate_video.async_translate_video.AsyncTranslateVideoClient",
+        side_effect=create_client,
+    )
+    job = AsyncTranslateVideo("JOB_000")
+
+    async def submit_twice_and_get_status() -> dict:
+        await job.submit()
+        await job.submit()
+        return await job.get_status()
+
+    assert asyncio.run(submit_twice_and_get_status()) == {"result": "completed"}
+    assert created_clients == [job.client]
+
+
+def test_async_get_status_non_existent_job() -> None:
+    """Fetching the status of a job that hasn't been submitted, asynchronously"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            return httpx.Response(503, json={"detail": "Failed to submit"})
+        return httpx.Response(404, json={"detail": "Job ID JOB_000 could not be found"})
+
+    with pytest.raises(errors.GetJobInfoError):
+        asyncio.run(_submit_and_get_status_async(handler, AsyncTranslateVideo("JOB_000")))
+
+
+def test_async_client_conditional_requests() -> None:
+    """GET requests send the latest ETag of the path, and 304s are turned into 200s"""
+    if_none_match_headers = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if_none_match_headers.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"completed"':
+            return httpx.Response(304, headers={"ETag": '"completed"'})
+        return httpx.Response(
+            200, json={"result": "completed"}, headers={"ETag": '"completed"'}
+        )
+
+    async def get_twice() -> list:
+        transport = httpx.MockTransport(handler)
+        async with AsyncTranslateVideoClient(BASE_URL, transport=transport) as client:
+            return [await client.request("GET", "/status/JOB_000") for _ in range(2)]
+
+    responses = asyncio.run(get_twice())
+
+    assert if_none_match_headers == [None, '"completed"']
+    assert [r.status_code for r in responses] == [200, 200]
+    assert responses[1].json() == {"result": "completed"}
+
+
+class _RecordingObserver(observers.Observer):
+    """Observer recording the events it's notified of, by hook"""
+
+    def __init__(self) -> None:
+        self.events = []
+
+    def on_poll(self, event) -> None:
+        self.events.append(("on_poll", event))
+
+    def on_transition(self, event) -> None:
+        self.events.append(("on_transition", event))
+
+    def on_timeout(self, event) -> None:
+        self.events.append(("on_timeout", event))
+
+    def on_http_error(self, event) -> None:
+        self.events.append(("on_http_error", event))
+
+
+def test_observers_notified_of_polls_and_transitions(mocker, capsys) -> None:
+    """Observers hear of every poll and status change, and nothing is printed"""
+    pending_response = mocker.Mock(status_code=200, headers={})
+    pending_response.json.return_value = {"result": "pending", "remaining_seconds": 3}
+    completed_response = mocker.Mock(status_code=200, headers={})
+    completed_response.json.return_value = {"result": "completed"}
+    mocker.patch(
+        "requests.Session.get",
+        side_effect=[pending_response, pending_response, completed_response],
+    )
+    mocker.patch("time.sleep")
+    observer = _RecordingObserver()
+
+    TranslateVideo("JOB_000", job_observers=[observer]).get_status()
+
+    hooks = [hook for hook, _ in observer.events]
+    assert hooks == ["on_poll", "on_transition", "on_poll", "on_poll", "on_transition"]
+    first_poll, first_transition = observer.events[0][1], observer.events[1][1]
+    assert first_poll.attempt == 1 and first_poll.remaining_seconds == 3
+    assert first_poll.request_seconds >= 0
+    assert first_transition.previous_result is None
+    assert first_transition.result == "pending"
+    last_transition = observer.events[-1][1]
+    assert (last_transition.attempt, last_transition.previous_result) == (3, "pending")
+    assert capsys.readouterr().out == ""
+
+
+def test_observers_notified_of_timeouts_and_http_errors(
+    mock_status_api_response,
+) -> None:
+    """Observers hear of giving up at the timeout, and of failed calls"""
+    observer = _RecordingObserver()
+    client = TranslateVideoClient(retry_policy=RetryPolicy(max_attempts=1))
+    job = TranslateVideo(
+        "JOB_000", timeout_seconds=0, client=client, job_observers=[observer]
+    )
+
+    mock_status_api_response(200, "pending")
+    job.get_status()
+    assert observer.events[-1][0] == "on_timeout"
+    assert observer.events[-1][1].attempts == 1
+
+    mock_status_api_response(503, None)
+    with pytest.raises(errors.GetJobInfoError):
+        job.get_status()
+    assert observer.events[-1][0] == "on_http_error"
+    assert observer.events[-1][1].status_code == 503
+
+
+def test_console_observer(mock_status_api_response, capsys) -> None:
+    """The console observer displays the status, and failing observers are ignored"""
+
+    class FailingObserver(observers.Observer):
+        def on_poll(self, event) -> None:
+            raise RuntimeError("Failing observer")
+
+    mock_status_api_response(200, "completed")
+    job = TranslateVideo(
+        "JOB_000", job_observers=[FailingObserver(), observers.ConsoleObserver()]
+    )
+
+    assert job.get_status() == {"result": "completed"}
+    output = capsys.readouterr().out
+    assert "JOB_000" in output and "completed" in output
+    assert "Elapsed time" in output
+
+
+def test_async_observers() -> None:
+    """Observers are notified by the asyncio client too"""
+    statuses = iter(["pending", "completed"])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            return httpx.Response(201, text="Successfully submitted the job: JOB_000")
+        return httpx.Response(200, json={"result": next(statuses)})
+
+    observer = _RecordingObserver()
+    job = AsyncTranslateVideo(
+        "JOB_000", polling_interval_seconds=0, job_observers=[observer]
+    )
+    asyncio.run(_submit_and_get_status_async(handler, job))
+
+    transitions = [event for hook, event in observer.events if hook == "on_transition"]
+    assert [event.result for event in transitions] == ["pending", "completed"]
@@ -0,0 +1,98 @@
+"""Testing the segmented downloads of the jobs' outputs, against the server"""
+
+from datetime import datetime, timedelta
+
+import os
+
+import pytest
+import requests
+from client_library.translate_video import errors
+from client_library.translate_video.resilience import RetryPolicy
+from client_library.translate_video.translate_video import (
+    TranslateVideo,
+    TranslateVideoClient,
+)
+from server import database, results
+from server.models import Job
+
+from .live_server import running_server
+
+SEGMENT_SIZE = 2**18
+OUTPUT_SIZE = 3 * SEGMENT_SIZE + SEGMENT_SIZE // 2
+
+
+def _create_job(job_id: str, delay: int = 0) -> None:
+    """Writes the record of a job, completed unless it has a delay"""
+    database.JOB_INFO_BY_ID[job_id] = Job(
+        delay=delay,
+        random_num=1.0,
+        started_at=datetime.now() - timedelta(seconds=1),
+        status="pending",
+    )
+
+
+def _read_output(directory: str, job_id: str) -> bytes:
+    """Returns the output the server wrote for the job"""
+    result_store = results.ResultStore(os.path.join(directory, "results"))
+    with open(os.path.join(result_store.directory, result_store.file_name(job_id)), "rb") as file:
+        return file.read()
+
+
+def test_download_writes_the_output(tmp_path) -> None:
+    """The output is downloaded in parallel segments, to the given path"""
+    _create_job("JOB_DOWNLOAD_000")
+    output_path = str(tmp_path / "output.mp4")
+    with running_server(str(tmp_path), result_standin_size=OUTPUT_SIZE) as base_url:
+        with TranslateVideoClient(base_url) as client:
+            job = TranslateVideo("JOB_DOWNLOAD_000", client=client)
+            job.download(output_path, concurrency=3, segment_size=SEGMENT_SIZE)
+
+    with open(output_path, "rb") as output:
+        assert output.read() == _read_output(str(tmp_path), "JOB_DOWNLOAD_000")
+    assert sorted(os.listdir(tmp_path)) == ["output.mp4", "results"]
+
+
+def test_download_resumes_after_interruption(mocker, tmp_path) -> None:
+    """A failed download is resumed from the segments that weren't written"""
+    get = TranslateVideoClient.get
+    failed_segments = []
+
+    def flaky_get(self, path: str, **kwargs) -> requests.Response:
+        if kwargs["headers"]["Range"].startswith(f"bytes={SEGMENT_SIZE}-") and not failed_segments:
+            failed_segments.append(path)
+            raise requests.ConnectionError("Connection reset by peer")
+        return get(self, path, **kwargs)
+
+    fetched_segments = mocker.patch.object(
+        TranslateVideoClient, "get", side_effect=flaky_get, autospec=True
+    )
+
+    _create_job("JOB_DOWNLOAD_001")
+    output_path = str(tmp_path / "output.mp4")
+    with running_server(str(tmp_path), result_standin_size=OUTPUT_SIZE) as base_url:
+        with TranslateVideoClient(base_url, retry_policy=RetryPolicy(max_attempts=1)) as client:
+            job = TranslateVideo("JOB_DOWNLOAD_001", client=client)
+            with pytest.raises(errors.DownloadError):
+                job.download(output_path, segment_size=SEGMENT_SIZE)
+            assert not os.path.exists(output_path)
+            assert fetched_segments.call_count == 4
+
+            job.download(output_path, segment_size=SEGMENT_SIZE)
+
+    assert fetched_segments.call_count == 5
+    assert fetched_segments.call_args.kwargs["headers"]["Range"] == (
+        f"bytes={SEGMENT_SIZE}-{2 * SEGMENT_SIZE - 1}"
+    )
+    with open(output_path, "rb") as output:
+        assert output.read() == _read_output(str(tmp_path), "JOB_DOWNLOAD_001")
+    assert not os.path.exists(f"{output_path}.part.json")
+
+
+def test_download_of_pending_job(tmp_path) -> None:
+    """A job that isn't completed has no output to download"""
+    _create_job("JOB_DOWNLOAD_002", delay=60)
+    with running_server(str(tmp_path)) as base_url:
+        with TranslateVideoClient(base_url) as client:
+            job = TranslateVideo("JOB_DOWNLOAD_002", client=client)
+            with pytest.raises(errors.DownloadError, match="HTTP 409"):
+                job.download(str(tmp_path / "output.mp4"))
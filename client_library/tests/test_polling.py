@@ -0,0 +1,99 @@
+"""Testing the polling strategies"""
+
+import random
+
+from client_library.translate_video.polling import (
+    DecorrelatedJitter,
+    EtaAware,
+    ExponentialBackoff,
+    FixedInterval,
+    PollContext,
+)
+from client_library.translate_video.translate_video import TranslateVideo
+
+
+def _context(attempt: int, elapsed_seconds: float = 0) -> PollContext:
+    """Builds the context of a job expected to take 20 seconds"""
+    return PollContext(
+        attempt=attempt, elapsed_seconds=elapsed_seconds, delay_seconds=20
+    )
+
+
+def test_fixed_interval() -> None:
+    """Polling every interval_seconds saves nothing over itself"""
+    strategy = FixedInterval(interval_seconds=3)
+    assert [strategy.next_interval(_context(attempt)) for attempt in (1, 2, 3)] == [3] * 3
+
+    for elapsed_seconds in (0, 3, 6):
+        strategy.record_poll(elapsed_seconds)
+    assert strategy.requests_saved == 0
+
+
+def test_exponential_backoff() -> None:
+    """The interval doubles after every poll, up to its cap"""
+    strategy = ExponentialBackoff(initial_interval_seconds=1, max_interval_seconds=10)
+    intervals = [strategy.next_interval(_context(attempt)) for attempt in range(1, 7)]
+    assert intervals == [1, 2, 4, 8, 10, 10]
+
+
+def test_decorrelated_jitter() -> None:
+    """Intervals are random, but stay within the base interval and the cap"""
+    strategy = DecorrelatedJitter(
+        base_interval_seconds=1, max_interval_seconds=10, rng=random.Random(42)
+    )
+    intervals = [strategy.next_interval(_context(attempt)) for attempt in range(1, 50)]
+    assert all(1 <= interval <= 10 for interval in intervals)
+    assert len(set(intervals)) > 1
+
+
+def test_eta_aware() -> None:
+    """Sleeps until shortly before the expected completion, then backs off"""
+    strategy = EtaAware(margin_seconds=1)
+    assert strategy.next_interval(_context(attempt=1, elapsed_seconds=0.5)) == 18.5
+    assert strategy.next_interval(_context(attempt=2, elapsed_seconds=19)) == 1
+    assert strategy.next_interval(_context(attempt=3, elapsed_seconds=20)) == 2
+
+    strategy.record_poll(0.5)
+    strategy.record_poll(19)
+    strategy.record_poll(20)
+    assert strategy.requests_saved == 2  # Polling every 5 seconds takes 5 requests
+
+
+def test_get_status_with_polling_strategy(mocker) -> None:
+    """TranslateVideo sleeps for as long as its polling strategy decides"""
+    mock_response = mocker.Mock()
+    mock_response.status_code = 200
+    mock_response.json.side_effect = [{"result": "pending"}, {"result": "completed"}]
+    mocker.patch("requests.Session.get", return_value=mock_response)
+    mocked_sleep = mocker.patch("time.sleep")
+
+    strategy = EtaAware(margin_seconds=1)
+    job = TranslateVideo("JOB_000", delay_seconds=20, polling_strategy=strategy)
+    status = job.get_status()
+
+    assert status == {"result": "completed"}
+    assert 18.9 < mocked_sleep.call_args.args[0] <= 19
+    assert strategy.polls == 2
+
+
+def test_jitter_survives_retry_after(mocker) -> None:
+    """Clients given the same Retry-After hint don't all poll again as soon as it
+    allows: the hint is a floor, that the jittered intervals are drawn above
+    """
+    pending_response = mocker.Mock(status_code=200, headers={"Retry-After": "7"})
+    pending_response.json.return_value = {"result": "pending"}
+    completed_response = mocker.Mock(status_code=200, headers={})
+    completed_response.json.return_value = {"result": "completed"}
+    mocker.patch(
+        "requests.Session.get", side_effect=[pending_response] * 10 + [completed_response]
+    )
+    mocked_sleep = mocker.patch("time.sleep")
+
+    strategy = DecorrelatedJitter(rng=random.Random(42))
+    job = TranslateVideo("JOB_000", timeout_seconds=3600, polling_strategy=strategy)
+    assert job.get_status() == {"result": "completed"}
+
+    sleeps = [call.args[0] for call in mocked_sleep.call_args_list]
+    assert len(sleeps) == 10
+    assert all(seconds >= 7 for seconds in sleeps)
+    assert len(set(sleeps)) == 10
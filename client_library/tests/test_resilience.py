@@ -0,0 +1,169 @@
+"""Testing the retry policy, the rate limiter and the circuit breaker, by
+injecting faults into the responses of a local stand-in server
+"""
+
+import asyncio
+import time
+
+import pytest
+import requests
+from client_library.tests.fault_server import running_fault_server
+from client_library.translate_video import errors
+from client_library.translate_video.async_translate_video import (
+    AsyncTranslateVideo,
+    AsyncTranslateVideoClient,
+)
+from client_library.translate_video.resilience import (
+    CircuitBreaker,
+    RetryPolicy,
+    TokenBucket,
+)
+from client_library.translate_video.translate_video import (
+    TranslateVideo,
+    TranslateVideoClient,
+)
+
+FAST_RETRIES = RetryPolicy(max_attempts=3, backoff_seconds=0.01)
+
+
+def test_retry_policy() -> None:
+    """Idempotent calls are retried on any transient failure, others only when
+    they surely weren't processed, and never past max_attempts
+    """
+    policy = RetryPolicy(max_attempts=3, max_backoff_seconds=10)
+
+    assert policy.should_retry(1, idempotent=True, status_code=500)
+    assert not policy.should_retry(1, idempotent=False, status_code=500)
+    assert policy.should_retry(1, idempotent=False, status_code=503)
+    assert not policy.should_retry(1, idempotent=True, status_code=404)
+    assert not policy.should_retry(3, idempotent=True, status_code=503)
+    assert policy.should_retry(1, idempotent=True, exception=requests.ReadTimeout())
+    assert not policy.should_retry(1, idempotent=False, exception=requests.ReadTimeout())
+    assert policy.should_retry(1, idempotent=False, exception=requests.ConnectTimeout())
+
+    assert policy.seconds_before_retry(1, retry_after_seconds=7) == 7
+    assert policy.seconds_before_retry(1, retry_after_seconds=60) == 10
+    assert 0.5 <= policy.seconds_before_retry(2) <= 1
+
+
+def test_get_status_retries_server_errors() -> None:
+    """GET /status is retried through 503s and dropped connections"""
+    with running_fault_server([503, "drop", None]) as server:
+        client = TranslateVideoClient(server.base_url, retry_policy=FAST_RETRIES)
+        status = TranslateVideo("JOB_000", client=client).get_status()
+
+    assert status == {"result": "completed"}
+    assert server.requests == ["GET /status/JOB_000"] * 3
+
+
+def test_get_status_gives_up_after_max_attempts() -> None:
+    """A server that keeps failing makes get_status() raise, rather than crash"""
+    with running_fault_server([503] * 3) as server:
+        client = TranslateVideoClient(server.base_url, retry_policy=FAST_RETRIES)
+        with pytest.raises(errors.GetJobInfoError):
+            TranslateVideo("JOB_000", client=client).get_status()
+
+    assert len(server.requests) == 3
+
+
+@pytest.mark.parametrize(
+    "faults, expected_requests",
+    [([503, None], 2), ([429, None], 2), ([500], 1), ([502], 1)],
+)
+def test_submit_retried_only_when_safe(faults, expected_requests) -> None:
+    """POST /submit is only retried when the server refused it (429/503)"""
+    with running_fault_server(faults) as server:
+        client = TranslateVideoClient(server.base_url, retry_policy=FAST_RETRIES)
+        TranslateVideo("JOB_000", client=client).submit()
+
+    assert server.requests == ["POST /submit/JOB_000"] * expected_requests
+
+
+def test_submit_not_retried_when_dropped() -> None:
+    """A submission whose connection dropped may have been processed, so it's not retried"""
+    with running_fault_server(["drop"]) as server:
+        client = TranslateVideoClient(server.base_url, retry_policy=FAST_RETRIES)
+        with pytest.raises(requests.ConnectionError):
+            TranslateVideo("JOB_000", client=client).submit()
+
+    assert len(server.requests) == 1
+
+
+def test_token_bucket() -> None:
+    """Bursts of up to `capacity` calls go through, later ones wait their turn"""
+    bucket = TokenBucket(rate_per_second=10, capacity=2)
+
+    waits = [bucket.reserve() for _ in range(4)]
+
+    assert waits[:2] == [0, 0]
+    assert waits[2] == pytest.approx(0.1, abs=0.01)
+    assert waits[3] == pytest.approx(0.2, abs=0.01)
+
+
+def test_client_rate_limited() -> None:
+    """Every request goes through the client's rate limiter"""
+    with running_fault_server() as server:
+        client = TranslateVideoClient(
+            server.base_url, rate_limiter=TokenBucket(rate_per_second=20, capacity=1)
+        )
+        started_at = time.monotonic()
+        for _ in range(5):
+            TranslateVideo("JOB_000", client=client).get_status()
+
+    assert time.monotonic() - started_at >= 0.2 - 0.01
+
+
+def test_circuit_breaker_sheds_load() -> None:
+    """Once open, the circuit fails calls without sending them, until a trial
+    call succeeds after the recovery period
+    """
+    circuit_breaker = CircuitBreaker(failure_threshold=2, recovery_seconds=0.2)
+    with running_fault_server([503, 503]) as server:
+        client = TranslateVideoClient(
+            server.base_url,
+            retry_policy=RetryPolicy(max_attempts=1),
+            circuit_breaker=circuit_breaker,
+        )
+        job = TranslateVideo("JOB_000", client=client)
+        for _ in range(2):
+            with pytest.raises(errors.GetJobInfoError):
+                job.get_status()
+
+        assert circuit_breaker.state == "open"
+        with pytest.raises(errors.CircuitOpenError):
+            job.get_status()
+        assert len(server.requests) == 2
+
+        time.sleep(0.25)
+        assert job.get_status() == {"result": "completed"}
+        assert circuit_breaker.state == "closed"
+
+
+def test_circuit_breaker_reopens_on_failed_trial() -> None:
+    """A failing trial call opens the circuit again"""
+    circuit_breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=0)
+    circuit_breaker.record_failure()
+
+    circuit_breaker.before_call()
+    assert circuit_breaker.state == "half_open"
+    with pytest.raises(errors.CircuitOpenError):
+        circuit_breaker.before_call()  # Only one trial call at a time
+
+    circuit_breaker.record_status_code(503)
+    assert circuit_breaker.state == "open"
+
+
+def test_async_client_retries() -> None:
+    """The asyncio client retries the same way"""
+
+    async def get_status(base_url: str) -> dict:
+        async with AsyncTranslateVideoClient(
+            base_url, retry_policy=FAST_RETRIES
+        ) as client:
+            return await AsyncTranslateVideo("JOB_000", client=client).get_status()
+
+    with running_fault_server([503, "drop", None]) as server:
+        status = asyncio.run(get_status(server.base_url))
+
+    assert status == {"result": "completed"}
+    assert len(server.requests) == 3
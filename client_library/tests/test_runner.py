@@ -0,0 +1,151 @@
+"""Testing the job runner"""
+
+import json
+
+import pytest
+from client_library.translate_video.runner import (
+    JobRunner,
+    ManifestEntry,
+    main,
+    read_manifest,
+)
+from client_library.translate_video.translate_video import TranslateVideoClient
+
+
+class _FakeServer:
+    """Stands in for the /submit:batch and /status:batch APIs. Jobs are "pending"
+    for `pending_polls` status checks, then "completed"
+    """
+
+    def __init__(self, mocker, pending_polls: int = 1) -> None:
+        self.mocker = mocker
+        self.pending_polls = pending_polls
+        self.polls_by_job_id = {}
+        self.submitted = []
+        self.largest_status_batch = 0
+
+    def post(self, url: str, json: dict, **kwargs):  # pylint: disable=redefined-outer-name
+        response = self.mocker.Mock(status_code=200)
+        if url.endswith("/submit:batch"):
+            results = []
+            for job in json["jobs"]:
+                self.submitted.append(job["job_id"])
+                self.polls_by_job_id[job["job_id"]] = 0
+                results.append({"job_id": job["job_id"], "status_code": 201})
+        else:
+            self.largest_status_batch = max(
+                self.largest_status_batch, len(json["job_ids"])
+            )
+            results = []
+            for job_id in json["job_ids"]:
+                self.polls_by_job_id[job_id] += 1
+                finished = self.polls_by_job_id[job_id] > self.pending_polls
+                results.append(
+                    {
+                        "job_id": job_id,
+                        "status_code": 200,
+                        "result": "completed" if finished else "pending",
+                    }
+                )
+
+        response.json.return_value = {"results": results}
+        return response
+
+
+@pytest.fixture
+def fake_server(mocker) -> _FakeServer:
+    """Patches the batch APIs with a fake server"""
+    server = _FakeServer(mocker)
+    mocker.patch("requests.Session.post", side_effect=server.post)
+    return server
+
+
+def _read_output(path) -> list:
+    """Returns the outcomes written to the output file"""
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+def test_read_manifest(tmp_path) -> None:
+    """Manifests are read from CSV and JSONL files"""
+    csv_manifest = tmp_path / "manifest.csv"
+    csv_manifest.write_text("job_id,delay_seconds\nJOB_000,5\nJOB_001,\n")
+    jsonl_manifest = tmp_path / "manifest.jsonl"
+    jsonl_manifest.write_text(
+        '{"job_id": "JOB_000", "delay_seconds": 5}\n\n{"job_id": 1}\n'
+    )
+
+    expected = [ManifestEntry("JOB_000", 5), ManifestEntry("JOB_001", 20)]
+    assert list(read_manifest(str(csv_manifest))) == expected
+    assert list(read_manifest(str(jsonl_manifest))) == [
+        ManifestEntry("JOB_000", 5),
+        ManifestEntry("1", 20),
+    ]
+    with pytest.raises(ValueError):
+        read_manifest(str(tmp_path / "manifest.txt"))
+
+
+def test_runner_submits_and_tracks_jobs(fake_server, tmp_path) -> None:
+    """Every job is submitted once and written out when it completes, with at
+    most max_outstanding jobs in flight
+    """
+    output_path = str(tmp_path / "results.jsonl")
+    runner = JobRunner(
+        output_path,
+        client=TranslateVideoClient(),
+        max_outstanding=4,
+        chunk_size=3,
+        poll_interval_seconds=0,
+    )
+    entries = [ManifestEntry(f"JOB_{i:03}") for i in range(10)]
+
+    summary = runner.run(entries + [ManifestEntry("JOB_000")])
+
+    assert fake_server.submitted == [entry.job_id for entry in entries]
+    assert fake_server.largest_status_batch == 3
+    assert summary.submitted == 10 and summary.skipped == 1
+    assert summary.results == {"completed": 10}
+    outcomes = _read_output(output_path)
+    assert sorted(outcome["job_id"] for outcome in outcomes) == fake_server.submitted
+    assert not (tmp_path / "results.jsonl.checkpoint").exists()
+
+
+def test_runner_times_out_jobs(mocker, tmp_path) -> None:
+    """Jobs that don't finish within the timeout are given up on"""
+    server = _FakeServer(mocker, pending_polls=100)
+    mocker.patch("requests.Session.post", side_effect=server.post)
+    runner = JobRunner(
+        str(tmp_path / "results.jsonl"), poll_interval_seconds=0, timeout_seconds=0
+    )
+
+    summary = runner.run([ManifestEntry("JOB_000")])
+
+    assert summary.results == {"timeout": 1}
+
+
+def test_runner_resumes_from_checkpoint(fake_server, tmp_path) -> None:
+    """A restarted run skips the finished jobs, and tracks the submitted ones
+    without resubmitting them
+    """
+    output = tmp_path / "results.jsonl"
+    # JOB_000 finished, JOB_001 was submitted, and the run crashed mid-write
+    output.write_text(
+        '{"job_id": "JOB_000", "result": "completed", "elapsed_seconds": 1.0}\n'
+        '{"job_id": "JOB_0'
+    )
+    (tmp_path / "results.jsonl.checkpoint").write_text(
+        '{"job_id": "JOB_000", "submitted_at": 0}\n'
+        '{"job_id": "JOB_001", "submitted_at": 0}\n'
+    )
+    fake_server.polls_by_job_id["JOB_001"] = 0
+    manifest = tmp_path / "manifest.csv"
+    manifest.write_text("job_id,delay_seconds\nJOB_000,1\nJOB_001,1\nJOB_002,1\n")
+
+    main([str(manifest), "--output", str(output), "--poll-interval", "0"])
+
+    assert fake_server.submitted == ["JOB_002"]
+    assert [outcome["job_id"] for outcome in _read_output(output)] == [
+        "JOB_000",
+        "JOB_001",
+        "JOB_002",
+    ]
@@ -0,0 +1,207 @@
+"""Testing the routing of the calls across several servers"""
+
+from collections import Counter
+
+import asyncio
+import json
+import time
+
+import httpx
+import requests
+from client_library.translate_video.async_translate_video import (
+    AsyncTranslateVideo,
+    AsyncTranslateVideoClient,
+)
+from client_library.translate_video.resilience import CircuitBreaker
+from client_library.translate_video.sharding import ShardRouter
+from client_library.translate_video.translate_video import (
+    TranslateVideo,
+    TranslateVideoClient,
+)
+
+from .live_server import running_server_processes
+
+BASE_URLS = [f"http://10.0.0.{i}:8000" for i in range(1, 5)]
+
+
+def _wait_for(condition, timeout_seconds: float = 10) -> None:
+    """Waits for the condition to be true"""
+    deadline = time.time() + timeout_seconds
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.05)
+
+
+def _servers_holding(base_urls, job_id: str) -> list:
+    """Returns the URLs of the servers the job was submitted to"""
+    return [
+        base_url
+        for base_url in base_urls
+        if requests.get(f"{base_url}/status/{job_id}", timeout=5).status_code == 200
+    ]
+
+
+def test_ring_spreads_and_reshuffles_minimally() -> None:
+    """The jobs are spread evenly across the servers, and a server going down
+    only moves its own jobs
+    """
+    router = ShardRouter(BASE_URLS)
+    job_ids = [f"JOB_{i:05}" for i in range(4000)]
+    shards = {job_id: router.route(job_id)[0] for job_id in job_ids}
+    counts = Counter(endpoint.url for endpoint in shards.values())
+    assert set(counts) == set(BASE_URLS)
+    assert all(700 < count < 1300 for count in counts.values())
+
+    down = router.endpoints[0]
+    router.mark_down(down)
+    for job_id, shard in shards.items():
+        route = router.route(job_id)
+        assert route[-1] is down
+        if shard is not down:
+            assert route[0] is shard
+        else:
+            assert route[0] is router.route(job_id, exclude=[down])[0]
+
+
+def test_calls_without_job_favour_fast_servers() -> None:
+    """Calls that aren't about a job mostly go to the fastest server"""
+    router = ShardRouter(BASE_URLS[:2])
+    router.mark_up(router.endpoints[0], latency_seconds=0.001)
+    router.mark_up(router.endpoints[1], latency_seconds=0.1)
+
+    picks = Counter(router.route()[0].url for _ in range(200))
+    assert picks[BASE_URLS[0]] > 150
+
+
+def test_jobs_stick_to_their_shard() -> None:
+    """Every call about a job goes to the same server"""
+    with running_server_processes(3) as servers:
+        base_urls = [server.base_url for server in servers]
+        with TranslateVideoClient(base_urls=base_urls) as client:
+            jobs = [
+                TranslateVideo(f"JOB_SHARD_{i:03}", delay_seconds=0, client=client)
+                for i in range(30)
+            ]
+            for job in jobs[:10]:
+                job.submit()
+            submitted = TranslateVideo.submit_many(jobs[10:], chunk_size=5, client=client)
+            assert all(submitted.values())
+
+            statuses = TranslateVideo.get_statuses([job.job_id for job in jobs], client=client)
+            assert None not in statuses.values()
+            for job in jobs:
+                shard = client.router.shard_of(job.job_id).url
+                assert _servers_holding(base_urls, job.job_id) == [shard]
+
+            assert len({client.router.shard_of(job.job_id).url for job in jobs}) == 3
+
+
+def test_failover_from_dead_server() -> None:
+    """The jobs of a server that's down go to the next server until it recovers"""
+    with running_server_processes(3) as servers:
+        base_urls = [server.base_url for server in servers]
+        with TranslateVideoClient(
+            base_urls=base_urls, health_check_interval_seconds=0.1
+        ) as client:
+            down = client.router.endpoints[0]
+            job_ids = [f"JOB_FAILOVER_{i:03}" for i in range(30)]
+            failover_job_ids = [
+                job_id for job_id in job_ids if client.router.shard_of(job_id) is down
+            ]
+            assert failover_job_ids
+
+            servers[0].stop()
+            # Submitted before the health checks noticed, or after
+            TranslateVideo(failover_job_ids[0], delay_seconds=0, client=client).submit()
+            _wait_for(lambda: not down.is_up(time.monotonic()))
+            for job_id in job_ids:
+                if job_id != failover_job_ids[0]:
+                    TranslateVideo(job_id, delay_seconds=0, client=client).submit()
+
+            for job_id in job_ids:
+                fallback = client.router.route(job_id, exclude=[down])[0].url
+                assert _servers_holding(base_urls[1:], job_id) == [fallback]
+
+            servers[0].start()
+            _wait_for(lambda: down.is_up(time.monotonic()))
+            job = TranslateVideo(failover_job_ids[0], delay_seconds=0, client=client)
+            job.submit()
+            assert requests.get(f"{down.url}/status/{job.job_id}", timeout=5).status_code == 200
+
+
+def test_failover_during_trial_request() -> None:
+    """Failing over is part of the circuit breaker's trial request, not another request"""
+    with running_server_processes(2) as servers:
+        base_urls = [server.base_url for server in servers]
+        circuit_breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=0)
+        with TranslateVideoClient(
+            base_urls=base_urls,
+            health_check_interval_seconds=0,
+            circuit_breaker=circuit_breaker,
+        ) as client:
+            down = client.router.endpoints[0]
+            job_id = next(
+                f"JOB_TRIAL_{i:03}"
+                for i in range(100)
+                if client.router.shard_of(f"JOB_TRIAL_{i:03}") is down
+            )
+            servers[0].stop()
+            circuit_breaker.record_failure()
+            assert circuit_breaker.state == "open"
+
+            TranslateVideo(job_id, delay_seconds=0, client=client).submit()
+            assert circuit_breaker.state == "closed"
+            assert _servers_holding(base_urls[1:], job_id) == [base_urls[1]]
+
+
+def test_async_client_shards_jobs() -> None:
+    """The asyncio client sends the calls about a job, and streams its status,
+    to the job's server, failing over from a server that's down
+    """
+    base_urls = BASE_URLS[:3]
+    down = base_urls[0]
+    requests_by_url: dict = {url: [] for url in base_urls}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        base_url = f"{request.url.scheme}://{request.url.netloc.decode()}"
+        if base_url == down:
+            raise httpx.ConnectError("Connection refused", request=request)
+        requests_by_url[base_url].append(request)
+        if request.method == "POST":
+            return httpx.Response(201, text="Submitted")
+        if request.url.path == "/status:stream":
+            events = [
+                {"job_id": job_id, "result": "completed"}
+                for job_id in request.url.params.get_list("job_id")
+            ]
+            body = "".join(f"event: status\ndata: {json.dumps(event)}\n\n" for event in events)
+            return httpx.Response(200, text=body)
+        return httpx.Response(200, json={"result": "completed"})
+
+    async def run(job_ids: list) -> list:
+        async with AsyncTranslateVideoClient(
+            base_urls=base_urls,
+            health_check_interval_seconds=0,
+            transport=httpx.MockTransport(handler),
+        ) as client:
+            for job_id in job_ids:
+                job = AsyncTranslateVideo(job_id, delay_seconds=0, client=client)
+                await job.submit()
+                assert await job.get_status() == {"result": "completed"}
+            return [event.job_id async for event in client.stream_statuses(job_ids)]
+
+    router = ShardRouter(base_urls)
+    job_ids = [f"JOB_ASYNC_{i:03}" for i in range(30)]
+    streamed_job_ids = asyncio.run(run(job_ids))
+
+    assert sorted(streamed_job_ids) == job_ids
+    down_endpoint = router.endpoints[0]
+    for job_id in job_ids:
+        server = router.route(job_id, exclude=[down_endpoint])[0].url
+        job_paths = [
+            request.url.path
+            for request in requests_by_url[server]
+            if job_id in str(request.url)
+        ]
+        assert job_paths == [f"/submit/{job_id}", f"/status/{job_id}", "/status:stream"]
+    assert all(requests_by_url[url] for url in base_urls[1:])
@@ -0,0 +1,71 @@
+"""Testing the chunked uploads of the source videos, against the server"""
+
+import os
+
+import pytest
+import requests
+from client_library.translate_video import errors
+from client_library.translate_video.resilience import RetryPolicy
+from client_library.translate_video.translate_video import (
+    TranslateVideo,
+    TranslateVideoClient,
+)
+from server import database, uploads
+
+from .live_server import running_server
+
+CHUNK_SIZE = uploads.CHUNK_SIZE_MULTIPLE
+
+
+@pytest.fixture
+def video_path(tmp_path) -> str:
+    """Writes a video of 3 and a half chunks, returning its path"""
+    path = tmp_path / "video.mp4"
+    path.write_bytes(os.urandom(3 * CHUNK_SIZE + CHUNK_SIZE // 2))
+    return str(path)
+
+
+def test_upload_submits_the_job(tmp_path, video_path) -> None:
+    """The video is uploaded in parallel chunks, then the job is submitted"""
+    with running_server(str(tmp_path)) as base_url:
+        with TranslateVideoClient(base_url) as client:
+            job = TranslateVideo("JOB_UPLOAD_000", delay_seconds=0, client=client)
+            with open(video_path, "rb") as video:
+                job.upload(video, chunk_size=CHUNK_SIZE, concurrency=3)
+
+    assert "JOB_UPLOAD_000" in database.JOB_INFO_BY_ID
+    upload_store = uploads.UploadStore(str(tmp_path / "uploads"))
+    with open(upload_store.source_path(job.upload_id), "rb") as source:
+        with open(video_path, "rb") as video:
+            assert source.read() == video.read()
+
+
+def test_upload_resumes_after_interruption(mocker, tmp_path, video_path) -> None:
+    """A failed upload is resumed from the chunks the server didn't receive"""
+    put = TranslateVideoClient.put
+    failed_chunks = []
+
+    def flaky_put(self, path: str, **kwargs) -> requests.Response:
+        if path.endswith("/chunks/2") and not failed_chunks:
+            failed_chunks.append(path)
+            raise requests.ConnectionError("Connection reset by peer")
+        return put(self, path, **kwargs)
+
+    sent_chunks = mocker.patch.object(
+        TranslateVideoClient, "put", side_effect=flaky_put, autospec=True
+    )
+
+    with running_server(str(tmp_path)) as base_url:
+        with TranslateVideoClient(base_url, retry_policy=RetryPolicy(max_attempts=1)) as client:
+            job = TranslateVideo("JOB_UPLOAD_001", delay_seconds=0, client=client)
+            with open(video_path, "rb") as video:
+                with pytest.raises(errors.UploadError):
+                    job.upload(video, chunk_size=CHUNK_SIZE)
+                assert "JOB_UPLOAD_001" not in database.JOB_INFO_BY_ID
+                assert sent_chunks.call_count == 4
+
+                job.upload(video, chunk_size=CHUNK_SIZE)
+
+    assert sent_chunks.call_count == 5
+    assert sent_chunks.call_args.args[1].endswith("/chunks/2")
+    assert "JOB_UPLOAD_001" in database.JOB_INFO_BY_ID
@@ -1,6 +1,21 @@
-"""Module containing the URLs of the /status and /submit APIs"""
+"""Module containing the URLs of the /status and /submit APIs (and their variants)"""
 
-_BASE_URL = "http://127.0.0.1:8000"
+# URL of the server, unless the client is configured with another one
+DEFAULT_BASE_URL = "http://127.0.0.1:8000"
 
-STATUS_URL = _BASE_URL + "/status"
-SUBMIT_URL = _BASE_URL + "/submit"
+# Paths relative to the base URL, for clients that are configured with one
+STATUS_PATH = "/status"
+SUBMIT_PATH = "/submit"
+STATUS_STREAM_PATH = "/status:stream"
+STATUS_BATCH_PATH = "/status:batch"
+SUBMIT_BATCH_PATH = "/submit:batch"
+UPLOADS_PATH = "/uploads"
+RESULT_PATH = "/result"
+
+STATUS_URL = DEFAULT_BASE_URL + STATUS_PATH
+SUBMIT_URL = DEFAULT_BASE_URL + SUBMIT_PATH
+STATUS_STREAM_URL = DEFAULT_BASE_URL + STATUS_STREAM_PATH
+STATUS_BATCH_URL = DEFAULT_BASE_URL + STATUS_BATCH_PATH
+SUBMIT_BATCH_URL = DEFAULT_BASE_URL + SUBMIT_BATCH_PATH
+UPLOADS_URL = DEFAULT_BASE_URL + UPLOADS_PATH
+RESULT_URL = DEFAULT_BASE_URL + RESULT_PATH
@@ -0,0 +1,395 @@
+"""Asyncio-native counterpart of the methods exposed by the Client Library"""
+
+# The methods mirror TranslateVideo's line for line, only awaiting the calls: what
+# they decide (retries, waits in between polls, etc.) is shared in resilience.py
+# and utils.py
+# pylint: disable=duplicate-code
+
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence
+
+import asyncio
+import logging
+
+import httpx
+import requests
+
+from . import api, caching, observers, polling, resilience, sharding, streaming, utils
+from .clock import SYSTEM_CLOCK, Clock
+
+logger = logging.getLogger(__name__)
+
+# Seconds a request may take on top of the time the server holds a long-poll open
+_REQUEST_TIMEOUT_SECONDS = 10
+
+
+class AsyncTranslateVideoClient:
+    """A pooled HTTP client shared by any number of AsyncTranslateVideo instances.
+
+    Requests reuse keep-alive connections from a single pool, and at most
+    `max_concurrency` of them are in flight at any point in time. Note that a
+    long-polling GET /status request occupies its slot while the server holds it.
+
+    Attributes:
+        base_url: str -> URL of the server. (default "http://127.0.0.1:8000").
+
+        base_urls, health_check_interval_seconds: See TranslateVideoClient. The calls
+        about a job, and the streams of the jobs' statuses, go to the jobs' servers.
+
+        max_concurrency: int -> Maximum number of requests in flight. (default 100).
+
+        max_keepalive_connections: int -> Maximum number of idle connections kept
+        open in the pool. (default 100).
+
+        keepalive_expiry_seconds: float -> Seconds after which an idle connection is
+        closed. (default 30).
+
+        transport: httpx.AsyncBaseTransport -> Optional transport to send the requests
+        through instead of the network, e.g. an httpx.ASGITransport wrapping the server.
+
+        conditional_requests, request_timeout_seconds, retry_policy, rate_limiter and
+        circuit_breaker: See TranslateVideoClient.
+
+        clock: Clock -> Clock the client, and the jobs going through it, read the time
+        from. They wait on the event loop, so a virtual clock has to drive the loop's
+        time too (see the server's clock.VirtualClock). (default: the system's).
+
+    Usage:
+        >>> async with AsyncTranslateVideoClient(max_concurrency=500) as client:
+        ...     job = AsyncTranslateVideo("JOB_001", client=client)
+        ...     await job.submit()
+        ...     await job.get_status()
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        base_url: str = api.DEFAULT_BASE_URL,
+        base_urls: Optional[Sequence[str]] = None,
+        health_check_interval_seconds: float = 5,
+        max_concurrency: int = 100,
+        max_keepalive_connections: int = 100,
+        keepalive_expiry_seconds: float = 30,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        conditional_requests: bool = True,
+        request_timeout_seconds: float = _REQUEST_TIMEOUT_SECONDS,
+        retry_policy: Optional[resilience.RetryPolicy] = None,
+        rate_limiter: Optional[resilience.TokenBucket] = None,
+        circuit_breaker: Optional[resilience.CircuitBreaker] = None,
+        clock: Clock = SYSTEM_CLOCK,
+    ) -> None:
+        # pylint: disable=too-many-arguments
+
+        self.clock = clock
+        self.router = sharding.ShardRouter(base_urls or [base_url])
+        self.base_url = self.router.endpoints[0].url
+        self.max_concurrency = max_concurrency
+        self.conditional_requests = conditional_requests
+        self.request_timeout_seconds = request_timeout_seconds
+        self.retry_policy = retry_policy or resilience.RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self._response_cache = caching.ConditionalRequestCache()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._http_client = httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry_seconds,
+            ),
+            timeout=request_timeout_seconds,
+            transport=transport,
+        )
+
+        # The health checks run on a thread, like TranslateVideoClient's
+        self.health_checker: Optional[sharding.HealthChecker] = None
+        if len(self.router.endpoints) > 1 and health_check_interval_seconds > 0:
+            self.health_checker = sharding.HealthChecker(
+                self.router,
+                requests.Session(),
+                interval_seconds=health_check_interval_seconds,
+            )
+            self.health_checker.start()
+
+    async def __aenter__(self) -> "AsyncTranslateVideoClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stops the health checks, and closes every connection in the pool"""
+        if self.health_checker:
+            await asyncio.to_thread(self.health_checker.stop)
+            self.health_checker.session.close()
+        await self._http_client.aclose()
+
+    async def _send(
+        self, method: str, path: str, shard_key: Optional[str] = None, **kwargs
+    ) -> httpx.Response:
+        """Sends the request once a concurrency slot frees up, to the server the
+        router picks for the shard key, as per the rate limiter, the circuit breaker
+        and the retry policy (see TranslateVideoClient._send)
+        """
+        attempts = resilience.CallAttempts(
+            method, path, self.retry_policy, self.circuit_breaker
+        )
+        while True:
+            attempts.start()
+            try:
+                response = await self._send_attempt(method, path, shard_key, **kwargs)
+            except httpx.TransportError as e:
+                seconds = attempts.retry_after_exception(e)
+                if seconds is None:
+                    raise
+            else:
+                seconds = attempts.retry_after_response(response)
+                if seconds is None:
+                    return response
+
+            await asyncio.sleep(seconds)
+
+    async def _send_attempt(
+        self, method: str, path: str, shard_key: Optional[str], **kwargs
+    ) -> httpx.Response:
+        """Sends a single attempt of the request, failing over to the next server
+        while the one it's sent to can't be reached
+        """
+        call = sharding.RoutedCall(self.router, shard_key, f"{method} {path}")
+        while True:
+            if self.rate_limiter:
+                await asyncio.sleep(self.rate_limiter.reserve())
+
+            endpoint = call.start()
+            try:
+                async with self._semaphore:
+                    response = await self._http_client.request(
+                        method, endpoint.url + path, **kwargs
+                    )
+            except httpx.TransportError as e:
+                if not call.fail_over(endpoint, e):
+                    raise
+            else:
+                call.succeeded(endpoint)
+                return response
+
+    async def request(
+        self, method: str, path: str, shard_key: Optional[str] = None, **kwargs
+    ) -> httpx.Response:
+        """Sends a request to the server of the shard key (e.g. the job_id the
+        request is about, see ShardRouter.route) once a concurrency slot frees up,
+        retrying it if need be. GET requests are conditional (see `conditional_requests`).
+        """
+        if method != "GET" or not self.conditional_requests:
+            return await self._send(method, path, shard_key, **kwargs)
+
+        cached = self._response_cache.make_conditional(path, kwargs)
+        response = await self._send(method, path, shard_key, **kwargs)
+        cached = self._response_cache.stand_in_for(path, response, cached)
+        if cached:
+            # Standing in for the 200 the server would've answered with
+            headers = dict(response.headers)
+            headers.pop("content-length", None)
+            headers.setdefault("content-type", cached.content_type or "application/json")
+            return httpx.Response(
+                200, headers=headers, content=cached.content, request=response.request
+            )
+
+        return response
+
+    async def stream_statuses(
+        self, job_ids: Iterable[str]
+    ) -> AsyncIterator[streaming.JobStatusEvent]:
+        """Yields the status transitions of the given jobs (see streaming.stream_statuses),
+        streaming those of every server's jobs from the server at the same time
+        """
+        job_ids_by_url: Dict[str, List[str]] = {}
+        for job_id in job_ids:
+            job_ids_by_url.setdefault(self.router.route(job_id)[0].url, []).append(job_id)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        tasks = [
+            asyncio.create_task(self._stream_server_statuses(url, server_job_ids, queue))
+            for url, server_job_ids in job_ids_by_url.items()
+        ]
+        try:
+            streaming_servers = len(tasks)
+            while streaming_servers:
+                item = await queue.get()
+                if isinstance(item, Exception):
+                    raise item
+                if item is None:
+                    streaming_servers -= 1
+                else:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _stream_server_statuses(
+        self, base_url: str, job_ids: List[str], queue: asyncio.Queue
+    ) -> None:
+        """Puts the status transitions of the jobs of a single server on the queue,
+        followed by None, or by the error the stream failed with
+        """
+        item: Optional[Exception] = None
+        try:
+            async for event in streaming.stream_statuses(
+                job_ids, client=self._http_client, base_url=base_url
+            ):
+                await queue.put(event)
+        except Exception as e:  # pylint: disable=broad-except
+            item = e
+        await queue.put(item)
+
+
+class AsyncTranslateVideo:
+    """A class representing a video translation job, whose methods are coroutines.
+
+    Has the same attributes and behaviour as TranslateVideo, except that waiting
+    in between polls doesn't block the thread, so a single event loop can watch
+    thousands of jobs at once.
+
+    Attributes:
+        job_id, delay_seconds, polling_interval_seconds, timeout_seconds,
+        long_poll_seconds, polling_strategy, honour_server_hints and observers (passed
+        as `job_observers`): See TranslateVideo.
+
+        client: AsyncTranslateVideoClient -> Client whose connection pool is used
+        for the API calls. The instance creates its own on first use otherwise, and
+        keeps reusing it (an httpx client can't be shared across event loops, unlike
+        the sync side's default client).
+
+    Usage:
+        >>> job = AsyncTranslateVideo("JOB_001", client=client)
+        >>> await job.submit()
+        >>> await job.get_status()
+        {"result": "pending"} OR {"result": "completed"} OR {"result": "error"}
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        job_id: str,
+        delay_seconds: int = 20,
+        polling_interval_seconds: int = 5,
+        timeout_seconds: int = 3600,
+        long_poll_seconds: int = 30,
+        polling_strategy: Optional[polling.PollingStrategy] = None,
+        honour_server_hints: bool = True,
+        client: Optional[AsyncTranslateVideoClient] = None,
+        job_observers: Iterable[observers.Observer] = (),
+    ) -> None:
+        # pylint: disable=too-many-arguments
+
+        self.job_id = job_id
+        self.delay_seconds = delay_seconds
+        self.polling_interval_seconds = polling_interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.long_poll_seconds = long_poll_seconds
+        self.polling_strategy = polling_strategy or polling.FixedInterval(
+            polling_interval_seconds
+        )
+        self.honour_server_hints = honour_server_hints
+        self.observers = list(job_observers)
+        self.client = client
+
+    @property
+    def clock(self) -> Clock:
+        """Clock of the client, or the system's if there's none"""
+        return self.client.clock if self.client else SYSTEM_CLOCK
+
+    def display_attributes(self) -> None:
+        """Prettily displays the attributes of the class instance"""
+        utils.display_object_attributes(self)
+
+    def _get_client(self) -> AsyncTranslateVideoClient:
+        """Returns the instance's client, creating it on first use if it wasn't given one"""
+        if self.client is None:
+            self.client = AsyncTranslateVideoClient()
+
+        return self.client
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Sends the request through the instance's client"""
+        return await self._get_client().request(method, path, self.job_id, **kwargs)
+
+    async def get_status(self) -> Dict[str, str]:
+        """Gets the job's status by calling the GET /status API repeatedly,
+        as long as the elapsed time is within the `timeout_seconds` seconds.
+        See TranslateVideo.get_status.
+        """
+        valid_statuses_to_exit = {"completed", "error"}
+        start_time = self.clock.time()
+        path = api.STATUS_PATH + f"/{self.job_id}"
+
+        self.polling_strategy.reset()
+        requested_at = self.clock.time()
+        job_status = await self._poll_status(path=path, start_time=start_time)
+        utils.record_poll(self, job_status, previous_result=None)
+
+        while (
+            job_status.result not in valid_statuses_to_exit
+            and job_status.elapsed_time < self.timeout_seconds
+        ):
+
+            await asyncio.sleep(
+                utils.seconds_until_next_poll(
+                    self, job_status, requested_at, self.clock.time()
+                )
+            )
+
+            requested_at = self.clock.time()
+            previous_result = job_status.result
+            job_status = await self._poll_status(path=path, start_time=start_time)
+            utils.record_poll(self, job_status, previous_result)
+
+        if job_status.result not in valid_statuses_to_exit:
+            utils.notify_timeout(self, job_status)
+
+        logger.debug(
+            "Polled the status of %s %d times, saving %d requests",
+            self.job_id,
+            self.polling_strategy.polls,
+            self.polling_strategy.requests_saved,
+        )
+        return {"result": job_status.result}
+
+    async def _poll_status(
+        self, path: str, start_time: float
+    ) -> utils.JobResultAndElapsedTime:
+        """Makes a single (long-polling) call to the GET /status API"""
+        remaining_seconds = self.timeout_seconds - (self.clock.time() - start_time)
+        wait_seconds = max(0, min(self.long_poll_seconds, int(remaining_seconds)))
+        params = {"wait": wait_seconds} if wait_seconds else None
+
+        request_timeout_seconds = self._get_client().request_timeout_seconds
+
+        attempt = self.polling_strategy.polls + 1
+        requested_at = self.clock.monotonic()
+        response = await self._request(
+            "GET", path, params=params, timeout=wait_seconds + request_timeout_seconds
+        )
+        request_seconds = self.clock.monotonic() - requested_at
+
+        return utils.read_polled_status(
+            self,
+            response,
+            attempt=attempt,
+            request_seconds=request_seconds,
+            start_time=start_time,
+            now=self.clock.time(),
+            logger=logger,
+        )
+
+    async def submit(self) -> None:
+        """Submits the job by calling the POST /submit API"""
+        params = {"delay_seconds": self.delay_seconds}
+        path = api.SUBMIT_PATH + f"/{self.job_id}"
+
+        response = await self._request("POST", path, params=params)
+        if response.status_code != 201:
+            message = response.json()["detail"]
+            logger.error(message)
@@ -0,0 +1,80 @@
+"""Cache of the server's latest responses, for making conditional GET requests"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import threading
+
+
+@dataclass
+class CachedResponse:
+    """DTO holding what's needed to rebuild a response the server answered a 304 to"""
+
+    etag: str
+    content: bytes
+    content_type: Optional[str]
+
+
+class ConditionalRequestCache:
+    """Remembers the ETag and body of the latest 200 response to a GET request
+    of each path (query parameters aside), so that the next request of the path
+    can send If-None-Match and the server can answer a body-less 304 when the
+    resource hasn't changed. The least recently used paths are forgotten first.
+
+    Attributes:
+        max_entries: int -> Maximum number of paths remembered. (default 1024).
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, path: str) -> Optional[CachedResponse]:
+        """Returns the latest response of the path, if it's remembered"""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                self._entries.move_to_end(path)
+
+            return entry
+
+    def make_conditional(self, path: str, kwargs: Dict) -> Optional[CachedResponse]:
+        """Adds If-None-Match to the keyword arguments of a GET request of the path,
+        if its latest response is remembered. Returns that response, if any.
+        """
+        entry = self.lookup(path)
+        if entry:
+            kwargs["headers"] = {
+                "If-None-Match": entry.etag,
+                **(kwargs.get("headers") or {}),
+            }
+
+        return entry
+
+    def stand_in_for(
+        self, path: str, response, cached: Optional[CachedResponse]
+    ) -> Optional[CachedResponse]:
+        """Returns the cached response a 304 to the conditional GET request of the
+        path stands in for. Any other response is remembered, and None returned.
+        """
+        if response.status_code == 304 and cached:
+            return cached
+
+        self.remember(path, response.status_code, response.headers, response.content)
+        return None
+
+    def remember(self, path: str, status_code: int, headers, content: bytes) -> None:
+        """Remembers the response to a GET request of the path, if it has an ETag"""
+        etag = headers.get("ETag")
+        if status_code != 200 or not isinstance(etag, str):
+            return
+
+        with self._lock:
+            self._entries[path] = CachedResponse(
+                etag=etag, content=content, content_type=headers.get("Content-Type")
+            )
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
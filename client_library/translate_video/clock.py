@@ -0,0 +1,62 @@
+"""Source of the time the client library reads and waits on.
+
+The clients (and the jobs going through them) read the time and wait in between
+polls and retries through their `clock`: the system's clock unless they're given
+another one, e.g. a VirtualClock to replay hours of polling in an instant.
+
+The asyncio client waits on its event loop (asyncio.sleep) rather than on the
+clock, so a virtual clock has to drive the loop's time for it too (see the
+server's clock.VirtualClock, which does both).
+"""
+
+import threading
+import time
+
+
+class Clock:
+    """The system's clock"""
+
+    def time(self) -> float:
+        """Returns the seconds since the epoch"""
+        return time.time()
+
+    def monotonic(self) -> float:
+        """Returns the seconds elapsed since an arbitrary point in time, never going back"""
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        """Blocks the calling thread for the given seconds"""
+        time.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """Clock whose time only moves when it's slept on, or advanced: sleeping
+    moves the clock forward and returns straight away. Thread-safe.
+
+    Attributes:
+        start: float -> Seconds since the epoch the clock starts at. (default 0).
+    """
+
+    def __init__(self, start: float = 0.0) -> None:
+        self.start = start
+        self._elapsed_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def time(self) -> float:
+        return self.start + self._elapsed_seconds
+
+    def monotonic(self) -> float:
+        return self._elapsed_seconds
+
+    def advance(self, seconds: float) -> None:
+        """Moves the clock forward"""
+        with self._lock:
+            self._elapsed_seconds += max(0.0, seconds)
+
+    def sleep(self, seconds: float) -> None:
+        """Moves the clock forward, instead of waiting"""
+        self.advance(seconds)
+
+
+# Clock of the clients that aren't given one
+SYSTEM_CLOCK = Clock()
@@ -0,0 +1,103 @@
+"""Progress of the segmented downloads of the jobs' outputs, for resuming them"""
+
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import json
+import os
+import threading
+
+
+@dataclass
+class DownloadProgress:
+    """Record of a download to `path`, kept next to the partial file ("<path>.part")
+    in "<path>.part.json", so that an interrupted download can pick up from the
+    segments already on disk.
+
+    Attributes:
+        path: str -> Path the output is downloaded to.
+        size: int -> Size of the output, in bytes.
+        segment_size: int -> Size of every segment (but the last one), in bytes.
+        etag: Optional[str] -> ETag of the output, the segments were downloaded from.
+        downloaded_segments: set[int] -> Indices of the segments written so far.
+    """
+
+    path: str
+    size: int
+    segment_size: int
+    etag: Optional[str]
+    downloaded_segments: set[int] = field(default_factory=set)
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+
+    @property
+    def part_path(self) -> str:
+        """Path of the partial file"""
+        return f"{self.path}.part"
+
+    @property
+    def progress_path(self) -> str:
+        """Path of the record"""
+        return f"{self.path}.part.json"
+
+    @property
+    def segments(self) -> int:
+        """Number of segments the output is split into"""
+        return -(-self.size // self.segment_size)
+
+    @classmethod
+    def load_or_create(
+        cls, path: str, size: int, segment_size: int, etag: Optional[str]
+    ) -> "DownloadProgress":
+        """Returns the progress of the earlier download to the path, if it was of
+        the same output in the same segments, or else starts a new one (with an
+        empty partial file of the output's size)
+        """
+        progress = cls(path=path, size=size, segment_size=segment_size, etag=etag)
+        try:
+            with open(progress.progress_path, encoding="utf-8") as file:
+                recorded = json.load(file)
+            if etag is not None and os.path.getsize(progress.part_path) == size and (
+                recorded["etag"],
+                recorded["size"],
+                recorded["segment_size"],
+            ) == (etag, size, segment_size):
+                progress.downloaded_segments = set(recorded["downloaded_segments"])
+                return progress
+        except (OSError, ValueError, KeyError):
+            pass
+
+        with open(progress.part_path, "wb") as file:
+            file.truncate(size)
+        progress._save()
+        return progress
+
+    def _save(self) -> None:
+        """Writes the record, atomically"""
+        record = asdict(self)
+        record["downloaded_segments"] = sorted(self.downloaded_segments)
+        temporary_path = f"{self.progress_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(record, file)
+        os.replace(temporary_path, self.progress_path)
+
+    def record(self, index: int) -> None:
+        """Records that the segment was written to the partial file"""
+        with self._lock:
+            self.downloaded_segments.add(index)
+            self._save()
+
+    def discard(self) -> None:
+        """Forgets the segments downloaded so far (e.g. when the output changed)"""
+        with self._lock:
+            self.downloaded_segments.clear()
+            try:
+                os.remove(self.progress_path)
+            except FileNotFoundError:
+                pass
+
+    def finish(self) -> None:
+        """Moves the (whole) partial file to the path and removes the record"""
+        os.replace(self.part_path, self.path)
+        os.remove(self.progress_path)
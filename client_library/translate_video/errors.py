@@ -11,3 +11,15 @@ class SubmitJobError(Exception):
 
 class UpdateJobStatusError(Exception):
     """Raised when updating a job's status fails"""
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request isn't sent because the server keeps failing"""
+
+
+class UploadError(Exception):
+    """Raised when uploading a job's source video fails"""
+
+
+class DownloadError(Exception):
+    """Raised when downloading a job's output fails"""
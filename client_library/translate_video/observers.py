@@ -0,0 +1,139 @@
+"""Hooks reporting the progress of the polling of a job's status.
+
+TranslateVideo (and AsyncTranslateVideo) notify their observers of every poll,
+of every change of the job's status, of giving up at the timeout and of failed
+calls to the GET /status API, with the request's latency, the attempt number
+and the elapsed time. Without observers nothing is reported, which is what a
+library wants by default; ConsoleObserver displays the progress on the console.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, Literal, Optional
+
+import logging
+
+from colorama import Fore, init
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PollEvent:
+    """DTO describing a successful call to the GET /status API"""
+
+    job_id: str
+    attempt: int  # Number of calls made to the GET /status API so far, this one included
+    result: Literal["completed", "error", "pending"]
+    request_seconds: float  # Seconds the call took (long-polling included)
+    elapsed_seconds: float  # Seconds since the first call
+    remaining_seconds: Optional[float] = None  # Server's estimate of the time left
+
+
+@dataclass
+class TransitionEvent:
+    """DTO describing the job's status changing in between two polls.
+    `previous_result` is None on the first poll.
+    """
+
+    job_id: str
+    attempt: int
+    previous_result: Optional[Literal["completed", "error", "pending"]]
+    result: Literal["completed", "error", "pending"]
+    elapsed_seconds: float
+
+
+@dataclass
+class TimeoutEvent:
+    """DTO describing giving up on a job that's still "pending" at the timeout"""
+
+    job_id: str
+    attempts: int
+    elapsed_seconds: float
+
+
+@dataclass
+class HttpErrorEvent:
+    """DTO describing an unsuccessful call to the GET /status API"""
+
+    job_id: str
+    attempt: int
+    status_code: int
+    request_seconds: float
+    elapsed_seconds: float
+
+
+class Observer:
+    """Base class of the observers, whose hooks do nothing.
+    Subclasses override the hooks they're interested in.
+    """
+
+    def on_poll(self, event: PollEvent) -> None:
+        """Called after every successful call to the GET /status API"""
+
+    def on_transition(self, event: TransitionEvent) -> None:
+        """Called when the job's status differs from the one of the previous poll"""
+
+    def on_timeout(self, event: TimeoutEvent) -> None:
+        """Called when the job's still "pending" once `timeout_seconds` have elapsed"""
+
+    def on_http_error(self, event: HttpErrorEvent) -> None:
+        """Called when a call to the GET /status API is unsuccessful"""
+
+
+class ConsoleObserver(Observer):
+    """Displays the status of the job and the elapsed time on the console, after
+    every poll (or only when the status changes, if `every_poll` is False)
+    """
+
+    _COLOR_BY_RESULT = {
+        "completed": Fore.GREEN,
+        "pending": Fore.LIGHTYELLOW_EX,
+        "error": Fore.RED,
+    }
+
+    def __init__(self, every_poll: bool = True) -> None:
+        init(autoreset=True)
+        self.every_poll = every_poll
+
+    def _display(self, job_id: str, result: str, elapsed_seconds: float) -> None:
+        """Displays the status of the job, then the elapsed time"""
+        color = self._COLOR_BY_RESULT.get(result, Fore.RED)
+        print(
+            f"\n{Fore.WHITE}Status of {Fore.LIGHTCYAN_EX}{job_id}{Fore.WHITE} : "
+            f"{color} {result}"
+        )
+        print(
+            f"{Fore.WHITE}Elapsed time: {Fore.LIGHTCYAN_EX}"
+            f"{round(elapsed_seconds, 2)} seconds\n"
+        )
+
+    def on_poll(self, event: PollEvent) -> None:
+        if self.every_poll:
+            self._display(event.job_id, event.result, event.elapsed_seconds)
+
+    def on_transition(self, event: TransitionEvent) -> None:
+        if not self.every_poll:
+            self._display(event.job_id, event.result, event.elapsed_seconds)
+
+    def on_timeout(self, event: TimeoutEvent) -> None:
+        print(
+            f"{Fore.RED}Gave up on {Fore.LIGHTCYAN_EX}{event.job_id}{Fore.RED} after "
+            f"{event.attempts} polls ({round(event.elapsed_seconds, 2)} seconds)\n"
+        )
+
+    def on_http_error(self, event: HttpErrorEvent) -> None:
+        print(
+            f"{Fore.RED}Failed to get the status of {Fore.LIGHTCYAN_EX}{event.job_id}"
+            f"{Fore.RED} (HTTP {event.status_code})\n"
+        )
+
+
+def notify(observers: Iterable[Observer], hook: str, event: object) -> None:
+    """Calls the given hook (e.g. "on_poll") of every observer with the event.
+    A failing observer is logged and doesn't affect the polling or the other observers.
+    """
+    for observer in observers:
+        try:
+            getattr(observer, hook)(event)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("%s.%s failed", type(observer).__name__, hook)
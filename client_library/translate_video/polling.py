@@ -0,0 +1,190 @@
+"""Pluggable strategies deciding how long to wait in between successive
+calls to the GET /status API, while a job is "pending".
+
+Every strategy keeps count of the polls it made, so that it can report how many
+requests it saved compared to polling at a fixed (baseline) interval.
+A strategy instance is stateful: use one per job.
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional
+
+import math
+import random
+
+
+@dataclass
+class PollContext:
+    """DTO with attributes describing the progress of the polling so far"""
+
+    attempt: int  # Number of calls made to the GET /status API so far
+    elapsed_seconds: float  # Seconds since the first call
+    delay_seconds: float  # Seconds the job is expected to take to complete
+    remaining_seconds: Optional[float] = None  # Server's estimate of the time left
+    retry_after_seconds: Optional[float] = None  # Server's Retry-After hint, if honoured
+
+
+class PollingStrategy(ABC):
+    """Base class of the polling strategies.
+
+    Attributes:
+        baseline_interval_seconds: float -> Interval of the fixed-interval polling
+        that `requests_saved` is measured against. (default 5).
+    """
+
+    def __init__(self, baseline_interval_seconds: float = 5) -> None:
+        self.baseline_interval_seconds = baseline_interval_seconds
+        self.polls = 0
+        self.elapsed_seconds = 0.0
+
+    def reset(self) -> None:
+        """Starts over, for polling the status of a job from scratch"""
+        self.polls = 0
+        self.elapsed_seconds = 0.0
+
+    def record_poll(self, elapsed_seconds: float) -> None:
+        """Keeps count of the calls made to the GET /status API"""
+        self.polls += 1
+        self.elapsed_seconds = elapsed_seconds
+
+    @property
+    def requests_saved(self) -> int:
+        """Number of calls saved compared to fixed-interval polling at the
+        baseline interval, over the same elapsed time
+        """
+        if self.baseline_interval_seconds <= 0:
+            return 0
+
+        baseline_polls = 1 + math.floor(
+            self.elapsed_seconds / self.baseline_interval_seconds
+        )
+        return baseline_polls - self.polls
+
+    @abstractmethod
+    def next_interval(self, context: PollContext) -> float:
+        """Returns the seconds to wait before calling the GET /status API again"""
+
+
+class FixedInterval(PollingStrategy):
+    """Polls every `interval_seconds` seconds (the library's original behaviour)"""
+
+    def __init__(
+        self,
+        interval_seconds: float = 5,
+        baseline_interval_seconds: Optional[float] = None,
+    ) -> None:
+        if baseline_interval_seconds is None:
+            baseline_interval_seconds = interval_seconds
+
+        super().__init__(baseline_interval_seconds)
+        self.interval_seconds = interval_seconds
+
+    def next_interval(self, context: PollContext) -> float:
+        return self.interval_seconds
+
+
+class ExponentialBackoff(PollingStrategy):
+    """Multiplies the interval by `multiplier` after every poll,
+    starting at `initial_interval_seconds` and capped at `max_interval_seconds`
+    """
+
+    def __init__(
+        self,
+        initial_interval_seconds: float = 1,
+        multiplier: float = 2,
+        max_interval_seconds: float = 60,
+        baseline_interval_seconds: float = 5,
+    ) -> None:
+        super().__init__(baseline_interval_seconds)
+        self.initial_interval_seconds = initial_interval_seconds
+        self.multiplier = multiplier
+        self.max_interval_seconds = max_interval_seconds
+
+    def next_interval(self, context: PollContext) -> float:
+        # Capping the exponent keeps the power from overflowing
+        exponent = min(max(0, context.attempt - 1), 64)
+        interval = self.initial_interval_seconds * self.multiplier**exponent
+        return min(self.max_interval_seconds, interval)
+
+
+class DecorrelatedJitter(PollingStrategy):
+    """Exponential backoff with "decorrelated jitter": every interval is drawn
+    at random between `base_interval_seconds` and 3x the previous interval
+    (capped at `max_interval_seconds`), so that clients that started together
+    don't keep polling in lockstep. A Retry-After hint raises both bounds, so the
+    clients given the same hint are spread out past it rather than all polling
+    again as soon as it allows.
+    """
+
+    def __init__(
+        self,
+        base_interval_seconds: float = 1,
+        max_interval_seconds: float = 60,
+        baseline_interval_seconds: float = 5,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        super().__init__(baseline_interval_seconds)
+        self.base_interval_seconds = base_interval_seconds
+        self.max_interval_seconds = max_interval_seconds
+        self.rng = rng or random.Random()
+        self._previous_interval = base_interval_seconds
+
+    def reset(self) -> None:
+        super().reset()
+        self._previous_interval = self.base_interval_seconds
+
+    def next_interval(self, context: PollContext) -> float:
+        base_interval = max(self.base_interval_seconds, context.retry_after_seconds or 0)
+        interval = self.rng.uniform(
+            base_interval, max(self._previous_interval, base_interval) * 3
+        )
+        self._previous_interval = min(self.max_interval_seconds, interval)
+        return self._previous_interval
+
+
+class EtaAware(PollingStrategy):
+    """Sleeps until `margin_seconds` before the job's expected completion (as
+    estimated by the server, or else its `delay_seconds`), then falls back to the
+    `fallback` strategy (default: exponential backoff from 1 up to 30 seconds).
+    """
+
+    def __init__(
+        self,
+        margin_seconds: float = 1,
+        fallback: Optional[PollingStrategy] = None,
+        baseline_interval_seconds: float = 5,
+    ) -> None:
+        super().__init__(baseline_interval_seconds)
+        self.margin_seconds = margin_seconds
+        self.fallback = fallback or ExponentialBackoff(max_interval_seconds=30)
+        self._fallback_started_at_attempt: Optional[int] = None
+
+    def reset(self) -> None:
+        super().reset()
+        self.fallback.reset()
+        self._fallback_started_at_attempt = None
+
+    def next_interval(self, context: PollContext) -> float:
+        if context.remaining_seconds is not None:
+            seconds_until_eta = context.remaining_seconds - self.margin_seconds
+        else:
+            seconds_until_eta = (
+                context.delay_seconds - self.margin_seconds - context.elapsed_seconds
+            )
+        if self._fallback_started_at_attempt is None and seconds_until_eta > 0:
+            return seconds_until_eta
+
+        # Past the expected completion: the fallback starts from its first interval
+        if self._fallback_started_at_attempt is None:
+            self._fallback_started_at_attempt = context.attempt - 1
+
+        return self.fallback.next_interval(
+            PollContext(
+                attempt=context.attempt - self._fallback_started_at_attempt,
+                elapsed_seconds=context.elapsed_seconds,
+                delay_seconds=context.delay_seconds,
+                remaining_seconds=context.remaining_seconds,
+                retry_after_seconds=context.retry_after_seconds,
+            )
+        )
@@ -0,0 +1,330 @@
+"""Policies protecting the API calls (and the server) from transient failures:
+
+- RetryPolicy: retries failed calls with exponential backoff, as long as
+  retrying is safe, i.e. the call is idempotent or surely wasn't processed.
+- TokenBucket: caps the rate of the calls made by a client.
+- CircuitBreaker: fails calls fast, without sending them, while the server
+  keeps failing, so that a degraded server isn't buried under retries.
+
+The clients (TranslateVideoClient and AsyncTranslateVideoClient) apply them to
+every call they make, through CallAttempts.
+"""
+
+from typing import FrozenSet, Optional, Union
+
+import logging
+import random
+import threading
+
+import httpx
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from . import api, errors, utils
+from .clock import SYSTEM_CLOCK, Clock
+
+logger = logging.getLogger(__name__)
+
+# Status codes of the calls that are worth retrying
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Status codes with which the server refuses a call without processing it
+# (e.g. a 503 after rolling a failed submission back), so that even
+# non-idempotent calls can be retried
+_REJECTED_STATUS_CODES = frozenset({429, 503})
+
+# POST APIs that only read, and so can be retried like GETs
+_IDEMPOTENT_POST_PATHS = frozenset({api.STATUS_BATCH_PATH})
+
+
+def is_idempotent(method: str, path: str) -> bool:
+    """Whether sending the call twice has the same effect as sending it once.
+    (Resubmitting a job restarts it, so POST /submit isn't.)
+    """
+    return method in ("GET", "HEAD", "OPTIONS", "PUT", "DELETE") or (
+        method == "POST" and path in _IDEMPOTENT_POST_PATHS
+    )
+
+
+def failed_to_connect(exception: Exception) -> bool:
+    """Whether the call failed before reaching the server (e.g. the connection
+    was refused), as opposed to failing while or after the server processed it
+    """
+    if isinstance(
+        exception, (httpx.ConnectError, httpx.ConnectTimeout, requests.ConnectTimeout)
+    ):
+        return True
+
+    # requests wraps urllib3's errors (e.g. "connection refused") in a ConnectionError
+    reason = getattr(exception.args[0], "reason", None) if exception.args else None
+    return isinstance(exception, requests.ConnectionError) and isinstance(
+        reason, NewConnectionError
+    )
+
+
+class RetryPolicy:
+    """Decides whether, and after how long, a failed call is retried.
+
+    Idempotent calls are retried on transport errors and on the retryable status
+    codes. Other calls (e.g. POST /submit) are only retried when they surely
+    weren't processed: when the connection couldn't be established, or when the
+    server refused them (429 or 503).
+
+    Attributes:
+        max_attempts: int -> Maximum number of attempts per call, the first one
+        included. 1 disables retries. (default 3).
+
+        backoff_seconds: float -> Seconds waited before the first retry, doubled
+        before every subsequent one (with jitter). (default 0.5).
+
+        max_backoff_seconds: float -> Cap of the waits, the server's Retry-After
+        hints included. (default 10).
+
+        retryable_status_codes: FrozenSet[int] -> Status codes worth retrying.
+        (default 408, 429, 500, 502, 503 and 504).
+
+        rng: random.Random -> Source of the jitter, e.g. a seeded one for
+        reproducible waits. (default: an unseeded one).
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_seconds: float = 0.5,
+        max_backoff_seconds: float = 10,
+        retryable_status_codes: FrozenSet[int] = RETRYABLE_STATUS_CODES,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        # pylint: disable=too-many-arguments
+
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.retryable_status_codes = retryable_status_codes
+        self.rng = rng or random.Random()
+
+    def should_retry(
+        self,
+        attempt: int,
+        idempotent: bool,
+        status_code: Optional[int] = None,
+        exception: Optional[Exception] = None,
+    ) -> bool:
+        """Whether to retry the call after its `attempt`-th attempt either got a
+        response with the status code, or raised the exception
+        """
+        if attempt >= self.max_attempts:
+            return False
+
+        if exception is not None:
+            return idempotent or failed_to_connect(exception)
+
+        if status_code not in self.retryable_status_codes:
+            return False
+
+        return idempotent or status_code in _REJECTED_STATUS_CODES
+
+    def seconds_before_retry(
+        self, attempt: int, retry_after_seconds: Optional[float] = None
+    ) -> float:
+        """Returns the seconds to wait before the attempt following the
+        `attempt`-th one: the server's Retry-After hint if there's one, or else
+        an exponentially growing, jittered backoff
+        """
+        if retry_after_seconds is not None:
+            return min(retry_after_seconds, self.max_backoff_seconds)
+
+        backoff = min(
+            self.backoff_seconds * 2 ** (attempt - 1), self.max_backoff_seconds
+        )
+        # Jitter, so that clients failing together don't retry in lockstep
+        return self.rng.uniform(backoff / 2, backoff)
+
+
+class TokenBucket:  # pylint: disable=too-few-public-methods
+    """Rate limiter letting calls through at `rate_per_second` on average, with
+    bursts of up to `capacity` calls. Thread-safe, so it can be shared by a client.
+
+    Attributes:
+        rate_per_second: float -> Number of tokens added every second.
+        capacity: float -> Maximum number of tokens saved up. (default rate_per_second).
+        clock: Clock -> Clock the tokens are added as per. (default: the system's).
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        capacity: Optional[float] = None,
+        clock: Clock = SYSTEM_CLOCK,
+    ) -> None:
+        self.rate_per_second = rate_per_second
+        self.capacity = float(rate_per_second if capacity is None else capacity)
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated_at = clock.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes a token. Returns the seconds to wait for before making the call,
+        0 when a token was available. (Tokens are reserved ahead of time, so that
+        callers are let through in the order they asked.)
+        """
+        with self._lock:
+            now = self.clock.monotonic()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated_at) * self.rate_per_second,
+            )
+            self._updated_at = now
+            self._tokens -= 1
+
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate_per_second
+
+
+class CircuitBreaker:  # pylint: disable=too-many-instance-attributes
+    """Fails calls fast while the server is degraded.
+
+    The circuit opens after `failure_threshold` consecutive failures (transport
+    errors or 5xx responses), failing every call with a CircuitOpenError without
+    sending it. After `recovery_seconds`, a single trial call is let through: the
+    circuit closes again if it succeeds, and stays open otherwise.
+
+    Attributes:
+        failure_threshold: int -> Consecutive failures opening the circuit. (default 5).
+        recovery_seconds: float -> Seconds the circuit stays open for. (default 30).
+        state: str -> "closed" (calls go through), "open" or "half_open" (trial call).
+        clock: Clock -> Clock the recovery is timed as per. (default: the system's).
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_seconds: float = 30,
+        clock: Clock = SYSTEM_CLOCK,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.clock = clock
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Raises a CircuitOpenError if the call must not be sent"""
+        with self._lock:
+            if self.state == "open":
+                if self.clock.monotonic() - self._opened_at < self.recovery_seconds:
+                    raise errors.CircuitOpenError(
+                        "The server is failing, not sending the request"
+                    )
+                self.state = "half_open"
+
+            if self.state == "half_open":
+                if self._trial_in_flight:
+                    raise errors.CircuitOpenError(
+                        "Waiting on a trial request to the failing server"
+                    )
+                self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        """Records a call the server handled, closing the circuit"""
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Records a failed call, opening the circuit if need be"""
+        with self._lock:
+            self._trial_in_flight = False
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = self.clock.monotonic()
+
+    def record_status_code(self, status_code: int) -> None:
+        """Records a call that got a response: 5xx responses are failures"""
+        if status_code >= 500:
+            self.record_failure()
+        else:
+            self.record_success()
+
+
+class CallAttempts:
+    """Follows a call through its attempts, deciding as per the retry policy and
+    the circuit breaker whether, and after how long, it's sent again. The clients
+    only differ in how they send the call and wait, so both go through it.
+
+    Attributes:
+        method: str -> HTTP method of the call.
+        path: str -> Path of the call.
+        retry_policy: RetryPolicy -> Policy retrying the call, when it's safe.
+        circuit_breaker: CircuitBreaker -> Circuit breaker the call goes through. (default None).
+        attempt: int -> Number of the current attempt, starting at 1.
+    """
+
+    def __init__(
+        self,
+        method: str,
+        path: str,
+        retry_policy: RetryPolicy,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        self.method = method
+        self.path = path
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.attempt = 1
+        self._idempotent = is_idempotent(method, path)
+
+    def start(self) -> None:
+        """Raises a CircuitOpenError if the attempt must not be sent. Called once
+        per attempt: failing over to another server is part of the same attempt.
+        """
+        if self.circuit_breaker:
+            self.circuit_breaker.before_call()
+
+    def retry_after_exception(self, exception: Exception) -> Optional[float]:
+        """Records the attempt that raised the exception. Returns the seconds to
+        wait before the next attempt, or None when the call isn't retried.
+        """
+        if self.circuit_breaker:
+            self.circuit_breaker.record_failure()
+        if not self.retry_policy.should_retry(
+            self.attempt, self._idempotent, exception=exception
+        ):
+            return None
+
+        return self._next_attempt(repr(exception))
+
+    def retry_after_response(
+        self, response: Union[requests.Response, httpx.Response]
+    ) -> Optional[float]:
+        """Records the attempt that got the response. Returns the seconds to wait
+        before the next attempt, or None when the response is to be handed back.
+        """
+        if self.circuit_breaker:
+            self.circuit_breaker.record_status_code(response.status_code)
+        if not self.retry_policy.should_retry(
+            self.attempt, self._idempotent, status_code=response.status_code
+        ):
+            return None
+
+        return self._next_attempt(
+            f"HTTP {response.status_code}", utils.parse_retry_after(response)
+        )
+
+    def _next_attempt(
+        self, failure: str, retry_after_seconds: Optional[float] = None
+    ) -> float:
+        """Moves on to the next attempt, returning the seconds to wait before it"""
+        seconds = self.retry_policy.seconds_before_retry(self.attempt, retry_after_seconds)
+        logger.warning(
+            "%s %s failed (%s), retrying in %.2fs", self.method, self.path, failure, seconds
+        )
+        self.attempt += 1
+        return seconds
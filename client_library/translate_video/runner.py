@@ -0,0 +1,404 @@
+"""Runner submitting the jobs of a (CSV or JSONL) manifest and tracking them
+until they finish, writing their results to an output file as they come in.
+
+The manifest is read as a stream: at most `max_outstanding` jobs are submitted
+and not finished yet at any point in time, so a manifest of any size runs in
+bounded memory. Jobs are submitted through the /submit:batch API, and all the
+outstanding jobs are tracked through one shared /status:batch polling loop,
+with at most `concurrency` of these requests in flight.
+
+Every finished job is appended to the output file (JSONL), and every submitted
+one to a checkpoint file next to it. A run that's restarted with the same
+output file skips the jobs already in it, and resumes tracking the submitted
+ones instead of resubmitting them. (Only the jobs submitted in the instant
+before a crash, if any, are submitted again.)
+
+Usage: python -m translate_video.runner manifest.csv --output results.jsonl
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, Iterator, List, Literal, Optional, Set, TextIO, Tuple
+
+import argparse
+import csv
+import json
+import logging
+import os
+import time
+
+from . import api, utils
+from .translate_video import TranslateVideo, TranslateVideoClient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ManifestEntry:
+    """DTO for a job to submit, as read from the manifest"""
+
+    job_id: str
+    delay_seconds: int = 20
+
+
+@dataclass
+class JobOutcome:
+    """DTO for a line of the output file: how a job ended up, and how long
+    after its submission ("timeout" and "submit_failed" are the runner's own)
+    """
+
+    job_id: str
+    result: Literal["completed", "error", "timeout", "submit_failed"]
+    elapsed_seconds: float
+
+
+@dataclass
+class RunSummary:
+    """DTO with the counts of a run.
+
+    Attributes:
+        submitted: int -> Jobs submitted by this run.
+        resumed: int -> Jobs submitted by a previous run, tracked until they finished.
+        skipped: int -> Jobs of the manifest already in the output file, or repeated.
+        results: Dict[str, int] -> Number of jobs written to the output, by result.
+    """
+
+    submitted: int = 0
+    resumed: int = 0
+    skipped: int = 0
+    results: Dict[str, int] = field(default_factory=dict)
+
+
+def _to_entry(row: dict) -> ManifestEntry:
+    """Builds a manifest entry out of a CSV row or a JSON object"""
+    delay_seconds = row.get("delay_seconds")
+    if delay_seconds in (None, ""):
+        return ManifestEntry(job_id=str(row["job_id"]))
+
+    return ManifestEntry(job_id=str(row["job_id"]), delay_seconds=int(delay_seconds))
+
+
+def _read_csv(path: str) -> Iterator[ManifestEntry]:
+    """Lazily reads a CSV manifest, with a header row"""
+    with open(path, newline="", encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            yield _to_entry(row)
+
+
+def _read_jsonl(path: str) -> Iterator[ManifestEntry]:
+    """Lazily reads a JSONL manifest, one JSON object per line"""
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield _to_entry(json.loads(line))
+
+
+def read_manifest(path: str) -> Iterator[ManifestEntry]:
+    """Lazily reads the jobs of a manifest: a CSV file (with `job_id` and optional
+    `delay_seconds` columns) or a JSONL file (with objects of the same keys)
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return _read_csv(path)
+    if extension in (".jsonl", ".ndjson"):
+        return _read_jsonl(path)
+
+    raise ValueError(f"Unsupported manifest {path}: expected a .csv or .jsonl file")
+
+
+def _read_records(path: str) -> Iterator[dict]:
+    """Lazily reads the records of an output or checkpoint file, if it exists.
+    A line torn by a crash is skipped.
+    """
+    if not os.path.exists(path):
+        return
+
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Skipping a torn line of %s: %r", path, line)
+
+
+def _open_for_appending(path: str) -> TextIO:
+    """Opens the output or checkpoint file for appending records to it, after
+    cutting off its last line if a crash tore it
+    """
+    with open(path, "ab+") as file:
+        end = file.seek(0, os.SEEK_END)
+        start = end
+        while start > 0:
+            start = max(0, start - 4096)
+            file.seek(start)
+            last_newline = file.read(end - start).rfind(b"\n")
+            if last_newline != -1:
+                file.truncate(start + last_newline + 1)
+                break
+        else:
+            file.truncate(0)
+
+    return open(path, "a", encoding="utf-8")  # pylint: disable=consider-using-with
+
+
+class JobRunner:  # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    """Submits jobs and tracks them until they finish, with bounded concurrency.
+
+    Attributes:
+        output_path: str -> JSONL file the JobOutcome of every job is appended to.
+        The checkpoint is kept next to it, in `output_path` + ".checkpoint".
+
+        client: TranslateVideoClient -> Client used for the API calls.
+        (default: a client with a pool of `concurrency` connections).
+
+        concurrency: int -> Maximum number of /submit:batch and /status:batch
+        requests in flight at once. (default 4).
+
+        max_outstanding: int -> Maximum number of jobs submitted and not finished
+        yet. The manifest isn't read any further until some finish. (default 10000).
+
+        chunk_size: int -> Number of jobs per /submit:batch or /status:batch request.
+        (default 500).
+
+        poll_interval_seconds: float -> Seconds in between the rounds of status
+        checks of the outstanding jobs. (default 5).
+
+        timeout_seconds: float -> Seconds after its submission a job that hasn't
+        finished is given up on, as a "timeout". (default 3600).
+
+    Usage:
+        >>> runner = JobRunner("results.jsonl", concurrency=8)
+        >>> runner.run(read_manifest("manifest.csv"))
+        RunSummary(submitted=250000, resumed=0, skipped=0, results={...})
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        output_path: str,
+        client: Optional[TranslateVideoClient] = None,
+        concurrency: int = 4,
+        max_outstanding: int = 10000,
+        chunk_size: int = 500,
+        poll_interval_seconds: float = 5,
+        timeout_seconds: float = 3600,
+    ) -> None:
+
+        self.output_path = output_path
+        self.checkpoint_path = output_path + ".checkpoint"
+        self.client = client or TranslateVideoClient(pool_maxsize=concurrency)
+        self.concurrency = concurrency
+        self.max_outstanding = max_outstanding
+        self.chunk_size = chunk_size
+        self.poll_interval_seconds = poll_interval_seconds
+        self.timeout_seconds = timeout_seconds
+
+    def _read_finished_job_ids(self) -> Set[str]:
+        """Returns the jobs already in the output file"""
+        return {outcome["job_id"] for outcome in _read_records(self.output_path)}
+
+    def _read_checkpoint(self, finished_job_ids: Set[str]) -> Dict[str, float]:
+        """Returns the jobs a previous run submitted that haven't finished,
+        with the time they were submitted at
+        """
+        return {
+            submission["job_id"]: submission["submitted_at"]
+            for submission in _read_records(self.checkpoint_path)
+            if submission["job_id"] not in finished_job_ids
+        }
+
+    def _write_outcome(
+        self, output: TextIO, outcome: JobOutcome, summary: RunSummary
+    ) -> None:
+        """Appends the outcome to the output file, and counts it"""
+        output.write(json.dumps(asdict(outcome)) + "\n")
+        summary.results[outcome.result] = summary.results.get(outcome.result, 0) + 1
+
+    def _submit_chunk(self, chunk: List[ManifestEntry]) -> Dict[str, bool]:
+        """Submits the jobs through a single /submit:batch request"""
+        return TranslateVideo.submit_many(
+            [
+                TranslateVideo(entry.job_id, entry.delay_seconds, client=self.client)
+                for entry in chunk
+            ],
+            chunk_size=len(chunk),
+            client=self.client,
+        )
+
+    def _get_statuses_chunk(self, chunk: List[str]) -> Dict[str, Optional[str]]:
+        """Gets the status of the jobs through a single /status:batch request"""
+        return TranslateVideo.get_statuses(
+            chunk, chunk_size=len(chunk), client=self.client
+        )
+
+    def run(self, entries: Iterable[ManifestEntry]) -> RunSummary:
+        """Submits the jobs (skipping those already in the output file) and
+        tracks them, along with those submitted by a previous run, until they
+        all finish. Returns the run's counts.
+        """
+        finished_job_ids = self._read_finished_job_ids()
+        outstanding = self._read_checkpoint(finished_job_ids)
+        summary = RunSummary(resumed=len(outstanding))
+        entries = iter(entries)
+        exhausted = False
+
+        with _open_for_appending(self.output_path) as output, _open_for_appending(
+            self.checkpoint_path
+        ) as checkpoint, ThreadPoolExecutor(self.concurrency) as executor:
+            while True:
+                if not exhausted:
+                    batch, exhausted = self._next_batch(
+                        entries, finished_job_ids, outstanding, summary
+                    )
+                    self._submit(
+                        executor, batch, outstanding, output, checkpoint, summary
+                    )
+
+                if not outstanding:
+                    if exhausted:
+                        break
+                    continue
+
+                time.sleep(self.poll_interval_seconds)
+                finished_job_ids |= self._track(executor, outstanding, output, summary)
+                logger.info(
+                    "%d jobs finished, %d outstanding",
+                    sum(summary.results.values()),
+                    len(outstanding),
+                )
+
+        # Every job is in the output file by now
+        os.remove(self.checkpoint_path)
+        return summary
+
+    def _next_batch(
+        self,
+        entries: Iterator[ManifestEntry],
+        finished_job_ids: Set[str],
+        outstanding: Dict[str, float],
+        summary: RunSummary,
+    ) -> Tuple[List[ManifestEntry], bool]:
+        """Reads the next jobs to submit off the manifest, as many as there's room
+        for among the outstanding jobs. Returns them, and whether the manifest
+        has been read to the end.
+        """
+        batch: Dict[str, ManifestEntry] = {}
+        room = self.max_outstanding - len(outstanding)
+        while len(batch) < room:
+            entry = next(entries, None)
+            if entry is None:
+                return list(batch.values()), True
+
+            if (
+                entry.job_id in finished_job_ids
+                or entry.job_id in outstanding
+                or entry.job_id in batch
+            ):
+                summary.skipped += 1
+                continue
+
+            batch[entry.job_id] = entry
+
+        return list(batch.values()), False
+
+    def _submit(
+        self,
+        executor: ThreadPoolExecutor,
+        batch: List[ManifestEntry],
+        outstanding: Dict[str, float],
+        output: TextIO,
+        checkpoint: TextIO,
+        summary: RunSummary,
+    ) -> None:
+        """Submits the jobs, and records them as outstanding in the checkpoint"""
+        chunks = list(utils.chunked(batch, self.chunk_size))
+        for submitted_by_job_id in executor.map(self._submit_chunk, chunks):
+            submitted_at = time.time()
+            for job_id, submitted in submitted_by_job_id.items():
+                if not submitted:
+                    self._write_outcome(
+                        output, JobOutcome(job_id, "submit_failed", 0.0), summary
+                    )
+                    continue
+
+                outstanding[job_id] = submitted_at
+                checkpoint.write(
+                    json.dumps({"job_id": job_id, "submitted_at": submitted_at}) + "\n"
+                )
+                summary.submitted += 1
+
+        checkpoint.flush()
+        output.flush()
+
+    def _track(
+        self,
+        executor: ThreadPoolExecutor,
+        outstanding: Dict[str, float],
+        output: TextIO,
+        summary: RunSummary,
+    ) -> Set[str]:
+        """Checks the status of every outstanding job, writing out (and no longer
+        tracking) the finished and timed out ones. Returns them.
+        """
+        chunks = list(utils.chunked(outstanding, self.chunk_size))
+        done_job_ids = set()
+        for status_by_job_id in executor.map(self._get_statuses_chunk, chunks):
+            now = time.time()
+            for job_id, result in status_by_job_id.items():
+                elapsed_seconds = now - outstanding[job_id]
+                if result in ("completed", "error"):
+                    outcome = JobOutcome(job_id, result, elapsed_seconds)
+                elif elapsed_seconds >= self.timeout_seconds:
+                    outcome = JobOutcome(job_id, "timeout", elapsed_seconds)
+                else:
+                    continue
+
+                self._write_outcome(output, outcome, summary)
+                done_job_ids.add(job_id)
+
+        for job_id in done_job_ids:
+            del outstanding[job_id]
+
+        output.flush()
+        return done_job_ids
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point: runs the jobs of a manifest"""
+    parser = argparse.ArgumentParser(
+        description="Submits the jobs of a CSV/JSONL manifest and writes their "
+        "results to a JSONL file, resuming where a previous run left off"
+    )
+    parser.add_argument("manifest", help="CSV or JSONL file of job_id/delay_seconds")
+    parser.add_argument("--output", required=True, help="JSONL file of the results")
+    parser.add_argument(
+        "--base-url",
+        default=api.DEFAULT_BASE_URL,
+        help="URL of the server, or comma-separated URLs of servers to shard the jobs across",
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--max-outstanding", type=int, default=10000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--poll-interval", type=float, default=5)
+    parser.add_argument("--timeout", type=float, default=3600)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    base_urls = args.base_url.split(",")
+    with TranslateVideoClient(base_urls=base_urls, pool_maxsize=args.concurrency) as client:
+        runner = JobRunner(
+            args.output,
+            client=client,
+            concurrency=args.concurrency,
+            max_outstanding=args.max_outstanding,
+            chunk_size=args.chunk_size,
+            poll_interval_seconds=args.poll_interval,
+            timeout_seconds=args.timeout,
+        )
+        summary = runner.run(read_manifest(args.manifest))
+
+    print(json.dumps(asdict(summary)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""Routing of the API calls across several servers (shards):
+
+- ShardRouter: maps every job to the same server with consistent hashing, so
+  that its submission and its status calls hit the same shard. When a server is
+  down, its jobs (and only its jobs) fail over to the next server on the ring.
+  Calls that aren't about a single job go to the least loaded of two servers
+  picked at random, by their latency and number of calls in flight.
+- RoutedCall: follows a call across the servers it's routed to, failing over
+  to the next one while the one it's sent to can't be reached.
+- HealthChecker: probes the servers' GET /healthz in the background, taking
+  down servers out of the rotation and putting them back once they recover.
+
+TranslateVideoClient and AsyncTranslateVideoClient route every call they make
+through a ShardRouter.
+"""
+
+from bisect import bisect
+from typing import Iterable, List, Optional, Sequence
+
+import hashlib
+import logging
+import random
+import threading
+import time
+
+import requests
+
+from . import resilience
+
+logger = logging.getLogger(__name__)
+
+# Path of the servers' health check API
+HEALTH_PATH = "/healthz"
+
+
+def _hash(key: str) -> int:
+    """Position of the key on the ring"""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class Endpoint:
+    """A server the calls can be routed to.
+
+    Attributes:
+        url: str -> Base URL of the server.
+        latency_seconds: Optional[float] -> Moving average of its health checks'
+        latency, None until it was first checked.
+        in_flight: int -> Number of calls currently sent to it.
+        down_until: float -> Time (of time.monotonic()) until which it's assumed
+        to be down, 0 when it's up.
+    """
+
+    def __init__(self, url: str) -> None:
+        self.url = url.rstrip("/")
+        self.latency_seconds: Optional[float] = None
+        self.in_flight = 0
+        self.down_until = 0.0
+
+    def __repr__(self) -> str:
+        return f"Endpoint({self.url!r})"
+
+    def is_up(self, now: float) -> bool:
+        """Whether the server is assumed to be up"""
+        return now >= self.down_until
+
+    @property
+    def load(self) -> float:
+        """Expected time to get a response, the lower the better"""
+        return (self.latency_seconds or 0.0) * (self.in_flight + 1)
+
+
+class ShardRouter:  # pylint: disable=too-many-instance-attributes
+    """Routes the calls across the servers. Thread-safe, so it can be shared by a client.
+
+    Attributes:
+        endpoints: List[Endpoint] -> The servers, in the order they were given.
+        virtual_nodes: int -> Number of points every server gets on the ring, so
+        that the jobs are spread evenly across them. (default 160).
+        down_seconds: float -> Seconds a server that failed a call (or a health
+        check) is kept out of the rotation for, unless a health check finds it up
+        again sooner. (default 30).
+        latency_smoothing: float -> Weight of the latest health check in the moving
+        average of a server's latency. (default 0.3).
+        rng: random.Random -> Source of the random picks of the calls that aren't
+        about a job, e.g. a seeded one. (default: an unseeded one).
+    """
+
+    def __init__(
+        self,
+        base_urls: Sequence[str],
+        virtual_nodes: int = 160,
+        down_seconds: float = 30,
+        latency_smoothing: float = 0.3,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        # pylint: disable=too-many-arguments
+
+        if not base_urls:
+            raise ValueError("At least one base URL is needed")
+
+        self.endpoints: List[Endpoint] = [Endpoint(url) for url in base_urls]
+        self.virtual_nodes = virtual_nodes
+        self.down_seconds = down_seconds
+        self.latency_smoothing = latency_smoothing
+        self.rng = rng or random.Random()
+        self._lock = threading.Lock()
+
+        # Every server's virtual nodes, sorted by their position on the ring
+        points = sorted(
+            (_hash(f"{endpoint.url}#{i}"), index)
+            for index, endpoint in enumerate(self.endpoints)
+            for i in range(virtual_nodes)
+        )
+        self._ring_positions = [position for position, _ in points]
+        self._ring_endpoints = [index for _, index in points]
+
+    def shard_of(self, key: str) -> Endpoint:
+        """Returns the server the key belongs to when every server is up"""
+        return self._successors(key)[0]
+
+    def _successors(self, key: str) -> List[Endpoint]:
+        """Returns every server, in the order they're met walking the ring
+        clockwise from the key's position
+        """
+        successors: List[Endpoint] = []
+        start = bisect(self._ring_positions, _hash(key))
+        for offset in range(len(self._ring_endpoints)):
+            index = self._ring_endpoints[(start + offset) % len(self._ring_endpoints)]
+            if self.endpoints[index] not in successors:
+                successors.append(self.endpoints[index])
+                if len(successors) == len(self.endpoints):
+                    break
+
+        return successors
+
+    def route(self, key: Optional[str] = None, exclude: Iterable[Endpoint] = ()) -> List[Endpoint]:
+        """Returns the servers to send the call to, the first one first and the
+        others to fail over to, in order. The servers that are down come last
+        (as a last resort), and the excluded ones (e.g. that were already tried) not at all.
+
+        Calls about a job (`key` being its job_id) go to the job's shard, or if it's
+        down to the next server on the ring that's up. Other calls go to the
+        least loaded of two servers picked at random (the power of two choices).
+        """
+        now = time.monotonic()
+        excluded = set(exclude)
+        with self._lock:
+            if key is not None:
+                candidates = [e for e in self._successors(key) if e not in excluded]
+            else:
+                candidates = [e for e in self.endpoints if e not in excluded]
+                self.rng.shuffle(candidates)
+                if len(candidates) > 1 and candidates[1].is_up(now) and (
+                    not candidates[0].is_up(now) or candidates[1].load < candidates[0].load
+                ):
+                    candidates[0], candidates[1] = candidates[1], candidates[0]
+
+            return [e for e in candidates if e.is_up(now)] + [
+                e for e in candidates if not e.is_up(now)
+            ]
+
+    def started(self, endpoint: Endpoint) -> None:
+        """Records that a call was sent to the server"""
+        with self._lock:
+            endpoint.in_flight += 1
+
+    def finished(self, endpoint: Endpoint, failed_to_connect: bool = False) -> None:
+        """Records that a call to the server finished, taking the server out of
+        the rotation if it couldn't be reached
+        """
+        with self._lock:
+            endpoint.in_flight -= 1
+        if failed_to_connect:
+            self.mark_down(endpoint)
+
+    def mark_down(self, endpoint: Endpoint) -> None:
+        """Takes the server out of the rotation for `down_seconds`"""
+        with self._lock:
+            was_up = endpoint.is_up(time.monotonic())
+            endpoint.down_until = time.monotonic() + self.down_seconds
+        if was_up:
+            logger.warning("%s is down, failing over from it", endpoint.url)
+
+    def mark_up(self, endpoint: Endpoint, latency_seconds: float) -> None:
+        """Puts the server (back) into the rotation, averaging in the latency of
+        the health check that found it up
+        """
+        with self._lock:
+            was_up = endpoint.is_up(time.monotonic())
+            endpoint.down_until = 0.0
+            if endpoint.latency_seconds is None:
+                endpoint.latency_seconds = latency_seconds
+            else:
+                endpoint.latency_seconds += self.latency_smoothing * (
+                    latency_seconds - endpoint.latency_seconds
+                )
+        if not was_up:
+            logger.info("%s is up again", endpoint.url)
+
+
+class RoutedCall:
+    """Follows a single attempt of a call across the servers it's routed to: a
+    server the call can't connect to is taken out of the rotation, and the call
+    fails over to the next one right away, until every server was tried.
+
+    Attributes:
+        router: ShardRouter -> Router picking the servers.
+        key: Optional[str] -> Shard key of the call, e.g. the job_id it's about.
+        description: str -> Description of the call (e.g. "GET /status/JOB_001"), for the logs.
+    """
+
+    def __init__(self, router: ShardRouter, key: Optional[str], description: str) -> None:
+        self.router = router
+        self.key = key
+        self.description = description
+        self._unreachable: List[Endpoint] = []
+        self._can_fail_over = False
+
+    def start(self) -> Endpoint:
+        """Picks the server to send the call to, and records it's sent there"""
+        endpoints = self.router.route(self.key, exclude=self._unreachable)
+        self._can_fail_over = len(endpoints) > 1
+        endpoint = endpoints[0] if endpoints else self.router.route(self.key)[0]
+        self.router.started(endpoint)
+        return endpoint
+
+    def succeeded(self, endpoint: Endpoint) -> None:
+        """Records that the server answered the call"""
+        self.router.finished(endpoint)
+
+    def fail_over(self, endpoint: Endpoint, exception: Exception) -> bool:
+        """Records that sending the call to the server raised the exception.
+        Returns whether the call is to be sent again, to the next server.
+        """
+        failed_to_connect = resilience.failed_to_connect(exception)
+        self.router.finished(endpoint, failed_to_connect=failed_to_connect)
+        if not failed_to_connect or not self._can_fail_over:
+            return False
+
+        logger.warning("%s couldn't reach %s, failing over", self.description, endpoint.url)
+        self._unreachable.append(endpoint)
+        return True
+
+
+class HealthChecker:
+    """Checks the health of the router's servers, every `interval_seconds`, on a
+    background thread, until it's stopped. A server that doesn't answer its
+    GET /healthz with a 200 within `timeout_seconds` is marked down.
+
+    Attributes:
+        router: ShardRouter -> Router whose servers are checked.
+        session: requests.Session -> Session the health checks are sent through.
+        interval_seconds: float -> Seconds in between two rounds of checks. (default 5).
+        timeout_seconds: float -> Seconds a health check may take. (default 2).
+    """
+
+    def __init__(
+        self,
+        router: ShardRouter,
+        session: requests.Session,
+        interval_seconds: float = 5,
+        timeout_seconds: float = 2,
+    ) -> None:
+        self.router = router
+        self.session = session
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="health-checker", daemon=True)
+
+    def start(self) -> None:
+        """Starts checking the servers"""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops checking the servers, waiting for the current round to finish"""
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def check(self, endpoint: Endpoint) -> bool:
+        """Checks the server once, marking it up or down. Returns whether it's up"""
+        started_at = time.perf_counter()
+        try:
+            response = self.session.get(
+                endpoint.url + HEALTH_PATH, timeout=self.timeout_seconds
+            )
+            is_up = response.status_code == 200
+        except requests.RequestException:
+            is_up = False
+
+        if is_up:
+            self.router.mark_up(endpoint, time.perf_counter() - started_at)
+        else:
+            self.router.mark_down(endpoint)
+
+        return is_up
+
+    def _run(self) -> None:
+        """Checks every server, then waits for the next round"""
+        while not self._stopped.is_set():
+            for endpoint in self.router.endpoints:
+                self.check(endpoint)
+            self._stopped.wait(self.interval_seconds)
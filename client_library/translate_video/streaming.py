@@ -0,0 +1,102 @@
+"""Async iterator API over the GET /status:stream API, which pushes the status
+transitions of many jobs over a single Server-Sent Events connection.
+"""
+
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterable, Literal, Optional
+
+import json
+import logging
+
+import httpx
+
+from . import api, errors
+
+logger = logging.getLogger(__name__)
+
+# Seconds allowed for connecting to the server. Reads never time out, as
+# the stream stays open for as long as any of the jobs is "pending".
+_CONNECT_TIMEOUT_SECONDS = 10
+
+
+@dataclass
+class JobStatusEvent:
+    """DTO with attributes describing the (new) status of a job.
+
+    `result` is None (and `detail` holds the reason) when the job's
+    status couldn't be determined, e.g. because it was never submitted.
+    """
+
+    job_id: str
+    result: Optional[Literal["completed", "error", "pending"]]
+    detail: Optional[str] = None
+
+
+async def _iter_server_sent_events(
+    lines: AsyncIterator[str],
+) -> AsyncIterator[tuple[str, str]]:
+    """Parses a text/event-stream into (event, data) tuples, skipping comments"""
+    event, data = "message", []
+    async for line in lines:
+        if not line:
+            if data:
+                yield event, "\n".join(data)
+            event, data = "message", []
+        elif line.startswith(":"):
+            continue
+        else:
+            field, _, value = line.partition(":")
+            value = value.removeprefix(" ")
+            if field == "event":
+                event = value
+            elif field == "data":
+                data.append(value)
+
+
+async def stream_statuses(
+    job_ids: Iterable[str],
+    client: Optional[httpx.AsyncClient] = None,
+    base_url: Optional[str] = None,
+) -> AsyncIterator[JobStatusEvent]:
+    """Yields the current status of every given job, followed by an event for
+    each of their status transitions, until all of them have completed
+    (successfully or not).
+
+    Args:
+        job_ids: IDs of the (submitted) jobs to watch.
+        client: Optional httpx.AsyncClient to reuse, configured with the server's
+        base URL. A short-lived one is used otherwise.
+        base_url: URL of the server to stream from, instead of the client's base URL.
+
+    Usage:
+        >>> async for event in stream_statuses(["JOB_001", "JOB_002"]):
+        ...     print(event.job_id, event.result)
+    """
+    job_ids = list(job_ids)
+
+    if client is None:
+        async with httpx.AsyncClient(base_url=api.DEFAULT_BASE_URL) as own_client:
+            async for event in stream_statuses(job_ids, own_client, base_url):
+                yield event
+        return
+
+    params = [("job_id", job_id) for job_id in job_ids]
+    timeout = httpx.Timeout(_CONNECT_TIMEOUT_SECONDS, read=None)
+
+    async with client.stream(
+        "GET", (base_url or "") + api.STATUS_STREAM_PATH, params=params, timeout=timeout
+    ) as response:
+        if response.status_code != 200:
+            await response.aread()
+            message = f"Failed to stream the status of the jobs {job_ids}. Try again later"
+            logger.error(message)
+            raise errors.GetJobInfoError(message)
+
+        async for event, data in _iter_server_sent_events(response.aiter_lines()):
+            payload = json.loads(data)
+            if event == "status":
+                yield JobStatusEvent(job_id=payload["job_id"], result=payload["result"])
+            elif event == "error":
+                yield JobStatusEvent(
+                    job_id=payload["job_id"], result=None, detail=payload["detail"]
+                )
@@ -1,18 +1,269 @@
 """Methods exposed by the Client Library"""
 
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Sequence, TypeVar
 
+import hashlib
 import logging
-import time
+import os
+import threading
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from . import api, utils
+from . import (
+    api, caching, downloads, errors, observers, polling, resilience, sharding, utils
+)
+from .clock import SYSTEM_CLOCK, Clock
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
 
-class TranslateVideo:
+# Number of jobs sent per /submit:batch or /status:batch request (the server accepts up to 1000)
+_BATCH_CHUNK_SIZE = 500
+
+# Seconds a request may take on top of the time the server holds a long-poll open
+_REQUEST_TIMEOUT_SECONDS = 10
+
+# Size of the chunks the source videos are uploaded in (a multiple of 1 MiB),
+# unless the caller asks for another one
+_UPLOAD_CHUNK_SIZE = 8 * 2**20
+
+# Size of the byte ranges the outputs are downloaded in, unless the caller asks
+# for another one, and of the blocks they're written to disk in
+_DOWNLOAD_SEGMENT_SIZE = 8 * 2**20
+_DOWNLOAD_BLOCK_SIZE = 2**20
+
+
+class TranslateVideoClient:
+    """A pooled HTTP session shared by any number of TranslateVideo instances.
+
+    Requests reuse keep-alive connections from the session's pool instead of
+    opening (and tearing down) a TCP connection per call. The client is thread-safe
+    for the way TranslateVideo uses it, so it can be shared across threads.
+
+    Attributes:
+        base_url: str -> URL of the server. (default "http://127.0.0.1:8000").
+
+        base_urls: Sequence[str] -> URLs of several servers to shard the jobs across,
+        instead of `base_url`. Every call about a job goes to the job's server (by
+        consistent hashing of its job_id), failing over to the next one while it's
+        down. Other calls go to the least loaded server. (default None).
+
+        health_check_interval_seconds: float -> Seconds in between the health checks
+        of the servers (GET /healthz), with several base URLs. 0 disables them, in
+        which case servers are only taken out of the rotation when they can't be
+        reached. (default 5).
+
+        pool_maxsize: int -> Maximum number of connections kept open to the server,
+        i.e. the number of threads that can make requests concurrently without
+        opening throwaway connections. (default 10).
+
+        keep_alive: bool -> Whether connections are reused across requests. (default True).
+
+        conditional_requests: bool -> Whether GET requests send the ETag of the latest
+        response to the same path (If-None-Match), so that the server can answer a
+        body-less 304 when nothing changed. 304s are handed back as the 200 they stand
+        for, with the remembered body. (default True).
+
+        request_timeout_seconds: float -> Seconds a request may take (on top of the time
+        the server holds a long-poll open). (default 10).
+
+        retry_policy: RetryPolicy -> Policy retrying the failed requests, when it's safe.
+        (default RetryPolicy(): up to 3 attempts, with exponential backoff).
+
+        rate_limiter: TokenBucket -> Rate limiter every request (and retry) goes
+        through. (default None: no limit).
+
+        circuit_breaker: CircuitBreaker -> Circuit breaker failing the requests fast
+        while the server keeps failing. (default None: requests are always sent).
+
+        clock: Clock -> Clock the client, and the jobs going through it, read the time
+        from and wait on, e.g. a VirtualClock in simulations. (default: the system's).
+
+    Usage:
+        >>> with TranslateVideoClient(pool_maxsize=32) as client:
+        ...     job = TranslateVideo("JOB_001", client=client)
+        ...     job.submit()
+        ...     job.get_status()
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        base_url: str = api.DEFAULT_BASE_URL,
+        base_urls: Optional[Sequence[str]] = None,
+        health_check_interval_seconds: float = 5,
+        pool_maxsize: int = 10,
+        keep_alive: bool = True,
+        conditional_requests: bool = True,
+        request_timeout_seconds: float = _REQUEST_TIMEOUT_SECONDS,
+        retry_policy: Optional[resilience.RetryPolicy] = None,
+        rate_limiter: Optional[resilience.TokenBucket] = None,
+        circuit_breaker: Optional[resilience.CircuitBreaker] = None,
+        clock: Clock = SYSTEM_CLOCK,
+    ) -> None:
+        # pylint: disable=too-many-arguments
+
+        self.clock = clock
+        self.router = sharding.ShardRouter(base_urls or [base_url])
+        self.base_url = self.router.endpoints[0].url
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.conditional_requests = conditional_requests
+        self.request_timeout_seconds = request_timeout_seconds
+        self.retry_policy = retry_policy or resilience.RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self._response_cache = caching.ConditionalRequestCache()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=len(self.router.endpoints), pool_maxsize=pool_maxsize
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+
+        self.health_checker: Optional[sharding.HealthChecker] = None
+        if len(self.router.endpoints) > 1 and health_check_interval_seconds > 0:
+            self.health_checker = sharding.HealthChecker(
+                self.router, self.session, interval_seconds=health_check_interval_seconds
+            )
+            self.health_checker.start()
+
+    def __enter__(self) -> "TranslateVideoClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stops the health checks, and closes every connection in the pool"""
+        if self.health_checker:
+            self.health_checker.stop()
+        self.session.close()
+
+    def _send(
+        self,
+        method: str,
+        send: Callable[..., requests.Response],
+        path: str,
+        shard_key: Optional[str] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """Sends the request through `send` (the session's get or post), to the
+        server the router picks for the shard key (see ShardRouter.route), as per
+        the rate limiter, the circuit breaker and the retry policy. Returns the
+        last response, or raises the last error, once the request can't be retried.
+
+        A request that couldn't reach its server fails over to the next server
+        right away, without counting as an attempt, until every server was tried.
+        """
+        attempts = resilience.CallAttempts(
+            method, path, self.retry_policy, self.circuit_breaker
+        )
+        while True:
+            attempts.start()
+            try:
+                response = self._send_attempt(method, send, path, shard_key, **kwargs)
+            except requests.RequestException as e:
+                seconds = attempts.retry_after_exception(e)
+                if seconds is None:
+                    raise
+            else:
+                seconds = attempts.retry_after_response(response)
+                if seconds is None:
+                    return response
+
+            self.clock.sleep(seconds)
+
+    def _send_attempt(
+        self,
+        method: str,
+        send: Callable[..., requests.Response],
+        path: str,
+        shard_key: Optional[str],
+        **kwargs,
+    ) -> requests.Response:
+        """Sends a single attempt of the request, failing over to the next server
+        while the one it's sent to can't be reached
+        """
+        call = sharding.RoutedCall(self.router, shard_key, f"{method} {path}")
+        while True:
+            if self.rate_limiter:
+                self.clock.sleep(self.rate_limiter.reserve())
+
+            endpoint = call.start()
+            try:
+                response = send(url=endpoint.url + path, **kwargs)
+            except requests.RequestException as e:
+                if not call.fail_over(endpoint, e):
+                    raise
+            else:
+                call.succeeded(endpoint)
+                return response
+
+    def get(self, path: str, conditional: Optional[bool] = None, **kwargs) -> requests.Response:
+        """Sends a (conditional, see `conditional_requests`) GET request to the
+        given path of the server. `conditional` overrides `conditional_requests`,
+        e.g. for responses too large to be remembered.
+        """
+        if not (self.conditional_requests if conditional is None else conditional):
+            return self._send("GET", self.session.get, path, **kwargs)
+
+        cached = self._response_cache.make_conditional(path, kwargs)
+        response = self._send("GET", self.session.get, path, **kwargs)
+        cached = self._response_cache.stand_in_for(path, response, cached)
+        if cached:
+            # Standing in for the 200 the server would've answered with
+            response.status_code = 200
+            response._content = cached.content  # pylint: disable=protected-access
+            if cached.content_type:
+                response.headers.setdefault("Content-Type", cached.content_type)
+
+        return response
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        """Sends a POST request to the given path of the server"""
+        return self._send("POST", self.session.post, path, **kwargs)
+
+    def put(self, path: str, **kwargs) -> requests.Response:
+        """Sends a PUT request to the given path of the server"""
+        return self._send("PUT", self.session.put, path, **kwargs)
+
+    def head(self, path: str, **kwargs) -> requests.Response:
+        """Sends a HEAD request to the given path of the server"""
+        return self._send("HEAD", self.session.head, path, **kwargs)
+
+    def group_by_shard(self, items: Iterable[T], key: Callable[[T], str]) -> List[List[T]]:
+        """Groups the items by the server the calls about them (by their shard
+        `key`, e.g. job_id) are routed to, so that each group can be sent in
+        batches to its own server. The items keep their order within a group.
+        """
+        groups: Dict[str, List[T]] = {}
+        for item in items:
+            groups.setdefault(self.router.route(key(item))[0].url, []).append(item)
+
+        return list(groups.values())
+
+
+_DEFAULT_CLIENT: Optional[TranslateVideoClient] = None
+
+
+def _get_default_client() -> TranslateVideoClient:
+    """Returns the client shared by the instances that weren't given one"""
+    global _DEFAULT_CLIENT  # pylint: disable=global-statement
+    if _DEFAULT_CLIENT is None:
+        _DEFAULT_CLIENT = TranslateVideoClient()
+
+    return _DEFAULT_CLIENT
+
+
+class TranslateVideo:  # pylint: disable=too-many-instance-attributes
     """A class representing a video translation job.
 
     This class provides functionality for submitting a video translation
@@ -33,14 +284,41 @@ class TranslateVideo:
         before returning the status of the job, when the status is "pending".
         (default 3600).
 
+        long_poll_seconds: int -> Value indicating how long (in seconds) the server may
+        hold each GET /status request open while the job is "pending". A value of 0
+        disables long-polling. (default 30).
+
+        polling_strategy: PollingStrategy -> Strategy deciding how long to wait in between
+        successive calls to the GET /status API. (default FixedInterval(polling_interval_seconds)).
+
+        honour_server_hints: bool -> Whether to wait at least as long as the server's
+        Retry-After header asks to (when present), whatever the polling strategy decides.
+        (default True).
+
+        client: TranslateVideoClient -> Client whose connection pool (and base URL, and
+        clock) is used for the API calls. (default: a client shared by the whole process).
+
+        upload_id: str -> ID of the upload session of the job's source video, once
+        upload() has started one. Set it to resume an upload started elsewhere.
+        (default None).
+
+        observers: List[Observer] -> Observers notified of every poll, status change,
+        timeout and failed call to the GET /status API (see observers.py), e.g. a
+        ConsoleObserver to display the progress. Passed to the constructor as
+        `job_observers`. (default: none, nothing is displayed).
+
     Public Methods:
         display_attributes: Prettily displays the attributes of the class object.
         get_status: Returns the status of the job by calling the GET /status API.
         submit: Submits a video translation job by calling the /submit API.
+        upload: Uploads the job's source video in chunks, then submits the job.
+        download: Downloads the job's output in parallel byte ranges.
+        submit_many: Submits many jobs through as few calls to the /submit:batch API as possible.
+        get_statuses: Returns the status of many jobs through the /status:batch API.
 
 
     Usage:
-        >>> job = TranslateVideo("JOB_001")
+        >>> job = TranslateVideo("JOB_001", job_observers=[ConsoleObserver()])
         >>> job.display_attributes() # Prettily prints the attributes of the object with its values.
         >>> job.submit() # Submits the job for processing.
         >>> job.get_status()
@@ -53,54 +331,403 @@ class TranslateVideo:
         delay_seconds: int = 20,
         polling_interval_seconds: int = 5,
         timeout_seconds: int = 3600,
+        long_poll_seconds: int = 30,
+        polling_strategy: Optional[polling.PollingStrategy] = None,
+        honour_server_hints: bool = True,
+        client: Optional[TranslateVideoClient] = None,
+        job_observers: Iterable[observers.Observer] = (),
     ) -> None:
+        # pylint: disable=too-many-arguments
 
         self.job_id = job_id
         self.delay_seconds = delay_seconds
         self.polling_interval_seconds = polling_interval_seconds
         self.timeout_seconds = timeout_seconds
+        self.long_poll_seconds = long_poll_seconds
+        self.polling_strategy = polling_strategy or polling.FixedInterval(
+            polling_interval_seconds
+        )
+        self.honour_server_hints = honour_server_hints
+        self.observers = list(job_observers)
+        self.client = client or _get_default_client()
+        self.upload_id: Optional[str] = None
 
     def display_attributes(self) -> None:
         """Prettily displays the attributes of the class instance"""
         utils.display_object_attributes(self)
 
     def get_status(self) -> Dict[str, str]:
-        """Gets the job's status by calling the GET /status API repeatedly
-        after every `polling_interval_seconds` seconds, as long as the elapsed
-        time is within the `timeout_seconds` seconds.
+        """Gets the job's status by calling the GET /status API repeatedly,
+        as long as the elapsed time is within the `timeout_seconds` seconds.
+
+        Each call long-polls the server for up to `long_poll_seconds` seconds,
+        so a single request usually covers the job's whole processing time.
+        Successive calls are spaced as per the `polling_strategy`, and never
+        sooner than the server's Retry-After hint allows.
         """
         valid_statuses_to_exit = {"completed", "error"}
-        start_time = time.time()
-        url = api.STATUS_URL + f"/{self.job_id}"
+        clock = self.client.clock
+        start_time = clock.time()
+        path = api.STATUS_PATH + f"/{self.job_id}"
 
-        response = requests.get(url=url, timeout=10)
-        utils.handle_status_api_errors(response, self.job_id, logger)
-
-        job_status = utils.check_status_and_display(
-            response=response, start_time=start_time, job_id=self.job_id
-        )
+        self.polling_strategy.reset()
+        requested_at = clock.time()
+        job_status = self._poll_status(path=path, start_time=start_time)
+        utils.record_poll(self, job_status, previous_result=None)
 
         while (
             job_status.result not in valid_statuses_to_exit
             and job_status.elapsed_time < self.timeout_seconds
         ):
 
-            time.sleep(self.polling_interval_seconds)
-            response = requests.get(url=url, timeout=10)
-            utils.handle_status_api_errors(response, self.job_id, logger)
-
-            job_status = utils.check_status_and_display(
-                response=response, start_time=start_time, job_id=self.job_id
+            clock.sleep(
+                utils.seconds_until_next_poll(self, job_status, requested_at, clock.time())
             )
 
+            requested_at = clock.time()
+            previous_result = job_status.result
+            job_status = self._poll_status(path=path, start_time=start_time)
+            utils.record_poll(self, job_status, previous_result)
+
+        if job_status.result not in valid_statuses_to_exit:
+            utils.notify_timeout(self, job_status)
+
+        logger.debug(
+            "Polled the status of %s %d times, saving %d requests",
+            self.job_id,
+            self.polling_strategy.polls,
+            self.polling_strategy.requests_saved,
+        )
         return {"result": job_status.result}
 
+    def _poll_status(
+        self, path: str, start_time: float
+    ) -> utils.JobResultAndElapsedTime:
+        """Makes a single (long-polling) call to the GET /status API"""
+        clock = self.client.clock
+        remaining_seconds = self.timeout_seconds - (clock.time() - start_time)
+        wait_seconds = max(0, min(self.long_poll_seconds, int(remaining_seconds)))
+        params = {"wait": wait_seconds} if wait_seconds else None
+
+        attempt = self.polling_strategy.polls + 1
+        requested_at = clock.monotonic()
+        response = self.client.get(
+            path,
+            shard_key=self.job_id,
+            params=params,
+            timeout=wait_seconds + self.client.request_timeout_seconds,
+        )
+        request_seconds = clock.monotonic() - requested_at
+
+        return utils.read_polled_status(
+            self,
+            response,
+            attempt=attempt,
+            request_seconds=request_seconds,
+            start_time=start_time,
+            now=clock.time(),
+            logger=logger,
+        )
+
     def submit(self) -> None:
         """Submits the job by calling the POST /submit API"""
         params = {"delay_seconds": self.delay_seconds}
-        url = api.SUBMIT_URL + f"/{self.job_id}"
+        path = api.SUBMIT_PATH + f"/{self.job_id}"
 
-        response = requests.post(url=url, params=params, timeout=10)
+        response = self.client.post(
+            path,
+            shard_key=self.job_id,
+            params=params,
+            timeout=self.client.request_timeout_seconds,
+        )
         if response.status_code != 201:
             message = response.json()["detail"]
             logger.error(message)
+
+    def upload(
+        self,
+        file: BinaryIO,
+        chunk_size: int = _UPLOAD_CHUNK_SIZE,
+        concurrency: int = 4,
+    ) -> None:
+        """Uploads the job's source video from the file (opened in binary mode),
+        `concurrency` chunks at a time, and submits the job once every chunk is in.
+
+        Chunks are read from the file as they're sent, so at most `concurrency`
+        chunks are held in memory, and each one is sent with its SHA-256 digest.
+        A failed upload can be resumed by calling upload() again: only the chunks
+        the server hasn't received are sent.
+
+        Raises: UploadError if the upload fails, in which case `upload_id` is kept
+        for it to be resumed. SubmitJobError if the job can't be submitted.
+        """
+        size = os.fstat(file.fileno()).st_size
+        session = self._get_upload_session() if self.upload_id else None
+        if session is None:
+            session = self._create_upload_session(size, chunk_size)
+        if session["completed"]:
+            return
+        if session["size"] != size:
+            raise errors.UploadError(
+                f"The upload {self.upload_id} is of {session['size']} bytes, not {size}"
+            )
+
+        received_chunks = set(session["received_chunks"])
+        missing_chunks = [i for i in range(session["chunks"]) if i not in received_chunks]
+        file_lock = threading.Lock()
+
+        def upload_chunk(index: int) -> None:
+            offset = index * session["chunk_size"]
+            with file_lock:
+                file.seek(offset)
+                data = file.read(session["chunk_size"])
+            response = self.client.put(
+                api.UPLOADS_PATH + f"/{self.upload_id}/chunks/{index}",
+                shard_key=self.job_id,
+                data=data,
+                headers={"X-Chunk-SHA256": hashlib.sha256(data).hexdigest()},
+                timeout=self.client.request_timeout_seconds,
+            )
+            if response.status_code != 200:
+                raise errors.UploadError(
+                    f"Failed to upload the chunk {index} of {self.job_id}'s video: "
+                    f"{response.json()['detail']}"
+                )
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(upload_chunk, index) for index in missing_chunks]
+            failures = [future.exception() for future in futures if future.exception()]
+        if failures:
+            logger.error("Failed to upload %d chunks of %s's video", len(failures), self.job_id)
+            if isinstance(failures[0], errors.UploadError):
+                raise failures[0]
+            raise errors.UploadError(f"Failed to upload {self.job_id}'s video") from failures[0]
+
+        response = self.client.post(
+            api.UPLOADS_PATH + f"/{self.upload_id}:complete",
+            shard_key=self.job_id,
+            timeout=self.client.request_timeout_seconds,
+        )
+        if response.status_code != 201:
+            raise errors.SubmitJobError(response.json()["detail"])
+
+    def _get_upload_session(self) -> Optional[dict]:
+        """Returns the state of the job's upload session, or None if the server
+        doesn't know of it (any longer)
+        """
+        response = self.client.get(
+            api.UPLOADS_PATH + f"/{self.upload_id}",
+            shard_key=self.job_id,
+            timeout=self.client.request_timeout_seconds,
+        )
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise errors.UploadError(
+                f"Failed to get the upload {self.upload_id}: {response.json()['detail']}"
+            )
+
+        return response.json()
+
+    def _create_upload_session(self, size: int, chunk_size: int) -> dict:
+        """Starts an upload session of the job's source video. Returns its state"""
+        response = self.client.post(
+            api.SUBMIT_PATH + f"/{self.job_id}/uploads",
+            shard_key=self.job_id,
+            json={
+                "size": size,
+                "chunk_size": chunk_size,
+                "delay_seconds": self.delay_seconds,
+            },
+            timeout=self.client.request_timeout_seconds,
+        )
+        if response.status_code != 201:
+            raise errors.UploadError(
+                f"Failed to start uploading {self.job_id}'s video: {response.json()['detail']}"
+            )
+
+        session = response.json()
+        self.upload_id = session["upload_id"]
+        return session
+
+    def download(
+        self,
+        path: str,
+        concurrency: int = 4,
+        segment_size: int = _DOWNLOAD_SEGMENT_SIZE,
+    ) -> None:
+        """Downloads the output of the (completed) job to the path, fetching
+        `segment_size` byte ranges of it, `concurrency` at a time, and streaming
+        each one to its place in the file.
+
+        The file is written to "<path>.part" until it's whole, the downloaded
+        segments being recorded in "<path>.part.json". A failed download can be
+        resumed by calling download() again: only the missing segments are
+        fetched, as long as the output hasn't changed in the meantime.
+
+        Raises: DownloadError if the download fails.
+        """
+        result_path = api.RESULT_PATH + f"/{self.job_id}"
+        response = self.client.head(
+            result_path, shard_key=self.job_id, timeout=self.client.request_timeout_seconds
+        )
+        if response.status_code != 200:
+            raise errors.DownloadError(
+                f"Failed to download {self.job_id}'s output (HTTP {response.status_code})"
+            )
+
+        size = int(response.headers["Content-Length"])
+        etag = response.headers.get("ETag")
+        if response.headers.get("Accept-Ranges") != "bytes" or not etag:
+            segment_size = max(size, 1)  # A single request, that can't be resumed
+
+        progress = downloads.DownloadProgress.load_or_create(path, size, segment_size, etag)
+        missing_segments = [
+            i for i in range(progress.segments) if i not in progress.downloaded_segments
+        ]
+
+        def download_segment(index: int) -> None:
+            first = index * segment_size
+            last = min(first + segment_size, size) - 1
+            headers = {"Range": f"bytes={first}-{last}"}
+            if etag:
+                headers["If-Range"] = etag
+
+            with self.client.get(
+                result_path,
+                shard_key=self.job_id,
+                conditional=False,
+                headers=headers,
+                stream=True,
+                timeout=self.client.request_timeout_seconds,
+            ) as response:
+                if response.status_code == 200 and (first, last) != (0, size - 1):
+                    progress.discard()
+                    raise errors.DownloadError(
+                        f"{self.job_id}'s output changed while downloading it"
+                    )
+                if response.status_code not in (200, 206):
+                    raise errors.DownloadError(
+                        f"Failed to download bytes {first}-{last} of {self.job_id}'s "
+                        f"output (HTTP {response.status_code})"
+                    )
+
+                with open(progress.part_path, "r+b") as file:
+                    file.seek(first)
+                    for block in response.iter_content(_DOWNLOAD_BLOCK_SIZE):
+                        file.write(block)
+                    if file.tell() != last + 1:
+                        raise errors.DownloadError(
+                            f"Got {file.tell() - first} of the bytes {first}-{last} "
+                            f"of {self.job_id}'s output"
+                        )
+
+            progress.record(index)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(download_segment, index) for index in missing_segments]
+            failures = [future.exception() for future in futures if future.exception()]
+        if failures:
+            logger.error(
+                "Failed to download %d segments of %s's output", len(failures), self.job_id
+            )
+            if isinstance(failures[0], errors.DownloadError):
+                raise failures[0]
+            raise errors.DownloadError(
+                f"Failed to download {self.job_id}'s output"
+            ) from failures[0]
+
+        progress.finish()
+
+    @classmethod
+    def submit_many(
+        cls,
+        jobs: Iterable["TranslateVideo"],
+        chunk_size: int = _BATCH_CHUNK_SIZE,
+        client: Optional[TranslateVideoClient] = None,
+    ) -> Dict[str, bool]:
+        """Submits the jobs by calling the POST /submit:batch API once
+        for every `chunk_size` jobs (of the same shard), through the given (or
+        shared) client.
+
+        Returns: Whether each job (by its job_id) has been submitted successfully.
+        """
+        client = client or _get_default_client()
+        submitted_by_job_id = {}
+
+        chunks = (
+            chunk
+            for shard_jobs in client.group_by_shard(jobs, key=lambda job: job.job_id)
+            for chunk in utils.chunked(shard_jobs, chunk_size)
+        )
+        for chunk in chunks:
+            payload = {
+                "jobs": [
+                    {"job_id": job.job_id, "delay_seconds": job.delay_seconds}
+                    for job in chunk
+                ]
+            }
+            response = client.post(
+                api.SUBMIT_BATCH_PATH,
+                shard_key=chunk[0].job_id,
+                json=payload,
+                timeout=client.request_timeout_seconds,
+            )
+            if response.status_code != 200:
+                logger.error(
+                    "Failed to submit %d jobs, starting with %s", len(chunk), chunk[0].job_id
+                )
+                submitted_by_job_id.update({job.job_id: False for job in chunk})
+                continue
+
+            for result in response.json()["results"]:
+                if result["status_code"] != 201:
+                    logger.error(result["detail"])
+                submitted_by_job_id[result["job_id"]] = result["status_code"] == 201
+
+        return submitted_by_job_id
+
+    @classmethod
+    def get_statuses(
+        cls,
+        job_ids: Iterable[str],
+        chunk_size: int = _BATCH_CHUNK_SIZE,
+        client: Optional[TranslateVideoClient] = None,
+    ) -> Dict[str, Optional[str]]:
+        """Gets the current status of the jobs by calling the POST /status:batch API
+        once for every `chunk_size` jobs (of the same shard), through the given (or
+        shared) client. Unlike get_status(), this doesn't poll.
+
+        Returns: The status ("completed" OR "error" OR "pending") of each job
+        (by its job_id), or None when it couldn't be fetched.
+        """
+        client = client or _get_default_client()
+        status_by_job_id = {}
+
+        chunks = (
+            chunk
+            for shard_job_ids in client.group_by_shard(job_ids, key=lambda job_id: job_id)
+            for chunk in utils.chunked(shard_job_ids, chunk_size)
+        )
+        for chunk in chunks:
+            response = client.post(
+                api.STATUS_BATCH_PATH,
+                shard_key=chunk[0],
+                json={"job_ids": chunk},
+                timeout=client.request_timeout_seconds,
+            )
+            if response.status_code != 200:
+                logger.error(
+                    "Failed to get the status of %d jobs, starting with %s. Try again later",
+                    len(chunk),
+                    chunk[0],
+                )
+                status_by_job_id.update({job_id: None for job_id in chunk})
+                continue
+
+            for result in response.json()["results"]:
+                if result["status_code"] != 200:
+                    logger.error(result["detail"])
+                status_by_job_id[result["job_id"]] = result["result"]
+
+        return status_by_job_id
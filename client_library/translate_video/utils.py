@@ -1,102 +1,90 @@
-"""Module exposing various utility methods for displaying helpful information
-regarding the progress of the video translation job on the console,
-handling errors when the API calls aren't successful, parsing the response to
-retrieve the job's status and calculating the elapsed time.
+"""Module exposing various utility methods for displaying the attributes of a
+video translation job on the console, handling errors when the API calls aren't
+successful, parsing the response to retrieve the job's status and calculating
+the elapsed time. (The progress of the polling is reported through observers.)
 """
 
 from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from logging import Logger
-from typing import Dict, Literal
+from typing import Dict, Iterable, Iterator, List, Literal, Optional, TypeVar
 
+import itertools
 import time
 
 from colorama import Fore, init
 from requests import Response
 
+from . import errors, observers, polling
+
 init(autoreset=True)
 
+T = TypeVar("T")
+
 
 @dataclass
 class JobResultAndElapsedTime:
-    """DTO with attributes holding the current status of the job along with the elapsed time"""
+    """DTO with attributes holding the current status of the job along with the elapsed time,
+    and the server's hints on when it's expected to complete (for "pending" jobs)
+    """
 
     result: Literal["completed", "error", "pending"]
     elapsed_time: float
+    remaining_seconds: Optional[float] = None
+    retry_after_seconds: Optional[float] = None
 
 
-def _display_elapsed_time(elapsed_time: float) -> None:
-    """Displays the elapsed time since initially checking the status of the job"""
-    print(
-        Fore.WHITE
-        + "Elapsed time: "
-        + Fore.LIGHTCYAN_EX
-        + str(round(elapsed_time, 2))
-        + " seconds"
-        + "\n"
-    )
-
+def get_status_and_elapsed_time(
+    response: Response, start_time: float, now: Optional[float] = None
+) -> JobResultAndElapsedTime:
+    """Returns the job status and the time elapsed from `start_time` to `now`
+    (default: the current time). Raises a GetJobInfoError if the response
+    doesn't hold a status
+    """
+    status = _jsonify_response(response)
+    if "result" not in status:
+        raise errors.GetJobInfoError(f"Unexpected response to GET /status: {status}")
 
-def _display_job_status(
-    job_id: str, job_status: Literal["completed", "error", "pending"]
-) -> None:
-    """Displays the status of the given job_id"""
-    if job_status == "completed":
-        color = Fore.GREEN
-    elif job_status == "pending":
-        color = Fore.LIGHTYELLOW_EX
-    else:
-        color = Fore.RED
+    elapsed_time = (time.time() if now is None else now) - start_time
 
-    print(
-        "\n"
-        + Fore.WHITE
-        + "Status of "
-        + Fore.LIGHTCYAN_EX
-        + job_id
-        + Fore.WHITE
-        + " : "
-        + color
-        + f" {job_status}"
+    return JobResultAndElapsedTime(
+        result=status["result"],
+        elapsed_time=elapsed_time,
+        remaining_seconds=status.get("remaining_seconds"),
+        retry_after_seconds=parse_retry_after(response),
     )
 
 
-def _display_job_status_and_elapsed_time(
-    job_id: str,
-    job_status: Literal["completed", "error", "pending"],
-    elapsed_time: float,
-) -> None:
-    """Invokes the 'private' functions that display the job status and the elapsed time"""
-    _display_job_status(job_id, job_status)
-    _display_elapsed_time(elapsed_time)
-
+def _jsonify_response(response: Response) -> Dict[str, str]:
+    """Converts the HTTP Response to JSON"""
+    return response.json()
 
-def _get_status_and_elapsed_time(
-    response: Response, start_time: float
-) -> JobResultAndElapsedTime:
-    """Returns the job status and the elapsed time"""
-    status = _jsonify_response(response)
-    elapsed_time = time.time() - start_time
 
-    return JobResultAndElapsedTime(result=status["result"], elapsed_time=elapsed_time)
+def parse_retry_after(response: Response) -> Optional[float]:
+    """Returns the seconds to wait as per the Retry-After header, if any.
+    The header holds either a number of seconds or an HTTP-date.
+    """
+    retry_after = response.headers.get("Retry-After")
+    if not isinstance(retry_after, str):
+        return None
 
+    if retry_after.strip().isdigit():
+        return float(retry_after)
 
-def _jsonify_response(response: Response) -> Dict[str, str]:
-    """Converts the HTTP Response to JSON"""
-    return response.json()
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
 
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
 
-def check_status_and_display(
-    job_id: str,
-    response: Response,
-    start_time: float,
-) -> JobResultAndElapsedTime:
-    """Gets the job's status and the elapsed time. Displays the job info"""
-    job_info = _get_status_and_elapsed_time(response, start_time)
-    _display_job_status_and_elapsed_time(
-        job_id=job_id, job_status=job_info.result, elapsed_time=job_info.elapsed_time
-    )
 
-    return job_info
+def chunked(iterable: Iterable[T], chunk_size: int) -> Iterator[List[T]]:
+    """Lazily splits the iterable into lists of (at most) chunk_size items"""
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, chunk_size)):
+        yield chunk
 
 
 def display_object_attributes(job) -> None:
@@ -124,18 +112,146 @@ def display_object_attributes(job) -> None:
         + "timeout_seconds: "
         + Fore.LIGHTCYAN_EX
         + str(job.timeout_seconds)
+    )
+    print(
+        Fore.LIGHTYELLOW_EX
+        + "long_poll_seconds: "
+        + Fore.LIGHTCYAN_EX
+        + str(job.long_poll_seconds)
         + "\n"
     )
 
 
 def handle_status_api_errors(response: Response, job_id: str, logger: Logger) -> None:
     """In case of an unsuccessful request to the
-    /status API, this method handles the errors
+    /status API, this method handles the errors by logging
+    them and raising a GetJobInfoError.
+
+    Works with both `requests` and `httpx` responses.
     """
     if response.status_code == 404:
-        logger.error(
+        message = (
             f"{job_id} could not be found.\nPlease ensure the job has been submitted "
             "by calling cls_obj.submit()"
         )
     elif response.status_code != 200:
-        logger.error(f"Failed to get the status of the job {job_id}. Try again later")
+        message = f"Failed to get the status of the job {job_id}. Try again later"
+    else:
+        return
+
+    logger.error(message)
+    raise errors.GetJobInfoError(message)
+
+
+def record_poll(
+    job, job_status: JobResultAndElapsedTime, previous_result: Optional[str]
+) -> None:
+    """Keeps count of the job's poll, and notifies its observers if the status changed"""
+    job.polling_strategy.record_poll(job_status.elapsed_time)
+
+    if job.observers and job_status.result != previous_result:
+        observers.notify(
+            job.observers,
+            "on_transition",
+            observers.TransitionEvent(
+                job_id=job.job_id,
+                attempt=job.polling_strategy.polls,
+                previous_result=previous_result,
+                result=job_status.result,
+                elapsed_seconds=job_status.elapsed_time,
+            ),
+        )
+
+
+def seconds_until_next_poll(
+    job, job_status: JobResultAndElapsedTime, requested_at: float, now: float
+) -> float:
+    """Returns the seconds the job waits before polling again, without waiting past
+    its timeout. The job's polling strategy decides, but the server's Retry-After
+    hint (if there's one, and the job's `honour_server_hints` is set) is a floor:
+    the strategy is told about it, so that a jittered one still spreads out the
+    clients that were given the same hint.
+    """
+    retry_after_seconds = (
+        job_status.retry_after_seconds if job.honour_server_hints else None
+    )
+    interval = job.polling_strategy.next_interval(
+        polling.PollContext(
+            attempt=job.polling_strategy.polls,
+            elapsed_seconds=job_status.elapsed_time,
+            delay_seconds=job.delay_seconds,
+            remaining_seconds=job_status.remaining_seconds,
+            retry_after_seconds=retry_after_seconds,
+        )
+    )
+    # Only the part of the interval that wasn't already spent
+    # waiting on the previous (long-polling) request is waited through
+    seconds = interval - (now - requested_at)
+    if retry_after_seconds is not None:
+        seconds = max(seconds, retry_after_seconds)
+
+    remaining_timeout = job.timeout_seconds - job_status.elapsed_time
+    return max(0, min(seconds, remaining_timeout))
+
+
+def read_polled_status(
+    job,
+    response: Response,
+    attempt: int,
+    request_seconds: float,
+    start_time: float,
+    now: float,
+    logger: Logger,
+) -> JobResultAndElapsedTime:
+    """Returns the job's status as per the response to its `attempt`-th poll of
+    the GET /status API, notifying its observers of the poll (or of the failed
+    call, in which case a GetJobInfoError is raised)
+    """
+    # pylint: disable=too-many-arguments
+
+    if job.observers and response.status_code != 200:
+        observers.notify(
+            job.observers,
+            "on_http_error",
+            observers.HttpErrorEvent(
+                job_id=job.job_id,
+                attempt=attempt,
+                status_code=response.status_code,
+                request_seconds=request_seconds,
+                elapsed_seconds=now - start_time,
+            ),
+        )
+    handle_status_api_errors(response, job.job_id, logger)
+
+    job_status = get_status_and_elapsed_time(
+        response=response, start_time=start_time, now=now
+    )
+    if job.observers:
+        observers.notify(
+            job.observers,
+            "on_poll",
+            observers.PollEvent(
+                job_id=job.job_id,
+                attempt=attempt,
+                result=job_status.result,
+                request_seconds=request_seconds,
+                elapsed_seconds=job_status.elapsed_time,
+                remaining_seconds=job_status.remaining_seconds,
+            ),
+        )
+
+    return job_status
+
+
+def notify_timeout(job, job_status: JobResultAndElapsedTime) -> None:
+    """Notifies the job's observers that it timed out, still pending"""
+    if job.observers:
+        observers.notify(
+            job.observers,
+            "on_timeout",
+            observers.TimeoutEvent(
+                job_id=job.job_id,
+                attempts=job.polling_strategy.polls,
+                elapsed_seconds=job_status.elapsed_time,
+            ),
+        )
@@ -0,0 +1,5 @@
+"""Allows running the server with `python -m server`"""
+
+from server.launcher import main
+
+main()
@@ -0,0 +1,170 @@
+"""Admission control of the job submissions: a cap on the number of jobs
+pending at once, and per-client token-bucket rate limits.
+
+Submissions over either limit are rejected (the API answers them with a 429 and
+a Retry-After header), so that an overloaded server sheds load rather than
+storing jobs until it falls over. The limits are enforced per server process:
+each worker has its own buckets, and its own estimate of the pending jobs.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Literal, Optional
+
+import asyncio
+import logging
+import math
+import threading
+
+from server import clock, config, database, errors
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Rejection:
+    """DTO describing why submissions weren't admitted, and when to try again"""
+
+    reason: Literal["over_capacity", "rate_limited"]
+    detail: str
+    retry_after_seconds: int
+
+
+class _TokenBucket:  # pylint: disable=too-few-public-methods
+    """Tokens refilled at `rate` per second, up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def take(self, tokens: int, now: float) -> float:
+        """Takes the tokens if there are enough of them, returning 0. Otherwise
+        returns the seconds until there will be. A request for more tokens than
+        the capacity is served from a full bucket, leaving it in debt.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+        needed = min(tokens, self.capacity)
+        if self.tokens >= needed:
+            self.tokens -= tokens
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """Decides whether submissions are admitted.
+
+    Counting the pending jobs scans the store, so it's never done while admitting
+    a submission: the count is refreshed every `refresh_seconds` in the
+    background (see run()), on a worker thread, and the submissions admitted in
+    between are added to it.
+
+    Attributes:
+        max_pending_jobs: int -> Maximum number of jobs pending at once. 0 disables the cap.
+
+        rate_per_client: float -> Jobs a client (by IP address) may submit per second,
+        on average. 0 disables the rate limits.
+
+        burst_per_client: float -> Jobs a client may submit at once, after a pause.
+
+        max_clients: int -> Number of clients whose bucket is kept. The least recently
+        seen client's bucket is dropped (i.e. refilled) beyond that.
+
+        refresh_seconds: float -> Seconds in between two counts of the pending jobs.
+
+        over_capacity_retry_after_seconds: int -> Retry-After of the submissions
+        rejected for being over capacity.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        max_pending_jobs: int = config.MAX_PENDING_JOBS,
+        rate_per_client: float = config.SUBMIT_RATE_PER_CLIENT,
+        burst_per_client: float = config.SUBMIT_BURST_PER_CLIENT,
+        max_clients: int = 10000,
+        refresh_seconds: float = 1,
+        over_capacity_retry_after_seconds: int = config.OVER_CAPACITY_RETRY_AFTER_SECONDS,
+    ) -> None:
+        # pylint: disable=too-many-arguments
+
+        self.max_pending_jobs = max_pending_jobs
+        self.rate_per_client = rate_per_client
+        self.burst_per_client = burst_per_client
+        self.max_clients = max_clients
+        self.refresh_seconds = refresh_seconds
+        self.over_capacity_retry_after_seconds = over_capacity_retry_after_seconds
+        self._buckets: OrderedDict[str, _TokenBucket] = OrderedDict()
+        self._pending_jobs = 0
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        """Counts the pending jobs (which blocks, for as long as scanning the store
+        takes), replacing the estimate admit() goes by
+        """
+        try:
+            pending_jobs = database.fake_count_jobs_by_status().get("pending", 0)
+        except errors.GetJobInfoError:
+            # Going on with the previous estimate
+            logger.exception("Failed to count the pending jobs")
+            return
+
+        with self._lock:
+            self._pending_jobs = pending_jobs
+
+    async def run(self) -> None:
+        """Refreshes the count of pending jobs every `refresh_seconds`, until
+        cancelled. Returns straight away if there's no cap on them.
+        """
+        while self.max_pending_jobs:
+            await asyncio.to_thread(self.refresh)
+            await asyncio.sleep(self.refresh_seconds)
+
+    def _bucket(self, client_id: str, now: float) -> _TokenBucket:
+        """Returns the client's bucket, creating it (full) if need be"""
+        bucket = self._buckets.get(client_id)
+        if bucket is None:
+            bucket = self._buckets[client_id] = _TokenBucket(
+                self.rate_per_client, self.burst_per_client, now
+            )
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client_id)
+
+        return bucket
+
+    def admit(self, client_id: str, jobs: int = 1) -> Optional[Rejection]:
+        """Admits the submission of `jobs` jobs by the client.
+        Returns why they can't be admitted, if so.
+        """
+        with self._lock:
+            now = clock.monotonic()
+            if self.max_pending_jobs and self._pending_jobs + jobs > self.max_pending_jobs:
+                return Rejection(
+                    reason="over_capacity",
+                    detail=f"Too many pending jobs (the limit is {self.max_pending_jobs}). "
+                    "Try again later",
+                    retry_after_seconds=self.over_capacity_retry_after_seconds,
+                )
+
+            if self.rate_per_client:
+                seconds = self._bucket(client_id, now).take(jobs, now)
+                if seconds:
+                    return Rejection(
+                        reason="rate_limited",
+                        detail=f"Too many submissions (the limit is "
+                        f"{self.rate_per_client:g} jobs per second). Try again later",
+                        retry_after_seconds=math.ceil(seconds),
+                    )
+
+            self._pending_jobs += jobs
+            return None
+
+
+# Controller of the submissions to this server process
+ADMISSION_CONTROLLER = AdmissionController()
@@ -0,0 +1,137 @@
+"""Source of the time the server reads.
+
+Everything that reads the time (the jobs' timestamps, the long-polls, the
+scheduler, the sweeper, ...) goes through `now()` and `monotonic()`, which read
+`CLOCK`: the system's clock, unless it's replaced by a VirtualClock, e.g. to
+simulate hours of traffic in seconds (see benchmarks/simulation.py).
+
+The waits are the event loop's (asyncio.sleep, timeouts), so a VirtualClock comes
+with an event loop of its own, that runs on the clock's time and moves the clock
+straight to its next timer whenever there's nothing else to do.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+import asyncio
+import selectors
+import threading
+import time
+
+
+class Clock:
+    """The system's clock"""
+
+    def now(self) -> datetime:
+        """Returns the current (local, naive) date and time"""
+        return datetime.now()
+
+    def monotonic(self) -> float:
+        """Returns the seconds elapsed since an arbitrary point in time, never going back"""
+        return time.monotonic()
+
+
+class VirtualClock(Clock):
+    """Clock whose time only moves when it's told to (advance()), or when its
+    event loop has nothing to do but wait.
+
+    Also has the time() and sleep() of the client library's clocks, so that a
+    client and a server can share it.
+
+    Attributes:
+        start: datetime -> Date and time the clock starts at. (default 2000-01-01).
+    """
+
+    def __init__(self, start: Optional[datetime] = None) -> None:
+        self.start = start or datetime(2000, 1, 1)
+        self._elapsed_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def now(self) -> datetime:
+        """Returns the start date and time, plus the seconds the clock moved forward"""
+        return self.start + timedelta(seconds=self._elapsed_seconds)
+
+    def monotonic(self) -> float:
+        """Returns the seconds the clock moved forward since it started"""
+        return self._elapsed_seconds
+
+    def time(self) -> float:
+        """Returns the seconds since the epoch"""
+        return self.now().timestamp()
+
+    def advance(self, seconds: float) -> None:
+        """Moves the clock forward"""
+        with self._lock:
+            self._elapsed_seconds += max(0.0, seconds)
+
+    def sleep(self, seconds: float) -> None:
+        """Moves the clock forward, instead of waiting"""
+        self.advance(seconds)
+
+    def new_event_loop(self) -> asyncio.AbstractEventLoop:
+        """Returns an event loop running on the clock's time"""
+        return _VirtualTimeEventLoop(self)
+
+
+class _VirtualTimeSelector:
+    """Selector moving the loop's clock forward by the timeout of a select()
+    that would block, rather than blocking. Selecting still blocks while calls
+    are running on worker threads, since their results are yet to come.
+    """
+
+    def __init__(self, selector: selectors.BaseSelector, loop: "_VirtualTimeEventLoop") -> None:
+        self._selector = selector
+        self._loop = loop
+
+    def __getattr__(self, name: str):
+        return getattr(self._selector, name)
+
+    def select(self, timeout: Optional[float] = None):
+        """Returns the ready events, moving the clock to the end of the timeout if there are none"""
+        if timeout is None or timeout <= 0 or self._loop.executor_calls:
+            return self._selector.select(timeout)
+
+        events = self._selector.select(0)
+        if not events:
+            self._loop.clock.advance(timeout)
+        return events
+
+
+class _VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """Event loop whose time is the clock's, so that asyncio.sleep() and every
+    other timer is waited through in virtual time
+    """
+
+    def __init__(self, clock: VirtualClock) -> None:
+        # Set first, as the selector reads them
+        self.clock = clock
+        self.executor_calls = 0
+        super().__init__(_VirtualTimeSelector(selectors.DefaultSelector(), self))
+
+    def time(self) -> float:
+        """Returns the clock's monotonic time, which the loop's timers are scheduled as per"""
+        return self.clock.monotonic()
+
+    def run_in_executor(self, executor, func, *args) -> asyncio.Future:
+        """Runs the call on a worker thread, keeping count of the calls still running"""
+        future = super().run_in_executor(executor, func, *args)
+        self.executor_calls += 1
+        future.add_done_callback(self._executor_call_done)
+        return future
+
+    def _executor_call_done(self, _future: asyncio.Future) -> None:
+        self.executor_calls -= 1
+
+
+# Clock of the server process
+CLOCK: Clock = Clock()
+
+
+def now() -> datetime:
+    """Returns the current date and time, as per the server's clock"""
+    return CLOCK.now()
+
+
+def monotonic() -> float:
+    """Returns the seconds elapsed since an arbitrary point in time, as per the server's clock"""
+    return CLOCK.monotonic()
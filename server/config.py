@@ -0,0 +1,95 @@
+"""Server settings, read from the environment variables when the server starts"""
+
+import os
+
+
+def _get_float(name: str, default: float) -> float:
+    """Reads a number from the environment variable, if it's set"""
+    return float(os.environ.get(name, default))
+
+
+# Share of the jobs that end up in "error" rather than "completed"
+JOB_ERROR_RATE = _get_float("JOB_ERROR_RATE", 0.2)
+
+# Seed of the jobs' random numbers, deciding which of them end up in "error".
+# Unset, they're seeded from the operating system's randomness
+RANDOM_SEED = os.environ.get("RANDOM_SEED")
+
+# Backend storing the job records: "memory", "sqlite" or "redis"
+JOB_STORE_BACKEND = os.environ.get("JOB_STORE_BACKEND", "memory")
+
+# Path of the database file used by the "sqlite" backend
+JOB_STORE_SQLITE_PATH = os.environ.get("JOB_STORE_SQLITE_PATH", "jobs.sqlite3")
+
+# URL of the server used by the "redis" backend (any server speaking the Redis protocol)
+JOB_STORE_REDIS_URL = os.environ.get("JOB_STORE_REDIS_URL", "redis://127.0.0.1:6379/0")
+
+# Seconds a job is kept for after reaching "completed"/"error" (or, if nobody has
+# looked at it, after it finished processing) before the sweeper deletes it
+JOB_RETENTION_SECONDS = _get_float("JOB_RETENTION_SECONDS", 3600)
+
+# Seconds in between the sweeper's runs, and the number of jobs it deletes at once
+JOB_SWEEP_INTERVAL_SECONDS = _get_float("JOB_SWEEP_INTERVAL_SECONDS", 60)
+JOB_SWEEP_BATCH_SIZE = int(_get_float("JOB_SWEEP_BATCH_SIZE", 1000))
+
+# Maximum number of due jobs the scheduler moves to their terminal state at once, and
+# the seconds it waits before retrying a job it failed to move on (doubling after
+# every failed attempt, up to the maximum)
+JOB_SCHEDULER_BATCH_SIZE = int(_get_float("JOB_SCHEDULER_BATCH_SIZE", 1000))
+JOB_SCHEDULER_BACKOFF_SECONDS = _get_float("JOB_SCHEDULER_BACKOFF_SECONDS", 1)
+JOB_SCHEDULER_MAX_BACKOFF_SECONDS = _get_float("JOB_SCHEDULER_MAX_BACKOFF_SECONDS", 60)
+
+# How the jobs are processed: "timer" (each job runs from its submission, with no
+# limit on how many run at once) or "pool" (a pool of JOB_WORKERS workers takes the
+# queued jobs by priority, first come first served within a priority)
+JOB_EXECUTION_MODE = os.environ.get("JOB_EXECUTION_MODE", "timer")
+JOB_WORKERS = int(_get_float("JOB_WORKERS", 8))
+
+# Highest priority a job may be submitted with (jobs are submitted with 0 by default)
+MAX_JOB_PRIORITY = int(_get_float("MAX_JOB_PRIORITY", 9))
+
+# Webhook deliveries: the number of callbacks waiting to be delivered (beyond
+# which they're dead-lettered), the deliveries in flight at once, overall and per
+# host, and the attempts made (with exponential backoff in between) before giving up
+WEBHOOK_QUEUE_SIZE = int(_get_float("WEBHOOK_QUEUE_SIZE", 10000))
+WEBHOOK_MAX_IN_FLIGHT = int(_get_float("WEBHOOK_MAX_IN_FLIGHT", 1000))
+WEBHOOK_MAX_CONNECTIONS_PER_HOST = int(_get_float("WEBHOOK_MAX_CONNECTIONS_PER_HOST", 10))
+WEBHOOK_MAX_ATTEMPTS = int(_get_float("WEBHOOK_MAX_ATTEMPTS", 5))
+WEBHOOK_BACKOFF_SECONDS = _get_float("WEBHOOK_BACKOFF_SECONDS", 1)
+WEBHOOK_TIMEOUT_SECONDS = _get_float("WEBHOOK_TIMEOUT_SECONDS", 10)
+
+# Number of failed deliveries kept for inspection through GET /webhooks/dead-letters
+WEBHOOK_DEAD_LETTERS_SIZE = int(_get_float("WEBHOOK_DEAD_LETTERS_SIZE", 1000))
+
+# Whether the server records metrics and serves them through GET /metrics ("0" turns them off)
+METRICS_ENABLED = _get_float("METRICS_ENABLED", 1) != 0
+
+# Admission control of the submissions: the maximum number of jobs pending at once,
+# the jobs a client (by IP address) may submit per second on average and at once
+# (0 disables either limit), and the Retry-After of the submissions over capacity
+MAX_PENDING_JOBS = int(_get_float("MAX_PENDING_JOBS", 100000))
+SUBMIT_RATE_PER_CLIENT = _get_float("SUBMIT_RATE_PER_CLIENT", 1000)
+SUBMIT_BURST_PER_CLIENT = _get_float("SUBMIT_BURST_PER_CLIENT", 2000)
+OVER_CAPACITY_RETRY_AFTER_SECONDS = int(_get_float("OVER_CAPACITY_RETRY_AFTER_SECONDS", 5))
+
+# Maximum delay_seconds of a submitted job, and length of its job_id
+MAX_DELAY_SECONDS = int(_get_float("MAX_DELAY_SECONDS", 3600))
+MAX_JOB_ID_LENGTH = int(_get_float("MAX_JOB_ID_LENGTH", 256))
+
+# Chunked uploads of the source videos: the directory they're spooled to, the
+# chunk size used unless the client asks for another one, the maximum chunk and
+# file sizes (in bytes), and the seconds an upload may take to be completed before
+# the sweeper deletes it as abandoned
+UPLOAD_DIRECTORY = os.environ.get("UPLOAD_DIRECTORY", "uploads")
+UPLOAD_CHUNK_SIZE = int(_get_float("UPLOAD_CHUNK_SIZE", 8 * 2**20))
+MAX_UPLOAD_CHUNK_SIZE = int(_get_float("MAX_UPLOAD_CHUNK_SIZE", 64 * 2**20))
+MAX_UPLOAD_SIZE = int(_get_float("MAX_UPLOAD_SIZE", 20 * 2**30))
+UPLOAD_RETENTION_SECONDS = _get_float("UPLOAD_RETENTION_SECONDS", 24 * 3600)
+
+# Output files of the completed jobs: the directory they're stored in, the size of
+# the stand-in output generated for every job, and the prefix of the internal
+# location a reverse proxy (e.g. nginx, through X-Accel-Redirect) serves the
+# directory at, for it to send the files itself ("" to serve them from Python)
+RESULT_DIRECTORY = os.environ.get("RESULT_DIRECTORY", "results")
+RESULT_STANDIN_SIZE = int(_get_float("RESULT_STANDIN_SIZE", 16 * 2**20))
+RESULT_ACCEL_REDIRECT_PREFIX = os.environ.get("RESULT_ACCEL_REDIRECT_PREFIX", "")
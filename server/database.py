@@ -1,70 +1,199 @@
 """Database module mimicking a persistent storage and methods to interact with it"""
 
-from dataclasses import dataclass
 from datetime import datetime
 
 import random
-from typing import Literal, Optional
+from typing import Iterable, Literal, Optional
 
-from server import errors
+from server import clock, config, errors, events, metrics, stores
+from server.models import Job
 
+# Dictionary acting like a database. Gets initialized every session.
+# It backs the "memory" job store, which is the default one.
+JOB_INFO_BY_ID: dict[str, Job] = {}
 
-@dataclass
-class Job:
-    """Attributes of every Job object/record"""
+# Backend the job records are persisted in, as configured by config.JOB_STORE_BACKEND
+JOB_STORE: stores.JobStore = stores.create_job_store(memory_jobs=JOB_INFO_BY_ID)
 
-    delay: int
-    random_num: float
-    started_at: datetime
-    status: Literal["completed", "error", "pending"]
+# Source of the jobs' random numbers (and so of which of them fail), seeded with
+# config.RANDOM_SEED to make the outcomes reproducible
+RANDOM = random.Random(config.RANDOM_SEED)
 
 
-# Dictionary acting like a database. Gets initialized every session.
-JOB_INFO_BY_ID: dict[str, Job] = {}
+@metrics.instrument("delete_job")
+def fake_delete_job(job_id: str) -> bool:
+    """Mimicks deleting a Job record from the database.
+    Returns whether there was a record to delete.
+    """
+
+    # Adding a try-except block as I would, if this method
+    # was actually interacting with a database.
+    try:
+        return JOB_STORE.delete(job_id)
+    except Exception as e:
+        raise errors.DeleteJobError(f"Failed to delete the job {job_id}") from e
+
+
+@metrics.instrument("delete_expired_jobs")
+def fake_delete_expired_jobs(cutoff: datetime, limit: int) -> list[str]:
+    """Mimicks deleting (at most `limit` of) the Job records whose retention
+    period started before the cutoff. Returns the job_ids of the deleted records.
+    """
+
+    # Adding a try-except block as I would, if this method
+    # was actually interacting with a database.
+    try:
+        return JOB_STORE.delete_expired(cutoff, limit)
+    except Exception as e:
+        raise errors.DeleteJobError("Failed to delete the expired jobs") from e
+
+
+@metrics.instrument("count_jobs")
+def fake_count_jobs() -> int:
+    """Mimicks counting the Job records in the database"""
+
+    # Adding a try-except block as I would, if this method
+    # was actually interacting with a database.
+    try:
+        return JOB_STORE.count()
+    except Exception as e:
+        raise errors.GetJobInfoError("Failed to count the jobs") from e
 
 
-# This can be implemented if we ever want to delete the job-records from the database
-# pylint: disable=unused-argument
-def fake_delete_job(job_id: str) -> None:
-    """Placeholder method for deleting job-records from the database"""
+@metrics.instrument("count_jobs_by_status")
+def fake_count_jobs_by_status() -> dict[str, int]:
+    """Mimicks counting the Job records in the database, by status"""
+
+    # Adding a try-except block as I would, if this method
+    # was actually interacting with a database.
+    try:
+        return JOB_STORE.count_by_status()
+    except Exception as e:
+        raise errors.GetJobInfoError("Failed to count the jobs by status") from e
 
 
+@metrics.instrument("get_job_info")
 def fake_get_job_info(job_id: str) -> Optional[Job]:
     """Mimicks fetching a Job record from the database"""
 
     # Adding a try-except block as I would, if this method
     # was actually interacting with a database.
     try:
-        return JOB_INFO_BY_ID.get(job_id)
+        return JOB_STORE.get(job_id)
     except Exception as e:
         raise errors.GetJobInfoError(f"Failed to get {job_id}'s info") from e
 
 
-def fake_submit_job(job_id: str, delay: int) -> None:
-    """Mimicks writing a Job record to the database"""
+@metrics.instrument("get_jobs_info")
+def fake_get_jobs_info(job_ids: Iterable[str]) -> dict[str, Optional[Job]]:
+    """Mimicks fetching multiple Job records from the database in a single query"""
+
+    job_ids = list(job_ids)
+
+    # Adding a try-except block as I would, if this method
+    # was actually interacting with a database.
+    try:
+        return JOB_STORE.get_many(job_ids)
+    except Exception as e:
+        raise errors.GetJobInfoError(f"Failed to get the info of {job_ids}") from e
+
+
+@metrics.instrument("get_pending_jobs")
+def fake_get_pending_jobs() -> dict[str, Job]:
+    """Mimicks fetching every pending Job record from the database, by job_id"""
 
     # Adding a try-except block as I would, if this method
     # was actually interacting with a database.
     try:
-        JOB_INFO_BY_ID[job_id] = Job(
+        return dict(JOB_STORE.iter_pending())
+    except Exception as e:
+        raise errors.GetJobInfoError("Failed to get the pending jobs") from e
+
+
+@metrics.instrument("submit_job")
+def fake_submit_job(
+    job_id: str, delay: int, callback_url: Optional[str] = None
+) -> Job:
+    """Mimicks writing a Job record to the database. Returns the written record"""
+
+    # Adding a try-except block as I would, if this method
+    # was actually interacting with a database.
+    try:
+        job = Job(
             delay=delay,
-            random_num=random.random(),
-            started_at=datetime.now(),
+            random_num=RANDOM.random(),
+            started_at=clock.now(),
             status="pending",
+            callback_url=callback_url,
         )
+        JOB_STORE.put(job_id, job)
+        metrics.JOBS_SUBMITTED.inc()
+        return job
     except Exception as e:
         # rollback any transactions
         raise errors.SubmitJobError(f"Failed to submit the job {job_id}") from e
 
 
-def fake_update_job_status(job_id: str, status: Literal["completed", "error"]) -> None:
-    """Mimicks updating a Job record in the database"""
+@metrics.instrument("update_job_status")
+def fake_update_job_status(
+    job_id: str,
+    status: Literal["completed", "error"],
+    callback_url: Optional[str] = None,
+) -> None:
+    """Mimicks updating a Job record in the database.
+
+    Actual status changes are announced on `events.JOB_TRANSITIONS`, along with
+    the job's `callback_url`.
+    """
 
     # Adding a try-except block as I would, if this method
     # was actually interacting with a database.
     try:
-        JOB_INFO_BY_ID[job_id].status = status
+        previous_status = JOB_STORE.update_status(job_id, status, clock.now())
     except Exception as e:
         raise errors.UpdateJobStatusError(
             f"Failed to update the status of the job {job_id}"
         ) from e
+
+    if previous_status != status:
+        events.JOB_TRANSITIONS.publish(
+            events.JobTransition(
+                job_id=job_id,
+                previous_status=previous_status,
+                status=status,
+                callback_url=callback_url,
+            )
+        )
+
+
+@metrics.instrument("submit_jobs")
+def fake_submit_jobs(
+    delays_by_job_id: dict[str, int],
+    callback_urls_by_job_id: Optional[dict[str, str]] = None,
+) -> dict[str, Job]:
+    """Mimicks writing multiple Job records to the database in a single transaction.
+    Returns the written records, by job_id.
+    """
+
+    # Adding a try-except block as I would, if this method
+    # was actually interacting with a database.
+    try:
+        started_at = clock.now()
+        jobs = {
+            job_id: Job(
+                delay=delay,
+                random_num=RANDOM.random(),
+                started_at=started_at,
+                status="pending",
+                callback_url=(callback_urls_by_job_id or {}).get(job_id),
+            )
+            for job_id, delay in delays_by_job_id.items()
+        }
+        JOB_STORE.put_many(jobs)
+        metrics.JOBS_SUBMITTED.inc(amount=len(jobs))
+        return jobs
+    except Exception as e:
+        # rollback any transactions
+        raise errors.SubmitJobError(
+            f"Failed to submit the jobs {list(delays_by_job_id)}"
+        ) from e
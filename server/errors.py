@@ -11,3 +11,23 @@ class SubmitJobError(Exception):
 
 class UpdateJobStatusError(Exception):
     """Raised when updating a job's status fails"""
+
+
+class DeleteJobError(Exception):
+    """Raised when deleting a job fails"""
+
+
+class UploadError(Exception):
+    """Raised when reading or writing an upload fails"""
+
+
+class ChunkRejectedError(Exception):
+    """Raised when an uploaded chunk doesn't have the expected length or checksum"""
+
+
+class ResultError(Exception):
+    """Raised when reading or writing a job's output file fails"""
+
+
+class RangeNotSatisfiableError(Exception):
+    """Raised when none of the requested byte ranges are within the file"""
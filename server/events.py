@@ -0,0 +1,61 @@
+"""In-process event bus broadcasting the status transitions of the jobs"""
+
+from dataclasses import dataclass
+from typing import Callable, Literal, Optional
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class JobTransition:
+    """Event describing a job moving from one status to another"""
+
+    job_id: str
+    previous_status: Literal["completed", "error", "pending"]
+    status: Literal["completed", "error", "pending"]
+    callback_url: Optional[str] = None  # The job's, to be notified of the transition
+
+
+Subscriber = Callable[[JobTransition], None]
+
+
+class EventBus:
+    """Fans every published event out to all of its subscribers.
+
+    Subscribers are invoked synchronously on the publishing thread, so they
+    must be quick and must not block (hand the event off to a queue instead).
+    A failing subscriber is logged and doesn't affect the other subscribers.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: list[Subscriber] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, subscriber: Subscriber) -> None:
+        """Registers the subscriber for all the subsequently published events"""
+        with self._lock:
+            self._subscribers.append(subscriber)
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Stops delivering events to the subscriber"""
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def publish(self, event: JobTransition) -> None:
+        """Delivers the event to every subscriber"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            try:
+                subscriber(event)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Subscriber %r failed to handle %r", subscriber, event)
+
+
+# Bus on which database.fake_update_job_status announces every status change
+JOB_TRANSITIONS = EventBus()
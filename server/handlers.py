@@ -1,14 +1,39 @@
-# pylint: skip-file
 """Entry point to the GET /status API and the POST /submit API"""
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Annotated, Literal
+from email.utils import parsedate_to_datetime
+from typing import Annotated, AsyncIterator, Literal, Optional
 
-from fastapi import FastAPI, Path, Query, Response, HTTPException
+import json
+import logging
+import math
+
+from fastapi import Body, FastAPI, Header, Path, Query, Request, Response, HTTPException
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
+from pydantic import Field
+
+from . import (
+    admission,
+    clock,
+    config,
+    database,
+    errors,
+    events,
+    metrics,
+    ops_handlers,
+    pool,
+    results,
+    scheduler,
+    submission,
+    sweeper,
+    upload_handlers,
+    webhooks,
+)
 
-from . import database, errors
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -18,68 +43,713 @@ class GetStatusResponse:
     result: Literal["completed", "error", "pending"]
 
 
-app = FastAPI()
+@dataclass
+class GetPendingStatusResponse(GetStatusResponse):
+    """DTO for the /status API's response object, when the job is "pending" """
+
+    estimated_completion_at: datetime
+    remaining_seconds: float
+    queue_position: Optional[int] = None  # When the jobs are processed by the worker pool
+
+
+@dataclass
+class SubmitJobRequest:
+    """DTO for a single job in the /submit:batch API's request object"""
+
+    job_id: Annotated[str, Field(min_length=1, max_length=config.MAX_JOB_ID_LENGTH)]
+    delay_seconds: Annotated[int, Field(ge=0, le=config.MAX_DELAY_SECONDS)] = 20
+    priority: Annotated[int, Field(ge=0, le=config.MAX_JOB_PRIORITY)] = 0
+    callback_url: Optional[submission.CallbackUrl] = None
+
+
+@dataclass
+class SubmitJobResult:
+    """DTO for the outcome of submitting a single job through the /submit:batch API"""
+
+    job_id: str
+    status_code: int
+    detail: str
+
+
+@dataclass
+class SubmitJobsResponse:
+    """DTO for the /submit:batch API's response object"""
+
+    results: list[SubmitJobResult]
+
+
+@dataclass
+class GetStatusResult:
+    """DTO for the status of a single job in the /status:batch API's response object.
+    `result` is None when the status couldn't be determined (see `status_code`).
+    """
+
+    job_id: str
+    status_code: int
+    result: Optional[Literal["completed", "error", "pending"]] = None
+    detail: Optional[str] = None
+    remaining_seconds: Optional[float] = None
+    queue_position: Optional[int] = None
+
+
+@dataclass
+class GetStatusesResponse:
+    """DTO for the /status:batch API's response object"""
+
+    results: list[GetStatusResult]
+
+
+# Upper bound on how long a single long-polling GET /status request is held open
+MAX_WAIT_SECONDS = 60
+
+# Maximum number of jobs accepted by a single /submit:batch or /status:batch request
+MAX_BATCH_SIZE = 1000
+
+# Seconds of silence after which a keep-alive comment is sent on a status stream
+STREAM_HEARTBEAT_SECONDS = 15
+
+# Seconds a shared cache (e.g. a reverse proxy) may serve a terminal status for
+# without revalidating it. Kept short, as the job may be deleted or resubmitted.
+TERMINAL_STATUS_MAX_AGE_SECONDS = 60
+
+# Seconds after which a pending job whose transition hasn't been announced is
+# looked up again, when the jobs are processed by the worker pool
+POOL_RECHECK_SECONDS = 1
+
+
+async def _dispatch_pending_jobs() -> None:
+    """Hands the stored pending jobs (e.g. those submitted before a restart) over to
+    the scheduler or the worker pool. Their priority isn't stored, so queued jobs
+    get the default one.
+    """
+    try:
+        pending_jobs = await asyncio.to_thread(database.fake_get_pending_jobs)
+    except errors.GetJobInfoError:
+        logger.exception("Failed to get the pending jobs")
+        return
+
+    for job_id, job in pending_jobs.items():
+        submission.dispatch(job_id, job, priority=0)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Runs the background tasks for as long as the server is up"""
+    await _dispatch_pending_jobs()
+    tasks = [
+        asyncio.create_task(scheduler.JOB_SCHEDULER.run()),
+        asyncio.create_task(sweeper.JOB_SWEEPER.run()),
+        asyncio.create_task(webhooks.WEBHOOK_DISPATCHER.run()),
+        asyncio.create_task(admission.ADMISSION_CONTROLLER.run()),
+    ]
+    if config.JOB_EXECUTION_MODE == "pool":
+        tasks.append(asyncio.create_task(pool.WORKER_POOL.run()))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+
+app = FastAPI(lifespan=lifespan)
+app.include_router(upload_handlers.router)
+app.include_router(ops_handlers.router)
+
+
+def _count_jobs_by_status() -> dict[tuple[str, ...], float]:
+    """Returns the number of stored jobs, by status, for the "jobs" gauge"""
+    return {
+        (status,): count
+        for status, count in database.fake_count_jobs_by_status().items()
+    }
+
+
+if config.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+    events.JOB_TRANSITIONS.subscribe(
+        lambda transition: metrics.JOB_TRANSITIONS.inc(transition.status)
+    )
+    metrics.REGISTRY.register(
+        metrics.CallbackMetric(
+            "jobs", "Jobs currently stored, by status", _count_jobs_by_status, ("status",)
+        )
+    )
+    metrics.REGISTRY.register(
+        metrics.CallbackMetric(
+            "jobs_evicted_total",
+            "Expired jobs deleted by this process' sweeper",
+            lambda: {(): sweeper.JOB_SWEEPER.evicted_jobs},
+            type_name="counter",
+        )
+    )
+    metrics.REGISTRY.register(
+        metrics.CallbackMetric(
+            "jobs_scheduled_transitions_total",
+            "Jobs moved to their terminal state by this process' scheduler",
+            lambda: {(): scheduler.JOB_SCHEDULER.transitioned_jobs},
+            type_name="counter",
+        )
+    )
+    metrics.REGISTRY.register(
+        metrics.CallbackMetric(
+            "webhook_callbacks_delivered_total",
+            "Callbacks this process delivered",
+            lambda: {(): webhooks.WEBHOOK_DISPATCHER.delivered_callbacks},
+            type_name="counter",
+        )
+    )
+    metrics.REGISTRY.register(
+        metrics.CallbackMetric(
+            "webhook_dead_letters",
+            "Failed callbacks currently kept for inspection",
+            lambda: {(): len(webhooks.WEBHOOK_DISPATCHER.dead_letters)},
+        )
+    )
+    if config.JOB_EXECUTION_MODE == "pool":
+        metrics.REGISTRY.register(
+            metrics.CallbackMetric(
+                "pool_queued_jobs",
+                "Jobs waiting for a worker of this process' pool",
+                lambda: {(): pool.WORKER_POOL.queued_jobs},
+            )
+        )
+        metrics.REGISTRY.register(
+            metrics.CallbackMetric(
+                "pool_busy_workers",
+                "Workers of this process' pool processing a job",
+                lambda: {(): pool.WORKER_POOL.busy_workers},
+            )
+        )
+        metrics.REGISTRY.register(
+            metrics.CallbackMetric(
+                "pool_processed_jobs_total",
+                "Jobs moved to their terminal state by this process' pool",
+                lambda: {(): pool.WORKER_POOL.processed_jobs},
+                type_name="counter",
+            )
+        )
+
+
+def _get_job_info_or_raise(job_id: str) -> database.Job:
+    """Fetches the job's record, raising the matching HTTPException on failure"""
+    try:
+        job_info = database.fake_get_job_info(job_id)
+    except errors.GetJobInfoError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    if not job_info:
+        raise HTTPException(
+            status_code=404, detail=f"Job ID {job_id} could not be found"
+        )
+
+    return job_info
+
+
+def _resolve_job_status(
+    job_id: str, job_info: database.Job
+) -> Literal["completed", "error", "pending"]:
+    """Returns the job's status. The scheduler moves the jobs to their terminal
+    state when they're due, so this is a plain lookup unless the job is overdue,
+    e.g. because it was scheduled by another worker, or before a restart.
+
+    Jobs processed by the worker pool are only ever moved on by the pool, as
+    they're not due until a worker has processed them.
+    """
+    if (
+        job_info.status != "pending"
+        or config.JOB_EXECUTION_MODE == "pool"
+        or clock.now() < job_info.due_at
+    ):
+        return job_info.status
+
+    try:
+        database.fake_update_job_status(job_id, job_info.outcome, job_info.callback_url)
+    except errors.UpdateJobStatusError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    return job_info.outcome
+
+
+def _read_job_status(
+    job_id: str,
+) -> tuple[database.Job, Literal["completed", "error", "pending"]]:
+    """Fetches the job's record and resolves its status, raising the matching
+    HTTPException on failure. Blocks on the job store, so the handlers run it on
+    a worker thread.
+    """
+    job_info = _get_job_info_or_raise(job_id)
+    return job_info, _resolve_job_status(job_id, job_info)
+
+
+def _estimate(job_id: str, job_info: database.Job) -> pool.JobEstimate:
+    """Returns when the pending job is expected to complete and, if it's in this
+    process' worker pool, its position in the queue
+    """
+    if config.JOB_EXECUTION_MODE == "pool":
+        estimate = pool.WORKER_POOL.estimate(job_id, job_info)
+        if estimate:
+            return estimate
+
+    # Jobs run from their submission, or were queued by another worker process
+    return pool.JobEstimate(
+        queue_position=None, estimated_completion_at=job_info.completes_at
+    )
+
+
+def _remaining_seconds(estimate: pool.JobEstimate) -> float:
+    """Returns the seconds left until the job is expected to complete"""
+    return max(0, (estimate.estimated_completion_at - clock.now()).total_seconds())
+
+
+def _next_check_at(job_id: str, job_info: database.Job) -> datetime:
+    """Returns when to look the pending job up again, unless its transition is
+    announced before then
+    """
+    if config.JOB_EXECUTION_MODE != "pool":
+        return job_info.due_at
+
+    # The pool announces the transitions of its jobs, so this is a fallback
+    return max(
+        _estimate(job_id, job_info).estimated_completion_at,
+        clock.now() + timedelta(seconds=POOL_RECHECK_SECONDS),
+    )
+
+
+async def _wait_for_transition(job_id: str, timeout_seconds: float) -> None:
+    """Waits until the job's transition is announced, or the timeout elapses"""
+    loop = asyncio.get_running_loop()
+    transitioned = asyncio.Event()
+
+    def on_transition(transition: events.JobTransition) -> None:
+        # Transitions may be published from any thread
+        if transition.job_id == job_id:
+            loop.call_soon_threadsafe(transitioned.set)
+
+    events.JOB_TRANSITIONS.subscribe(on_transition)
+    try:
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(transitioned.wait(), timeout=timeout_seconds)
+    finally:
+        events.JOB_TRANSITIONS.unsubscribe(on_transition)
+
+
+def _serialize(content: dict) -> bytes:
+    """Serializes the content the way JSONResponse does"""
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+# The bodies (and ETags) of the terminal statuses are the same for every job,
+# so they're serialized once and for all
+_TERMINAL_STATUS_BODIES = {
+    status: _serialize(jsonable_encoder(GetStatusResponse(result=status)))
+    for status in ("completed", "error")
+}
+_TERMINAL_STATUS_HEADERS = {
+    status: {
+        "ETag": f'"{status}"',
+        "Cache-Control": f"public, max-age={TERMINAL_STATUS_MAX_AGE_SECONDS}",
+    }
+    for status in _TERMINAL_STATUS_BODIES
+}
+
+
+def _pending_status_etag(job_info: database.Job) -> str:
+    """Returns the (weak, as the remaining seconds keep changing) ETag of a pending
+    job, which changes if the job is resubmitted
+    """
+    return f'W/"pending-{job_info.started_at.timestamp()!r}-{job_info.delay}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether the If-None-Match header matches the ETag, using the weak
+    comparison (https://www.rfc-editor.org/rfc/rfc9110#section-13.1.2)
+    """
+    if not if_none_match:
+        return False
+
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        candidate == "*" or candidate.removeprefix("W/") == opaque_tag
+        for candidate in (tag.strip() for tag in if_none_match.split(","))
+    )
+
+
+def _build_status_response(
+    status: Literal["completed", "error", "pending"],
+    job_id: str,
+    job_info: database.Job,
+    if_none_match: Optional[str] = None,
+) -> Response:
+    """Builds the /status API's response, or a 304 if the client's copy (as per
+    its If-None-Match header) is still current. Terminal statuses are served
+    from their precomputed bodies, and may be cached by shared caches.
+
+    For "pending" jobs, the response carries the estimated completion time (and
+    the queue position, if it's queued in the worker pool) and a Retry-After
+    header for polling clients (the latter even when it's a 304).
+    """
+    if status != "pending":
+        headers = _TERMINAL_STATUS_HEADERS[status]
+        if _etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        return Response(
+            content=_TERMINAL_STATUS_BODIES[status],
+            media_type="application/json",
+            headers=headers,
+        )
+
+    estimate = _estimate(job_id, job_info)
+    remaining_seconds = _remaining_seconds(estimate)
+    headers = {
+        "ETag": _pending_status_etag(job_info),
+        "Cache-Control": "no-cache",
+        "Retry-After": str(max(1, math.ceil(remaining_seconds))),
+    }
+    if _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    response = GetPendingStatusResponse(
+        result=status,
+        estimated_completion_at=estimate.estimated_completion_at,
+        remaining_seconds=round(remaining_seconds, 3),
+        queue_position=estimate.queue_position,
+    )
+    content = {
+        "result": response.result,
+        "estimated_completion_at": response.estimated_completion_at.isoformat(),
+        "remaining_seconds": response.remaining_seconds,
+    }
+    if response.queue_position is not None:
+        content["queue_position"] = response.queue_position
+
+    return Response(
+        content=_serialize(content),
+        media_type="application/json",
+        headers=headers,
+    )
 
 
 @app.get("/status/{job_id}")
 async def get_job_status(
     job_id: Annotated[str, Path(description="ID of the job whose status to check for")],
-) -> JSONResponse:
+    wait: Annotated[
+        int,
+        Query(
+            ge=0,
+            le=MAX_WAIT_SECONDS,
+            description="Seconds to hold the request open while the job is pending",
+        ),
+    ] = 0,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+) -> Response:
     """Returns the status of the given job_id
 
     Args:
         job_id: str: ID of the job whose status to check for
+        wait: int: Long-polling window (in seconds). While the job is "pending",
+        the response is held back until the job leaves "pending" or the window
+        elapses, whichever comes first. (default 0, i.e. respond immediately)
+        if_none_match: str: ETag(s) of the client's copy of the status, from a
+        previous response. A 304 is returned if the status hasn't changed.
 
     Returns:
-        The status of the given job_id ["completed" OR "error" OR "pending"]
+        The status of the given job_id ["completed" OR "error" OR "pending"].
+        "pending" responses also carry the job's `estimated_completion_at` and
+        `remaining_seconds` (and `queue_position`, when the jobs are processed
+        by the worker pool), along with a Retry-After header. Every response
+        carries the ETag of the job's state.
+    """
+    job_info, status = await asyncio.to_thread(_read_job_status, job_id)
+
+    wait_until = clock.now() + timedelta(seconds=wait)
+    while status == "pending":
+        current_time = clock.now()
+        if current_time >= wait_until:
+            break
+
+        # Sleeping on the event loop keeps the worker free to serve other requests
+        wake_at = min(wait_until, _next_check_at(job_id, job_info))
+        seconds = (wake_at - current_time).total_seconds()
+        if config.JOB_EXECUTION_MODE == "pool":
+            await _wait_for_transition(job_id, seconds)
+        else:
+            await asyncio.sleep(seconds)
+
+        job_info, status = await asyncio.to_thread(_read_job_status, job_id)
+
+    return _build_status_response(status, job_id, job_info, if_none_match)
+
+
+def _look_up_job_statuses(job_ids: list[str]) -> list[GetStatusResult]:
+    """Returns the status result of each of the given jobs (see POST /status:batch),
+    raising a 503 if they couldn't be read. Blocks on the job store, so the handler
+    runs it on a worker thread.
     """
     try:
-        job_info = database.fake_get_job_info(job_id)
+        jobs_info = database.fake_get_jobs_info(job_ids)
     except errors.GetJobInfoError as e:
-        raise HTTPException(status_code=503, detail=str(e))
+        raise HTTPException(status_code=503, detail=str(e)) from e
 
-    if not job_info:
-        raise HTTPException(
-            status_code=404, detail=f"Job ID {job_id} could not be found"
-        )
+    status_results = []
+    for job_id in job_ids:
+        job_info = jobs_info[job_id]
+        if not job_info:
+            status_results.append(
+                GetStatusResult(
+                    job_id=job_id,
+                    status_code=404,
+                    detail=f"Job ID {job_id} could not be found",
+                )
+            )
+            continue
 
-    if job_info.random_num <= 0.2:  # Want to return "error" 20% of the times
         try:
-            database.fake_update_job_status(job_id, "error")
-        except errors.UpdateJobStatusError as e:
-            raise HTTPException(status_code=503, detail=str(e))
+            status = _resolve_job_status(job_id, job_info)
+        except HTTPException as e:
+            status_results.append(
+                GetStatusResult(job_id=job_id, status_code=e.status_code, detail=e.detail)
+            )
+            continue
 
-        response = GetStatusResponse(result="error")
-        json_compatible_response = jsonable_encoder(response)
+        remaining_seconds = queue_position = None
+        if status == "pending":
+            estimate = _estimate(job_id, job_info)
+            remaining_seconds = round(_remaining_seconds(estimate), 3)
+            queue_position = estimate.queue_position
 
-        return JSONResponse(content=json_compatible_response)
+        status_results.append(
+            GetStatusResult(
+                job_id=job_id,
+                status_code=200,
+                result=status,
+                remaining_seconds=remaining_seconds,
+                queue_position=queue_position,
+            )
+        )
 
-    current_time = datetime.now()
-    job_completes_at = job_info.started_at + timedelta(seconds=job_info.delay)
+    return status_results
+
+
+@app.post("/status:batch")
+async def get_job_statuses(
+    job_ids: Annotated[
+        list[str],
+        Body(
+            embed=True,
+            min_length=1,
+            max_length=MAX_BATCH_SIZE,
+            description="IDs of the jobs whose status to check for",
+        ),
+    ],
+) -> GetStatusesResponse:
+    """Returns the status of each of the given job_ids with a single lookup
+
+    Args:
+        job_ids: list[str]: IDs of the jobs whose status to check for
+
+    Returns:
+        One result per job_id, in order. Jobs that could be looked up have
+        a 200 `status_code` and their `result`. The others have the
+        `status_code` and `detail` GET /status/{job_id} would've returned.
+    """
+    status_results = await asyncio.to_thread(_look_up_job_statuses, job_ids)
+    return GetStatusesResponse(results=status_results)
 
-    if current_time >= job_completes_at:
-        try:
-            database.fake_update_job_status(job_id, "completed")
-        except errors.UpdateJobStatusError as e:
-            raise HTTPException(status_code=503, detail=str(e))
 
-        response = GetStatusResponse(result="completed")
-        json_compatible_response = jsonable_encoder(response)
+def _format_server_sent_event(event: str, data: dict) -> str:
+    """Serializes a single Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-        return JSONResponse(content=json_compatible_response)
 
-    response = GetStatusResponse(result="pending")
-    json_compatible_response = jsonable_encoder(response)
+def _look_up_job_status(job_id: str) -> tuple[Optional[str], Optional[str], Optional[datetime]]:
+    """Returns the job's (status, detail, check_at): its status (None if it couldn't
+    be read, with the `detail` of the error) and, if it's still pending, when to
+    look it up again
+    """
+    try:
+        job_info, status = _read_job_status(job_id)
+    except HTTPException as e:
+        return None, e.detail, None
 
-    return JSONResponse(content=json_compatible_response)
+    check_at = _next_check_at(job_id, job_info) if status == "pending" else None
+    return status, None, check_at
+
+
+def _check_due_jobs(
+    due_at_by_job_id: dict[str, datetime]
+) -> list[tuple[str, Optional[str], Optional[str]]]:
+    """Looks up the jobs that are due by now, pushing back the next check of those
+    that are still pending. Returns their (job_id, status, detail) updates.
+    """
+    job_updates = []
+    for job_id, due_at in list(due_at_by_job_id.items()):
+        if due_at > clock.now():
+            continue
+
+        status, detail, check_at = _look_up_job_status(job_id)
+        if check_at is not None:  # The job was resubmitted, or is queued
+            due_at_by_job_id[job_id] = check_at
+        job_updates.append((job_id, status, detail))
+
+    return job_updates
+
+
+def _job_update_events(
+    job_updates: list[tuple[str, Optional[str], Optional[str]]],
+    last_sent_status: dict[str, str],
+    due_at_by_job_id: dict[str, datetime],
+) -> list[str]:
+    """Returns the events of the (job_id, status, detail) updates that change what
+    was last sent about the jobs still streamed. The jobs whose stream is over (in a
+    terminal state, or that couldn't be read) are dropped from `due_at_by_job_id`.
+    """
+    job_events = []
+    for job_id, status, detail in job_updates:
+        if job_id not in due_at_by_job_id:
+            continue
+
+        if detail is not None:
+            del due_at_by_job_id[job_id]
+            job_events.append(
+                _format_server_sent_event("error", {"job_id": job_id, "detail": detail})
+            )
+        elif last_sent_status[job_id] != status:
+            last_sent_status[job_id] = status
+            if status != "pending":
+                del due_at_by_job_id[job_id]
+            job_events.append(
+                _format_server_sent_event("status", {"job_id": job_id, "result": status})
+            )
+
+    return job_events
+
+
+async def _stream_job_transitions(job_ids: list[str]) -> AsyncIterator[str]:
+    """Yields a "status" event for each state of the given jobs until all of
+    them reach a terminal state. Unknown jobs get a single "error" event.
+    """
+    loop = asyncio.get_running_loop()
+    transitions: asyncio.Queue[events.JobTransition] = asyncio.Queue()
+
+    def enqueue_transition(transition: events.JobTransition) -> None:
+        # Transitions may be published from any thread
+        if transition.job_id in last_sent_status:
+            loop.call_soon_threadsafe(transitions.put_nowait, transition)
+
+    last_sent_status: dict[str, str] = {}
+    due_at_by_job_id: dict[str, datetime] = {}  # Of the jobs that are still pending
+
+    # Subscribing first so that no transition can slip in unnoticed
+    events.JOB_TRANSITIONS.subscribe(enqueue_transition)
+    try:
+        for job_id in dict.fromkeys(job_ids):
+            status, detail, check_at = await asyncio.to_thread(_look_up_job_status, job_id)
+            if status is None:
+                yield _format_server_sent_event(
+                    "error", {"job_id": job_id, "detail": detail}
+                )
+                continue
+
+            last_sent_status[job_id] = status
+            yield _format_server_sent_event(
+                "status", {"job_id": job_id, "result": status}
+            )
+
+            if check_at is not None:
+                due_at_by_job_id[job_id] = check_at
+
+        silent_since = clock.now()
+        while due_at_by_job_id:
+            # Transitions are announced by the scheduler. Jobs that are still pending
+            # once due (e.g. scheduled by another worker) are looked up instead.
+            wake_at = min(
+                silent_since + timedelta(seconds=STREAM_HEARTBEAT_SECONDS),
+                *due_at_by_job_id.values(),
+            )
+            try:
+                transition = await asyncio.wait_for(
+                    transitions.get(),
+                    timeout=max(0, (wake_at - clock.now()).total_seconds()),
+                )
+                job_updates = [(transition.job_id, transition.status, None)]
+            except asyncio.TimeoutError:
+                job_updates = await asyncio.to_thread(_check_due_jobs, due_at_by_job_id)
+
+            for event in _job_update_events(job_updates, last_sent_status, due_at_by_job_id):
+                yield event
+                silent_since = clock.now()
+
+            if clock.now() >= silent_since + timedelta(
+                seconds=STREAM_HEARTBEAT_SECONDS
+            ):
+                silent_since = clock.now()
+                yield ": keep-alive\n\n"
+    finally:
+        events.JOB_TRANSITIONS.unsubscribe(enqueue_transition)
+
+
+@app.get("/status:stream")
+async def stream_job_statuses(
+    job_ids: Annotated[
+        list[str],
+        Query(
+            alias="job_id",
+            min_length=1,
+            description="IDs of the jobs to subscribe to (repeat the parameter)",
+        ),
+    ],
+) -> StreamingResponse:
+    """Streams the status transitions of the given jobs as Server-Sent Events
+
+    Args:
+        job_ids: list[str]: IDs of the jobs to subscribe to
+
+    Returns:
+        A "text/event-stream" with one "status" event ({"job_id": ..., "result": ...})
+        for the current status of each job and for each subsequent transition.
+        The stream ends once every job has reached "completed" or "error".
+    """
+    return StreamingResponse(
+        _stream_job_transitions(job_ids),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
 
 
 @app.post("/submit/{job_id}")
 async def submit_job(
-    job_id: Annotated[str, Path(description="ID of the job to create")],
+    request: Request,
+    job_id: Annotated[
+        str,
+        Path(max_length=config.MAX_JOB_ID_LENGTH, description="ID of the job to create"),
+    ],
     delay_seconds: Annotated[
-        int, Query(description="Time in seconds for the job to complete")
+        int,
+        Query(
+            ge=0,
+            le=config.MAX_DELAY_SECONDS,
+            description="Time in seconds for the job to complete",
+        ),
     ] = 20,
+    callback_url: Annotated[
+        Optional[str],
+        Query(
+            pattern=submission.CALLBACK_URL_PATTERN,
+            max_length=submission.CALLBACK_URL_MAX_LENGTH,
+            description="URL to POST the job's result to once it's completed",
+        ),
+    ] = None,
+    priority: Annotated[
+        int,
+        Query(
+            ge=0,
+            le=config.MAX_JOB_PRIORITY,
+            description="Priority of the job in the worker pool's queue (higher first)",
+        ),
+    ] = 0,
 ) -> Response:
     """Returns the job_id after submitting it successfully
 
@@ -87,13 +757,209 @@ async def submit_job(
         job_id: str: ID of the job to submit
         delay_seconds: int: Proxy for indicating the time (in seconds) it
         takes for the given job_id to complete successfully. (default 20)
+        callback_url: str: HTTP(S) URL that {"job_id": ..., "result": ...} is
+        POSTed to once the job reaches "completed"/"error". (default None)
+        priority: int: When the jobs are processed by the worker pool, queued jobs
+        of a higher priority are processed first, and jobs of the same priority
+        in submission order. Ignored otherwise. (default 0)
 
-    Returns: A string indicating successful submission of the job, with its ID
+    Returns: A string indicating successful submission of the job, with its ID,
+    or a 429 (with a Retry-After header) when the server is over capacity or the
+    client is submitting too fast
     """
+    submission.admit_or_raise(request, jobs=1)
+
     try:
-        database.fake_submit_job(job_id, delay_seconds)
+        job = await asyncio.to_thread(
+            database.fake_submit_job, job_id, delay_seconds, callback_url
+        )
+        submission.dispatch(job_id, job, priority)
         return Response(
             content=f"Successfully submitted the job: {job_id}", status_code=201
         )
     except errors.SubmitJobError as e:
-        raise HTTPException(status_code=503, detail=str(e))
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+
+@app.post("/submit:batch")
+async def submit_jobs(
+    request: Request,
+    jobs: Annotated[
+        list[SubmitJobRequest],
+        Body(
+            embed=True,
+            min_length=1,
+            max_length=MAX_BATCH_SIZE,
+            description=(
+                "Jobs to create, each with its own delay_seconds, priority and callback_url"
+            ),
+        ),
+    ],
+) -> SubmitJobsResponse:
+    """Submits all the given jobs with a single write
+
+    Args:
+        jobs: list[SubmitJobRequest]: The jobs to submit. Each one has a `job_id`,
+        an optional `delay_seconds` (default 20), an optional `priority` (default 0)
+        and an optional `callback_url` (see POST /submit/{job_id}).
+
+    Returns: One result per job, in order, with the `status_code` and `detail`
+    POST /submit/{job_id} would've returned for it. The whole batch is refused
+    with a 429 (see POST /submit/{job_id}) if its jobs can't all be admitted.
+    """
+    submission.admit_or_raise(request, jobs=len(jobs))
+
+    try:
+        submitted_jobs = await asyncio.to_thread(
+            database.fake_submit_jobs,
+            {job.job_id: job.delay_seconds for job in jobs},
+            {job.job_id: job.callback_url for job in jobs if job.callback_url},
+        )
+    except errors.SubmitJobError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    # The last submission of a job_id listed more than once is the one stored
+    priorities = {job.job_id: job.priority for job in jobs}
+    for job_id, job_info in submitted_jobs.items():
+        submission.dispatch(job_id, job_info, priorities[job_id])
+
+    return SubmitJobsResponse(
+        results=[
+            SubmitJobResult(
+                job_id=job.job_id,
+                status_code=201,
+                detail=f"Successfully submitted the job: {job.job_id}",
+            )
+            for job in jobs
+        ]
+    )
+
+
+@app.delete("/jobs/{job_id}", status_code=204)
+async def delete_job(
+    job_id: Annotated[str, Path(description="ID of the job to delete")],
+) -> Response:
+    """Deletes the given job_id, whatever its status
+
+    Args:
+        job_id: str: ID of the job to delete
+
+    Returns: An empty response
+    """
+    try:
+        deleted = await asyncio.to_thread(database.fake_delete_job, job_id)
+    except errors.DeleteJobError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    if not deleted:
+        raise HTTPException(
+            status_code=404, detail=f"Job ID {job_id} could not be found"
+        )
+
+    try:
+        await asyncio.to_thread(results.RESULT_STORE.delete, job_id)
+    except errors.ResultError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    return Response(status_code=204)
+
+
+def _is_modified_since(result: results.ResultFile, if_modified_since: Optional[str]) -> bool:
+    """Whether the file was modified after the If-Modified-Since header's date
+    (or the header is missing, or isn't a date)
+    """
+    if not if_modified_since:
+        return True
+
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return True
+
+    # Last-Modified only has a precision of a second
+    return int(result.modified_at) > since
+
+
+@app.api_route("/result/{job_id}", methods=["GET", "HEAD"])
+async def get_job_result(
+    job_id: Annotated[str, Path(description="ID of the job whose output to download")],
+    range_header: Annotated[Optional[str], Header(alias="range")] = None,
+    if_range: Annotated[Optional[str], Header()] = None,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    if_modified_since: Annotated[Optional[str], Header()] = None,
+) -> Response:
+    """Returns the output file of the given (completed) job_id
+
+    Args:
+        job_id: str: ID of the job whose output to download
+        range_header: str: Range header asking for a single byte range of the
+        file, e.g. "bytes=0-1048575". Several ranges get the whole file.
+        if_range: str: ETag or Last-Modified date the range is only honoured for,
+        i.e. the whole file is returned if it has changed since
+        if_none_match: str: ETag(s) of the client's copy of the file. A 304 is
+        returned if the file hasn't changed.
+        if_modified_since: str: Date of the client's copy of the file. A 304 is
+        returned if the file hasn't changed since (unless If-None-Match is sent).
+
+    Returns:
+        The file (200), or the requested range of it (206, with a Content-Range
+        header), with its ETag and Last-Modified date. A 409 if the job isn't
+        "completed", a 416 if the range isn't within the file.
+    """
+    job_info, status = await asyncio.to_thread(_read_job_status, job_id)
+    if status != "completed":
+        raise HTTPException(
+            status_code=409, detail=f"Job ID {job_id} is {status}, it has no output"
+        )
+
+    try:
+        result = await asyncio.to_thread(
+            results.RESULT_STORE.get_or_create, job_id, job_info
+        )
+    except errors.ResultError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    headers = {
+        "ETag": result.etag,
+        "Last-Modified": result.last_modified,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "no-cache",
+    }
+    # If-None-Match takes precedence over If-Modified-Since
+    if (
+        _etag_matches(if_none_match, result.etag)
+        if if_none_match
+        else not _is_modified_since(result, if_modified_since)
+    ):
+        return Response(status_code=304, headers=headers)
+
+    if config.RESULT_ACCEL_REDIRECT_PREFIX:
+        # The reverse proxy sends the file (and handles the Range header) itself
+        location = f"{config.RESULT_ACCEL_REDIRECT_PREFIX.rstrip('/')}/"
+        location += results.RESULT_STORE.file_name(job_id)
+        return Response(
+            headers={**headers, "X-Accel-Redirect": location},
+            media_type="application/octet-stream",
+        )
+
+    byte_range = None
+    if not if_range or if_range in (result.etag, result.last_modified):
+        try:
+            byte_range = results.parse_range(range_header, result.size)
+        except errors.RangeNotSatisfiableError:
+            return Response(
+                status_code=416,
+                headers={**headers, "Content-Range": f"bytes */{result.size}"},
+            )
+
+    if not byte_range:
+        return results.FileRangeResponse(result.path, 0, result.size, headers=headers)
+
+    first, last = byte_range
+    return results.FileRangeResponse(
+        result.path,
+        first,
+        last - first + 1,
+        status_code=206,
+        headers={**headers, "Content-Range": f"bytes {first}-{last}/{result.size}"},
+    )
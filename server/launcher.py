@@ -0,0 +1,109 @@
+"""Entry point for running the server with one or more worker processes.
+
+Job state is shared across the workers through the job store, so running more
+than one worker requires a store living outside of the processes ("sqlite" or
+"redis"). The workers inherit the store settings through the environment.
+
+Usage: python -m server --workers 4 [--job-store sqlite] [--port 8000]
+"""
+
+from typing import Optional, Sequence
+
+import argparse
+import os
+import socket
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from server import config
+
+# Job stores living in the worker's own memory, which other workers can't see
+_PROCESS_LOCAL_JOB_STORES = ("memory", "compact")
+
+
+def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    """Parses and validates the command line arguments"""
+    parser = argparse.ArgumentParser(prog="python -m server", description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes, e.g. the number of CPU cores (default 1)",
+    )
+    parser.add_argument(
+        "--job-store",
+        choices=["memory", "compact", "sqlite", "redis"],
+        help="Job store backend (default: JOB_STORE_BACKEND, or 'sqlite' "
+        "when running more than one worker)",
+    )
+    parser.add_argument("--sqlite-path", default=config.JOB_STORE_SQLITE_PATH)
+    parser.add_argument("--redis-url", default=config.JOB_STORE_REDIS_URL)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    if args.job_store is None:
+        args.job_store = config.JOB_STORE_BACKEND
+        if args.workers > 1 and args.job_store in _PROCESS_LOCAL_JOB_STORES:
+            args.job_store = "sqlite"
+
+    if args.workers > 1 and args.job_store in _PROCESS_LOCAL_JOB_STORES:
+        parser.error(
+            f"the '{args.job_store}' job store can't be shared across workers. "
+            "Use --job-store sqlite or --job-store redis"
+        )
+
+    return args
+
+
+def _bind_socket(host: str, port: int) -> socket.socket:
+    """Binds the listening socket shared by all the workers.
+
+    uvicorn's own (`socket.socket(family)`) has a protocol number of 0, which keeps
+    asyncio from enabling TCP_NODELAY on the accepted connections. Responses are
+    sent in multiple writes, so that'd add a ~40ms delayed-ACK stall to each one.
+    """
+    family, kind, proto, _, address = socket.getaddrinfo(
+        host, port, type=socket.SOCK_STREAM, proto=socket.IPPROTO_TCP
+    )[0]
+    sock = socket.socket(family, kind, proto)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(address)
+    sock.set_inheritable(True)
+
+    return sock
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Runs `server.handlers:app` on the requested number of workers"""
+    args = _parse_args(argv)
+
+    # The workers are separate processes that read their settings from the environment
+    os.environ["JOB_STORE_BACKEND"] = args.job_store
+    os.environ["JOB_STORE_SQLITE_PATH"] = os.path.abspath(args.sqlite_path)
+    os.environ["JOB_STORE_REDIS_URL"] = args.redis_url
+
+    uvicorn_config = uvicorn.Config(
+        "server.handlers:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=args.log_level,
+    )
+    server = uvicorn.Server(uvicorn_config)
+
+    if args.workers == 1:
+        server.run()
+        return
+
+    sock = _bind_socket(args.host, args.port)
+    Multiprocess(uvicorn_config, target=server.run, sockets=[sock]).run()
+
+
+if __name__ == "__main__":
+    main()
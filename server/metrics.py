@@ -0,0 +1,301 @@
+"""Counters and latency histograms of the server, exposed in the Prometheus text
+exposition format (https://prometheus.io/docs/instrumenting/exposition_formats/)
+
+Recording is cheap: a lock-protected increment per metric. Everything can be
+turned off through config.METRICS_ENABLED, in which case `instrument` leaves the
+functions it decorates untouched and the middleware isn't installed.
+"""
+
+from abc import ABC, abstractmethod
+from functools import wraps
+from typing import Callable, Iterable, Optional, TypeVar
+
+import bisect
+import math
+import threading
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from server import config
+
+F = TypeVar("F", bound=Callable)
+
+Labels = tuple[str, ...]
+
+# Upper bounds (in seconds) of the latency histograms' buckets
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60
+)
+
+
+def _escape(label_value: str) -> str:
+    """Escapes a label value for the text format"""
+    return label_value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    """Formats the labels of a sample, e.g. {method="GET",status="200"}"""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """Formats a sample's value"""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric(ABC):
+    """Base of the metrics: a named family of samples, one per combination of label values"""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Labels = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def samples(self) -> Iterable[tuple[str, str, float]]:
+        """Yields the (suffixed name, formatted labels, value) of every sample"""
+
+    def render(self) -> str:
+        """Returns the metric in the text exposition format"""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines += [
+            f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples()
+        ]
+        return "\n".join(lines) + "\n"
+
+
+class Counter(Metric):
+    """Value that only ever goes up, e.g. the number of requests served"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Labels = ()) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """Increments the sample of the given label values"""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        """Returns the sample of the given label values"""
+        return self._values.get(label_values, 0)
+
+    def samples(self) -> Iterable[tuple[str, str, float]]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            yield self.name, _format_labels(self.label_names, label_values), value
+
+
+class Histogram(Metric):
+    """Distribution of observed values (e.g. latencies) over cumulative buckets"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Labels = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: the count of every bucket (non-cumulative, the last
+        # one being +Inf), and the sum of the observed values
+        self._counts: dict[Labels, list[int]] = {}
+        self._sums: dict[Labels, float] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Records the value in the sample of the given label values"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(label_values)
+            if counts is None:
+                counts = self._counts[label_values] = [0] * (len(self.buckets) + 1)
+                self._sums[label_values] = 0.0
+            counts[index] += 1
+            self._sums[label_values] += value
+
+    def samples(self) -> Iterable[tuple[str, str, float]]:
+        with self._lock:
+            snapshot = sorted(
+                (label_values, list(counts), self._sums[label_values])
+                for label_values, counts in self._counts.items()
+            )
+        label_names = (*self.label_names, "le")
+        for label_values, counts, total in snapshot:
+            cumulative = 0
+            for upper_bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                labels = _format_labels(label_names, (*label_values, _format_value(upper_bound)))
+                yield f"{self.name}_bucket", labels, cumulative
+            labels = _format_labels(self.label_names, label_values)
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class CallbackMetric(Metric):
+    """Metric whose samples are read (by calling `callback`) when it's rendered,
+    e.g. a gauge of the number of stored jobs. The callback returns the value
+    of every combination of label values.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], dict[Labels, float]],
+        label_names: Labels = (),
+        type_name: str = "gauge",
+    ) -> None:
+        # pylint: disable=too-many-arguments
+
+        super().__init__(name, documentation, label_names)
+        self.callback = callback
+        self.type_name = type_name
+
+    def samples(self) -> Iterable[tuple[str, str, float]]:
+        for label_values, value in sorted(self.callback().items()):
+            yield self.name, _format_labels(self.label_names, label_values), value
+
+
+class Registry:
+    """Set of metrics rendered together"""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Adds the metric (replacing any metric of the same name). Returns it"""
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Returns every metric in the text exposition format"""
+        return "".join(metric.render() for metric in self._metrics.values())
+
+
+# Metrics served by GET /metrics
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(
+    Counter(
+        "http_requests_total",
+        "HTTP requests served, by method, route and status code",
+        ("method", "route", "status"),
+    )
+)
+HTTP_REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time spent serving the HTTP requests (long-polls and streams included), "
+        "by method and route",
+        ("method", "route"),
+    )
+)
+DATABASE_OPERATIONS = REGISTRY.register(
+    Counter(
+        "database_operations_total",
+        "Calls to the database functions, by operation and outcome (ok/error)",
+        ("operation", "outcome"),
+    )
+)
+DATABASE_OPERATION_DURATION = REGISTRY.register(
+    Histogram(
+        "database_operation_duration_seconds",
+        "Time spent in the database functions, by operation",
+        ("operation",),
+    )
+)
+JOBS_SUBMITTED = REGISTRY.register(
+    Counter("jobs_submitted_total", "Jobs submitted, one at a time or in batches")
+)
+SUBMISSIONS_REJECTED = REGISTRY.register(
+    Counter(
+        "submissions_rejected_total",
+        "Jobs whose submission was rejected by the admission control, by reason",
+        ("reason",),
+    )
+)
+JOB_TRANSITIONS = REGISTRY.register(
+    Counter(
+        "job_transitions_total",
+        "Jobs that moved to another status, by the status they moved to",
+        ("status",),
+    )
+)
+
+
+def instrument(operation: str) -> Callable[[F], F]:
+    """Decorator counting and timing the calls to a database function as the
+    given operation. A no-op when the metrics are disabled.
+    """
+
+    def decorator(function: F) -> F:
+        if not config.METRICS_ENABLED:
+            return function
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            started_at = time.perf_counter()
+            outcome = "error"
+            try:
+                result = function(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                DATABASE_OPERATIONS.inc(operation, outcome)
+                DATABASE_OPERATION_DURATION.observe(
+                    time.perf_counter() - started_at, operation
+                )
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+class MetricsMiddleware:  # pylint: disable=too-few-public-methods
+    """ASGI middleware counting and timing the HTTP requests, by route template
+    (e.g. "/status/{job_id}") so that the number of samples stays bounded
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        status_code: Optional[int] = None
+
+        async def send_and_record_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record_status)
+        finally:
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUESTS.inc(scope["method"], route_path, str(status_code or 500))
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started_at, scope["method"], route_path
+            )
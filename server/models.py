@@ -0,0 +1,49 @@
+"""Records stored in the database"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Literal, Optional
+
+from server import config
+
+
+@dataclass
+class Job:
+    """Attributes of every Job object/record"""
+
+    delay: int
+    random_num: float
+    started_at: datetime
+    status: Literal["completed", "error", "pending"]
+    finished_at: Optional[datetime] = None  # When the job reached "completed"/"error"
+    callback_url: Optional[str] = None  # Notified once the job reaches "completed"/"error"
+
+    @property
+    def completes_at(self) -> datetime:
+        """Point in time at which the job finishes processing"""
+        return self.started_at + timedelta(seconds=self.delay)
+
+    @property
+    def outcome(self) -> Literal["completed", "error"]:
+        """Terminal state the job moves to once it's due"""
+        # Want "error" JOB_ERROR_RATE (20% by default) of the times
+        return "error" if self.random_num <= config.JOB_ERROR_RATE else "completed"
+
+    @property
+    def due_at(self) -> datetime:
+        """Point in time at which the job moves to its terminal state. Jobs bound
+        to fail do so straight away, the others when they finish processing.
+        """
+        return self.started_at if self.outcome == "error" else self.completes_at
+
+    @property
+    def expiry_basis(self) -> Optional[datetime]:
+        """Point in time from which the job's retention period is counted: when it
+        reached its terminal state or, if nobody has looked at it since, when it
+        finished processing. None for the jobs that are queued for the worker pool
+        (JOB_EXECUTION_MODE "pool"), which never expire before the pool finishes them.
+        """
+        if self.finished_at is None and config.JOB_EXECUTION_MODE == "pool":
+            return None
+
+        return self.finished_at or self.completes_at
@@ -0,0 +1,104 @@
+"""Entry point to the operational APIs: GET /stats, GET /healthz,
+GET /webhooks/dead-letters and GET /metrics
+"""
+
+from dataclasses import dataclass
+from typing import Literal
+
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Response
+
+from server import config, database, errors, metrics, sweeper, webhooks
+
+router = APIRouter()
+
+
+@dataclass
+class GetStatsResponse:
+    """DTO for the /stats API's response object"""
+
+    live_jobs: int
+    evicted_jobs: int
+
+
+@dataclass
+class GetHealthResponse:
+    """DTO for the /healthz API's response object"""
+
+    status: Literal["ok"]
+
+
+@dataclass
+class GetDeadLettersResponse:
+    """DTO for the /webhooks/dead-letters API's response object"""
+
+    dead_letters: list[webhooks.DeadLetter]
+
+
+@router.get("/stats")
+async def get_stats() -> GetStatsResponse:
+    """Returns the number of jobs currently stored, and the number of expired
+    jobs this server process has evicted since it started
+
+    Returns: {"live_jobs": int, "evicted_jobs": int}
+    """
+    try:
+        live_jobs = await asyncio.to_thread(database.fake_count_jobs)
+    except errors.GetJobInfoError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    return GetStatsResponse(
+        live_jobs=live_jobs, evicted_jobs=sweeper.JOB_SWEEPER.evicted_jobs
+    )
+
+
+@router.get("/healthz")
+async def get_health() -> GetHealthResponse:
+    """Returns whether the server can serve the jobs, i.e. its job store answers.
+    Meant for load balancers and the client's health checks, so it's cheap: a
+    single lookup of a job that doesn't exist.
+
+    Returns: {"status": "ok"}, or a 503 if the job store can't be reached
+    """
+    try:
+        await asyncio.to_thread(database.fake_get_job_info, "__healthz__")
+    except errors.GetJobInfoError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    return GetHealthResponse(status="ok")
+
+
+@router.get("/webhooks/dead-letters")
+async def get_dead_letters() -> GetDeadLettersResponse:
+    """Returns the most recent callbacks this server process failed to deliver,
+    oldest first
+
+    Returns: {"dead_letters": [{"job_id", "callback_url", "result", "attempts",
+    "error", "failed_at"}, ...]}
+    """
+    return GetDeadLettersResponse(
+        dead_letters=list(webhooks.WEBHOOK_DISPATCHER.dead_letters)
+    )
+
+
+@router.get("/metrics")
+async def get_metrics() -> Response:
+    """Returns the server's metrics in the Prometheus text exposition format:
+    the HTTP requests (count and latency, by route), the database operations,
+    the submitted jobs, the status transitions and the stored jobs by status.
+
+    Returns 404 when the metrics are disabled (METRICS_ENABLED=0).
+    """
+    if not config.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+
+    try:
+        # Counting the jobs by status may scan the store
+        content = await asyncio.to_thread(metrics.REGISTRY.render)
+    except errors.GetJobInfoError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    return Response(
+        content=content, media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
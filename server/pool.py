@@ -0,0 +1,296 @@
+"""Bounded pool of workers processing the queued jobs, highest priority first"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+import asyncio
+import bisect
+import itertools
+import logging
+import threading
+
+from server import clock, config, database, errors
+from server.models import Job
+
+logger = logging.getLogger(__name__)
+
+# Processes a job: returns once the work is done
+Work = Callable[[str, Job], Awaitable[None]]
+
+
+async def simulate_work(job_id: str, job: Job) -> None:  # pylint: disable=unused-argument
+    """Mimicks processing the job: jobs bound to fail do so straight away, the
+    others take `delay` seconds
+    """
+    await asyncio.sleep(_work_seconds(job))
+
+
+def _work_seconds(job: Job) -> float:
+    """Returns the seconds the job is expected to keep a worker busy for"""
+    return (job.due_at - job.started_at).total_seconds()
+
+
+@dataclass
+class JobEstimate:
+    """DTO describing where a job stands in the pool, and when it should be done.
+    `queue_position` is 1 for the next job to be processed, 0 once it's processing.
+    """
+
+    queue_position: int
+    estimated_completion_at: datetime
+
+
+class _FifoQueue:
+    """Jobs of a single priority, first in first out. Jobs are identified by
+    their (increasing) sequence number, so that their rank is a binary search away.
+    """
+
+    def __init__(self) -> None:
+        self._sequences: list[int] = []
+        self._job_ids: list[str] = []
+        self._head = 0  # Index of the first job still queued
+
+    def __len__(self) -> int:
+        return len(self._sequences) - self._head
+
+    def push(self, sequence: int, job_id: str) -> None:
+        """Queues the job, which must have the highest sequence number so far"""
+        self._sequences.append(sequence)
+        self._job_ids.append(job_id)
+
+    def pop(self) -> str:
+        """Dequeues the first job. Returns its job_id"""
+        job_id = self._job_ids[self._head]
+        self._head += 1
+        # Dropping the dequeued jobs once they make up most of the lists
+        if self._head > 1024 and self._head * 2 > len(self._sequences):
+            del self._sequences[: self._head]
+            del self._job_ids[: self._head]
+            self._head = 0
+
+        return job_id
+
+    def rank(self, sequence: int) -> int:
+        """Returns the number of jobs queued ahead of the given one"""
+        return bisect.bisect_left(self._sequences, sequence, self._head) - self._head
+
+    def remove(self, sequence: int) -> None:
+        """Removes the given job from the queue"""
+        index = bisect.bisect_left(self._sequences, sequence, self._head)
+        if index < len(self._sequences) and self._sequences[index] == sequence:
+            del self._sequences[index]
+            del self._job_ids[index]
+
+
+@dataclass
+class _QueuedJob:
+    """A job waiting in the queue"""
+
+    priority: int
+    sequence: int
+    job: Job
+
+
+@dataclass
+class _RunningJob:
+    """A job being processed by a worker"""
+
+    job: Job
+    finishes_at: float  # clock.monotonic() at which it's expected to be done
+
+
+class WorkerPool:  # pylint: disable=too-many-instance-attributes
+    """Processes the submitted jobs on a bounded number of workers, moving each
+    one to its terminal state once processed (which is announced on
+    `events.JOB_TRANSITIONS`).
+
+    Queued jobs are taken highest priority first, and in submission order within
+    a priority. Jobs are checked against the stored record when a worker takes
+    them, so those that have been deleted, resubmitted or already moved on are
+    skipped. Resubmitting a job re-queues it behind the jobs of its new priority.
+
+    The queue only holds the jobs submitted to this process, and lives in memory:
+    jobs queued when the server stops are queued again (at the default priority)
+    when it starts.
+
+    Attributes:
+        workers: int -> Number of jobs processed at once.
+        work: Work -> Coroutine function processing a job. (default simulate_work).
+        processed_jobs: int -> Number of jobs moved on by this process' pool so far.
+    """
+
+    def __init__(self, workers: int = config.JOB_WORKERS, work: Work = simulate_work) -> None:
+        self.workers = workers
+        self.work = work
+        self.processed_jobs = 0
+        self._queues: dict[int, _FifoQueue] = {}  # By priority
+        self._queued_jobs: dict[str, _QueuedJob] = {}
+        self._queued_work_seconds = 0.0
+        self._running_jobs: dict[str, _RunningJob] = {}
+        self._sequences = itertools.count()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def queued_jobs(self) -> int:
+        """Number of jobs waiting for a worker"""
+        return len(self._queued_jobs)
+
+    @property
+    def busy_workers(self) -> int:
+        """Number of workers processing a job"""
+        return len(self._running_jobs)
+
+    def _dequeue(self, job_id: str) -> None:
+        """Removes the job from the queue, if it's queued. Requires the lock"""
+        queued_job = self._queued_jobs.pop(job_id, None)
+        if queued_job is not None:
+            self._queues[queued_job.priority].remove(queued_job.sequence)
+            self._queued_work_seconds -= _work_seconds(queued_job.job)
+
+    def submit(self, job_id: str, job: Job, priority: int = 0) -> None:
+        """Queues the job (replacing its previous submission, if it's still queued).
+        Safe to call from any thread.
+        """
+        with self._lock:
+            self._dequeue(job_id)
+            sequence = next(self._sequences)
+            self._queues.setdefault(priority, _FifoQueue()).push(sequence, job_id)
+            self._queued_jobs[job_id] = _QueuedJob(priority, sequence, job)
+            self._queued_work_seconds += _work_seconds(job)
+
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None:
+            loop.call_soon_threadsafe(wakeup.set)
+
+    def _take(self) -> Optional[tuple[str, Job]]:
+        """Takes the next job off the queue, if there's one"""
+        with self._lock:
+            queues = [priority for priority, queue in self._queues.items() if queue]
+            if not queues:
+                return None
+
+            job_id = self._queues[max(queues)].pop()
+            queued_job = self._queued_jobs.pop(job_id)
+            self._queued_work_seconds -= _work_seconds(queued_job.job)
+            return job_id, queued_job.job
+
+    def estimate(self, job_id: str, job: Job) -> Optional[JobEstimate]:
+        """Returns the position of the given submission of the job, and its
+        estimated completion time, or None if it isn't in this pool.
+
+        Queued jobs are expected to start once a worker is free and the jobs
+        ahead of them have been spread over the workers, each taking as long
+        as the average queued job.
+        """
+        now = clock.monotonic()
+        with self._lock:
+            running_job = self._running_jobs.get(job_id)
+            if running_job is not None and running_job.job.started_at == job.started_at:
+                return JobEstimate(
+                    queue_position=0,
+                    estimated_completion_at=clock.now()
+                    + timedelta(seconds=max(0.0, running_job.finishes_at - now)),
+                )
+
+            queued_job = self._queued_jobs.get(job_id)
+            if queued_job is None or queued_job.job.started_at != job.started_at:
+                return None
+
+            jobs_ahead = self._queues[queued_job.priority].rank(queued_job.sequence) + sum(
+                len(queue)
+                for priority, queue in self._queues.items()
+                if priority > queued_job.priority
+            )
+            if len(self._running_jobs) < self.workers:
+                seconds_until_free = 0.0
+            else:
+                seconds_until_free = max(
+                    0.0, min(other.finishes_at for other in self._running_jobs.values()) - now
+                )
+            average_work_seconds = self._queued_work_seconds / len(self._queued_jobs)
+
+        seconds = (
+            seconds_until_free
+            + jobs_ahead // self.workers * average_work_seconds
+            + _work_seconds(job)
+        )
+        return JobEstimate(
+            queue_position=jobs_ahead + 1,
+            estimated_completion_at=clock.now() + timedelta(seconds=seconds),
+        )
+
+    def _is_current(self, job_id: str, job: Job) -> bool:
+        """Whether the job's stored record is still this pending submission"""
+        stored_job = database.fake_get_job_info(job_id)
+        return (
+            stored_job is not None
+            and stored_job.status == "pending"
+            and stored_job.started_at == job.started_at
+        )
+
+    async def _process(self, job_id: str, job: Job) -> bool:
+        """Processes the job and moves it to its terminal state, if it's still
+        current. Returns whether it was moved on.
+        """
+        try:
+            if not await asyncio.to_thread(self._is_current, job_id, job):
+                return False
+        except errors.GetJobInfoError:
+            logger.exception("Failed to get the info of the job %s", job_id)
+            return False
+
+        running_job = _RunningJob(job, clock.monotonic() + _work_seconds(job))
+        with self._lock:
+            self._running_jobs[job_id] = running_job
+        try:
+            await self.work(job_id, job)
+            if not await asyncio.to_thread(self._is_current, job_id, job):
+                return False
+
+            await asyncio.to_thread(
+                database.fake_update_job_status, job_id, job.outcome, job.callback_url
+            )
+            return True
+        except (errors.GetJobInfoError, errors.UpdateJobStatusError):
+            logger.exception("Failed to move the job %s to its terminal state", job_id)
+            return False
+        finally:
+            with self._lock:
+                # Unless the job was resubmitted and taken by another worker since
+                if self._running_jobs.get(job_id) is running_job:
+                    del self._running_jobs[job_id]
+
+    async def _run_worker(self, wakeup: asyncio.Event) -> None:
+        """Processes the queued jobs one at a time, until cancelled"""
+        while True:
+            wakeup.clear()
+            next_job = self._take()
+            if next_job is None:
+                await wakeup.wait()
+                continue
+
+            if await self._process(*next_job):
+                self.processed_jobs += 1
+
+    async def run(self) -> None:
+        """Runs the workers, until cancelled"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        workers = [
+            asyncio.create_task(self._run_worker(self._wakeup)) for _ in range(self.workers)
+        ]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._loop = None
+            self._wakeup = None
+
+
+# Pool run by the server when config.JOB_EXECUTION_MODE is "pool"
+WORKER_POOL = WorkerPool()
@@ -0,0 +1,231 @@
+"""Output files of the completed jobs, and the responses serving them.
+
+Jobs don't actually translate anything, so every completed job gets a stand-in
+output: `size` pseudo-random bytes, seeded by the job's submission, generated
+the first time it's asked for.
+
+Files are sent without going through Python's memory whenever possible: through
+the reverse proxy (X-Accel-Redirect) if one is configured, or else through the
+ASGI server's zero-copy extensions (http.response.zerocopysend, or
+http.response.pathsend for whole files) if it offers them. Otherwise they're
+read and sent one block at a time.
+"""
+
+from dataclasses import dataclass
+from email.utils import formatdate
+from typing import Iterable, Optional
+
+import asyncio
+import hashlib
+import os
+import random
+import re
+import secrets
+
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from server import config, errors
+from server.models import Job
+
+# Bytes read from the file (on a worker thread) per message, when it's sent from Python
+_BLOCK_SIZE = 256 * 2**10
+
+# A single byte range, e.g. "bytes=0-499", "bytes=500-" or "bytes=-500"
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+@dataclass
+class ResultFile:
+    """DTO describing a job's output file"""
+
+    path: str
+    size: int
+    modified_at: float  # Seconds since the epoch
+
+    @property
+    def etag(self) -> str:
+        """Strong ETag of the file's current content"""
+        return f'"{self.size:x}-{int(self.modified_at * 1e6):x}"'
+
+    @property
+    def last_modified(self) -> str:
+        """Last-Modified header of the file"""
+        return formatdate(self.modified_at, usegmt=True)
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """Returns the first and last byte (inclusive) of the single byte range of
+    the Range header, or None if there's no range to honour (no header, or one
+    that can't be parsed, or asks for several ranges, which are served whole).
+
+    Raises: RangeNotSatisfiableError if the range isn't within the file
+    """
+    match = _RANGE_PATTERN.match(header.strip()) if header else None
+    if not match or match.groups() == ("", ""):
+        return None
+
+    first, last = match.groups()
+    if not first:  # The last `last` bytes
+        if int(last) == 0 or size == 0:
+            raise errors.RangeNotSatisfiableError(header)
+        return max(0, size - int(last)), size - 1
+
+    if last and int(last) < int(first):
+        return None
+    if int(first) >= size:
+        raise errors.RangeNotSatisfiableError(header)
+    return int(first), min(int(last), size - 1) if last else size - 1
+
+
+class ResultStore:
+    """Output files of the jobs, in the given directory"""
+
+    def __init__(
+        self,
+        directory: str = config.RESULT_DIRECTORY,
+        standin_size: int = config.RESULT_STANDIN_SIZE,
+    ) -> None:
+        self.directory = directory
+        self.standin_size = standin_size
+
+    def file_name(self, job_id: str) -> str:
+        """Returns the name of the job's output file (job IDs can hold any character)"""
+        return hashlib.sha256(job_id.encode()).hexdigest()
+
+    def _write_standin(self, path: str, job: Job) -> None:
+        """Writes the stand-in output of the job, atomically"""
+        rng = random.Random(f"{path}-{job.started_at.timestamp()!r}")
+        temporary_path = f"{path}.{secrets.token_hex(4)}"
+        try:
+            with open(temporary_path, "wb") as file:
+                for offset in range(0, self.standin_size, _BLOCK_SIZE):
+                    file.write(rng.randbytes(min(_BLOCK_SIZE, self.standin_size - offset)))
+            os.replace(temporary_path, path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+    def get_or_create(self, job_id: str, job: Job) -> ResultFile:
+        """Returns the output file of the (completed) job, creating it if need
+        be, e.g. the first time it's asked for or after the job was resubmitted
+        """
+        path = os.path.join(self.directory, self.file_name(job_id))
+        try:
+            try:
+                stat = os.stat(path)
+                is_stale = stat.st_mtime < job.started_at.timestamp()
+            except FileNotFoundError:
+                is_stale = True
+
+            if is_stale:
+                os.makedirs(self.directory, exist_ok=True)
+                self._write_standin(path, job)
+                stat = os.stat(path)
+        except OSError as e:
+            raise errors.ResultError(f"Failed to get {job_id}'s output") from e
+
+        return ResultFile(path=path, size=stat.st_size, modified_at=stat.st_mtime)
+
+    def delete(self, job_id: str) -> None:
+        """Deletes the job's output file, if there's one"""
+        try:
+            os.remove(os.path.join(self.directory, self.file_name(job_id)))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            raise errors.ResultError(f"Failed to delete {job_id}'s output") from e
+
+    def delete_many(self, job_ids: Iterable[str]) -> None:
+        """Deletes the output files of the jobs, e.g. of the expired ones"""
+        for job_id in job_ids:
+            self.delete(job_id)
+
+
+class FileRangeResponse(Response):
+    """Response sending `length` bytes of the file, from `offset`, without
+    reading them into memory when the ASGI server can send them itself
+    """
+
+    def __init__(
+        self,
+        path: str,
+        offset: int,
+        length: int,
+        status_code: int = 200,
+        headers: Optional[dict[str, str]] = None,
+        media_type: str = "application/octet-stream",
+        background: Optional[BackgroundTask] = None,
+    ) -> None:
+        # pylint: disable=super-init-not-called,too-many-arguments
+
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = background
+        self.init_headers({**(headers or {}), "Content-Length": str(length)})
+
+    async def _send_blocks(self, send: Send) -> None:
+        """Sends the bytes one block at a time, reading them on a worker thread"""
+        file = await asyncio.to_thread(open, self.path, "rb")
+        try:
+            await asyncio.to_thread(file.seek, self.offset)
+            remaining = self.length
+            while remaining:
+                block = await asyncio.to_thread(file.read, min(_BLOCK_SIZE, remaining))
+                if not block:  # The file was truncated underneath
+                    break
+                remaining -= len(block)
+                await send(
+                    {"type": "http.response.body", "body": block, "more_body": remaining > 0}
+                )
+        finally:
+            await asyncio.to_thread(file.close)
+
+        if remaining:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+
+        extensions = scope.get("extensions") or {}
+        if scope["method"] == "HEAD" or not self.length:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopysend" in extensions:
+            file = await asyncio.to_thread(open, self.path, "rb")
+            try:
+                await send(
+                    {
+                        "type": "http.response.zerocopysend",
+                        "file": file.fileno(),
+                        "offset": self.offset,
+                        "count": self.length,
+                    }
+                )
+            finally:
+                file.close()
+        elif (
+            "http.response.pathsend" in extensions
+            and self.offset == 0
+            and self.length == (await asyncio.to_thread(os.stat, self.path)).st_size
+        ):
+            await send({"type": "http.response.pathsend", "path": self.path})
+        else:
+            await self._send_blocks(send)
+
+        if self.background is not None:
+            await self.background()
+
+
+# Output files of the jobs completed by the server
+RESULT_STORE = ResultStore()
@@ -0,0 +1,171 @@
+"""Background task moving the jobs to their terminal state as soon as they're due"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+import asyncio
+import heapq
+import logging
+import threading
+
+from server import clock, config, database, errors
+from server.models import Job
+
+logger = logging.getLogger(__name__)
+
+
+class JobScheduler:
+    """Moves the scheduled jobs to "completed"/"error" at their `due_at`, whether
+    or not anybody polls them. Each transition is announced on
+    `events.JOB_TRANSITIONS`, for streams (and any other subscriber) to pick up.
+
+    A min-heap of (due_at, job_id, failed attempts) entries is kept in memory.
+    Entries are checked against the stored record when they're due, so those of
+    jobs that have been deleted, resubmitted or already moved on (e.g. by another
+    worker) are skipped. Due jobs are transitioned in batches of `batch_size`, each
+    on a worker thread. The jobs that couldn't be read or updated are pushed back,
+    due again after a backoff that doubles with every failed attempt (up to
+    config.JOB_SCHEDULER_MAX_BACKOFF_SECONDS).
+
+    The heap only holds the jobs scheduled by this process (the server schedules
+    the stored pending jobs when it starts, see handlers.py), so reading a pending
+    job that's overdue still moves it to its terminal state.
+
+    Attributes:
+        batch_size: int -> Maximum number of jobs transitioned at once.
+        backoff_seconds: float -> Seconds waited before retrying a job after its first failure.
+        transitioned_jobs: int -> Number of jobs moved on by this process' scheduler so far.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = config.JOB_SCHEDULER_BATCH_SIZE,
+        backoff_seconds: float = config.JOB_SCHEDULER_BACKOFF_SECONDS,
+    ) -> None:
+        self.batch_size = batch_size
+        self.backoff_seconds = backoff_seconds
+        self.transitioned_jobs = 0
+        self._due_jobs: list[tuple[datetime, str, int]] = []
+        self._due_jobs_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def schedule(self, job_id: str, job: Job) -> None:
+        """Schedules the job's transition at its `due_at`. Safe to call from any thread"""
+        self._push((job.due_at, job_id, 0))
+
+    def _retry(self, job_id: str, failed_attempts: int) -> None:
+        """Schedules the job's transition again, after a backoff"""
+        # Capping the exponent too, as jobs may keep failing for as long as the store is down
+        backoff_seconds = min(
+            self.backoff_seconds * 2 ** min(failed_attempts - 1, 32),
+            config.JOB_SCHEDULER_MAX_BACKOFF_SECONDS,
+        )
+        self._push(
+            (clock.now() + timedelta(seconds=backoff_seconds), job_id, failed_attempts)
+        )
+
+    def _push(self, entry: tuple[datetime, str, int]) -> None:
+        """Pushes the entry onto the heap, waking the scheduler up if it's the next one"""
+        with self._due_jobs_lock:
+            heapq.heappush(self._due_jobs, entry)
+            is_next = self._due_jobs[0] is entry
+
+        loop, wakeup = self._loop, self._wakeup
+        if is_next and loop is not None and wakeup is not None:
+            loop.call_soon_threadsafe(wakeup.set)
+
+    def _seconds_until_due(self) -> Optional[float]:
+        """Returns the seconds until the next job is due, or None if none is scheduled"""
+        with self._due_jobs_lock:
+            if not self._due_jobs:
+                return None
+
+            return (self._due_jobs[0][0] - clock.now()).total_seconds()
+
+    def _pop_due_jobs(self) -> dict[str, int]:
+        """Pops (at most `batch_size` of) the jobs that are due by now. Returns
+        their failed attempts so far, by job_id.
+        """
+        now = clock.now()
+        due_jobs: dict[str, int] = {}
+        with self._due_jobs_lock:
+            while (
+                self._due_jobs
+                and self._due_jobs[0][0] <= now
+                and len(due_jobs) < self.batch_size
+            ):
+                _, job_id, failed_attempts = heapq.heappop(self._due_jobs)
+                due_jobs[job_id] = max(failed_attempts, due_jobs.get(job_id, 0))
+
+        return due_jobs
+
+    def _transition(self, due_jobs: dict[str, int]) -> int:
+        """Moves the given jobs to their terminal state, if they're still pending
+        and due. Returns the number of transitioned jobs.
+        """
+        jobs_info = database.fake_get_jobs_info(due_jobs)
+        now = clock.now()
+        transitioned_jobs = 0
+
+        for job_id, job_info in jobs_info.items():
+            if not job_info or job_info.status != "pending" or job_info.due_at > now:
+                continue
+
+            try:
+                database.fake_update_job_status(
+                    job_id, job_info.outcome, job_info.callback_url
+                )
+            except errors.UpdateJobStatusError:
+                logger.exception("Failed to move the job %s to its terminal state", job_id)
+                self._retry(job_id, due_jobs[job_id] + 1)
+                continue
+
+            transitioned_jobs += 1
+
+        return transitioned_jobs
+
+    async def run_due(self) -> int:
+        """Transitions every job that's due by now. Returns how many were transitioned"""
+        transitioned_jobs = 0
+        while due_jobs := self._pop_due_jobs():
+            try:
+                transitioned = await asyncio.to_thread(self._transition, due_jobs)
+            except errors.GetJobInfoError:
+                logger.exception("Failed to get the info of the due jobs")
+                for job_id, failed_attempts in due_jobs.items():
+                    self._retry(job_id, failed_attempts + 1)
+                continue
+
+            transitioned_jobs += transitioned
+            self.transitioned_jobs += transitioned
+            await asyncio.sleep(0)
+
+        return transitioned_jobs
+
+    async def run(self) -> None:
+        """Transitions the jobs as they come due, until cancelled"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                self._wakeup.clear()
+                seconds_until_due = self._seconds_until_due()
+                if seconds_until_due is None or seconds_until_due > 0:
+                    # Scheduling an earlier job cuts the wait short
+                    try:
+                        await asyncio.wait_for(
+                            self._wakeup.wait(), timeout=seconds_until_due
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                await self.run_due()
+        finally:
+            self._loop = None
+            self._wakeup = None
+
+
+# Scheduler run by the server, for as long as it's up
+JOB_SCHEDULER = JobScheduler()
@@ -0,0 +1,44 @@
+"""Backends persisting the job records, behind the common JobStore interface"""
+
+from typing import Optional
+
+from server import config
+from server.models import Job
+from server.stores.base import JobStore
+from server.stores.compact import CompactJobStore
+from server.stores.memory import InMemoryJobStore
+from server.stores.redis import RedisJobStore
+from server.stores.sqlite import SQLiteJobStore
+
+
+def create_job_store(
+    backend: Optional[str] = None,
+    memory_jobs: Optional[dict[str, Job]] = None,
+) -> JobStore:
+    """Creates the job store of the given backend, configured as per `config`
+
+    Args:
+        backend: str: "memory", "compact", "sqlite" or "redis" (default config.JOB_STORE_BACKEND)
+        memory_jobs: dict[str, Job]: Dictionary the "memory" backend keeps its records in
+    """
+    backend = backend or config.JOB_STORE_BACKEND
+    if backend == "memory":
+        return InMemoryJobStore(memory_jobs)
+    if backend == "compact":
+        return CompactJobStore()
+    if backend == "sqlite":
+        return SQLiteJobStore(config.JOB_STORE_SQLITE_PATH)
+    if backend == "redis":
+        return RedisJobStore(config.JOB_STORE_REDIS_URL)
+
+    raise ValueError(f"Unknown job store backend: {backend}")
+
+
+__all__ = [
+    "CompactJobStore",
+    "InMemoryJobStore",
+    "JobStore",
+    "RedisJobStore",
+    "SQLiteJobStore",
+    "create_job_store",
+]
@@ -0,0 +1,114 @@
+"""Interface every job store backend implements"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable, Generic, Iterable, Iterator, Literal, Optional, Protocol, TypeVar
+
+import threading
+
+from server.models import Job
+
+
+class _Connection(Protocol):  # pylint: disable=too-few-public-methods
+    """Connection to a store's underlying storage"""
+
+    def close(self) -> None:
+        """Closes the connection"""
+
+
+C = TypeVar("C", bound=_Connection)
+
+
+class ThreadConnections(Generic[C]):
+    """Connections of a store that can't be shared across threads: every thread
+    gets its own, opened (by calling `connect`) the first time it needs one
+
+    Attributes:
+        connect: Callable[[], C] -> Opens a connection.
+    """
+
+    def __init__(self, connect: Callable[[], C]) -> None:
+        self.connect = connect
+        self._local = threading.local()
+        self._connections: list[C] = []
+        self._lock = threading.Lock()
+
+    def get(self) -> C:
+        """Returns the calling thread's connection, opening it if need be"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self.connect()
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+
+        return connection
+
+    def close(self) -> None:
+        """Closes every thread's connection. Threads open new ones if need be."""
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+class JobStore(ABC):
+    """Persists the job records, keyed by their job_id.
+
+    Implementations raise whatever their underlying storage raises: translating
+    that into the server's own exceptions is left to the `database` module.
+    """
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """Returns the job's record, or None if there's no such job"""
+
+    @abstractmethod
+    def get_many(self, job_ids: Iterable[str]) -> dict[str, Optional[Job]]:
+        """Returns the record (or None) of every given job"""
+
+    @abstractmethod
+    def iter_pending(self) -> Iterator[tuple[str, Job]]:
+        """Yields the job_id and record of every pending job"""
+
+    @abstractmethod
+    def put(self, job_id: str, job: Job) -> None:
+        """Creates (or overwrites) the job's record"""
+
+    @abstractmethod
+    def put_many(self, jobs: dict[str, Job]) -> None:
+        """Creates (or overwrites) the records of all the given jobs at once"""
+
+    @abstractmethod
+    def update_status(
+        self,
+        job_id: str,
+        status: Literal["completed", "error", "pending"],
+        updated_at: datetime,
+    ) -> Literal["completed", "error", "pending"]:
+        """Updates the job's status and returns its previous status. When the job
+        moves to "completed"/"error", `updated_at` is recorded as its `finished_at`.
+        Raises a KeyError if there's no such job.
+        """
+
+    @abstractmethod
+    def delete(self, job_id: str) -> bool:
+        """Deletes the job's record. Returns whether there was one to delete"""
+
+    @abstractmethod
+    def delete_expired(self, cutoff: datetime, limit: int) -> list[str]:
+        """Deletes (at most `limit` of) the jobs whose `expiry_basis` is before the
+        cutoff, sparing the ones without any. Returns the job_ids of the deleted jobs.
+        """
+
+    @abstractmethod
+    def count(self) -> int:
+        """Returns the number of stored jobs"""
+
+    @abstractmethod
+    def count_by_status(self) -> dict[str, int]:
+        """Returns the number of stored jobs of each status (that has any)"""
+
+    def close(self) -> None:
+        """Releases the resources (e.g. connections) held by the store"""
@@ -0,0 +1,234 @@
+"""Job store keeping the records in a compact, columnar in-memory table"""
+
+from array import array
+from datetime import datetime
+from typing import Iterable, Iterator, Literal, Optional
+
+import bisect
+import math
+import threading
+
+from server import config
+from server.models import Job
+from server.stores.base import JobStore
+
+_STATUSES: tuple[Literal["completed", "error", "pending"], ...] = (
+    "pending",
+    "completed",
+    "error",
+)
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+_FREE_ROW = 255  # Status code of the rows of deleted jobs, waiting to be reused
+
+
+class CompactJobStore(JobStore):  # pylint: disable=too-many-instance-attributes
+    """Keeps the records in a process-local table of typed arrays (one per field),
+    rather than in a Job object per record: timestamps are stored as POSIX floats
+    and statuses as one-byte codes, so a record only costs a few dozen bytes on
+    top of its job_id and its slot in the job_id -> row index. The few jobs with a
+    callback_url keep it in a separate row -> callback_url dictionary.
+
+    Jobs are indexed by the whole second of their expiry basis, in "buckets" of
+    row numbers. A row's bucket entry goes stale when the job's expiry basis moves
+    to another second or when the row gets reused by another job, and is skipped
+    when its bucket is swept.
+
+    Records are decoded into (new) Job objects on every read, so mutating one
+    doesn't affect the store.
+    """
+
+    def __init__(self) -> None:
+        self._rows: dict[str, int] = {}
+        self._job_ids: list[Optional[str]] = []
+        self._delays = array("q")
+        self._random_nums = array("d")
+        self._started_at = array("d")
+        self._finished_at = array("d")  # NaN until the job is finished
+        self._statuses = bytearray()
+        self._free_rows = array("I")
+        self._callback_urls: dict[int, str] = {}
+
+        self._expiry_buckets: dict[int, array] = {}
+        self._bucket_seconds: list[int] = []  # Sorted keys of _expiry_buckets
+        self._lock = threading.Lock()
+
+    def _expiry_basis(self, row: int) -> float:
+        """Returns the POSIX timestamp of the job's expiry basis (see Job.expiry_basis),
+        infinity if it has none
+        """
+        finished_at = self._finished_at[row]
+        if math.isnan(finished_at):
+            if config.JOB_EXECUTION_MODE == "pool":
+                return math.inf
+            return self._started_at[row] + self._delays[row]
+
+        return finished_at
+
+    def _track_expiry(self, row: int) -> None:
+        """Adds the row to the bucket of its expiry basis' second, if it has one"""
+        expiry_basis = self._expiry_basis(row)
+        if math.isinf(expiry_basis):
+            return
+
+        second = math.floor(expiry_basis)
+        bucket = self._expiry_buckets.get(second)
+        if bucket is None:
+            bucket = self._expiry_buckets[second] = array("I")
+            bisect.insort(self._bucket_seconds, second)
+
+        bucket.append(row)
+
+    def _decode(self, row: int) -> Job:
+        """Builds the Job object of the row"""
+        finished_at = self._finished_at[row]
+        return Job(
+            delay=self._delays[row],
+            random_num=self._random_nums[row],
+            started_at=datetime.fromtimestamp(self._started_at[row]),
+            status=_STATUSES[self._statuses[row]],
+            finished_at=(
+                None if math.isnan(finished_at) else datetime.fromtimestamp(finished_at)
+            ),
+            callback_url=self._callback_urls.get(row),
+        )
+
+    def _put(self, job_id: str, job: Job) -> None:
+        """Writes the job into its existing row, a free row or a new row"""
+        finished_at = job.finished_at.timestamp() if job.finished_at else math.nan
+        row = self._rows.get(job_id)
+        if row is None and self._free_rows:
+            row = self._free_rows.pop()
+
+        if row is None:
+            self._rows[job_id] = len(self._job_ids)
+            self._job_ids.append(job_id)
+            self._delays.append(job.delay)
+            self._random_nums.append(job.random_num)
+            self._started_at.append(job.started_at.timestamp())
+            self._finished_at.append(finished_at)
+            self._statuses.append(_STATUS_CODES[job.status])
+            row = self._rows[job_id]
+        else:
+            self._rows[job_id] = row
+            self._job_ids[row] = job_id
+            self._delays[row] = job.delay
+            self._random_nums[row] = job.random_num
+            self._started_at[row] = job.started_at.timestamp()
+            self._finished_at[row] = finished_at
+            self._statuses[row] = _STATUS_CODES[job.status]
+
+        if job.callback_url:
+            self._callback_urls[row] = job.callback_url
+        else:
+            self._callback_urls.pop(row, None)
+        self._track_expiry(row)
+
+    def _delete_row(self, row: int) -> None:
+        """Frees the row for reuse"""
+        del self._rows[self._job_ids[row]]
+        self._job_ids[row] = None
+        self._statuses[row] = _FREE_ROW
+        self._callback_urls.pop(row, None)
+        self._free_rows.append(row)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._rows.get(job_id)
+            return None if row is None else self._decode(row)
+
+    def get_many(self, job_ids: Iterable[str]) -> dict[str, Optional[Job]]:
+        with self._lock:
+            return {
+                job_id: None if (row := self._rows.get(job_id)) is None else self._decode(row)
+                for job_id in job_ids
+            }
+
+    def iter_pending(self) -> Iterator[tuple[str, Job]]:
+        pending_code = _STATUS_CODES["pending"]
+        with self._lock:
+            pending_jobs = [
+                (job_id, self._decode(row))
+                for job_id, row in self._rows.items()
+                if self._statuses[row] == pending_code
+            ]
+
+        yield from pending_jobs
+
+    def put(self, job_id: str, job: Job) -> None:
+        with self._lock:
+            self._put(job_id, job)
+
+    def put_many(self, jobs: dict[str, Job]) -> None:
+        with self._lock:
+            for job_id, job in jobs.items():
+                self._put(job_id, job)
+
+    def update_status(
+        self,
+        job_id: str,
+        status: Literal["completed", "error", "pending"],
+        updated_at: datetime,
+    ) -> Literal["completed", "error", "pending"]:
+        with self._lock:
+            row = self._rows[job_id]
+            previous_status = _STATUSES[self._statuses[row]]
+            if previous_status != status:
+                self._statuses[row] = _STATUS_CODES[status]
+                if status != "pending":
+                    self._finished_at[row] = updated_at.timestamp()
+                    self._track_expiry(row)
+
+            return previous_status
+
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            row = self._rows.get(job_id)
+            if row is None:
+                return False
+
+            self._delete_row(row)
+            return True
+
+    def delete_expired(self, cutoff: datetime, limit: int) -> list[str]:
+        # Only the buckets lying entirely before the cutoff are swept, so a job
+        # may outlive its retention period by up to a second
+        last_expired_second = math.floor(cutoff.timestamp()) - 1
+        deleted_job_ids: list[str] = []
+
+        with self._lock:
+            while len(deleted_job_ids) < limit and self._bucket_seconds:
+                second = self._bucket_seconds[0]
+                if second > last_expired_second:
+                    break
+
+                bucket = self._expiry_buckets[second]
+                swept = 0
+                for row in bucket:
+                    if len(deleted_job_ids) == limit:
+                        break
+                    swept += 1
+                    if (
+                        self._statuses[row] != _FREE_ROW
+                        and second <= self._expiry_basis(row) < second + 1
+                    ):
+                        deleted_job_ids.append(self._job_ids[row])
+                        self._delete_row(row)
+
+                if swept == len(bucket):
+                    del self._expiry_buckets[second]
+                    self._bucket_seconds.pop(0)
+                else:
+                    del bucket[:swept]
+
+        return deleted_job_ids
+
+    def count(self) -> int:
+        return len(self._rows)
+
+    def count_by_status(self) -> dict[str, int]:
+        with self._lock:
+            counts = {
+                status: self._statuses.count(code) for code, status in enumerate(_STATUSES)
+            }
+
+        return {status: count for status, count in counts.items() if count}
@@ -0,0 +1,102 @@
+"""Job store keeping the records in a process-local dictionary"""
+
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, Iterator, Literal, Optional
+
+import heapq
+import threading
+
+from server.models import Job
+from server.stores.base import JobStore
+
+
+class InMemoryJobStore(JobStore):
+    """Keeps the records in a dictionary, which gets lost when the process exits.
+
+    A min-heap of (expiry basis, job_id) entries lets delete_expired() find the
+    expired jobs without scanning all of them. Entries go stale when a job's expiry
+    basis changes (a newer entry is pushed then) and are discarded when popped.
+    Records written straight into `jobs` bypass the heap, and never expire.
+
+    Attributes:
+        jobs: dict[str, Job] -> The dictionary to keep the records in. (default: a new one).
+    """
+
+    def __init__(self, jobs: Optional[dict[str, Job]] = None) -> None:
+        self.jobs = {} if jobs is None else jobs
+        self._expiries: list[tuple[datetime, str]] = []
+        self._expiries_lock = threading.Lock()
+        # Serializes the status updates, so that only one of them sees the previous status
+        self._status_lock = threading.Lock()
+
+    def _track_expiry(self, job_id: str, job: Job) -> None:
+        """Records the job's current expiry basis, if it has one"""
+        expiry_basis = job.expiry_basis
+        if expiry_basis is None:
+            return
+
+        with self._expiries_lock:
+            heapq.heappush(self._expiries, (expiry_basis, job_id))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def get_many(self, job_ids: Iterable[str]) -> dict[str, Optional[Job]]:
+        return {job_id: self.jobs.get(job_id) for job_id in job_ids}
+
+    def iter_pending(self) -> Iterator[tuple[str, Job]]:
+        for job_id, job in list(self.jobs.items()):
+            if job.status == "pending":
+                yield job_id, job
+
+    def put(self, job_id: str, job: Job) -> None:
+        self.jobs[job_id] = job
+        self._track_expiry(job_id, job)
+
+    def put_many(self, jobs: dict[str, Job]) -> None:
+        self.jobs.update(jobs)
+        for job_id, job in jobs.items():
+            self._track_expiry(job_id, job)
+
+    def update_status(
+        self,
+        job_id: str,
+        status: Literal["completed", "error", "pending"],
+        updated_at: datetime,
+    ) -> Literal["completed", "error", "pending"]:
+        with self._status_lock:
+            job = self.jobs[job_id]
+            previous_status = job.status
+            if previous_status != status:
+                job.status = status
+                if status != "pending":
+                    job.finished_at = updated_at
+                    self._track_expiry(job_id, job)
+
+        return previous_status
+
+    def delete(self, job_id: str) -> bool:
+        return self.jobs.pop(job_id, None) is not None
+
+    def delete_expired(self, cutoff: datetime, limit: int) -> list[str]:
+        deleted_job_ids: list[str] = []
+        with self._expiries_lock:
+            while (
+                len(deleted_job_ids) < limit
+                and self._expiries
+                and self._expiries[0][0] < cutoff
+            ):
+                expiry_basis, job_id = heapq.heappop(self._expiries)
+                job = self.jobs.get(job_id)
+                if job is not None and job.expiry_basis == expiry_basis:
+                    del self.jobs[job_id]
+                    deleted_job_ids.append(job_id)
+
+        return deleted_job_ids
+
+    def count(self) -> int:
+        return len(self.jobs)
+
+    def count_by_status(self) -> dict[str, int]:
+        return dict(Counter(job.status for job in list(self.jobs.values())))
@@ -0,0 +1,418 @@
+"""Job store keeping the records in a server speaking the Redis protocol (RESP)"""
+
+from collections import Counter
+from datetime import datetime
+from typing import BinaryIO, Iterable, Iterator, Literal, Optional, Sequence, Union
+from urllib.parse import urlparse
+
+import socket
+
+from server.models import Job
+from server.stores.base import JobStore, ThreadConnections
+
+Reply = Union[None, int, bytes, str, list]
+
+_KEY_PREFIX = "job:"
+
+# Sorted set of every job_id, scored by the job's expiry basis (as a POSIX
+# timestamp, "+inf" for the jobs without any)
+_EXPIRIES_KEY = "jobs:expiries"
+
+# Number of jobs read at once when going through all of them
+_SCAN_PAGE_SIZE = 1000
+
+# Hash of the number of jobs in every status
+_STATUS_COUNTS_KEY = "jobs:statuses"
+
+
+class RespError(Exception):
+    """Raised when the server replies with an error"""
+
+
+class RespConnection:
+    """A minimal, blocking client for the Redis serialization protocol (RESP2).
+
+    Only what the job store needs is supported: sending commands (one at a time,
+    or pipelined, transactions included) and parsing their replies.
+
+    A connection that fails mid-command (e.g. a timeout, a dropped connection or
+    a reply that can't be parsed) may be out of step with the server's replies, so
+    it's closed then, and reopened by the next command.
+
+    Attributes:
+        host: str -> Host of the server.
+        port: int -> Port of the server.
+        db: int -> Database selected when connecting. (default 0)
+        timeout_seconds: float -> Timeout of every read and write. (default 10)
+    """
+
+    def __init__(self, host: str, port: int, db: int = 0, timeout_seconds: float = 10) -> None:
+        self.host = host
+        self.port = port
+        self.db = db
+        self.timeout_seconds = timeout_seconds
+        self._socket: Optional[socket.socket] = None
+        self._reader: Optional[BinaryIO] = None
+        self._open()
+
+    def _open(self) -> None:
+        """Connects to the server, and selects the database"""
+        self._socket = socket.create_connection(
+            (self.host, self.port), timeout=self.timeout_seconds
+        )
+        try:
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._reader = self._socket.makefile("rb")
+            if self.db:
+                _raise_errors(self.pipeline([("SELECT", self.db)]))
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """Closes the connection. The next command reopens it."""
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    @staticmethod
+    def _encode(command: Sequence[Union[str, bytes, int, float]]) -> bytes:
+        """Encodes a command as an array of bulk strings"""
+        parts = [b"*%d\r\n" % len(command)]
+        for argument in command:
+            if not isinstance(argument, bytes):
+                argument = str(argument).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(argument), argument))
+
+        return b"".join(parts)
+
+    def _read_reply(self) -> Reply:
+        """Parses a single reply off the connection"""
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("The server closed the connection")
+
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RespError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            return self._reader.read(length + 2)[:-2]
+        if kind == b"*":
+            length = int(payload)
+            if length == -1:
+                return None
+            # The elements (e.g. the replies to a transaction's commands) may be errors
+            elements: list = []
+            for _ in range(length):
+                try:
+                    elements.append(self._read_reply())
+                except RespError as e:
+                    elements.append(e)
+            return elements
+
+        raise ConnectionError(f"Unexpected reply: {line!r}")
+
+    def execute(self, *command: Union[str, bytes, int, float]) -> Reply:
+        """Sends a single command and returns its reply"""
+        return self.pipeline([command])[0]
+
+    def pipeline(self, commands: Sequence[Sequence[Union[str, bytes, int, float]]]) -> list:
+        """Sends all the commands in one go and returns their replies, in order.
+        Every reply is read even if some of them are errors, which are returned.
+        """
+        if self._socket is None:
+            self._open()
+
+        try:
+            self._socket.sendall(b"".join(self._encode(command) for command in commands))
+
+            replies: list = []
+            for _ in commands:
+                try:
+                    replies.append(self._read_reply())
+                except RespError as e:
+                    replies.append(e)
+        except BaseException:
+            self.close()
+            raise
+
+        return replies
+
+
+def _raise_errors(replies: list) -> list:
+    """Raises the first error among the pipelined replies, if any"""
+    for reply in replies:
+        if isinstance(reply, RespError):
+            raise reply
+
+    return replies
+
+
+def _to_fields(job: Job) -> list:
+    """Converts a Job into the field-value pairs of its hash"""
+    fields = [
+        "delay",
+        job.delay,
+        "random_num",
+        repr(job.random_num),
+        "started_at",
+        repr(job.started_at.timestamp()),
+        "status",
+        job.status,
+    ]
+    if job.finished_at:
+        fields += ["finished_at", repr(job.finished_at.timestamp())]
+    if job.callback_url:
+        fields += ["callback_url", job.callback_url]
+
+    return fields
+
+
+def _from_fields(reply: list) -> Optional[Job]:
+    """Converts the reply to HGETALL into a Job (None for a missing hash)"""
+    if not reply:
+        return None
+
+    fields = dict(zip(reply[::2], reply[1::2]))
+    finished_at = fields.get(b"finished_at")
+    callback_url = fields.get(b"callback_url")
+    return Job(
+        delay=int(fields[b"delay"]),
+        random_num=float(fields[b"random_num"]),
+        started_at=datetime.fromtimestamp(float(fields[b"started_at"])),
+        status=fields[b"status"].decode(),
+        finished_at=datetime.fromtimestamp(float(finished_at)) if finished_at else None,
+        callback_url=callback_url.decode() if callback_url else None,
+    )
+
+
+def _watch_statuses(connection: RespConnection, keys: Sequence[Union[str, bytes]]) -> list:
+    """Watches the hashes of the jobs (see _execute_transaction), and returns
+    their current status (None for a missing hash)
+    """
+    replies = _raise_errors(
+        connection.pipeline([("WATCH", *keys)] + [("HGET", key, "status") for key in keys])
+    )
+    return [status.decode() if status else None for status in replies[1:]]
+
+
+def _execute_transaction(connection: RespConnection, commands: list) -> bool:
+    """Executes the commands atomically (MULTI/EXEC), unless any of the watched
+    keys changed since they were watched. Returns whether they were executed.
+    """
+    replies = _raise_errors(connection.pipeline([("MULTI",), *commands, ("EXEC",)]))
+    if replies[-1] is None:
+        return False
+
+    _raise_errors(replies[-1])
+    return True
+
+
+def _count_commands(
+    added: Iterable[Optional[str]], removed: Iterable[Optional[str]] = ()
+) -> list:
+    """Returns the commands updating the number of jobs in every status, once jobs
+    of the `added` statuses are stored and jobs of the `removed` ones are gone
+    """
+    changes = Counter(status for status in added if status)
+    changes.subtract(status for status in removed if status)
+    return [
+        ("HINCRBY", _STATUS_COUNTS_KEY, status, change)
+        for status, change in changes.items()
+        if change
+    ]
+
+
+class RedisJobStore(JobStore):
+    """Keeps every record in a hash named "job:<job_id>", indexes the jobs by
+    their expiry basis in the "jobs:expiries" sorted set, and counts them by
+    status in the "jobs:statuses" hash.
+
+    Every thread gets its own connection, and bulk operations are pipelined
+    so that they only cost a single round trip. Changes to the records are
+    transactions (WATCH/MULTI/EXEC), retried if a record changed in the meantime,
+    so that concurrent updates of a job's status never both see its previous one.
+
+    Attributes:
+        url: str -> URL of the server, e.g. "redis://127.0.0.1:6379/0".
+    """
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        parsed_url = urlparse(url)
+        self._host = parsed_url.hostname or "127.0.0.1"
+        self._port = parsed_url.port or 6379
+        self._db = int(parsed_url.path.lstrip("/") or 0)
+        self._connections = ThreadConnections(self._connect)
+
+    def _connect(self) -> RespConnection:
+        """Opens a connection to the server, to the store's database"""
+        return RespConnection(self._host, self._port, self._db)
+
+    def _connection(self) -> RespConnection:
+        """Returns the calling thread's connection, opening it if need be"""
+        return self._connections.get()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return _from_fields(self._connection().execute("HGETALL", _KEY_PREFIX + job_id))
+
+    def get_many(self, job_ids: Iterable[str]) -> dict[str, Optional[Job]]:
+        unique_job_ids = list(dict.fromkeys(job_ids))
+        replies = _raise_errors(
+            self._connection().pipeline(
+                [("HGETALL", _KEY_PREFIX + job_id) for job_id in unique_job_ids]
+            )
+        )
+
+        return {
+            job_id: _from_fields(reply) for job_id, reply in zip(unique_job_ids, replies)
+        }
+
+    def iter_pending(self) -> Iterator[tuple[str, Job]]:
+        # There's no index by status, so every job is read, a page at a time
+        connection = self._connection()
+        offset = 0
+        while job_ids := connection.execute(
+            "ZRANGEBYSCORE", _EXPIRIES_KEY, "-inf", "+inf", "LIMIT", offset, _SCAN_PAGE_SIZE
+        ):
+            offset += len(job_ids)
+            replies = _raise_errors(
+                connection.pipeline(
+                    [("HGETALL", _KEY_PREFIX.encode() + job_id) for job_id in job_ids]
+                )
+            )
+            for job_id, reply in zip(job_ids, replies):
+                job = _from_fields(reply)
+                if job is not None and job.status == "pending":
+                    yield job_id.decode(), job
+
+    def put(self, job_id: str, job: Job) -> None:
+        self.put_many({job_id: job})
+
+    def put_many(self, jobs: dict[str, Job]) -> None:
+        if not jobs:
+            return
+
+        connection = self._connection()
+        keys = [_KEY_PREFIX + job_id for job_id in jobs]
+        while True:
+            previous_statuses = _watch_statuses(connection, keys)
+            commands = []
+            for job_id, job in jobs.items():
+                # Overwriting, rather than merging into, any previous record
+                commands.append(("DEL", _KEY_PREFIX + job_id))
+                commands.append(("HSET", _KEY_PREFIX + job_id, *_to_fields(job)))
+                expiry_basis = job.expiry_basis
+                score = "+inf" if expiry_basis is None else repr(expiry_basis.timestamp())
+                commands.append(("ZADD", _EXPIRIES_KEY, score, job_id))
+            commands += _count_commands(
+                (job.status for job in jobs.values()), previous_statuses
+            )
+
+            if _execute_transaction(connection, commands):
+                return
+
+    def update_status(
+        self,
+        job_id: str,
+        status: Literal["completed", "error", "pending"],
+        updated_at: datetime,
+    ) -> Literal["completed", "error", "pending"]:
+        connection = self._connection()
+        key = _KEY_PREFIX + job_id
+        while True:
+            (previous_status,) = _watch_statuses(connection, [key])
+            if previous_status is None or previous_status == status:
+                connection.execute("UNWATCH")
+                if previous_status is None:
+                    raise KeyError(job_id)
+                return previous_status
+
+            fields = ["status", status]
+            commands = []
+            if status != "pending":
+                finished_at = repr(updated_at.timestamp())
+                fields += ["finished_at", finished_at]
+                commands.append(("ZADD", _EXPIRIES_KEY, finished_at, job_id))
+            commands.append(("HSET", key, *fields))
+            commands += _count_commands([status], [previous_status])
+
+            if _execute_transaction(connection, commands):
+                return previous_status
+
+    def delete(self, job_id: str) -> bool:
+        connection = self._connection()
+        key = _KEY_PREFIX + job_id
+        while True:
+            (status,) = _watch_statuses(connection, [key])
+            if status is None:
+                _raise_errors(
+                    connection.pipeline([("UNWATCH",), ("ZREM", _EXPIRIES_KEY, job_id)])
+                )
+                return False
+
+            commands = [("DEL", key), ("ZREM", _EXPIRIES_KEY, job_id)]
+            commands += _count_commands([], [status])
+            if _execute_transaction(connection, commands):
+                return True
+
+    def delete_expired(self, cutoff: datetime, limit: int) -> list[str]:
+        connection = self._connection()
+        while True:
+            job_ids = connection.execute(
+                "ZRANGEBYSCORE",
+                _EXPIRIES_KEY,
+                "-inf",
+                f"({cutoff.timestamp()!r}",  # "(" excludes the cutoff itself
+                "LIMIT",
+                0,
+                limit,
+            )
+            if not job_ids:
+                return []
+
+            keys = [_KEY_PREFIX.encode() + job_id for job_id in job_ids]
+            statuses = _watch_statuses(connection, keys)
+            # Jobs resubmitted since the range was read have a new expiry basis. Their
+            # hashes are watched by now, so their scores can't change before EXEC.
+            scores = _raise_errors(
+                connection.pipeline([("ZSCORE", _EXPIRIES_KEY, job_id) for job_id in job_ids])
+            )
+            expired_jobs = [
+                (job_id, key, status)
+                for job_id, key, status, score in zip(job_ids, keys, statuses, scores)
+                if score is not None and float(score) < cutoff.timestamp()
+            ]
+            if not expired_jobs:
+                connection.execute("UNWATCH")
+                continue
+
+            commands = [("DEL", key) for _, key, status in expired_jobs if status]
+            commands.append(("ZREM", _EXPIRIES_KEY, *(job_id for job_id, _, _ in expired_jobs)))
+            commands += _count_commands([], (status for _, _, status in expired_jobs))
+
+            if _execute_transaction(connection, commands):
+                return [job_id.decode() for job_id, _, status in expired_jobs if status]
+
+    def count(self) -> int:
+        return self._connection().execute("ZCARD", _EXPIRIES_KEY)
+
+    def count_by_status(self) -> dict[str, int]:
+        reply = self._connection().execute("HGETALL", _STATUS_COUNTS_KEY)
+        counts = {
+            status.decode(): int(count) for status, count in zip(reply[::2], reply[1::2])
+        }
+        return {status: count for status, count in counts.items() if count > 0}
+
+    def close(self) -> None:
+        self._connections.close()
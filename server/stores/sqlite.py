@@ -0,0 +1,214 @@
+"""Job store keeping the records in a SQLite database file"""
+
+from datetime import datetime
+from typing import Iterable, Iterator, Literal, Optional
+
+import sqlite3
+
+from server import config
+from server.models import Job
+from server.stores.base import JobStore, ThreadConnections
+
+# SQLite caps the number of "?" placeholders in a single statement
+_MAX_VARIABLES_PER_QUERY = 500
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    delay INTEGER NOT NULL,
+    random_num REAL NOT NULL,
+    started_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    finished_at REAL,
+    callback_url TEXT
+) WITHOUT ROWID
+"""
+_CREATE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status)",
+    "CREATE INDEX IF NOT EXISTS jobs_by_started_at ON jobs (started_at)",
+    "CREATE INDEX IF NOT EXISTS jobs_by_finished_at ON jobs (finished_at)",
+)
+
+# The statements are kept constant (with placeholders) so that sqlite3 prepares each
+# of them once per connection and reuses the compiled statement from its cache
+_COLUMNS = "job_id, delay, random_num, started_at, status, finished_at, callback_url"
+_SELECT_JOB = f"SELECT {_COLUMNS} FROM jobs WHERE job_id = ?"
+_UPSERT_JOB = f"INSERT OR REPLACE INTO jobs ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+_SELECT_PENDING_JOBS = f"SELECT {_COLUMNS} FROM jobs WHERE status = 'pending'"
+_SELECT_STATUS = "SELECT status FROM jobs WHERE job_id = ?"
+_UPDATE_STATUS = "UPDATE jobs SET status = ?, finished_at = ? WHERE job_id = ?"
+_DELETE_JOB = "DELETE FROM jobs WHERE job_id = ?"
+_COUNT_JOBS = "SELECT COUNT(*) FROM jobs"
+_COUNT_JOBS_BY_STATUS = "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+# Jobs that reached their terminal state before the cutoff, or that nobody has looked
+# at since they finished processing before the cutoff (started_at + delay < cutoff),
+# unless they're only finished by the worker pool (see Job.expiry_basis)
+_DELETE_EXPIRED_JOBS = """
+DELETE FROM jobs WHERE job_id IN (
+    SELECT job_id FROM jobs WHERE finished_at < :cutoff
+    UNION ALL
+    SELECT job_id FROM jobs
+    WHERE :unfinished_jobs_expire AND finished_at IS NULL
+    AND started_at < :cutoff AND started_at + delay < :cutoff
+    LIMIT :limit
+)
+RETURNING job_id
+"""
+
+
+def _to_row(job_id: str, job: Job) -> tuple:
+    """Converts a Job into a row of the jobs table"""
+    finished_at = job.finished_at.timestamp() if job.finished_at else None
+    return (
+        job_id,
+        job.delay,
+        job.random_num,
+        job.started_at.timestamp(),
+        job.status,
+        finished_at,
+        job.callback_url,
+    )
+
+
+def _from_row(row: tuple) -> Job:
+    """Converts a row of the jobs table into a Job"""
+    _, delay, random_num, started_at, status, finished_at, callback_url = row
+    return Job(
+        delay=delay,
+        random_num=random_num,
+        started_at=datetime.fromtimestamp(started_at),
+        status=status,
+        finished_at=datetime.fromtimestamp(finished_at) if finished_at else None,
+        callback_url=callback_url,
+    )
+
+
+class SQLiteJobStore(JobStore):
+    """Keeps the records in a SQLite database in WAL mode, so that multiple
+    processes can read it concurrently while one of them is writing.
+
+    Every thread gets its own connection, as SQLite connections can't be shared.
+
+    Attributes:
+        path: str -> Path of the database file (":memory:" isn't shareable across threads).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._connections = ThreadConnections(self._connect)
+
+        connection = self._connection()
+        with connection:
+            connection.execute(_CREATE_TABLE)
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(jobs)")}
+            if "finished_at" not in columns:  # Created before jobs expired
+                connection.execute("ALTER TABLE jobs ADD COLUMN finished_at REAL")
+            if "callback_url" not in columns:  # Created before webhooks
+                connection.execute("ALTER TABLE jobs ADD COLUMN callback_url TEXT")
+            for statement in _CREATE_INDEXES:
+                connection.execute(statement)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Opens a connection to the database"""
+        connection = sqlite3.connect(
+            self.path,
+            timeout=30,
+            isolation_level=None,  # Transactions are managed explicitly
+            check_same_thread=False,
+            cached_statements=64,
+        )
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    def _connection(self) -> sqlite3.Connection:
+        """Returns the calling thread's connection, opening it if need be"""
+        return self._connections.get()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self._connection().execute(_SELECT_JOB, (job_id,)).fetchone()
+        return _from_row(row) if row else None
+
+    def get_many(self, job_ids: Iterable[str]) -> dict[str, Optional[Job]]:
+        jobs: dict[str, Optional[Job]] = dict.fromkeys(job_ids)
+        unique_job_ids = list(jobs)
+        connection = self._connection()
+
+        for start in range(0, len(unique_job_ids), _MAX_VARIABLES_PER_QUERY):
+            chunk = unique_job_ids[start : start + _MAX_VARIABLES_PER_QUERY]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = connection.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE job_id IN ({placeholders})", chunk
+            )
+            for row in rows:
+                jobs[row[0]] = _from_row(row)
+
+        return jobs
+
+    def iter_pending(self) -> Iterator[tuple[str, Job]]:
+        for row in self._connection().execute(_SELECT_PENDING_JOBS).fetchall():
+            yield row[0], _from_row(row)
+
+    def put(self, job_id: str, job: Job) -> None:
+        self._connection().execute(_UPSERT_JOB, _to_row(job_id, job))
+
+    def put_many(self, jobs: dict[str, Job]) -> None:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                _UPSERT_JOB, (_to_row(job_id, job) for job_id, job in jobs.items())
+            )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def update_status(
+        self,
+        job_id: str,
+        status: Literal["completed", "error", "pending"],
+        updated_at: datetime,
+    ) -> Literal["completed", "error", "pending"]:
+        connection = self._connection()
+
+        # Repeated updates to the same status are common, and don't need the write lock
+        row = connection.execute(_SELECT_STATUS, (job_id,)).fetchone()
+        if row is not None and row[0] == status:
+            return row[0]
+
+        # Locking the database upfront, so the status can't change in between
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(_SELECT_STATUS, (job_id,)).fetchone()
+            if row is None:
+                raise KeyError(job_id)
+            finished_at = updated_at.timestamp() if status != "pending" else None
+            connection.execute(_UPDATE_STATUS, (status, finished_at, job_id))
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+        return row[0]
+
+    def delete(self, job_id: str) -> bool:
+        return self._connection().execute(_DELETE_JOB, (job_id,)).rowcount > 0
+
+    def delete_expired(self, cutoff: datetime, limit: int) -> list[str]:
+        parameters = {
+            "cutoff": cutoff.timestamp(),
+            "limit": limit,
+            "unfinished_jobs_expire": config.JOB_EXECUTION_MODE != "pool",
+        }
+        rows = self._connection().execute(_DELETE_EXPIRED_JOBS, parameters).fetchall()
+        return [job_id for (job_id,) in rows]
+
+    def count(self) -> int:
+        return self._connection().execute(_COUNT_JOBS).fetchone()[0]
+
+    def count_by_status(self) -> dict[str, int]:
+        return dict(self._connection().execute(_COUNT_JOBS_BY_STATUS).fetchall())
+
+    def close(self) -> None:
+        self._connections.close()
@@ -0,0 +1,43 @@
+"""Admission and dispatch of the submitted jobs, shared by the APIs submitting them"""
+
+from typing import Annotated
+
+from fastapi import HTTPException, Request
+from pydantic import Field
+
+from server import admission, config, database, metrics, pool, scheduler
+
+# The URLs the jobs' results can be POSTed to, once they're completed
+CALLBACK_URL_PATTERN = r"^https?://\S+$"
+CALLBACK_URL_MAX_LENGTH = 2048
+
+# Type of the `callback_url` field of the request bodies submitting jobs
+CallbackUrl = Annotated[
+    str, Field(pattern=CALLBACK_URL_PATTERN, max_length=CALLBACK_URL_MAX_LENGTH)
+]
+
+
+def admit_or_raise(request: Request, jobs: int) -> None:
+    """Raises a 429, with a Retry-After header, if the admission control doesn't
+    admit the client's submission of `jobs` jobs
+    """
+    client_id = request.client.host if request.client else "unknown"
+    rejection = admission.ADMISSION_CONTROLLER.admit(client_id, jobs)
+    if rejection:
+        if config.METRICS_ENABLED:
+            metrics.SUBMISSIONS_REJECTED.inc(rejection.reason, amount=jobs)
+        raise HTTPException(
+            status_code=429,
+            detail=rejection.detail,
+            headers={"Retry-After": str(rejection.retry_after_seconds)},
+        )
+
+
+def dispatch(job_id: str, job: database.Job, priority: int) -> None:
+    """Hands the submitted job over to the worker pool or, when the jobs run from
+    their submission, to the scheduler
+    """
+    if config.JOB_EXECUTION_MODE == "pool":
+        pool.WORKER_POOL.submit(job_id, job, priority)
+    else:
+        scheduler.JOB_SCHEDULER.schedule(job_id, job)
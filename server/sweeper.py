@@ -0,0 +1,122 @@
+"""Background task bounding the server's memory and disk use by deleting the
+expired jobs (and their output files) and upload sessions
+"""
+
+from datetime import timedelta
+
+import asyncio
+import logging
+
+from server import clock, config, database, errors, results, uploads
+
+logger = logging.getLogger(__name__)
+
+# Seconds a completed upload is kept for even though its job can't be found, as
+# the job is submitted right after the upload is completed
+_COMPLETED_UPLOAD_GRACE_SECONDS = 60
+
+
+class JobSweeper:
+    """Deletes the jobs whose retention period has elapsed, every `interval_seconds`.
+
+    Expired jobs are deleted in batches of `batch_size`, along with their output
+    files, each on a worker thread, yielding to the event loop in between batches
+    so that requests keep being served while a large backlog is swept.
+
+    Upload sessions are deleted, source file included, once they're abandoned
+    (not completed within `upload_retention_seconds`) or once their job is gone.
+
+    Attributes:
+        retention_seconds: float -> Seconds a job is kept for after it's finished.
+        interval_seconds: float -> Seconds in between sweeps.
+        batch_size: int -> Maximum number of jobs deleted at once.
+        upload_retention_seconds: float -> Seconds an upload may take to be completed.
+        evicted_jobs: int -> Number of jobs deleted by this process' sweeper so far.
+        evicted_uploads: int -> Number of upload sessions deleted by this process'
+        sweeper so far.
+    """
+
+    def __init__(
+        self,
+        retention_seconds: float = config.JOB_RETENTION_SECONDS,
+        interval_seconds: float = config.JOB_SWEEP_INTERVAL_SECONDS,
+        batch_size: int = config.JOB_SWEEP_BATCH_SIZE,
+        upload_retention_seconds: float = config.UPLOAD_RETENTION_SECONDS,
+    ) -> None:
+        self.retention_seconds = retention_seconds
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.upload_retention_seconds = upload_retention_seconds
+        self.evicted_jobs = 0
+        self.evicted_uploads = 0
+
+    async def sweep(self) -> int:
+        """Deletes every job that has expired by now. Returns how many were deleted"""
+        cutoff = clock.now() - timedelta(seconds=self.retention_seconds)
+        evicted_jobs = 0
+
+        while True:
+            deleted_job_ids = await asyncio.to_thread(
+                database.fake_delete_expired_jobs, cutoff, self.batch_size
+            )
+            evicted_jobs += len(deleted_job_ids)
+            self.evicted_jobs += len(deleted_job_ids)
+            await asyncio.to_thread(results.RESULT_STORE.delete_many, deleted_job_ids)
+            if len(deleted_job_ids) < self.batch_size:
+                return evicted_jobs
+
+            await asyncio.sleep(0)
+
+    async def sweep_uploads(self) -> int:
+        """Deletes every upload session that has been abandoned by now, or whose
+        job is gone (deleted, or swept). Returns how many were deleted
+        """
+        sessions = await asyncio.to_thread(uploads.UPLOAD_STORE.sessions)
+        now = clock.now().timestamp()
+        completed_sessions = [
+            session
+            for session in sessions
+            if session.completed_at is not None
+            and session.completed_at < now - _COMPLETED_UPLOAD_GRACE_SECONDS
+        ]
+        jobs_info = await asyncio.to_thread(
+            database.fake_get_jobs_info, [session.job_id for session in completed_sessions]
+        )
+
+        expired_sessions = [
+            session
+            for session in sessions
+            if not session.completed
+            and session.created_at < now - self.upload_retention_seconds
+        ] + [session for session in completed_sessions if not jobs_info[session.job_id]]
+        evicted_uploads = 0
+        for session in expired_sessions:
+            if await asyncio.to_thread(uploads.UPLOAD_STORE.delete, session.upload_id):
+                evicted_uploads += 1
+
+        self.evicted_uploads += evicted_uploads
+        return evicted_uploads
+
+    async def run(self) -> None:
+        """Sweeps every `interval_seconds`, until cancelled"""
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                evicted_jobs = await self.sweep()
+            except (errors.DeleteJobError, errors.ResultError):
+                logger.exception("Failed to sweep the expired jobs")
+            else:
+                if evicted_jobs:
+                    logger.info("Evicted %d expired jobs", evicted_jobs)
+
+            try:
+                evicted_uploads = await self.sweep_uploads()
+            except (errors.GetJobInfoError, errors.UploadError):
+                logger.exception("Failed to sweep the expired uploads")
+            else:
+                if evicted_uploads:
+                    logger.info("Evicted %d expired uploads", evicted_uploads)
+
+
+# Sweeper run by the server, for as long as it's up
+JOB_SWEEPER = JobSweeper()
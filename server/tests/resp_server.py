@@ -0,0 +1,193 @@
+"""Local stand-in for a Redis server, speaking just enough of the protocol
+(RESP2) for the "redis" job store to be tested without a real server
+"""
+
+from contextlib import contextmanager
+from typing import Iterator, Optional, Union
+
+import socket
+import socketserver
+import threading
+
+Reply = Union[None, int, bytes, str, list, Exception]
+
+
+def _encode_reply(reply: Reply) -> bytes:
+    """Serializes a reply"""
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, Exception):
+        return b"-ERR %s\r\n" % str(reply).encode()
+    if isinstance(reply, str):
+        return b"+%s\r\n" % reply.encode()
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, bytes):
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+
+    return b"*%d\r\n" % len(reply) + b"".join(_encode_reply(item) for item in reply)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Serves the commands of a single connection"""
+
+    server: "_Server"
+
+    def _read_command(self) -> list[bytes]:
+        """Parses a command (an array of bulk strings) off the connection"""
+        line = self.rfile.readline()
+        if not line:
+            return []
+
+        command = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            command.append(self.rfile.read(length + 2)[:-2])
+
+        return command
+
+    def handle(self) -> None:
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Versions of the keys the connection WATCHes, and the commands it queued
+        # since MULTI (None outside of a transaction)
+        watched: dict[bytes, int] = {}
+        queued: Optional[list[list[bytes]]] = None
+        while command := self._read_command():
+            name = command[0].upper()
+            with self.server.lock:
+                if name == b"WATCH":
+                    watched.update((key, self.server.version(key)) for key in command[1:])
+                    reply: Reply = "OK"
+                elif name == b"UNWATCH":
+                    watched.clear()
+                    reply = "OK"
+                elif name == b"MULTI":
+                    queued = []
+                    reply = "OK"
+                elif name == b"EXEC":
+                    if any(self.server.version(key) != v for key, v in watched.items()):
+                        reply = None
+                    else:
+                        reply = [
+                            self.server.execute(queued_command)
+                            for queued_command in queued or []
+                        ]
+                    watched.clear()
+                    queued = None
+                elif queued is not None:
+                    queued.append(command)
+                    reply = "QUEUED"
+                else:
+                    reply = self.server.execute(command)
+            self.wfile.write(_encode_reply(reply))
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    """Keeps the hashes in a dictionary and executes the supported commands"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.hashes: dict[bytes, dict[bytes, bytes]] = {}
+        self.sorted_sets: dict[bytes, dict[bytes, float]] = {}
+        # Number of the latest write, overall and to every key (for WATCH)
+        self.writes = 0
+        self.versions: dict[bytes, int] = {}
+
+    def version(self, key: bytes) -> int:
+        """Returns the number of the latest write to the key"""
+        return self.versions.get(key, 0)
+
+    def _written(self, *keys: bytes) -> None:
+        """Records a write to the keys"""
+        self.writes += 1
+        self.versions.update((key, self.writes) for key in keys)
+
+    def _zrangebyscore(self, args: list[bytes]) -> list:
+        """ZRANGEBYSCORE key min max [LIMIT offset count]"""
+
+        def in_range(score: float, bound: bytes, is_min: bool) -> bool:
+            exclusive = bound.startswith(b"(")
+            value = float(bound.lstrip(b"("))
+            if is_min:
+                return score > value if exclusive else score >= value
+            return score < value if exclusive else score <= value
+
+        members = sorted(
+            (score, member)
+            for member, score in self.sorted_sets.get(args[0], {}).items()
+            if in_range(score, args[1], True) and in_range(score, args[2], False)
+        )
+        offset, count = 0, len(members)
+        if len(args) == 6 and args[3].upper() == b"LIMIT":
+            offset, count = int(args[4]), int(args[5])
+
+        return [member for _, member in members[offset : offset + count]]
+
+    def execute(self, command: list[bytes]) -> Reply:
+        """Returns the reply to the command"""
+        name, args = command[0].upper(), command[1:]
+
+        if name == b"PING":
+            return "PONG"
+        if name in (b"SELECT", b"FLUSHALL"):
+            if name == b"FLUSHALL":
+                self._written(*self.hashes, *self.sorted_sets)
+                self.hashes.clear()
+                self.sorted_sets.clear()
+            return "OK"
+        if name in (b"HSET", b"HINCRBY", b"DEL", b"ZADD", b"ZREM"):
+            self._written(*(args if name == b"DEL" else args[:1]))
+        if name == b"HSET":
+            fields = self.hashes.setdefault(args[0], {})
+            pairs = dict(zip(args[1::2], args[2::2]))
+            added = len(pairs.keys() - fields.keys())
+            fields.update(pairs)
+            return added
+        if name == b"HINCRBY":
+            fields = self.hashes.setdefault(args[0], {})
+            value = int(fields.get(args[1], b"0")) + int(args[2])
+            fields[args[1]] = b"%d" % value
+            return value
+        if name == b"HGET":
+            return self.hashes.get(args[0], {}).get(args[1])
+        if name == b"HGETALL":
+            fields = self.hashes.get(args[0], {})
+            return [item for pair in fields.items() for item in pair]
+        if name == b"DEL":
+            return sum(self.hashes.pop(key, None) is not None for key in args)
+        if name == b"ZADD":
+            members = self.sorted_sets.setdefault(args[0], {})
+            scores = {member: float(score) for score, member in zip(args[1::2], args[2::2])}
+            added = len(scores.keys() - members.keys())
+            members.update(scores)
+            return added
+        if name == b"ZREM":
+            members = self.sorted_sets.get(args[0], {})
+            return sum(members.pop(member, None) is not None for member in args[1:])
+        if name == b"ZSCORE":
+            score = self.sorted_sets.get(args[0], {}).get(args[1])
+            return None if score is None else repr(score).encode()
+        if name == b"ZCARD":
+            return len(self.sorted_sets.get(args[0], {}))
+        if name == b"ZRANGEBYSCORE":
+            return self._zrangebyscore(args)
+
+        return Exception(f"unknown command '{name.decode()}'")
+
+
+@contextmanager
+def running_resp_server() -> Iterator[str]:
+    """Runs the stand-in for the duration of the block. Yields its URL."""
+    server = _Server()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        yield f"redis://{host}:{port}/0"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,71 @@
+"""Testing the multi-worker launcher"""
+
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+import requests
+
+from server.launcher import _parse_args
+
+
+def test_multiple_workers_default_to_sqlite() -> None:
+    """Jobs can't be shared through the 'memory' store, so 'sqlite' is the default"""
+    assert _parse_args(["--workers", "4"]).job_store == "sqlite"
+    assert _parse_args(["--workers", "4", "--job-store", "redis"]).job_store == "redis"
+    assert _parse_args([]).job_store == "memory"
+
+
+def test_multiple_workers_with_memory_store() -> None:
+    """Running multiple workers on the process-local 'memory' store is refused"""
+    with pytest.raises(SystemExit):
+        _parse_args(["--workers", "2", "--job-store", "memory"])
+
+
+def test_jobs_shared_across_workers(tmp_path) -> None:
+    """A job submitted through one worker can be found through every worker"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+
+    with subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "server",
+            "--port",
+            str(port),
+            "--workers",
+            "2",
+            "--sqlite-path",
+            str(tmp_path / "jobs.sqlite3"),
+            "--log-level",
+            "warning",
+        ]
+    ) as process:
+        try:
+            deadline = time.time() + 20
+            while True:
+                try:
+                    requests.get(base_url + "/docs", timeout=1)
+                    break
+                except requests.ConnectionError:
+                    assert time.time() < deadline and process.poll() is None
+                    time.sleep(0.1)
+
+            response = requests.post(base_url + "/submit/JOB_000", timeout=10)
+            assert response.status_code == 201
+
+            # Every request opens a new connection, which may land on either worker
+            for _ in range(20):
+                response = requests.get(
+                    base_url + "/status/JOB_000",
+                    headers={"Connection": "close"},
+                    timeout=10,
+                )
+                assert response.status_code == 200
+        finally:
+            process.terminate()
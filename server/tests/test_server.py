@@ -1,12 +1,37 @@
 """Testing the server's functionality"""
 
-from datetime import datetime
+from collections import deque
+from datetime import datetime, timedelta
+
+import asyncio
+import hashlib
+import json
+import os
+import time
 
 from fastapi.testclient import TestClient
 import pytest
 
+from benchmarks.simulation import simulate
+from server import (
+    admission,
+    clock,
+    config,
+    database,
+    errors,
+    events,
+    metrics,
+    pool,
+    results,
+    uploads,
+    webhooks,
+)
 from server.handlers import app
 from server.database import JOB_INFO_BY_ID, Job
+from server.scheduler import JobScheduler
+from server.stores import InMemoryJobStore
+from server.sweeper import JobSweeper
+from server.tests.webhook_receiver import running_webhook_receiver
 
 client = TestClient(app)
 
@@ -44,6 +69,14 @@ def fake_create_pending_job() -> None:
     JOB_INFO_BY_ID[FAKE_PENDING_JOB_ID] = FAKE_PENDING_JOB_INFO
 
 
+def _wait_until(condition, timeout_seconds: float = 5) -> None:
+    """Waits for the condition to hold, failing the test if it doesn't in time"""
+    deadline = datetime.now() + timedelta(seconds=timeout_seconds)
+    while not condition():
+        assert datetime.now() < deadline
+        time.sleep(0.01)
+
+
 def test_get_status_non_existent_job_id() -> None:
     """Fetching the status of a job that hasn't been submitted"""
     response = client.get("/status/non_existent_job_id")
@@ -80,7 +113,863 @@ def test_get_status_pending_job(fake_create_pending_job) -> None:
     assert status["result"] == "pending"
 
 
+def test_get_status_pending_job_hints(fake_create_pending_job) -> None:
+    """Pending jobs come with their estimated completion and a Retry-After header"""
+    response = client.get(f"/status/{FAKE_PENDING_JOB_ID}")
+
+    status = response.json()
+    expected_completion_at = FAKE_PENDING_JOB_INFO.started_at + timedelta(seconds=10)
+    assert status["estimated_completion_at"] == expected_completion_at.isoformat()
+    assert 0 < status["remaining_seconds"] <= 10
+    assert 1 <= int(response.headers["Retry-After"]) <= 10
+
+
+def test_get_status_completed_job_has_no_hints(fake_create_completed_job) -> None:
+    """Terminal jobs don't come with any hint about when to poll again"""
+    response = client.get(f"/status/{FAKE_COMPLETED_JOB_ID}")
+
+    assert response.json() == {"result": "completed"}
+    assert "Retry-After" not in response.headers
+
+
+def test_get_status_completed_job_conditional(fake_create_completed_job) -> None:
+    """Terminal statuses carry a cacheable ETag, which If-None-Match is checked against"""
+    response = client.get(f"/status/{FAKE_COMPLETED_JOB_ID}")
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"].startswith("public, max-age=")
+
+    response = client.get(
+        f"/status/{FAKE_COMPLETED_JOB_ID}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    response = client.get(
+        f"/status/{FAKE_COMPLETED_JOB_ID}", headers={"If-None-Match": '"error"'}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"result": "completed"}
+
+
+def test_get_status_pending_job_conditional(fake_create_pending_job) -> None:
+    """Pending statuses carry a weak ETag, and their 304s still carry Retry-After"""
+    response = client.get(f"/status/{FAKE_PENDING_JOB_ID}")
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"pending-')
+    assert response.headers["Cache-Control"] == "no-cache"
+
+    response = client.get(f"/status/{FAKE_PENDING_JOB_ID}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_get_status_long_poll_until_completed() -> None:
+    """Long-polling the status of a job that completes while the request is held"""
+    JOB_INFO_BY_ID["JOB_004"] = Job(
+        delay=1, random_num=1.0, started_at=datetime.now(), status="pending"
+    )
+    response = client.get("/status/JOB_004", params={"wait": 5})
+    assert response.status_code == 200
+
+    status = response.json()
+    assert status["result"] == "completed"
+
+
+def test_get_status_long_poll_times_out(fake_create_pending_job) -> None:
+    """Long-polling the status of a job that's still pending when the wait elapses"""
+    response = client.get(f"/status/{FAKE_PENDING_JOB_ID}", params={"wait": 1})
+    assert response.status_code == 200
+
+    status = response.json()
+    assert status["result"] == "pending"
+
+
+def test_get_status_long_poll_invalid_wait(fake_create_pending_job) -> None:
+    """Long-polling for longer than the server allows"""
+    response = client.get(f"/status/{FAKE_PENDING_JOB_ID}", params={"wait": 3600})
+    assert response.status_code == 422
+
+
+def test_get_status_terminal_job_is_not_written(monkeypatch) -> None:
+    """Reading the status of a job that's already finished doesn't write to the store"""
+    JOB_INFO_BY_ID["JOB_013"] = Job(
+        delay=1, random_num=1.0, started_at=datetime(2000, 1, 1), status="completed"
+    )
+    monkeypatch.setattr(database, "fake_update_job_status", None)
+
+    response = client.get("/status/JOB_013")
+
+    assert response.json() == {"result": "completed"}
+
+
 def test_submit_job() -> None:
     """Tests the /submit API"""
     response = client.post("/submit/JOB_000")
     assert response.status_code == 201
+
+
+def test_stream_job_statuses() -> None:
+    """Subscribing to the status transitions of multiple jobs on one connection"""
+    JOB_INFO_BY_ID["JOB_005"] = Job(
+        delay=1, random_num=1.0, started_at=datetime.now(), status="pending"
+    )
+    JOB_INFO_BY_ID["JOB_006"] = Job(
+        delay=1, random_num=0.0, started_at=datetime.now(), status="pending"
+    )
+    params = [("job_id", "JOB_005"), ("job_id", "JOB_006"), ("job_id", "unknown")]
+
+    with client.stream("GET", "/status:stream", params=params) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        lines = [line for line in response.iter_lines() if line.startswith("data: ")]
+
+    events = [json.loads(line.removeprefix("data: ")) for line in lines]
+    assert events == [
+        {"job_id": "JOB_005", "result": "pending"},
+        {"job_id": "JOB_006", "result": "error"},
+        {"job_id": "unknown", "detail": "Job ID unknown could not be found"},
+        {"job_id": "JOB_005", "result": "completed"},
+    ]
+
+
+def test_submit_jobs_batch() -> None:
+    """Submitting multiple jobs with a single call to the /submit:batch API"""
+    jobs = [{"job_id": "JOB_007", "delay_seconds": 1}, {"job_id": "JOB_008"}]
+    response = client.post("/submit:batch", json={"jobs": jobs})
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+    assert [result["job_id"] for result in results] == ["JOB_007", "JOB_008"]
+    assert all(result["status_code"] == 201 for result in results)
+    assert JOB_INFO_BY_ID["JOB_007"].delay == 1
+    assert JOB_INFO_BY_ID["JOB_008"].delay == 20
+
+
+def test_submit_jobs_batch_with_callback_urls() -> None:
+    """Jobs of a batch are called back at their own callback URL, if they have one"""
+    jobs = [
+        {"job_id": "JOB_050", "callback_url": "http://127.0.0.1:9/hook"},
+        {"job_id": "JOB_051"},
+    ]
+    assert client.post("/submit:batch", json={"jobs": jobs}).status_code == 200
+    assert JOB_INFO_BY_ID["JOB_050"].callback_url == "http://127.0.0.1:9/hook"
+    assert JOB_INFO_BY_ID["JOB_051"].callback_url is None
+
+    jobs = [{"job_id": "JOB_052", "callback_url": "ftp://host/x"}]
+    assert client.post("/submit:batch", json={"jobs": jobs}).status_code == 422
+
+
+def test_submit_jobs_batch_too_large() -> None:
+    """Submitting more jobs than a single /submit:batch call accepts"""
+    jobs = [{"job_id": f"JOB_{i}"} for i in range(1001)]
+    response = client.post("/submit:batch", json={"jobs": jobs})
+    assert response.status_code == 422
+
+
+def test_get_statuses_batch(
+    fake_create_completed_job, fake_create_erroneous_job, fake_create_pending_job
+) -> None:
+    """Fetching the status of multiple jobs with a single call to the /status:batch API"""
+    job_ids = [
+        FAKE_COMPLETED_JOB_ID,
+        FAKE_ERRONEOUS_JOB_ID,
+        FAKE_PENDING_JOB_ID,
+        "non_existent_job_id",
+    ]
+    response = client.post("/status:batch", json={"job_ids": job_ids})
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+    assert [(result["status_code"], result["result"]) for result in results] == [
+        (200, "completed"),
+        (200, "error"),
+        (200, "pending"),
+        (404, None),
+    ]
+    assert results[3]["detail"] == "Job ID non_existent_job_id could not be found"
+
+
+def test_delete_job() -> None:
+    """Deleting a job, after which it can't be found anymore"""
+    client.post("/submit/JOB_009")
+
+    response = client.delete("/jobs/JOB_009")
+    assert response.status_code == 204
+
+    assert client.get("/status/JOB_009").status_code == 404
+    assert client.delete("/jobs/JOB_009").status_code == 404
+
+
+def test_sweeper_evicts_expired_jobs() -> None:
+    """The sweeper deletes the finished jobs once their retention period elapses"""
+    database.fake_submit_jobs({"JOB_010": 0, "JOB_011": 0, "JOB_012": 3600})
+    job_sweeper = JobSweeper(retention_seconds=0, batch_size=1)
+
+    evicted_jobs = asyncio.run(job_sweeper.sweep())
+
+    assert evicted_jobs >= 2  # Other tests' jobs may have expired as well
+    assert job_sweeper.evicted_jobs == evicted_jobs
+    assert "JOB_010" not in JOB_INFO_BY_ID and "JOB_011" not in JOB_INFO_BY_ID
+    assert "JOB_012" in JOB_INFO_BY_ID
+
+
+def test_get_stats() -> None:
+    """Counting the live jobs"""
+    response = client.get("/stats")
+    assert response.status_code == 200
+
+    stats = response.json()
+    assert stats["live_jobs"] == len(JOB_INFO_BY_ID)
+    assert stats["evicted_jobs"] >= 0
+
+
+def test_health(mocker) -> None:
+    """The server is healthy as long as its job store answers"""
+    response = client.get("/healthz")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+    mocker.patch.object(database.JOB_STORE, "get", side_effect=ConnectionError)
+    assert client.get("/healthz").status_code == 503
+
+
+def test_scheduler_transitions_due_jobs() -> None:
+    """The scheduler moves the jobs to their terminal state without anyone polling"""
+    job_scheduler = JobScheduler()
+    transitions = []
+    events.JOB_TRANSITIONS.subscribe(transitions.append)
+
+    async def run_scheduler() -> None:
+        task = asyncio.create_task(job_scheduler.run())
+        await asyncio.sleep(0)
+        for job_id, delay in [("JOB_014", 3600), ("JOB_015", 0)]:
+            JOB_INFO_BY_ID[job_id] = Job(
+                delay=delay, random_num=1.0, started_at=datetime.now(), status="pending"
+            )
+            job_scheduler.schedule(job_id, JOB_INFO_BY_ID[job_id])
+
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+    try:
+        asyncio.run(run_scheduler())
+    finally:
+        events.JOB_TRANSITIONS.unsubscribe(transitions.append)
+
+    assert JOB_INFO_BY_ID["JOB_014"].status == "pending"
+    assert JOB_INFO_BY_ID["JOB_015"].status == "completed"
+    assert [t.job_id for t in transitions] == ["JOB_015"]
+    assert job_scheduler.transitioned_jobs == 1
+
+
+def test_scheduler_skips_resubmitted_jobs() -> None:
+    """A job resubmitted with a longer delay isn't moved on at its former due time"""
+    job_scheduler = JobScheduler()
+    job_scheduler.schedule(
+        "JOB_016",
+        Job(delay=0, random_num=1.0, started_at=datetime.now(), status="pending"),
+    )
+    JOB_INFO_BY_ID["JOB_016"] = Job(
+        delay=3600, random_num=1.0, started_at=datetime.now(), status="pending"
+    )
+
+    assert asyncio.run(job_scheduler.run_due()) == 0
+    assert JOB_INFO_BY_ID["JOB_016"].status == "pending"
+
+
+def _flaky(function, error: Exception):
+    """Wraps the function so that its first call raises the error"""
+    errors_to_raise = [error]
+
+    def flaky_function(*args):
+        if errors_to_raise:
+            raise errors_to_raise.pop()
+        return function(*args)
+
+    return flaky_function
+
+
+def _schedule_due_jobs(job_scheduler: JobScheduler, job_ids: list[str]) -> None:
+    """Stores the (pending) jobs, due right away, and schedules them"""
+    for job_id in job_ids:
+        JOB_INFO_BY_ID[job_id] = Job(
+            delay=0, random_num=1.0, started_at=datetime.now(), status="pending"
+        )
+        job_scheduler.schedule(job_id, JOB_INFO_BY_ID[job_id])
+
+
+def test_scheduler_retries_failed_batches(monkeypatch) -> None:
+    """The jobs of a batch that couldn't be read are transitioned after a backoff"""
+    job_scheduler = JobScheduler(backoff_seconds=0.05)
+    _schedule_due_jobs(job_scheduler, ["JOB_045", "JOB_046"])
+    monkeypatch.setattr(
+        database,
+        "fake_get_jobs_info",
+        _flaky(database.fake_get_jobs_info, errors.GetJobInfoError("down")),
+    )
+
+    assert asyncio.run(job_scheduler.run_due()) == 0
+    assert JOB_INFO_BY_ID["JOB_045"].status == "pending"
+
+    time.sleep(0.05)
+    assert asyncio.run(job_scheduler.run_due()) == 2
+    assert JOB_INFO_BY_ID["JOB_045"].status == "completed"
+    assert JOB_INFO_BY_ID["JOB_046"].status == "completed"
+
+
+def test_scheduler_retries_failed_updates(monkeypatch) -> None:
+    """A job whose status couldn't be updated is transitioned after a backoff"""
+    job_scheduler = JobScheduler(backoff_seconds=0.05)
+    _schedule_due_jobs(job_scheduler, ["JOB_047", "JOB_048"])
+    monkeypatch.setattr(
+        database,
+        "fake_update_job_status",
+        _flaky(database.fake_update_job_status, errors.UpdateJobStatusError("down")),
+    )
+
+    assert asyncio.run(job_scheduler.run_due()) == 1
+    assert JOB_INFO_BY_ID["JOB_047"].status == "pending"
+
+    time.sleep(0.05)
+    assert asyncio.run(job_scheduler.run_due()) == 1
+    assert JOB_INFO_BY_ID["JOB_047"].status == "completed"
+
+
+def test_server_schedules_the_stored_pending_jobs() -> None:
+    """Jobs still pending when the server (re)starts reach their terminal state"""
+    JOB_INFO_BY_ID["JOB_049"] = Job(
+        delay=0, random_num=1.0, started_at=datetime.now(), status="pending"
+    )
+
+    with TestClient(app):
+        _wait_until(lambda: JOB_INFO_BY_ID["JOB_049"].status != "pending")
+
+
+def test_server_runs_the_scheduler() -> None:
+    """Submitted jobs reach their terminal state while the server is up"""
+    with TestClient(app) as lifespan_client:
+        lifespan_client.post("/submit/JOB_017", params={"delay_seconds": 0})
+
+        _wait_until(lambda: JOB_INFO_BY_ID["JOB_017"].status != "pending")
+
+
+def test_submit_job_invalid_callback_url() -> None:
+    """Only HTTP(S) URLs can be called back"""
+    response = client.post("/submit/JOB_018", params={"callback_url": "ftp://host/x"})
+    assert response.status_code == 422
+
+
+def test_webhook_delivered_when_job_finishes() -> None:
+    """The job's result is POSTed to its callback URL, retrying after a failure"""
+    with running_webhook_receiver(status_codes=(503, 200)) as receiver:
+        with TestClient(app) as lifespan_client:
+            lifespan_client.post(
+                "/submit/JOB_019",
+                params={"delay_seconds": 0, "callback_url": receiver.url},
+            )
+            _wait_until(lambda: len(receiver.received) == 2)
+            # The host is forgotten once it has no deliveries left
+            _wait_until(lambda: not webhooks.WEBHOOK_DISPATCHER._in_flight_by_host)
+
+    result = JOB_INFO_BY_ID["JOB_019"].outcome
+    assert receiver.received == [{"job_id": "JOB_019", "result": result}] * 2
+
+
+def test_webhook_dead_lettered(monkeypatch) -> None:
+    """Callbacks that keep failing end up in the dead letters"""
+    monkeypatch.setattr(webhooks.WEBHOOK_DISPATCHER, "max_attempts", 2)
+    monkeypatch.setattr(webhooks.WEBHOOK_DISPATCHER, "backoff_seconds", 0.01)
+
+    with running_webhook_receiver(status_codes=(500,)) as receiver:
+        with TestClient(app) as lifespan_client:
+            lifespan_client.post(
+                "/submit/JOB_020",
+                params={"delay_seconds": 0, "callback_url": receiver.url},
+            )
+            _wait_until(lambda: webhooks.WEBHOOK_DISPATCHER.dead_letters)
+            response = lifespan_client.get("/webhooks/dead-letters")
+
+    assert len(receiver.received) == 2
+    dead_letter = response.json()["dead_letters"][-1]
+    assert dead_letter["job_id"] == "JOB_020"
+    assert dead_letter["callback_url"] == receiver.url
+    assert dead_letter["attempts"] == 2
+    assert dead_letter["error"] == "HTTP 500"
+
+
+def test_webhook_queue_holds_callbacks_only(monkeypatch) -> None:
+    """Transitions of the jobs without a callback_url take no room in the delivery
+    queue, and are never dead-lettered
+    """
+    monkeypatch.setattr(webhooks.WEBHOOK_DISPATCHER, "queue_size", 1)
+    monkeypatch.setattr(webhooks.WEBHOOK_DISPATCHER, "dead_letters", deque(maxlen=10))
+
+    with running_webhook_receiver(status_codes=(200,)) as receiver:
+        with TestClient(app) as lifespan_client:
+            lifespan_client.get("/healthz")  # Lets the dispatcher start
+            for i in range(100):
+                events.JOB_TRANSITIONS.publish(
+                    events.JobTransition(f"JOB_NO_CALLBACK_{i}", "pending", "completed")
+                )
+            events.JOB_TRANSITIONS.publish(
+                events.JobTransition("JOB_CALLBACK", "pending", "error", receiver.url)
+            )
+            _wait_until(lambda: receiver.received)
+
+    assert receiver.received == [{"job_id": "JOB_CALLBACK", "result": "error"}]
+    assert not webhooks.WEBHOOK_DISPATCHER.dead_letters
+
+
+def test_get_metrics(fake_create_completed_job) -> None:
+    """Requests and database operations are counted, by route and operation"""
+    operations = metrics.DATABASE_OPERATIONS.value("get_job_info", "ok")
+    requests = metrics.HTTP_REQUESTS.value("GET", "/status/{job_id}", "200")
+
+    client.get(f"/status/{FAKE_COMPLETED_JOB_ID}")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert metrics.DATABASE_OPERATIONS.value("get_job_info", "ok") == operations + 1
+    assert (
+        metrics.HTTP_REQUESTS.value("GET", "/status/{job_id}", "200") == requests + 1
+    )
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/status/{job_id}"}'
+        in response.text
+    )
+    assert 'jobs{status="completed"}' in response.text
+
+
+def test_metrics_histogram_buckets_are_cumulative() -> None:
+    """Every observation counts towards its bucket and all the larger ones"""
+    histogram = metrics.Histogram("latency_seconds", "Latency", ("route",), (0.1, 1))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5, "/a")
+
+    assert histogram.render().splitlines()[2:] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 5.55',
+        'latency_seconds_count{route="/a"} 3',
+    ]
+
+
+@pytest.mark.parametrize("delay_seconds", [-1, 3601])
+def test_submit_job_invalid_delay(delay_seconds) -> None:
+    """Delays have to be within 0 and MAX_DELAY_SECONDS, one job at a time or in batches"""
+    response = client.post("/submit/JOB_021", params={"delay_seconds": delay_seconds})
+    assert response.status_code == 422
+
+    jobs = [{"job_id": "JOB_021", "delay_seconds": delay_seconds}]
+    response = client.post("/submit:batch", json={"jobs": jobs})
+    assert response.status_code == 422
+
+
+def test_submit_rate_limited(monkeypatch) -> None:
+    """Clients submitting faster than their rate limit get 429s with a Retry-After"""
+    monkeypatch.setattr(
+        admission,
+        "ADMISSION_CONTROLLER",
+        admission.AdmissionController(rate_per_client=0.5, burst_per_client=2),
+    )
+
+    jobs = [{"job_id": "JOB_022"}, {"job_id": "JOB_023"}]
+    assert client.post("/submit:batch", json={"jobs": jobs}).status_code == 200
+    response = client.post("/submit/JOB_024")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+    assert "JOB_024" not in JOB_INFO_BY_ID
+
+
+def test_submit_over_capacity(monkeypatch, fake_create_pending_job) -> None:
+    """Submissions beyond the cap on pending jobs get 429s, batches as a whole"""
+    pending_jobs = sum(job.status == "pending" for job in JOB_INFO_BY_ID.values())
+    controller = admission.AdmissionController(
+        max_pending_jobs=pending_jobs + 1, over_capacity_retry_after_seconds=3
+    )
+    controller.refresh()  # As the lifespan's background task would
+    monkeypatch.setattr(admission, "ADMISSION_CONTROLLER", controller)
+
+    jobs = [{"job_id": "JOB_025"}, {"job_id": "JOB_026"}]
+    response = client.post("/submit:batch", json={"jobs": jobs})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
+
+    assert client.post("/submit/JOB_025").status_code == 201
+    assert client.post("/submit/JOB_026").status_code == 429
+
+
+def test_admission_does_not_count_while_admitting(monkeypatch) -> None:
+    """Submissions are admitted against the count of pending jobs of the latest
+    refresh, plus the ones admitted since, without scanning the store
+    """
+    counts = []
+    monkeypatch.setattr(
+        database, "fake_count_jobs_by_status", lambda: counts.append(1) or {"pending": 5}
+    )
+    controller = admission.AdmissionController(max_pending_jobs=8, rate_per_client=0)
+    controller.refresh()
+
+    assert controller.admit("client", jobs=2) is None
+    assert controller.admit("client", jobs=2).reason == "over_capacity"
+    assert controller.admit("client", jobs=1) is None
+    assert len(counts) == 1
+
+
+def test_pool_processes_by_priority() -> None:
+    """Queued jobs are processed highest priority first, first come first served
+    within a priority, and at most `workers` at once
+    """
+    processed_job_ids = []
+    running_jobs = max_running_jobs = 0
+
+    async def work(job_id: str, job: Job) -> None:
+        nonlocal running_jobs, max_running_jobs
+        running_jobs += 1
+        max_running_jobs = max(max_running_jobs, running_jobs)
+        processed_job_ids.append(job_id)
+        await asyncio.sleep(0.01)
+        running_jobs -= 1
+
+    worker_pool = pool.WorkerPool(workers=2, work=work)
+    for job_id, priority in [
+        ("JOB_027", 0), ("JOB_028", 0), ("JOB_029", 5), ("JOB_030", 0), ("JOB_031", 5)
+    ]:
+        JOB_INFO_BY_ID[job_id] = Job(
+            delay=0, random_num=1.0, started_at=datetime.now(), status="pending"
+        )
+        worker_pool.submit(job_id, JOB_INFO_BY_ID[job_id], priority)
+
+    async def run_pool() -> None:
+        task = asyncio.create_task(worker_pool.run())
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+    asyncio.run(run_pool())
+
+    assert processed_job_ids == ["JOB_029", "JOB_031", "JOB_027", "JOB_028", "JOB_030"]
+    assert max_running_jobs == 2
+    assert worker_pool.processed_jobs == 5
+    assert JOB_INFO_BY_ID["JOB_030"].status == "completed"
+
+
+def test_pool_skips_resubmitted_jobs() -> None:
+    """A job resubmitted while queued is only processed once, at its new place"""
+    worker_pool = pool.WorkerPool(workers=1)
+    for _ in range(2):
+        JOB_INFO_BY_ID["JOB_032"] = Job(
+            delay=0, random_num=1.0, started_at=datetime.now(), status="pending"
+        )
+        worker_pool.submit("JOB_032", JOB_INFO_BY_ID["JOB_032"])
+
+    assert worker_pool.queued_jobs == 1
+
+
+def test_status_reports_queue_position(monkeypatch) -> None:
+    """Queued jobs report their position, and an ETA growing with the queue depth"""
+    monkeypatch.setattr(config, "JOB_EXECUTION_MODE", "pool")
+    monkeypatch.setattr(pool, "WORKER_POOL", pool.WorkerPool(workers=2))
+    monkeypatch.setattr(database.RANDOM, "random", lambda: 1.0)  # No job bound to fail
+
+    # The pool isn't running (the lifespan isn't), so the jobs stay queued
+    for job_id, priority in [("JOB_033", 0), ("JOB_034", 0), ("JOB_035", 0), ("JOB_036", 1)]:
+        response = client.post(
+            f"/submit/{job_id}", params={"delay_seconds": 10, "priority": priority}
+        )
+        assert response.status_code == 201
+
+    statuses = [client.get(f"/status/JOB_03{i}").json() for i in range(3, 7)]
+    assert [status["queue_position"] for status in statuses] == [2, 3, 4, 1]
+    # Two workers: the first two jobs are expected to take 10s, the next two 20s
+    assert [round(status["remaining_seconds"]) for status in statuses] == [10, 20, 20, 10]
+
+    response = client.post("/status:batch", json={"job_ids": ["JOB_035"]})
+    assert response.json()["results"][0]["queue_position"] == 4
+
+
+def test_server_runs_the_pool(monkeypatch) -> None:
+    """Submitted jobs are processed by the pool while the server is up, and
+    long-polls return as soon as they are
+    """
+    monkeypatch.setattr(config, "JOB_EXECUTION_MODE", "pool")
+    monkeypatch.setattr(pool, "WORKER_POOL", pool.WorkerPool(workers=1))
+    # Otherwise the pending jobs of the other tests would be queued ahead of this one
+    monkeypatch.setattr(database, "JOB_STORE", InMemoryJobStore())
+
+    with TestClient(app) as lifespan_client:
+        lifespan_client.post("/submit/JOB_037", params={"delay_seconds": 1})
+        started_at = time.monotonic()
+        response = lifespan_client.get("/status/JOB_037", params={"wait": 10})
+
+    assert response.json()["result"] in ("completed", "error")
+    assert time.monotonic() - started_at < 2
+
+
+def test_sweeper_spares_queued_jobs(monkeypatch) -> None:
+    """Jobs queued for the pool for longer than their delay and retention period
+    aren't swept until the pool has finished them
+    """
+    monkeypatch.setattr(config, "JOB_EXECUTION_MODE", "pool")
+    worker_pool = pool.WorkerPool(workers=1)
+    monkeypatch.setattr(pool, "WORKER_POOL", worker_pool)
+    job_ids = [f"JOB_QUEUED_{i:03}" for i in range(50)]
+    for job_id in job_ids:
+        assert client.post(f"/submit/{job_id}", params={"delay_seconds": 0}).status_code == 201
+
+    job_sweeper = JobSweeper(retention_seconds=0)
+    asyncio.run(job_sweeper.sweep())
+    assert all(job_id in JOB_INFO_BY_ID for job_id in job_ids)
+
+    async def run_pool() -> None:
+        task = asyncio.create_task(worker_pool.run())
+        while worker_pool.queued_jobs:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(run_pool())
+    asyncio.run(job_sweeper.sweep())
+    assert not any(job_id in JOB_INFO_BY_ID for job_id in job_ids)
+
+
+def _put_chunk(upload_id: str, index: int, data: bytes, sha256: str = ""):
+    """Uploads a chunk through the PUT /uploads/{upload_id}/chunks/{index} API"""
+    return client.put(
+        f"/uploads/{upload_id}/chunks/{index}",
+        content=data,
+        headers={"X-Chunk-SHA256": sha256 or hashlib.sha256(data).hexdigest()},
+    )
+
+
+def test_chunked_upload(monkeypatch, tmp_path) -> None:
+    """Chunks uploaded in any order are assembled into the source file, and the
+    job is submitted once the upload is completed
+    """
+    monkeypatch.setattr(uploads, "UPLOAD_STORE", uploads.UploadStore(str(tmp_path)))
+    chunk_size = uploads.CHUNK_SIZE_MULTIPLE
+    video = os.urandom(2 * chunk_size + 1000)
+
+    response = client.post(
+        "/submit/JOB_038/uploads",
+        json={"size": len(video), "chunk_size": chunk_size, "delay_seconds": 0},
+    )
+    assert response.status_code == 201
+    session = response.json()
+    assert session["chunks"] == 3
+    upload_id = session["upload_id"]
+
+    for index in (2, 0):
+        response = _put_chunk(upload_id, index, video[index * chunk_size :][:chunk_size])
+        assert response.status_code == 200
+    assert response.json()["offset"] == 0
+
+    response = client.post(f"/uploads/{upload_id}:complete")
+    assert response.status_code == 409
+    assert "JOB_038" not in JOB_INFO_BY_ID
+
+    # Resuming: the server tells which chunks it already has
+    assert client.get(f"/uploads/{upload_id}").json()["received_chunks"] == [0, 2]
+    assert _put_chunk(upload_id, 1, video[chunk_size : 2 * chunk_size]).status_code == 200
+
+    assert client.post(f"/uploads/{upload_id}:complete").status_code == 201
+    assert JOB_INFO_BY_ID["JOB_038"].status == "pending"
+    with open(uploads.UPLOAD_STORE.source_path(upload_id), "rb") as source:
+        assert source.read() == video
+    assert _put_chunk(upload_id, 1, video[chunk_size : 2 * chunk_size]).status_code == 409
+
+
+def test_chunked_upload_completed_once(monkeypatch, tmp_path) -> None:
+    """Of concurrent completions of an upload, a single one submits its job"""
+    monkeypatch.setattr(uploads, "UPLOAD_STORE", uploads.UploadStore(str(tmp_path)))
+    response = client.post("/submit/JOB_039_ONCE/uploads", json={"size": 10})
+    upload_id = response.json()["upload_id"]
+    assert _put_chunk(upload_id, 0, b"0123456789").status_code == 200
+
+    # The other completions read the session before the first one completed it
+    session = uploads.UPLOAD_STORE.get(upload_id)
+    monkeypatch.setattr(uploads.UPLOAD_STORE, "get", lambda _: session)
+    submit_job = database.fake_submit_job
+    submitted_jobs = []
+    monkeypatch.setattr(
+        database,
+        "fake_submit_job",
+        lambda *args: submitted_jobs.append(args[0]) or submit_job(*args),
+    )
+
+    status_codes = [client.post(f"/uploads/{upload_id}:complete").status_code for _ in range(3)]
+    assert status_codes == [201, 409, 409]
+    assert submitted_jobs == ["JOB_039_ONCE"]
+
+
+def test_chunked_upload_rejects_corrupt_chunks(monkeypatch, tmp_path) -> None:
+    """Chunks that don't match their digest or length aren't marked as received"""
+    monkeypatch.setattr(uploads, "UPLOAD_STORE", uploads.UploadStore(str(tmp_path)))
+    response = client.post("/submit/JOB_039/uploads", json={"size": 10})
+    upload_id = response.json()["upload_id"]
+
+    assert _put_chunk(upload_id, 0, b"0123456789", sha256="0" * 64).status_code == 422
+    assert _put_chunk(upload_id, 0, b"012345678").status_code == 422
+    assert _put_chunk(upload_id, 0, b"0123456789A").status_code == 422
+    assert _put_chunk(upload_id, 1, b"0123456789").status_code == 422
+    assert client.get(f"/uploads/{upload_id}").json()["received_chunks"] == []
+
+    response = client.post("/submit/JOB_039/uploads", json={"size": 10, "chunk_size": 1000})
+    assert response.status_code == 422
+    assert client.get("/uploads/../../etc").status_code == 404
+    assert client.delete(f"/uploads/{upload_id}").status_code == 204
+    assert client.get(f"/uploads/{upload_id}").status_code == 404
+
+
+def test_sweeper_evicts_expired_uploads(monkeypatch, tmp_path) -> None:
+    """Abandoned uploads, and the completed ones whose job is gone, are deleted"""
+    monkeypatch.setattr(uploads, "UPLOAD_STORE", uploads.UploadStore(str(tmp_path)))
+    virtual_clock = clock.VirtualClock(start=datetime.now())
+    monkeypatch.setattr(clock, "CLOCK", virtual_clock)
+    # Buckets refilled as per the virtual clock
+    monkeypatch.setattr(admission, "ADMISSION_CONTROLLER", admission.AdmissionController())
+
+    def create_upload(job_id: str, complete: bool) -> str:
+        response = client.post(
+            f"/submit/{job_id}/uploads", json={"size": 10, "delay_seconds": 3600}
+        )
+        upload_id = response.json()["upload_id"]
+        if complete:
+            assert _put_chunk(upload_id, 0, b"0123456789").status_code == 200
+            assert client.post(f"/uploads/{upload_id}:complete").status_code == 201
+        return upload_id
+
+    abandoned_upload_id = create_upload("JOB_040", complete=False)
+    virtual_clock.advance(3600)
+    ongoing_upload_id = create_upload("JOB_041", complete=False)
+    completed_upload_id = create_upload("JOB_042", complete=True)
+    orphaned_upload_id = create_upload("JOB_043", complete=True)
+    assert client.delete("/jobs/JOB_043").status_code == 204
+    virtual_clock.advance(120)
+
+    job_sweeper = JobSweeper(upload_retention_seconds=1800)
+    assert asyncio.run(job_sweeper.sweep_uploads()) == 2
+    assert job_sweeper.evicted_uploads == 2
+    assert uploads.UPLOAD_STORE.get(abandoned_upload_id) is None
+    assert uploads.UPLOAD_STORE.get(orphaned_upload_id) is None
+    assert uploads.UPLOAD_STORE.get(ongoing_upload_id) is not None
+    assert uploads.UPLOAD_STORE.get(completed_upload_id).completed
+
+
+def test_sweeper_deletes_outputs(monkeypatch, tmp_path) -> None:
+    """The output files of the expired jobs are deleted along with them"""
+    monkeypatch.setattr(
+        results, "RESULT_STORE", results.ResultStore(str(tmp_path), standin_size=10)
+    )
+    monkeypatch.setattr(database.RANDOM, "random", lambda: 1.0)  # No job bound to fail
+    database.fake_submit_jobs({"JOB_044": 0})
+    assert client.get("/result/JOB_044").status_code == 200
+    assert len(os.listdir(tmp_path)) == 1
+
+    asyncio.run(JobSweeper(retention_seconds=0).sweep())
+
+    assert "JOB_044" not in JOB_INFO_BY_ID
+    assert os.listdir(tmp_path) == []
+
+
+def test_get_result_ranges(monkeypatch, tmp_path, fake_create_completed_job) -> None:
+    """The output of a completed job is served whole or by byte range, with
+    validators the client can make conditional and If-Range requests with
+    """
+    monkeypatch.setattr(
+        results, "RESULT_STORE", results.ResultStore(str(tmp_path), standin_size=1000)
+    )
+
+    response = client.get(f"/result/{FAKE_COMPLETED_JOB_ID}")
+    assert response.status_code == 200
+    assert len(response.content) == 1000
+    assert response.headers["Accept-Ranges"] == "bytes"
+    output, etag = response.content, response.headers["ETag"]
+
+    for range_header, expected_range, expected_content in [
+        ("bytes=0-99", "0-99", output[:100]),
+        ("bytes=900-", "900-999", output[900:]),
+        ("bytes=-10", "990-999", output[-10:]),
+        ("bytes=990-5000", "990-999", output[990:]),
+    ]:
+        response = client.get(
+            f"/result/{FAKE_COMPLETED_JOB_ID}", headers={"Range": range_header}
+        )
+        assert response.status_code == 206
+        assert response.headers["Content-Range"] == f"bytes {expected_range}/1000"
+        assert response.content == expected_content
+
+    response = client.get(f"/result/{FAKE_COMPLETED_JOB_ID}", headers={"Range": "bytes=1000-"})
+    assert response.status_code == 416
+    assert response.headers["Content-Range"] == "bytes */1000"
+
+    # A stale If-Range gets the whole (new) file rather than a range of it
+    response = client.get(
+        f"/result/{FAKE_COMPLETED_JOB_ID}",
+        headers={"Range": "bytes=0-9", "If-Range": '"stale"'},
+    )
+    assert response.status_code == 200
+    response = client.get(
+        f"/result/{FAKE_COMPLETED_JOB_ID}", headers={"Range": "bytes=0-9", "If-Range": etag}
+    )
+    assert response.status_code == 206
+
+    response = client.get(f"/result/{FAKE_COMPLETED_JOB_ID}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    response = client.get(
+        f"/result/{FAKE_COMPLETED_JOB_ID}",
+        headers={"If-Modified-Since": response.headers["Last-Modified"]},
+    )
+    assert response.status_code == 304
+
+    response = client.head(f"/result/{FAKE_COMPLETED_JOB_ID}")
+    assert response.headers["Content-Length"] == "1000"
+    assert response.content == b""
+
+
+def test_get_result_of_pending_job() -> None:
+    """Jobs that aren't completed have no output"""
+    JOB_INFO_BY_ID["JOB_RESULT_PENDING"] = Job(
+        delay=60, random_num=1.0, started_at=datetime.now(), status="pending"
+    )
+    response = client.get("/result/JOB_RESULT_PENDING")
+    assert response.status_code == 409
+
+
+def test_virtual_clock_event_loop() -> None:
+    """Waits on the loop of a virtual clock are skipped through, except for the
+    calls running on worker threads
+    """
+    virtual_clock = clock.VirtualClock(start=datetime(2000, 1, 1))
+    loop = virtual_clock.new_event_loop()
+
+    async def wait() -> int:
+        await asyncio.sleep(3600)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(asyncio.Event().wait(), timeout=1800)
+        return await asyncio.to_thread(lambda: 42)
+
+    started_at = time.perf_counter()
+    try:
+        assert loop.run_until_complete(wait()) == 42
+    finally:
+        loop.close()
+    assert time.perf_counter() - started_at < 1
+    assert virtual_clock.now() == datetime(2000, 1, 1, 1, 30)
+
+
+def test_simulation_is_reproducible() -> None:
+    """Hours of polling are simulated in seconds, with the same outcomes for the same seed"""
+    first, second = (simulate(jobs=100, hours=2, seed=7) for _ in range(2))
+
+    assert first.digest == second.digest
+    assert first.results == second.results
+    assert sum(first.results.values()) == 100 and "pending" not in first.results
+    assert first.virtual_seconds > 3600
+    assert first.wall_seconds < 30
+    assert simulate(jobs=100, hours=2, seed=8).digest != first.digest
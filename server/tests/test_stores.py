@@ -0,0 +1,289 @@
+"""Testing the job store backends"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Iterator
+
+import socket
+import threading
+
+import pytest
+
+from server import config, database, errors, events
+from server.models import Job
+from server.stores import redis as redis_store
+from server.stores import (
+    CompactJobStore,
+    InMemoryJobStore,
+    JobStore,
+    RedisJobStore,
+    SQLiteJobStore,
+)
+from server.tests.resp_server import running_resp_server
+
+
+STARTED_AT = datetime(2024, 5, 1, 12, 0, 0, 123456)
+
+
+def _job(status: str = "pending", started_at: datetime = STARTED_AT) -> Job:
+    """Builds a job record, which finishes processing 10 seconds after it's started"""
+    return Job(delay=10, random_num=0.5, started_at=started_at, status=status)
+
+
+@pytest.fixture(scope="module")
+def resp_server_url() -> Iterator[str]:
+    """Runs a stand-in for a Redis server, shared by the module's tests"""
+    with running_resp_server() as url:
+        yield url
+
+
+@pytest.fixture(params=["memory", "compact", "sqlite", "redis"])
+def job_store(request, tmp_path, resp_server_url) -> Iterator[JobStore]:
+    """Yields an empty job store of every backend"""
+    if request.param == "memory":
+        yield InMemoryJobStore()
+    elif request.param == "compact":
+        yield CompactJobStore()
+    elif request.param == "sqlite":
+        store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+        yield store
+        store.close()
+    else:
+        store = RedisJobStore(resp_server_url)
+        yield store
+        store._connection().execute("FLUSHALL")
+        store.close()
+
+
+def test_put_and_get(job_store) -> None:
+    """Records round-trip through the store"""
+    job_store.put("JOB_000", _job())
+
+    assert job_store.get("JOB_000") == _job()
+    assert job_store.get("non_existent_job_id") is None
+
+
+def test_put_many_and_get_many(job_store) -> None:
+    """Records round-trip through the store in bulk"""
+    job_store.put_many({f"JOB_{i:03}": _job() for i in range(3)})
+
+    jobs = job_store.get_many(["JOB_002", "JOB_000", "non_existent_job_id"])
+    assert jobs == {"JOB_002": _job(), "JOB_000": _job(), "non_existent_job_id": None}
+
+
+def test_put_overwrites(job_store) -> None:
+    """Resubmitting a job replaces its record"""
+    job_store.put("JOB_000", _job("error"))
+    job_store.put("JOB_000", _job())
+
+    assert job_store.get("JOB_000").status == "pending"
+
+
+def test_callback_url(job_store) -> None:
+    """Callback URLs round-trip through the store, and go away on overwrites"""
+    job = _job()
+    job.callback_url = "http://127.0.0.1:9000/hooks?job=JOB_000"
+    job_store.put("JOB_000", job)
+    assert job_store.get("JOB_000") == job
+
+    job_store.put("JOB_000", _job())
+    assert job_store.get("JOB_000").callback_url is None
+
+
+def test_update_status(job_store) -> None:
+    """Updating the status returns the previous one"""
+    job_store.put("JOB_000", _job())
+    finished_at = STARTED_AT + timedelta(seconds=15)
+
+    assert job_store.update_status("JOB_000", "completed", finished_at) == "pending"
+    assert job_store.get("JOB_000").status == "completed"
+    assert job_store.get("JOB_000").finished_at == finished_at
+
+    with pytest.raises(KeyError):
+        job_store.update_status("non_existent_job_id", "completed", finished_at)
+
+
+def test_count_by_status(job_store) -> None:
+    """Jobs are counted per status"""
+    assert job_store.count_by_status() == {}
+
+    job_store.put_many({"JOB_000": _job(), "JOB_001": _job(), "JOB_002": _job()})
+    job_store.update_status("JOB_001", "error", STARTED_AT)
+
+    assert job_store.count_by_status() == {"pending": 2, "error": 1}
+
+
+def test_iter_pending(job_store) -> None:
+    """Only the pending jobs are gone through"""
+    job_store.put_many({"JOB_000": _job(), "JOB_001": _job(), "JOB_002": _job()})
+    job_store.update_status("JOB_001", "completed", STARTED_AT)
+
+    assert dict(job_store.iter_pending()) == {"JOB_000": _job(), "JOB_002": _job()}
+
+
+def test_concurrent_status_updates_from_threads(job_store) -> None:
+    """Of the threads updating a job's status at once, only one sees it pending"""
+    job_store.put("JOB_000", _job())
+    barrier = threading.Barrier(8)
+
+    def update_status(status: str) -> str:
+        barrier.wait()
+        return job_store.update_status("JOB_000", status, STARTED_AT)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        previous_statuses = list(executor.map(update_status, ["completed", "error"] * 4))
+
+    assert previous_statuses.count("pending") == 1
+
+
+def test_concurrent_status_updates(resp_server_url, monkeypatch) -> None:
+    """An update of a job's status racing another connection's is retried, so
+    that only one of them sees the previous status, and the counts stay right
+    """
+    store, other_store = RedisJobStore(resp_server_url), RedisJobStore(resp_server_url)
+    store.put_many({"JOB_000": _job(), "JOB_001": _job()})
+    execute_transaction = redis_store._execute_transaction
+    raced: list = []
+
+    def racing_execute_transaction(connection, commands):
+        if connection is store._connection() and not raced:
+            raced.append(other_store.update_status("JOB_000", "error", STARTED_AT))
+        return execute_transaction(connection, commands)
+
+    monkeypatch.setattr(redis_store, "_execute_transaction", racing_execute_transaction)
+    try:
+        assert store.update_status("JOB_000", "completed", STARTED_AT) == "error"
+        assert raced == ["pending"]
+        assert store.count_by_status() == {"completed": 1, "pending": 1}
+
+        store.delete("JOB_001")
+        assert other_store.count_by_status() == {"completed": 1}
+    finally:
+        store._connection().execute("FLUSHALL")
+        store.close()
+        other_store.close()
+
+
+def test_redis_connection_reopened_after_failure(resp_server_url) -> None:
+    """A connection that failed mid-command is closed, and reopened by the next one"""
+    store = RedisJobStore(resp_server_url)
+    try:
+        store.put("JOB_000", _job())
+        connection = store._connection()
+        connection._socket.shutdown(socket.SHUT_RDWR)  # As if the server dropped it
+
+        with pytest.raises(OSError):
+            store.get("JOB_000")
+        assert store.get("JOB_000") == _job()
+        assert store._connection() is connection
+    finally:
+        store._connection().execute("FLUSHALL")
+        store.close()
+
+
+def test_delete(job_store) -> None:
+    """Deleting a record, which only succeeds once"""
+    job_store.put("JOB_000", _job())
+
+    assert job_store.delete("JOB_000") is True
+    assert job_store.delete("JOB_000") is False
+    assert job_store.get("JOB_000") is None
+
+
+def test_delete_expired(job_store) -> None:
+    """Jobs expire as of when they reached their terminal state or, if nobody
+    has looked at them since, as of when they finished processing
+    """
+    job_store.put_many(
+        {
+            "JOB_000": _job(),  # Finishes processing at STARTED_AT + 10s
+            "JOB_001": _job(started_at=STARTED_AT + timedelta(seconds=20)),
+            "JOB_002": _job(),
+            "JOB_003": _job(),
+        }
+    )
+    job_store.update_status("JOB_002", "error", STARTED_AT + timedelta(seconds=1))
+    job_store.update_status("JOB_003", "completed", STARTED_AT + timedelta(seconds=30))
+    assert job_store.count() == 4
+
+    cutoff = STARTED_AT + timedelta(seconds=25)
+    assert job_store.delete_expired(cutoff, limit=1) == ["JOB_002"]
+    assert job_store.delete_expired(cutoff, limit=10) == ["JOB_000"]
+    assert job_store.delete_expired(cutoff, limit=10) == []
+
+    assert None not in job_store.get_many(["JOB_001", "JOB_003"]).values()
+    assert job_store.count() == 2
+
+
+def test_delete_expired_spares_replacement_jobs(job_store) -> None:
+    """A deleted job's expiry doesn't carry over to a job stored after it"""
+    job_store.put("JOB_000", _job())  # Finishes processing at STARTED_AT + 10s
+    job_store.delete("JOB_000")
+    job_store.put("JOB_001", _job(started_at=STARTED_AT + timedelta(seconds=20)))
+
+    assert job_store.delete_expired(STARTED_AT + timedelta(seconds=25), limit=10) == []
+    assert job_store.get("JOB_001") == _job(started_at=STARTED_AT + timedelta(seconds=20))
+
+
+def test_delete_expired_spares_jobs_resubmitted_meanwhile(resp_server_url, monkeypatch) -> None:
+    """A job resubmitted by another connection after its expiry was read isn't deleted"""
+    store, other_store = RedisJobStore(resp_server_url), RedisJobStore(resp_server_url)
+    store.put_many({"JOB_000": _job(), "JOB_001": _job()})  # Expire at STARTED_AT + 10s
+    watch_statuses = redis_store._watch_statuses
+    raced: list = []
+
+    def racing_watch_statuses(connection, keys):
+        if connection is store._connection() and not raced:
+            resubmitted_job = _job(started_at=STARTED_AT + timedelta(seconds=20))
+            raced.append(other_store.put("JOB_000", resubmitted_job))
+        return watch_statuses(connection, keys)
+
+    monkeypatch.setattr(redis_store, "_watch_statuses", racing_watch_statuses)
+    try:
+        assert store.delete_expired(STARTED_AT + timedelta(seconds=25), limit=10) == ["JOB_001"]
+        assert raced == [None]
+        assert store.get("JOB_000") == _job(started_at=STARTED_AT + timedelta(seconds=20))
+        assert store.count_by_status() == {"pending": 1}
+    finally:
+        store._connection().execute("FLUSHALL")
+        store.close()
+        other_store.close()
+
+
+def test_delete_expired_spares_queued_jobs(job_store, monkeypatch) -> None:
+    """Jobs run by the worker pool don't expire while they're pending, however
+    long they're queued for, but as of when they finished
+    """
+    monkeypatch.setattr(config, "JOB_EXECUTION_MODE", "pool")
+    job_store.put_many({"JOB_000": _job(), "JOB_001": _job()})
+    job_store.update_status("JOB_001", "completed", STARTED_AT + timedelta(hours=1))
+
+    cutoff = STARTED_AT + timedelta(days=1)
+    assert job_store.delete_expired(cutoff, limit=10) == ["JOB_001"]
+    assert job_store.get("JOB_000") == _job()
+    assert job_store.get("JOB_001") is None
+
+    job_store.update_status("JOB_000", "error", STARTED_AT + timedelta(hours=2))
+    assert job_store.delete_expired(cutoff, limit=10) == ["JOB_000"]
+    assert job_store.count() == 0
+
+
+def test_database_functions_use_the_store(job_store, monkeypatch) -> None:
+    """The database functions go through the configured job store"""
+    monkeypatch.setattr(database, "JOB_STORE", job_store)
+    transitions = []
+    events.JOB_TRANSITIONS.subscribe(transitions.append)
+
+    try:
+        database.fake_submit_job("JOB_000", 5)
+        database.fake_update_job_status("JOB_000", "completed")
+        database.fake_update_job_status("JOB_000", "completed")
+    finally:
+        events.JOB_TRANSITIONS.unsubscribe(transitions.append)
+
+    assert database.fake_get_job_info("JOB_000").status == "completed"
+    assert transitions == [events.JobTransition("JOB_000", "pending", "completed")]
+    assert database.fake_delete_job("JOB_000") is True
+
+    with pytest.raises(errors.UpdateJobStatusError):
+        database.fake_update_job_status("JOB_000", "error")
@@ -0,0 +1,67 @@
+"""Local stand-in for the endpoints the webhook callbacks are delivered to"""
+
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+import json
+import threading
+
+
+class WebhookReceiver(ThreadingHTTPServer):
+    """Records the JSON body of every POST request, and answers each of them
+    with the next of `status_codes` (the last one being repeated).
+
+    Attributes:
+        url: str -> URL to POST the callbacks to.
+        received: list[dict] -> Bodies of the received requests, in order.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, status_codes: list[int]) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        host, port = self.server_address[:2]
+        self.url = f"http://{host}:{port}/callbacks"
+        self.received: list[dict] = []
+        self._status_codes = list(status_codes)
+        self._lock = threading.Lock()
+
+    def record(self, body: dict) -> int:
+        """Records the body and returns the status code to answer with"""
+        with self._lock:
+            self.received.append(body)
+            if len(self._status_codes) > 1:
+                return self._status_codes.pop(0)
+            return self._status_codes[0]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves the requests of a single connection"""
+
+    server: WebhookReceiver
+    protocol_version = "HTTP/1.1"  # Keeps the connections alive
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """Records the callback"""
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        status_code = self.server.record(json.loads(body))
+        self.send_response(status_code)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format: str, *args) -> None:  # pylint: disable=redefined-builtin
+        """Keeps the test output quiet"""
+
+
+@contextmanager
+def running_webhook_receiver(status_codes: tuple[int, ...] = (200,)) -> Iterator[WebhookReceiver]:
+    """Runs the receiver for the duration of the block"""
+    receiver = WebhookReceiver(list(status_codes))
+    thread = threading.Thread(target=receiver.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield receiver
+    finally:
+        receiver.shutdown()
+        receiver.server_close()
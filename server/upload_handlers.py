@@ -0,0 +1,284 @@
+"""Entry point to the APIs uploading the jobs' source videos in chunks, before
+submitting them (POST /submit/{job_id}/uploads and the /uploads APIs)
+"""
+
+from dataclasses import dataclass
+from typing import Annotated, Optional
+
+import asyncio
+import logging
+
+from fastapi import APIRouter, Header, HTTPException, Path, Request, Response
+from pydantic import Field
+
+from server import config, database, errors, submission, uploads
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@dataclass
+class CreateUploadRequest:
+    """DTO for the POST /submit/{job_id}/uploads API's request object"""
+
+    size: Annotated[int, Field(ge=1, le=config.MAX_UPLOAD_SIZE)]
+    chunk_size: Annotated[
+        int,
+        Field(
+            ge=uploads.CHUNK_SIZE_MULTIPLE,
+            le=config.MAX_UPLOAD_CHUNK_SIZE,
+            multiple_of=uploads.CHUNK_SIZE_MULTIPLE,
+        ),
+    ] = config.UPLOAD_CHUNK_SIZE
+    delay_seconds: Annotated[int, Field(ge=0, le=config.MAX_DELAY_SECONDS)] = 20
+    priority: Annotated[int, Field(ge=0, le=config.MAX_JOB_PRIORITY)] = 0
+    callback_url: Optional[submission.CallbackUrl] = None
+
+
+@dataclass
+class UploadSessionResponse:
+    """DTO for the state of an upload session, as returned by the /uploads APIs"""
+
+    upload_id: str
+    job_id: str
+    size: int
+    chunk_size: int
+    chunks: int
+    received_chunks: list[int]
+    completed: bool
+
+
+@dataclass
+class UploadChunkResponse:
+    """DTO for the PUT /uploads/{upload_id}/chunks/{index} API's response object"""
+
+    upload_id: str
+    index: int
+    offset: int
+    length: int
+
+
+# Bytes of an uploaded chunk gathered in memory before they're written to its file
+UPLOAD_BLOCK_SIZE = 2**20
+
+
+def _build_upload_session_response(session: uploads.UploadSession) -> UploadSessionResponse:
+    """Builds the /uploads APIs' description of the session"""
+    return UploadSessionResponse(
+        upload_id=session.upload_id,
+        job_id=session.job_id,
+        size=session.size,
+        chunk_size=session.chunk_size,
+        chunks=session.chunks,
+        received_chunks=session.received_chunks,
+        completed=session.completed,
+    )
+
+
+async def _get_upload_session_or_raise(upload_id: str) -> uploads.UploadSession:
+    """Fetches the upload session, raising the matching HTTPException on failure"""
+    try:
+        session = await asyncio.to_thread(uploads.UPLOAD_STORE.get, upload_id)
+    except errors.UploadError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    if not session:
+        raise HTTPException(
+            status_code=404, detail=f"Upload {upload_id} could not be found"
+        )
+
+    return session
+
+
+@router.post("/submit/{job_id}/uploads", status_code=201)
+async def create_upload(
+    request: Request,
+    job_id: Annotated[
+        str,
+        Path(max_length=config.MAX_JOB_ID_LENGTH, description="ID of the job to create"),
+    ],
+    upload: CreateUploadRequest,
+) -> UploadSessionResponse:
+    """Starts a chunked upload of the job's source video. The job is submitted
+    once every chunk has been uploaded (see POST /uploads/{upload_id}:complete).
+
+    Args:
+        job_id: str: ID of the job to submit
+        upload: CreateUploadRequest: The `size` of the file (in bytes), the
+        `chunk_size` it's uploaded in (a multiple of 1 MiB, default
+        UPLOAD_CHUNK_SIZE), and the `delay_seconds`, `priority` and
+        `callback_url` the job is submitted with (see POST /submit/{job_id})
+
+    Returns: The upload session, with its `upload_id` and number of `chunks`,
+    or a 429 (see POST /submit/{job_id})
+    """
+    submission.admit_or_raise(request, jobs=1)
+
+    try:
+        session = await asyncio.to_thread(
+            uploads.UPLOAD_STORE.create,
+            job_id,
+            upload.size,
+            upload.chunk_size,
+            upload.delay_seconds,
+            upload.priority,
+            upload.callback_url,
+        )
+    except errors.UploadError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    return _build_upload_session_response(session)
+
+
+@router.get("/uploads/{upload_id}")
+async def get_upload(
+    upload_id: Annotated[str, Path(description="ID of the upload session")],
+) -> UploadSessionResponse:
+    """Returns the state of the upload session, e.g. to resume an interrupted upload
+
+    Args:
+        upload_id: str: ID of the upload session
+
+    Returns: The upload session, with the indices of the `received_chunks`
+    """
+    return _build_upload_session_response(await _get_upload_session_or_raise(upload_id))
+
+
+@router.put("/uploads/{upload_id}/chunks/{index}")
+async def upload_chunk(
+    request: Request,
+    upload_id: Annotated[str, Path(description="ID of the upload session")],
+    index: Annotated[int, Path(ge=0, description="Index of the chunk (0 for the first)")],
+    x_chunk_sha256: Annotated[
+        str,
+        Header(pattern=r"^[0-9a-fA-F]{64}$", description="SHA-256 digest of the chunk, in hex"),
+    ],
+) -> UploadChunkResponse:
+    """Uploads a chunk of the file, i.e. its `chunk_size` bytes from offset
+    `index * chunk_size` (fewer for the last chunk). Chunks may be uploaded in
+    any order, in parallel, and uploaded again.
+
+    The body is written to disk as it's received, rather than buffered.
+
+    Args:
+        upload_id: str: ID of the upload session
+        index: int: Index of the chunk
+        x_chunk_sha256: str: The chunk's SHA-256 digest (X-Chunk-SHA256 header)
+
+    Returns: The chunk's `offset` and `length`, a 422 if the chunk doesn't have
+    the expected length or digest (in which case it isn't stored), or a 409 if
+    the upload was completed
+    """
+    session = await _get_upload_session_or_raise(upload_id)
+    if session.completed:
+        raise HTTPException(status_code=409, detail=f"Upload {upload_id} is completed")
+    if index >= session.chunks:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Upload {upload_id} only has {session.chunks} chunks",
+        )
+
+    try:
+        writer = await asyncio.to_thread(uploads.UPLOAD_STORE.open_chunk, session, index)
+    except errors.UploadError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    try:
+        block = bytearray()
+        async for data in request.stream():
+            block += data
+            if len(block) >= UPLOAD_BLOCK_SIZE:
+                full_block, block = block, bytearray()
+                await asyncio.to_thread(writer.write, full_block)
+        await asyncio.to_thread(writer.write, block)
+        await asyncio.to_thread(writer.commit, x_chunk_sha256)
+    except errors.ChunkRejectedError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    except errors.UploadError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    finally:
+        writer.close()
+
+    return UploadChunkResponse(
+        upload_id=upload_id, index=index, offset=writer.offset, length=writer.length
+    )
+
+
+@router.post("/uploads/{upload_id}:complete")
+async def complete_upload(
+    upload_id: Annotated[str, Path(description="ID of the upload session")],
+) -> Response:
+    """Completes the upload, once every chunk has been uploaded, and submits its job
+
+    Args:
+        upload_id: str: ID of the upload session
+
+    Returns: A string indicating successful submission of the job, with its ID,
+    or a 409 if chunks are missing or the upload was already completed
+    """
+    session = await _get_upload_session_or_raise(upload_id)
+    if session.completed:
+        raise HTTPException(
+            status_code=409, detail=f"Upload {upload_id} is already completed"
+        )
+
+    missing_chunks = session.chunks - len(session.received_chunks)
+    if missing_chunks:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Upload {upload_id} is missing {missing_chunks} of its {session.chunks} chunks",
+        )
+
+    # Claiming the completion first, so that concurrent calls don't all submit the job
+    try:
+        claimed = await asyncio.to_thread(uploads.UPLOAD_STORE.claim_completion, session)
+    except errors.UploadError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    if not claimed:
+        raise HTTPException(
+            status_code=409, detail=f"Upload {upload_id} is already completed"
+        )
+
+    try:
+        job = await asyncio.to_thread(
+            database.fake_submit_job,
+            session.job_id,
+            session.delay_seconds,
+            session.callback_url,
+        )
+        submission.dispatch(session.job_id, job, session.priority)
+    except errors.SubmitJobError as e:
+        try:
+            await asyncio.to_thread(uploads.UPLOAD_STORE.release_completion, session)
+        except errors.UploadError:
+            logger.exception("Failed to reopen the upload %s", upload_id)
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    return Response(
+        content=f"Successfully submitted the job: {session.job_id}", status_code=201
+    )
+
+
+@router.delete("/uploads/{upload_id}", status_code=204)
+async def delete_upload(
+    upload_id: Annotated[str, Path(description="ID of the upload session")],
+) -> Response:
+    """Deletes the upload session and its file, e.g. to abandon an upload
+
+    Args:
+        upload_id: str: ID of the upload session
+
+    Returns: An empty response
+    """
+    try:
+        deleted = await asyncio.to_thread(uploads.UPLOAD_STORE.delete, upload_id)
+    except errors.UploadError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+    if not deleted:
+        raise HTTPException(
+            status_code=404, detail=f"Upload {upload_id} could not be found"
+        )
+
+    return Response(status_code=204)
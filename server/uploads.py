@@ -0,0 +1,291 @@
+"""Chunked, resumable uploads of the jobs' source videos.
+
+An upload session spools a file of a known size to disk, in fixed-size chunks
+that can be sent in any order, in parallel, and again after an interruption.
+Every chunk is written straight into its place in the (pre-sized) file through a
+memory map of its region, so the file is assembled as the chunks arrive: nothing
+is buffered beyond a block of the chunk in flight, and nothing is copied once the
+last chunk is in.
+
+A session is a directory of the upload directory:
+
+- session.json: the session's parameters, written once.
+- source: the file being uploaded.
+- chunks/<index>: marker of a chunk that was received (and flushed to disk),
+  holding its SHA-256 digest. Markers are created atomically, after the chunk's
+  data, so that several server processes can share the upload directory.
+- completed: marker of an upload that was completed, and whose job was (or is
+  being) submitted, holding the time of its completion. It's created
+  exclusively, so that only one of concurrent completions submits the job.
+"""
+
+from contextlib import suppress
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import secrets
+import shutil
+
+from server import clock, config, errors
+
+# Chunk sizes have to be a multiple of this, so that every chunk's region can be
+# memory-mapped on its own (the offset of a map is a multiple of the allocation
+# granularity, 4 KiB on Linux and 64 KiB on Windows)
+CHUNK_SIZE_MULTIPLE = 2**20
+
+# IDs of the upload sessions, as generated by create()
+_UPLOAD_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+@dataclass
+class UploadSession:
+    """Record of an upload session.
+
+    Attributes:
+        upload_id: str -> ID of the session.
+        job_id: str -> ID of the job submitted once the upload is complete.
+        size: int -> Size of the file, in bytes.
+        chunk_size: int -> Size of every chunk (but the last one), in bytes.
+        delay_seconds: int -> `delay_seconds` the job is submitted with.
+        priority: int -> `priority` the job is submitted with.
+        callback_url: Optional[str] -> `callback_url` the job is submitted with.
+        created_at: float -> Time (since the epoch) at which the session was created.
+        received_chunks: list[int] -> Indices of the chunks received so far.
+        completed_at: Optional[float] -> Time (since the epoch) at which the upload
+        was completed (and its job submitted), None until it is.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    upload_id: str
+    job_id: str
+    size: int
+    chunk_size: int
+    delay_seconds: int
+    priority: int
+    callback_url: Optional[str]
+    created_at: float
+    received_chunks: list[int] = field(default_factory=list)
+    completed_at: Optional[float] = None
+
+    @property
+    def completed(self) -> bool:
+        """Whether the upload was completed"""
+        return self.completed_at is not None
+
+    @property
+    def chunks(self) -> int:
+        """Number of chunks the file is split into"""
+        return -(-self.size // self.chunk_size)
+
+    def chunk_range(self, index: int) -> tuple[int, int]:
+        """Returns the offset and the length of the given chunk"""
+        offset = index * self.chunk_size
+        return offset, min(self.chunk_size, self.size - offset)
+
+
+class ChunkWriter:
+    """Writes a chunk's data, as it comes, into its memory-mapped region of the file.
+    Closed without being committed, the chunk isn't marked as received.
+    """
+
+    def __init__(self, directory: str, session: UploadSession, index: int) -> None:
+        self.offset, self.length = session.chunk_range(index)
+        self.written = 0
+        self._marker_path = os.path.join(directory, "chunks", str(index))
+        self._digest = hashlib.sha256()
+        with open(os.path.join(directory, "source"), "r+b") as file:
+            self._map = mmap.mmap(file.fileno(), self.length, offset=self.offset)
+
+    def __enter__(self) -> "ChunkWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmaps the chunk's region"""
+        self._map.close()
+
+    def write(self, data: bytes) -> None:
+        """Writes the next bytes of the chunk"""
+        if self.written + len(data) > self.length:
+            raise errors.ChunkRejectedError(f"The chunk is longer than {self.length} bytes")
+
+        self._map[self.written : self.written + len(data)] = data
+        self._digest.update(data)
+        self.written += len(data)
+
+    def commit(self, sha256: str) -> None:
+        """Flushes the chunk to disk and marks it as received, if it's whole and
+        matches the SHA-256 digest (in hex) it was sent with
+        """
+        if self.written != self.length:
+            raise errors.ChunkRejectedError(
+                f"Expected {self.length} bytes, got {self.written}"
+            )
+        if self._digest.hexdigest() != sha256.lower():
+            raise errors.ChunkRejectedError("The chunk doesn't match its SHA-256 digest")
+
+        try:
+            self._map.flush()
+            temporary_path = f"{self._marker_path}.{secrets.token_hex(4)}"
+            with open(temporary_path, "w", encoding="utf-8") as marker:
+                marker.write(self._digest.hexdigest())
+            os.replace(temporary_path, self._marker_path)
+        except OSError as e:
+            raise errors.UploadError("Failed to store the chunk") from e
+
+
+class UploadStore:
+    """Upload sessions, spooled to the given directory"""
+
+    def __init__(self, directory: str = config.UPLOAD_DIRECTORY) -> None:
+        self.directory = directory
+
+    def _session_directory(self, upload_id: str) -> str:
+        """Returns the path of the session's directory"""
+        return os.path.join(self.directory, upload_id)
+
+    def create(
+        self,
+        job_id: str,
+        size: int,
+        chunk_size: int,
+        delay_seconds: int = 20,
+        priority: int = 0,
+        callback_url: Optional[str] = None,
+    ) -> UploadSession:
+        """Creates a session, with an empty file of the given size (sparse, where
+        the file system supports it). Returns the session.
+        """
+        # pylint: disable=too-many-arguments
+
+        session = UploadSession(
+            upload_id=secrets.token_hex(16),
+            job_id=job_id,
+            size=size,
+            chunk_size=chunk_size,
+            delay_seconds=delay_seconds,
+            priority=priority,
+            callback_url=callback_url,
+            created_at=clock.now().timestamp(),
+        )
+        directory = self._session_directory(session.upload_id)
+        try:
+            os.makedirs(os.path.join(directory, "chunks"))
+            with open(os.path.join(directory, "source"), "wb") as file:
+                file.truncate(size)
+
+            parameters = asdict(session)
+            del parameters["received_chunks"], parameters["completed_at"]
+            with open(os.path.join(directory, "session.json"), "w", encoding="utf-8") as file:
+                json.dump(parameters, file)
+        except OSError as e:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise errors.UploadError(f"Failed to create an upload session for {job_id}") from e
+
+        return session
+
+    def get(self, upload_id: str) -> Optional[UploadSession]:
+        """Returns the session, with the chunks received so far, or None if it doesn't exist"""
+        if not _UPLOAD_ID_PATTERN.match(upload_id):
+            return None
+
+        directory = self._session_directory(upload_id)
+        try:
+            with open(os.path.join(directory, "session.json"), encoding="utf-8") as file:
+                session = UploadSession(**json.load(file))
+            session.received_chunks = sorted(
+                int(name)
+                for name in os.listdir(os.path.join(directory, "chunks"))
+                if name.isdigit()
+            )
+            try:
+                with open(os.path.join(directory, "completed"), encoding="utf-8") as marker:
+                    session.completed_at = float(marker.read())
+            except FileNotFoundError:
+                pass
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            raise errors.UploadError(f"Failed to read the upload session {upload_id}") from e
+
+        return session
+
+    def sessions(self) -> list[UploadSession]:
+        """Returns every session (that's readable)"""
+        try:
+            upload_ids = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        except OSError as e:
+            raise errors.UploadError("Failed to list the upload sessions") from e
+
+        return [session for upload_id in upload_ids if (session := self.get(upload_id))]
+
+    def open_chunk(self, session: UploadSession, index: int) -> ChunkWriter:
+        """Returns a writer of the given chunk of the session"""
+        try:
+            return ChunkWriter(self._session_directory(session.upload_id), session, index)
+        except OSError as e:
+            raise errors.UploadError(
+                f"Failed to open the chunk {index} of {session.upload_id}"
+            ) from e
+
+    def source_path(self, upload_id: str) -> str:
+        """Returns the path of the session's file"""
+        return os.path.join(self._session_directory(upload_id), "source")
+
+    def claim_completion(self, session: UploadSession) -> bool:
+        """Marks the session as completed, once every chunk has been received.
+        Returns whether this call did, rather than a concurrent one (or a previous one).
+        """
+        path = os.path.join(self._session_directory(session.upload_id), "completed")
+        temporary_path = f"{path}.{secrets.token_hex(4)}"
+        try:
+            with open(temporary_path, "w", encoding="utf-8") as marker:
+                marker.write(repr(clock.now().timestamp()))
+            # Unlike a rename, linking fails if the marker already exists
+            os.link(temporary_path, path)
+        except FileExistsError:
+            return False
+        except OSError as e:
+            raise errors.UploadError(f"Failed to complete the upload {session.upload_id}") from e
+        finally:
+            with suppress(OSError):
+                os.remove(temporary_path)
+
+        return True
+
+    def release_completion(self, session: UploadSession) -> None:
+        """Unmarks the session as completed, e.g. when its job couldn't be submitted"""
+        try:
+            os.remove(os.path.join(self._session_directory(session.upload_id), "completed"))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            raise errors.UploadError(f"Failed to reopen the upload {session.upload_id}") from e
+
+    def delete(self, upload_id: str) -> bool:
+        """Deletes the session and its file. Returns whether there was one to delete"""
+        if not _UPLOAD_ID_PATTERN.match(upload_id):
+            return False
+
+        try:
+            shutil.rmtree(self._session_directory(upload_id))
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            raise errors.UploadError(f"Failed to delete the upload {upload_id}") from e
+
+        return True
+
+
+# Upload sessions of the server
+UPLOAD_STORE = UploadStore()
@@ -0,0 +1,229 @@
+"""Background task notifying the callback URLs of the jobs reaching their terminal state"""
+
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Literal, Optional
+from urllib.parse import urlparse
+
+import asyncio
+import logging
+
+import httpx
+
+from server import clock, config, events
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DeadLetter:
+    """A callback that couldn't be delivered"""
+
+    job_id: str
+    callback_url: str
+    result: Literal["completed", "error"]
+    attempts: int
+    error: str
+    failed_at: datetime
+
+
+@dataclass
+class _HostDeliveries:
+    """The deliveries to a single host"""
+
+    in_flight: asyncio.Semaphore  # Caps the requests in flight to the host
+    deliveries: int = 0  # Deliveries to the host, in flight or waiting to be retried
+
+
+def _is_retryable(response: httpx.Response) -> bool:
+    """Whether a failed delivery is worth retrying, i.e. it didn't fail because of the request"""
+    return response.status_code in (408, 429) or response.status_code >= 500
+
+
+class WebhookDispatcher:  # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    """POSTs {"job_id": ..., "result": ...} to the `callback_url` of every job that
+    reaches "completed"/"error" (as announced on `events.JOB_TRANSITIONS`).
+
+    The transitions of the jobs with a callback_url (and only those) are buffered
+    in a bounded queue, and each of their callbacks is delivered by its own task,
+    through a single pooled HTTP client. At most
+    `max_in_flight` deliveries run at once, with at most `max_connections_per_host`
+    requests in flight to any single host. Hosts are only tracked while they have
+    deliveries running.
+
+    Deliveries failing with a network error, a timeout, a 408, a 429 or a 5xx are
+    retried up to `max_attempts` times, waiting `backoff_seconds` (doubling after
+    every attempt) in between. Deliveries that fail for good, and transitions that
+    don't fit in the queue, are kept in `dead_letters` (the most recent ones only).
+
+    Attributes:
+        queue_size: int -> Maximum number of transitions waiting to be delivered.
+        max_in_flight: int -> Maximum number of deliveries running at once.
+        max_connections_per_host: int -> Maximum number of requests in flight per host.
+        max_attempts: int -> Attempts made at delivering a callback.
+        backoff_seconds: float -> Seconds waited after the first failed attempt.
+        timeout_seconds: float -> Timeout of every attempt.
+        delivered_callbacks: int -> Number of callbacks delivered by this process so far.
+        dead_letters: deque[DeadLetter] -> The most recent deliveries that failed for good.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        queue_size: int = config.WEBHOOK_QUEUE_SIZE,
+        max_in_flight: int = config.WEBHOOK_MAX_IN_FLIGHT,
+        max_connections_per_host: int = config.WEBHOOK_MAX_CONNECTIONS_PER_HOST,
+        max_attempts: int = config.WEBHOOK_MAX_ATTEMPTS,
+        backoff_seconds: float = config.WEBHOOK_BACKOFF_SECONDS,
+        timeout_seconds: float = config.WEBHOOK_TIMEOUT_SECONDS,
+        dead_letters_size: int = config.WEBHOOK_DEAD_LETTERS_SIZE,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.queue_size = queue_size
+        self.max_in_flight = max_in_flight
+        self.max_connections_per_host = max_connections_per_host
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.timeout_seconds = timeout_seconds
+        self.delivered_callbacks = 0
+        self.dead_letters: deque[DeadLetter] = deque(maxlen=dead_letters_size)
+        self._transport = transport
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue[events.JobTransition]] = None
+        self._in_flight: Optional[asyncio.Semaphore] = None
+        self._in_flight_by_host: dict[str, _HostDeliveries] = {}
+
+    def _dead_letter(self, transition: events.JobTransition, attempts: int, error: str) -> None:
+        """Records a callback that couldn't be delivered"""
+        logger.warning(
+            "Giving up on the callback of the job %s to %s: %s",
+            transition.job_id,
+            transition.callback_url,
+            error,
+        )
+        self.dead_letters.append(
+            DeadLetter(
+                job_id=transition.job_id,
+                callback_url=transition.callback_url,
+                result=transition.status,
+                attempts=attempts,
+                error=error,
+                failed_at=clock.now(),
+            )
+        )
+
+    def _enqueue(self, transition: events.JobTransition) -> None:
+        """Queues the transition for delivery (on the event loop)"""
+        if self._queue is None:
+            return
+
+        try:
+            self._queue.put_nowait(transition)
+        except asyncio.QueueFull:
+            self._dead_letter(transition, 0, "The delivery queue was full")
+
+    def _on_transition(self, transition: events.JobTransition) -> None:
+        """Hands the terminal transitions of the jobs with a callback_url over to
+        the event loop, from any thread
+        """
+        loop = self._loop
+        if transition.status != "pending" and transition.callback_url and loop is not None:
+            loop.call_soon_threadsafe(self._enqueue, transition)
+
+    async def _deliver(
+        self, http_client: httpx.AsyncClient, transition: events.JobTransition
+    ) -> None:
+        """POSTs the job's result to its callback URL, within its host's limit"""
+        assert transition.callback_url is not None
+        host = urlparse(transition.callback_url).netloc
+        host_deliveries = self._in_flight_by_host.get(host)
+        if host_deliveries is None:
+            host_deliveries = _HostDeliveries(asyncio.Semaphore(self.max_connections_per_host))
+            self._in_flight_by_host[host] = host_deliveries
+
+        host_deliveries.deliveries += 1
+        try:
+            await self._post(http_client, transition, host_deliveries.in_flight)
+        finally:
+            host_deliveries.deliveries -= 1
+            if not host_deliveries.deliveries:
+                del self._in_flight_by_host[host]
+
+    async def _post(
+        self,
+        http_client: httpx.AsyncClient,
+        transition: events.JobTransition,
+        in_flight: asyncio.Semaphore,
+    ) -> None:
+        """POSTs the job's result to its callback URL, retrying with backoff"""
+        callback_url = transition.callback_url
+        assert callback_url is not None
+        payload = {"job_id": transition.job_id, "result": transition.status}
+
+        error = ""
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                async with in_flight:
+                    response = await http_client.post(callback_url, json=payload)
+            except httpx.HTTPError as e:
+                error = f"{type(e).__name__}: {e}"
+            else:
+                if response.is_success:
+                    self.delivered_callbacks += 1
+                    return
+
+                error = f"HTTP {response.status_code}"
+                if not _is_retryable(response):
+                    self._dead_letter(transition, attempt, error)
+                    return
+
+            if attempt < self.max_attempts:
+                await asyncio.sleep(self.backoff_seconds * 2 ** (attempt - 1))
+
+        self._dead_letter(transition, self.max_attempts, error)
+
+    async def _dispatch(
+        self, http_client: httpx.AsyncClient, deliveries: set[asyncio.Task]
+    ) -> None:
+        """Drains the queue, starting a delivery per transition"""
+        assert self._queue is not None and self._in_flight is not None
+        while True:
+            transition = await self._queue.get()
+            await self._in_flight.acquire()
+            delivery = asyncio.create_task(self._deliver(http_client, transition))
+            deliveries.add(delivery)
+            delivery.add_done_callback(deliveries.discard)
+            delivery.add_done_callback(lambda _: self._in_flight.release())
+
+    async def run(self) -> None:
+        """Delivers the callbacks as the jobs reach their terminal state, until cancelled"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(self.queue_size)
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        self._in_flight_by_host.clear()
+        deliveries: set[asyncio.Task] = set()
+
+        events.JOB_TRANSITIONS.subscribe(self._on_transition)
+        try:
+            async with httpx.AsyncClient(
+                transport=self._transport,
+                timeout=self.timeout_seconds,
+                limits=httpx.Limits(
+                    max_connections=self.max_in_flight,
+                    max_keepalive_connections=self.max_in_flight,
+                ),
+            ) as http_client:
+                try:
+                    await self._dispatch(http_client, deliveries)
+                finally:
+                    for delivery in list(deliveries):
+                        delivery.cancel()
+                    await asyncio.gather(*deliveries, return_exceptions=True)
+        finally:
+            events.JOB_TRANSITIONS.unsubscribe(self._on_transition)
+            self._loop = None
+            self._queue = None
+
+
+# Dispatcher run by the server, for as long as it's up
+WEBHOOK_DISPATCHER = WebhookDispatcher()
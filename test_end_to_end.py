@@ -3,6 +3,7 @@ after spinning up the FastAPI server and by making use of
 the installed 'translate_video' client library.
 """
 
+from translate_video.observers import ConsoleObserver
 from translate_video.translate_video import TranslateVideo
 
 job = TranslateVideo(
@@ -10,6 +11,7 @@ job = TranslateVideo(
     delay_seconds=15,
     polling_interval_seconds=3,
     timeout_seconds=60,
+    job_observers=[ConsoleObserver()],
 )
 job.display_attributes()
 